@@ -13,12 +13,22 @@ from pydantic import BaseModel, Field
 # LangGraph & LangChain Core
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, AnyMessage
 from langchain_core.runnables import RunnableConfig
 from langchain.tools import tool
 
+from apps.backend.agent.categories import CATEGORY_MAP
+from apps.backend.agent.checkpointer import create_checkpointer
+from apps.backend.agent.context import (
+    INTENT_HISTORY,
+    analysis_context,
+    recent_messages,
+    trim_cards_for_question,
+)
+from apps.backend.agent.fast_extract import FastPathExtractor
+from apps.backend.core.metrics import instrument_node, llm_metrics_callback, metrics
+from apps.backend.tools.benefit_digest import bullet_cache, digest_store, select_digest
 from apps.backend.tools.rag_search import card_rag_search
 
 # ===========================< Setting >============================
@@ -40,7 +50,11 @@ os.environ["LANGSMITH_ENDPOINT"] = "https://api.smith.langchain.com"
 # LLM Model 설정
 # solar-pro2 등 사용하시는 모델명으로 변경하세요.
 MODEL = "solar-pro2"
-llm = init_chat_model(model=MODEL, temperature=0.0)
+# LLM 호출 지연 / 토큰은 노드별로 /metrics에 집계
+llm = init_chat_model(model=MODEL, temperature=0.0, callbacks=[llm_metrics_callback])
+
+# 예산/카테고리가 명확한 메시지는 LLM 대신 규칙 기반 추출 (AGENT_FAST_PATH=false 로 끌 수 있음)
+FAST_PATH_ENABLED = os.getenv("AGENT_FAST_PATH", "true").lower() in ("1", "true", "yes")
 
 # ===========================< Data Models >============================
 
@@ -112,18 +126,8 @@ class IntentAnalysis(CardSearchCriteria):
     )
 
 
-CATEGORY_MAP = {
-    "General (무조건/범용)": '"어디서나 혜택", "전 가맹점 할인", "아무데서나 적립", "실적 상관없이" 관련 언급 시 매핑.',
-    "Shopping (쇼핑/결제)": "마트, 편의점(CU/GS25 등), 온라인/오프라인 쇼핑, 간편결제(온라인페이), 올리브영, 무신사, 네이버페이, 쿠팡, 옷 쇼핑 등.",
-    "Traffic (교통/차량)": "주유소, 버스, 지하철, 택시, 자동차 보험, 모빌리티 서비스.",
-    "Food (외식/배달)": "식비, 맛집, 배달 앱(배달의민족, 요기요 등), 저녁 외식 등.",
-    "Coffee (카페/디저트)": "스타벅스, 투썸, 빵집, 디저트 가게.",
-    "Cultural (문화/디지털)": "문화, 레저, 스포츠(헬스장, 골프 등), 구독, 디지털 콘텐츠(넷플릭스, 유튜브 프리미엄, 멜론 등), 영화관, 전시회.",
-    "Travel (여행/항공)": "항공, 면세점, 호텔, 에어비앤비, 해외 직구, 라운지 이용.",
-    "Life (생활/납부/금융)": "핸드폰 요금, 공과금(전기세, 수도세 등),  아파트 관리비, 자동납부, 렌탈, 금융, 보험료 납부.",
-    "EduHealth (교육/의료)": "교육, 육아, 병원, 약국, 건강보조식품 등.",
-    "Others (기타 항목)": "나머지 분류 기준에 해당되지 않는 항목들이 여기에 속함.",
-}
+# 규칙 기반 예산/카테고리 추출기 (키워드 사전은 CATEGORY_MAP에서 생성)
+fast_extractor = FastPathExtractor(CATEGORY_MAP)
 
 # ===========================< Tool Definitions >============================
 
@@ -147,19 +151,42 @@ class AgentState(TypedDict):
     total_turns: NotRequired[int]  # 세션 내 총 대화 턴 수
     # [NEW] 꼬리 질문(QA) 대응을 위한 RAG 원본 데이터 보존 필드
     last_raw_data: NotRequired[Optional[str]]
+    # 최근 의도 흐름 (대화 요약용, 최대 INTENT_HISTORY개)
+    intent_history: NotRequired[List[str]]
+
+
+def _analysis_update(state: AgentState, analysis_result: Optional[IntentAnalysis]):
+    """분석 결과와 의도 흐름을 state 업데이트 형태로 반환"""
+    intent_history = list(state.get("intent_history") or [])
+    if analysis_result is not None:
+        intent_history = (intent_history + [analysis_result.intent_type])[-INTENT_HISTORY:]
+    return {"analysis": analysis_result, "intent_history": intent_history}
 
 
 def analyze_input_node(state: AgentState):
     """
-    전체 대화 기록(state['messages'])을 분석하여 현재까지 파악된 정보를 추출합니다.
+    대화 기록을 분석하여 현재까지 파악된 정보를 추출합니다.
+    예산/카테고리가 명확한 메시지는 규칙 기반 추출기로 바로 처리하고(LLM 호출 생략),
+    나머지는 [이전 조건 요약 + 최근 대화]만 LLM에 넘겨 턴이 늘어도 입력 크기가 일정합니다.
     """
     print("[DEBUG] analyze_input_node")
-    # 전체 대화 히스토리를 LLM에게 전달하여 '맥락'을 이해시킴
-    conversation_history = state["messages"]
+    last_message = state["messages"][-1].content if state["messages"] else ""
+    if FAST_PATH_ENABLED and isinstance(last_message, str):
+        fast_result = fast_extractor.extract(last_message, state.get("analysis"))
+        if fast_result is not None:
+            print("└ [DEBUG] fast path (LLM 생략)")
+            metrics.inc("smartpick_cache_requests_total", cache="fast_path", result="hit")
+            return _analysis_update(state, IntentAnalysis(**fast_result))
+        metrics.inc("smartpick_cache_requests_total", cache="fast_path", result="miss")
+
+    # 직전 분석 결과 요약 + 토큰 예산 내 최근 대화 (agent/context.py)
+    conversation_history = analysis_context(
+        state["messages"], state.get("analysis"), state.get("intent_history")
+    )
 
     system_prompt = """
     당신은 신용카드 추천 서비스의 엄격한 '입력 검증자'입니다.
-    당신의 목표는 사용자와의 **전체 대화 내역**을 분석하여 검색 조건('지출', '카테고리')과 '검색 쿼리'를 추출하는 것입니다..
+    당신의 목표는 사용자와의 **대화 내역(이전 조건 요약 + 최근 대화)**을 분석하여 검색 조건('지출', '카테고리')과 '검색 쿼리'를 추출하는 것입니다..
     
     [카테고리 매핑 상세 가이드라인] 
 
@@ -207,8 +234,8 @@ def analyze_input_node(state: AgentState):
         [SystemMessage(content=system_prompt)] + conversation_history
     )
 
-    # 분석 결과를 state에 저장
-    return {"analysis": analysis_result}
+    # 분석 결과와 의도 흐름을 state에 저장
+    return _analysis_update(state, analysis_result)
 
 
 def ask_clarification_node(state: AgentState):
@@ -319,12 +346,32 @@ def call_search_tool_node(state: AgentState):
                 ]
             }
 
-        # 3. [변경] 단일 LLM 호출하지만, JSON 포맷으로 요청하여 매핑 가능하게 함
-        benefit_prompt = f"""
+        # 3. 카드별 맞춤 혜택 불릿: (카드, 관심 카테고리) 캐시에 없는 카드만 LLM 호출
+        #    전체 detailed_benefits 대신 관심 카테고리의 digest만 프롬프트에 넣음
+        benefits_map = {}
+        pending_digests = {}
+        pending_keys = {}
+        for c_name, card_info in grouped_cards.items():
+            digest = digest_store.for_card(card_info)
+            cache_key = bullet_cache.key(c_name, analysis.categories, digest.get("content_hash"))
+            cached = bullet_cache.get(cache_key)
+            metrics.inc(
+                "smartpick_cache_requests_total",
+                cache="benefit_bullets",
+                result="miss" if cached is None else "hit",
+            )
+            if cached is not None:
+                benefits_map[c_name] = cached
+                continue
+            pending_digests[c_name] = select_digest(digest, card_info, analysis.categories)
+            pending_keys[c_name] = cache_key
+
+        if pending_digests:
+            benefit_prompt = f"""
         유저 쿼리: {analysis.search_query}
         유저 관심 분야: {analysis.categories}
         관심 분야 상세 설명: {category_summary}
-        추천 카드 및 전체 혜택: {json.dumps(grouped_cards, ensure_ascii=False)}
+        추천 카드 및 관심 분야 혜택 발췌: {json.dumps(pending_digests, ensure_ascii=False)}
         
         위 데이터를 바탕으로 각 카드별로 유저 주요 지출 분야와 일치하는 핵심 혜택을 2~3개씩 추출해 불릿 포인트('- ')로 요약해줘.
         
@@ -337,25 +384,31 @@ def call_search_tool_node(state: AgentState):
             "카드명1": "- 혜택 내용 1\\n- 혜택 내용 2",
             "카드명2": "- 혜택 내용 1\\n- 혜택 내용 2"
         }}
-        키(Key)는 입력된 'card_name'과 정확히 일치해야 함.
+        키(Key)는 입력된 카드명과 정확히 일치해야 함.
         """
 
-        llm_raw = llm.invoke([SystemMessage(content=benefit_prompt)]).content
-        llm_response = (
-            llm_raw
-            if isinstance(llm_raw, str)
-            else json.dumps(llm_raw, ensure_ascii=False)
-        )
-
-        # JSON 파싱 시도 (마크다운 제거 등 전처리)
-        try:
-            cleaned_json = (
-                llm_response.replace("```json", "").replace("```", "").strip()
+            llm_raw = llm.invoke([SystemMessage(content=benefit_prompt)]).content
+            llm_response = (
+                llm_raw
+                if isinstance(llm_raw, str)
+                else json.dumps(llm_raw, ensure_ascii=False)
             )
-            benefits_map = json.loads(cleaned_json)
-        except json.JSONDecodeError:
-            print(f"[WARNING] LLM JSON 파싱 실패. 원본: {llm_response}")
-            benefits_map = {}
+
+            # JSON 파싱 시도 (마크다운 제거 등 전처리)
+            try:
+                cleaned_json = (
+                    llm_response.replace("```json", "").replace("```", "").strip()
+                )
+                generated = json.loads(cleaned_json)
+            except json.JSONDecodeError:
+                print(f"[WARNING] LLM JSON 파싱 실패. 원본: {llm_response}")
+                generated = {}
+
+            for c_name, cache_key in pending_keys.items():
+                bullets = generated.get(c_name) if isinstance(generated, dict) else None
+                if isinstance(bullets, str) and bullets.strip():
+                    bullet_cache.put(cache_key, bullets)
+                    benefits_map[c_name] = bullets
 
         # 4. 정보 결합 (카드 정보 + 상세 혜택)
         response_parts = []
@@ -426,8 +479,14 @@ def answer_qa_node(state: AgentState):
     """추천된 카드의 원본 데이터를 바탕으로 꼬리 질문에 답변합니다."""
     print("[DEBUG] answer_qa_node")
 
-    # State에 보존해둔 RAG 원본 데이터 꺼내기
-    raw_data = state.get("last_raw_data", "이전 검색 결과 원본이 존재하지 않습니다.")
+    # State에 보존해둔 RAG 원본 데이터 중 질문과 관련된 카드/혜택만 추림
+    question = state["messages"][-1].content if state["messages"] else ""
+    analysis = state.get("analysis")
+    raw_data = trim_cards_for_question(
+        state.get("last_raw_data"),
+        question if isinstance(question, str) else str(question),
+        analysis.categories if analysis else [],
+    )
 
     qa_prompt = f"""
     당신은 신용카드 상담사입니다. 사용자가 이전에 추천받은 카드에 대해 추가 질문을 했습니다.
@@ -439,8 +498,10 @@ def answer_qa_node(state: AgentState):
     질문에 대해 간결하고 정확하게 답변하며, 데이터에 없는 내용은 "해당 정보는 카드사 약관을 확인해야 합니다"라고 안내하세요.
     """
 
-    # 시스템 프롬프트 + 전체 대화 기록을 넘겨서 문맥에 맞는 답변 생성
-    response = llm.invoke([SystemMessage(content=qa_prompt)] + state["messages"])
+    # 시스템 프롬프트 + 최근 대화만 넘겨서 문맥에 맞는 답변 생성
+    response = llm.invoke(
+        [SystemMessage(content=qa_prompt)] + recent_messages(state["messages"])
+    )
 
     return {"messages": [AIMessage(content=response.content)]}
 
@@ -503,12 +564,12 @@ def check_sufficiency(
 
 workflow = StateGraph(AgentState)
 
-# 노드 등록
-workflow.add_node("analyze_input", analyze_input_node)
-workflow.add_node("ask_clarification", ask_clarification_node)
-workflow.add_node("search_cards", call_search_tool_node)
-workflow.add_node("terminate_chat", terminate_chat_node)
-workflow.add_node("answer_qa", answer_qa_node)
+# 노드 등록 (노드별 실행 시간은 smartpick_node_latency_ms로 기록)
+workflow.add_node("analyze_input", instrument_node("analyze_input", analyze_input_node))
+workflow.add_node("ask_clarification", instrument_node("ask_clarification", ask_clarification_node))
+workflow.add_node("search_cards", instrument_node("search_cards", call_search_tool_node))
+workflow.add_node("terminate_chat", instrument_node("terminate_chat", terminate_chat_node))
+workflow.add_node("answer_qa", instrument_node("answer_qa", answer_qa_node))
 
 # 엣지 연결
 workflow.add_edge(START, "analyze_input")
@@ -531,7 +592,8 @@ workflow.add_edge("terminate_chat", END)  # 메시지 출력 후 최종 종료
 workflow.add_edge("answer_qa", END)
 
 # 메모리(Checkpointer) 설정: 대화 맥락 유지의 핵심
-memory = InMemorySaver()
+# 기본은 SQLite(재시작/멀티 워커 간 공유, TTL·개수 제한), AGENT_CHECKPOINTER=memory 면 InMemorySaver
+memory = create_checkpointer()
 app = workflow.compile(checkpointer=memory)
 
 # ===========================< Test Execution >============================
@@ -0,0 +1,157 @@
+"""
+Context-size benchmark for analyze_input_node / answer_qa_node.
+
+Replays a scripted 15-turn session (search, criteria updates, follow-up
+questions) and prints the per-turn prompt size with the full history
+(previous behaviour) vs. the bounded context from agent/context.py.
+Card data is built from datasets/chunks so the QA payload has a realistic
+size. No LLM is called; tokens are approximated with context.count_tokens.
+
+Usage (from the finance-1 root):
+    uv run python -m apps.backend.agent.bench_context
+    AGENT_CONTEXT_MAX_TOKENS=800 uv run python -m apps.backend.agent.bench_context
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from apps.backend.agent.context import (
+    INTENT_HISTORY,
+    analysis_context,
+    count_tokens,
+    recent_messages,
+    trim_cards_for_question,
+)
+
+CHUNKS_DIR = Path("datasets/chunks")
+
+# (사용자 메시지, 의도, 예산, 카테고리)
+SCRIPT = [
+    ("스타벅스랑 편의점 자주 가는데 카드 추천해줘", "new_search", None, ["Coffee", "Shopping"]),
+    ("한 달에 30만원 정도 써", "update_criteria", 300000, ["Coffee", "Shopping"]),
+    ("첫 번째 카드 연회비 얼마야?", "qa_on_results", 300000, ["Coffee", "Shopping"]),
+    ("전월 실적 조건은 어떻게 돼?", "qa_on_results", 300000, ["Coffee", "Shopping"]),
+    ("교통비도 10만원 추가해줘", "update_criteria", 400000, ["Coffee", "Shopping", "Traffic"]),
+    ("지하철 할인은 몇 퍼센트야?", "qa_on_results", 400000, ["Coffee", "Shopping", "Traffic"]),
+    ("편의점 할인 한도는?", "qa_on_results", 400000, ["Coffee", "Shopping", "Traffic"]),
+    ("넷플릭스 구독도 있어", "update_criteria", 400000, ["Coffee", "Shopping", "Traffic", "Cultural"]),
+    ("두 번째 카드 해외 결제 혜택 있어?", "qa_on_results", 400000, ["Coffee", "Shopping", "Traffic", "Cultural"]),
+    ("예산은 50만원으로 늘릴게", "update_criteria", 500000, ["Coffee", "Shopping", "Traffic", "Cultural"]),
+    ("커피 할인 제일 큰 카드가 뭐야?", "qa_on_results", 500000, ["Coffee", "Shopping", "Traffic", "Cultural"]),
+    ("연회비 제일 싼 카드는?", "qa_on_results", 500000, ["Coffee", "Shopping", "Traffic", "Cultural"]),
+    ("배달앱도 자주 써", "update_criteria", 500000, ["Coffee", "Shopping", "Traffic", "Cultural", "Food"]),
+    ("배달 할인 조건 알려줘", "qa_on_results", 500000, ["Coffee", "Shopping", "Traffic", "Cultural", "Food"]),
+    ("통신비 자동납부 혜택도 있어?", "qa_on_results", 500000, ["Coffee", "Shopping", "Traffic", "Cultural", "Food"]),
+]
+
+
+def load_cards(limit: int = 5) -> List[Dict[str, Any]]:
+    """datasets/chunks에서 formatter 출력과 같은 모양의 카드 데이터를 만듭니다."""
+    cards: List[Dict[str, Any]] = []
+    for chunk_file in sorted(CHUNKS_DIR.glob("*.jsonl")):
+        rows = [json.loads(line) for line in chunk_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+        benefits = [row for row in rows if row.get("chunk_type") != "overview"]
+        if not benefits:
+            continue
+        cards.append(
+            {
+                "card_name": rows[0]["card_name"],
+                "card_company": rows[0].get("company", ""),
+                "annual_fee": 15000,
+                "min_performance": 300000,
+                "major_categories": sorted({row.get("category") or "Others" for row in benefits}),
+                "benefits_summary": benefits[0]["content"][:200],
+                "detailed_benefits": [
+                    {
+                        "category": row.get("category") or "Others",
+                        "content": row["content"],
+                        "conditions": "전월 이용실적 30만원 이상 시 제공",
+                    }
+                    for row in benefits
+                ],
+            }
+        )
+        if len(cards) == limit:
+            break
+    if not cards:
+        raise SystemExit(f"No benefit chunks found in {CHUNKS_DIR}")
+    return cards
+
+
+def recommendation_message(cards: List[Dict[str, Any]]) -> str:
+    """call_search_tool_node가 만드는 추천 응답과 비슷한 길이의 메시지"""
+    parts = [
+        f"[추천 카드 정보]\n[CARD] 카드명: {card['card_name']} ({card['card_company']})\n"
+        f"[FEE] 연회비: {card['annual_fee']:,}원\n[BUDGET] 필요 실적: {card['min_performance']:,}원\n"
+        f"[SUMMARY] 핵심 요약: {card['benefits_summary']}\n\n[고객님 맞춤 혜택 상세]\n"
+        + "\n".join(f"- {b['content'][:120]}" for b in card["detailed_benefits"][:3])
+        for card in cards
+    ]
+    return "\n\n" + ("\n" + "=" * 30 + "\n\n").join(parts)
+
+
+def main() -> None:
+    cards = load_cards()
+    raw_data = json.dumps(cards, ensure_ascii=False)
+    qa_answer = "해당 카드는 " + "조건에 따라 할인 혜택이 제공되며 월 통합 한도가 있습니다. " * 4
+
+    messages = []
+    analysis = None
+    intent_history: List[str] = []
+    rows = []
+
+    print(f"cards: {len(cards)} | last_raw_data: {len(raw_data):,} chars\n")
+    print(f"{'turn':>4} {'intent':<16} {'analyze full':>12} {'bounded':>8} {'qa full':>8} {'bounded':>8}")
+
+    for turn, (text, intent, budget, categories) in enumerate(SCRIPT, start=1):
+        messages.append(HumanMessage(content=text))
+
+        analyze_full = count_tokens(messages)
+        analyze_bounded = count_tokens(analysis_context(messages, analysis, intent_history))
+
+        analysis = SimpleNamespace(
+            budget=budget,
+            categories=categories,
+            search_query=f"월 {budget or 0:,}원 지출, {', '.join(categories)} 혜택 카드 추천",
+        )
+        intent_history = (intent_history + [intent])[-INTENT_HISTORY:]
+
+        qa_full = qa_bounded = None
+        if intent == "qa_on_results":
+            qa_full = count_tokens([SystemMessage(content=raw_data)] + messages)
+            qa_bounded = count_tokens(
+                [SystemMessage(content=trim_cards_for_question(raw_data, text, categories))]
+                + recent_messages(messages)
+            )
+            messages.append(AIMessage(content=qa_answer))
+        elif budget is not None:
+            messages.append(AIMessage(content=recommendation_message(cards)))
+        else:
+            messages.append(AIMessage(content="월 평균 예상 지출 금액을 알려주세요."))
+
+        rows.append((analyze_full, analyze_bounded, qa_full, qa_bounded))
+        print(
+            f"{turn:>4} {intent:<16} {analyze_full:>12,} {analyze_bounded:>8,} "
+            f"{qa_full if qa_full is not None else '-':>8} {qa_bounded if qa_bounded is not None else '-':>8}"
+        )
+
+    full_total = sum(r[0] + (r[2] or 0) for r in rows)
+    bounded_total = sum(r[1] + (r[3] or 0) for r in rows)
+    late = rows[-5:]
+    print(
+        f"\nsession total: full {full_total:,} -> bounded {bounded_total:,} tokens "
+        f"({100 * (1 - bounded_total / full_total):.0f}% less)"
+    )
+    print(
+        f"analyze input, turn 1-5 max vs turn 11-15 max: "
+        f"full {max(r[0] for r in rows[:5]):,} / {max(r[0] for r in late):,}, "
+        f"bounded {max(r[1] for r in rows[:5]):,} / {max(r[1] for r in late):,}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benefit-summarization prompt benchmark for call_search_tool_node.
+
+Replays a sequence of searches (5 cards each, drawn from datasets/chunks)
+and compares the old prompt payload (json.dumps of every detailed benefit)
+with the digest payload used now, plus the bullet cache hit rate across
+repeated (card, categories) pairs.
+
+No LLM is called. Latency is estimated from prompt tokens with a fixed
+prefill rate and fixed output length, so the absolute numbers are only
+indicative; the token counts are exact for the approximation used by
+agent/context.count_tokens.
+
+Usage (from the finance-1 root, after `python -m apps.backend.chunker.digest build`):
+    uv run python -m apps.backend.agent.bench_digest
+    uv run python -m apps.backend.agent.bench_digest --searches 100 --prefill-tps 2000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from langchain_core.messages import SystemMessage
+
+from apps.backend.agent.bench_context import load_cards
+from apps.backend.agent.context import count_tokens
+from apps.backend.tools.benefit_digest import BulletCache, DigestStore, select_digest
+
+CATEGORY_SETS = [
+    ["Coffee", "Shopping"],
+    ["Traffic", "Food"],
+    ["Shopping", "Travel"],
+    ["Coffee", "Traffic", "Cultural"],
+    ["Life", "EduHealth"],
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Digest vs full benefit prompt")
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--cards-per-search", type=int, default=5)
+    parser.add_argument("--prefill-tps", type=float, default=3000.0, help="가정한 prompt 처리 속도 (tokens/s)")
+    parser.add_argument("--output-ms", type=float, default=2500.0, help="가정한 불릿 생성 시간 (LLM 호출 1회)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cards = {card["card_name"]: card for card in load_cards(limit=100)}
+    store = DigestStore()
+    cache = BulletCache()
+    names = sorted(cards)
+    print(f"cards: {len(cards)} | digests on disk: {sum(store.get(n) is not None for n in names)}")
+
+    full_tokens, digest_tokens, build_ms = [], [], []
+    full_ms = digest_ms = 0.0
+    llm_calls = 0
+    for _ in range(args.searches):
+        categories = rng.choice(CATEGORY_SETS)
+        picked = rng.sample(names, min(args.cards_per_search, len(names)))
+        grouped = {name: cards[name] for name in picked}
+
+        full = count_tokens([SystemMessage(content=json.dumps(grouped, ensure_ascii=False))])
+        full_tokens.append(full)
+        full_ms += full / args.prefill_tps * 1000 + args.output_ms
+
+        start = time.perf_counter()
+        pending = {}
+        for name, card_info in grouped.items():
+            digest = store.for_card(card_info)
+            key = cache.key(name, categories, digest.get("content_hash"))
+            if cache.get(key) is not None:
+                continue
+            pending[name] = select_digest(digest, card_info, categories)
+            # LLM 응답 대신 더미 불릿 저장
+            cache.put(key, "- cached")
+        build_ms.append((time.perf_counter() - start) * 1000)
+
+        if pending:
+            tokens = count_tokens([SystemMessage(content=json.dumps(pending, ensure_ascii=False))])
+            digest_tokens.append(tokens)
+            digest_ms += tokens / args.prefill_tps * 1000 + args.output_ms
+            llm_calls += 1
+        else:
+            digest_tokens.append(0)
+
+    print(
+        f"\nbenefit payload tokens per search: full avg {statistics.mean(full_tokens):,.0f} "
+        f"(max {max(full_tokens):,}) -> digest avg {statistics.mean(digest_tokens):,.0f} "
+        f"(max {max(digest_tokens):,})"
+    )
+    print(f"total payload tokens: {sum(full_tokens):,} -> {sum(digest_tokens):,} "
+          f"({100 * (1 - sum(digest_tokens) / sum(full_tokens)):.0f}% less)")
+    print(f"digest selection overhead: p50 {statistics.median(build_ms):.2f} ms, max {max(build_ms):.2f} ms")
+    print(f"LLM calls: {args.searches} -> {llm_calls} | bullet cache {cache.stats()}")
+    print(
+        f"estimated node LLM time ({args.prefill_tps:.0f} tok/s prefill + {args.output_ms:.0f} ms output): "
+        f"{full_ms / args.searches:,.0f} ms -> {digest_ms / args.searches:,.0f} ms per search"
+    )
+
+
+if __name__ == "__main__":
+    main()
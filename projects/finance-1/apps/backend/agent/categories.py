@@ -0,0 +1,18 @@
+"""
+에이전트 카테고리 분류 기준 (IntentAnalysis.categories와 같은 체계)
+
+agent.py의 검색 쿼리 보강과 fast_extract.py의 키워드 사전이 함께 사용합니다.
+"""
+
+CATEGORY_MAP = {
+    "General (무조건/범용)": '"어디서나 혜택", "전 가맹점 할인", "아무데서나 적립", "실적 상관없이" 관련 언급 시 매핑.',
+    "Shopping (쇼핑/결제)": "마트, 편의점(CU/GS25 등), 온라인/오프라인 쇼핑, 간편결제(온라인페이), 올리브영, 무신사, 네이버페이, 쿠팡, 옷 쇼핑 등.",
+    "Traffic (교통/차량)": "주유소, 버스, 지하철, 택시, 자동차 보험, 모빌리티 서비스.",
+    "Food (외식/배달)": "식비, 맛집, 배달 앱(배달의민족, 요기요 등), 저녁 외식 등.",
+    "Coffee (카페/디저트)": "스타벅스, 투썸, 빵집, 디저트 가게.",
+    "Cultural (문화/디지털)": "문화, 레저, 스포츠(헬스장, 골프 등), 구독, 디지털 콘텐츠(넷플릭스, 유튜브 프리미엄, 멜론 등), 영화관, 전시회.",
+    "Travel (여행/항공)": "항공, 면세점, 호텔, 에어비앤비, 해외 직구, 라운지 이용.",
+    "Life (생활/납부/금융)": "핸드폰 요금, 공과금(전기세, 수도세 등),  아파트 관리비, 자동납부, 렌탈, 금융, 보험료 납부.",
+    "EduHealth (교육/의료)": "교육, 육아, 병원, 약국, 건강보조식품 등.",
+    "Others (기타 항목)": "나머지 분류 기준에 해당되지 않는 항목들이 여기에 속함.",
+}
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+# ===========================< Setting >============================
+# AGENT_CHECKPOINT_DB=":memory:" 으로 두면 프로세스 메모리 안에서만 유지됩니다.
+CHECKPOINT_DB = os.getenv("AGENT_CHECKPOINT_DB", "datasets/agent_state/checkpoints.sqlite")
+THREAD_TTL_SECONDS = int(os.getenv("AGENT_THREAD_TTL_SECONDS", str(60 * 60 * 24)))
+MAX_THREADS = int(os.getenv("AGENT_MAX_THREADS", "5000"))
+# 스레드(대화)마다 남겨 둘 최근 체크포인트 개수
+KEEP_CHECKPOINTS = int(os.getenv("AGENT_KEEP_CHECKPOINTS", "2"))
+# put() 몇 번마다 TTL/개수 정리를 돌릴지
+PRUNE_EVERY = int(os.getenv("AGENT_PRUNE_EVERY", "200"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    SQLite 기반 LangGraph 체크포인터 (InMemorySaver 대체).
+
+    - 대화 상태가 파일에 저장되어 재시작 후에도 유지되고, 같은 DB 파일을
+      가리키는 여러 uvicorn 워커가 같은 thread_id를 이어서 처리할 수 있습니다 (WAL 모드).
+    - 스레드마다 최근 `keep_checkpoints`개 체크포인트만 남기고 나머지는 삭제(compaction)합니다.
+    - `ttl_seconds` 동안 갱신이 없는 스레드와, `max_threads`를 넘는 오래된 스레드는 정리합니다.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB,
+        ttl_seconds: Optional[int] = THREAD_TTL_SECONDS,
+        max_threads: Optional[int] = MAX_THREADS,
+        keep_checkpoints: int = KEEP_CHECKPOINTS,
+        prune_every: int = PRUNE_EVERY,
+    ):
+        super().__init__()
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_threads = max_threads
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self.prune_every = max(1, prune_every)
+        self._puts_since_prune = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    # ---------------------------< read >----------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+            "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: list[Any] = [thread_id, checkpoint_ns]
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            writes = self._load_writes(thread_id, checkpoint_ns, row[0])
+        return self._to_tuple(thread_id, checkpoint_ns, row, writes)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        where: list[str] = []
+        params: list[Any] = []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self.serde.loads_typed((row[4], row[5]))
+            if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                writes = self._load_writes(thread_id, checkpoint_ns, row[0])
+            yield self._to_tuple(thread_id, checkpoint_ns, tuple(row), writes)
+
+    def _load_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> list[tuple[str, str, str, bytes]]:
+        # writes_sort_key 순서: (task_path, task_id, idx)
+        return self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+    def _to_tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        row: tuple,
+        writes: list[tuple[str, str, str, bytes]],
+    ) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    # ---------------------------< write >---------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        config["configurable"].get("checkpoint_id"),
+                        type_,
+                        serialized,
+                        metadata_type,
+                        serialized_metadata,
+                    ),
+                )
+                self._touch(thread_id)
+                self._compact(thread_id, checkpoint_ns)
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.prune_every:
+                self._prune_locked()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # 특수 채널(에러/인터럽트 등, idx < 0)은 덮어쓰고, 일반 쓰기는 최초 값을 유지
+        replace_rows, insert_rows = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            (replace_rows if write_idx < 0 else insert_rows).append(
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint_id,
+                    task_id,
+                    write_idx,
+                    channel,
+                    type_,
+                    serialized,
+                    task_path,
+                )
+            )
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    replace_rows,
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    insert_rows,
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            with self.conn:
+                self._delete_threads([thread_id])
+
+    # -------------------------< eviction >--------------------------
+
+    def _touch(self, thread_id: str) -> None:
+        self.conn.execute(
+            "INSERT INTO threads (thread_id, updated_at) VALUES (?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (thread_id, time.time()),
+        )
+
+    def _compact(self, thread_id: str, checkpoint_ns: str) -> None:
+        stale = self.conn.execute(
+            "SELECT checkpoint_id FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_checkpoints),
+        ).fetchall()
+        if not stale:
+            return
+        oldest_kept = stale[0][0]
+        for table in ("checkpoints", "writes"):
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND checkpoint_id <= ?",
+                (thread_id, checkpoint_ns, oldest_kept),
+            )
+
+    def _delete_threads(self, thread_ids: Sequence[str]) -> None:
+        rows = [(thread_id,) for thread_id in thread_ids]
+        for table in ("checkpoints", "writes", "threads"):
+            self.conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", rows)
+
+    def prune(self) -> int:
+        """TTL이 지났거나 max_threads를 넘는 스레드를 삭제하고, 삭제한 개수를 반환합니다."""
+        with self._lock:
+            return self._prune_locked()
+
+    def _prune_locked(self) -> int:
+        self._puts_since_prune = 0
+        expired: list[str] = []
+        if self.ttl_seconds is not None:
+            cutoff = time.time() - self.ttl_seconds
+            expired += [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?", (cutoff,)
+                )
+            ]
+        if self.max_threads is not None:
+            expired += [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT thread_id FROM threads ORDER BY updated_at DESC "
+                    "LIMIT -1 OFFSET ?",
+                    (self.max_threads,),
+                )
+            ]
+        expired = list(dict.fromkeys(expired))
+        if expired:
+            with self.conn:
+                self._delete_threads(expired)
+        return len(expired)
+
+    def thread_count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # ---------------------------< async >---------------------------
+    # sqlite3 호출은 짧은 로컬 I/O라 InMemorySaver와 같이 동기 메서드를 그대로 사용합니다.
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """AGENT_CHECKPOINTER=memory 이면 기존 InMemorySaver, 기본값은 SQLite."""
+    if os.getenv("AGENT_CHECKPOINTER", "sqlite").lower() == "memory":
+        return InMemorySaver()
+    return SQLiteCheckpointSaver()
@@ -0,0 +1,177 @@
+"""
+LLM 호출에 넘기는 대화 맥락을 일정 크기로 유지합니다.
+
+- analyze_input_node: 전체 기록 대신 [이전까지 파악된 조건 요약] + 최근 대화(토큰 예산 내)
+- answer_qa_node: 최근 대화 + 질문과 관련된 카드/혜택 필드만 남긴 last_raw_data
+
+세션이 길어져도(최대 15턴) 턴당 프롬프트 크기가 거의 일정하게 유지됩니다.
+"""
+
+import json
+import os
+import re
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.messages import AnyMessage, SystemMessage, trim_messages
+from langchain_core.messages.utils import count_tokens_approximately
+
+# ===========================< Setting >============================
+# 최근 대화에 쓸 토큰 예산 (한국어 기준 근사치, count_tokens 참고)
+CONTEXT_MAX_TOKENS = int(os.getenv("AGENT_CONTEXT_MAX_TOKENS", "1200"))
+# QA 답변 시 카드당 남길 상세 혜택 수 / 혜택 본문 최대 길이
+QA_BENEFITS_PER_CARD = int(os.getenv("AGENT_QA_BENEFITS_PER_CARD", "3"))
+QA_BENEFIT_CHARS = int(os.getenv("AGENT_QA_BENEFIT_CHARS", "300"))
+# 요약에 남길 이전 의도 개수
+INTENT_HISTORY = 5
+
+# 질문에 이 단어가 있으면 해당 필드를 꼭 포함
+FIELD_KEYWORDS = {
+    "annual_fee": ("연회비", "연 회비", "fee"),
+    "min_performance": ("실적", "전월", "조건", "이용금액"),
+    "major_categories": ("카테고리", "분야", "어디"),
+}
+
+
+def count_tokens(messages: Sequence[AnyMessage]) -> int:
+    """
+    오프라인 토큰 수 근사치. 한국어는 영어보다 글자당 토큰이 많아서
+    chars_per_token=2로 계산합니다.
+    """
+    return count_tokens_approximately(messages, chars_per_token=2.0)
+
+
+def recent_messages(
+    messages: Sequence[AnyMessage], max_tokens: int = CONTEXT_MAX_TOKENS
+) -> List[AnyMessage]:
+    """
+    토큰 예산 안에 들어가는 최근 대화만 남깁니다 (사람 메시지로 시작).
+    마지막 사용자 메시지는 예산을 넘더라도 항상 포함합니다.
+    """
+    if not messages:
+        return []
+    window = trim_messages(
+        list(messages),
+        max_tokens=max_tokens,
+        token_counter=count_tokens,
+        strategy="last",
+        start_on="human",
+    )
+    if window:
+        return window
+    last = messages[-1]
+    return [last]
+
+
+def criteria_summary(
+    analysis: Any, intent_history: Optional[Sequence[str]] = None
+) -> Optional[SystemMessage]:
+    """
+    직전 턴까지의 분석 결과(IntentAnalysis)를 한 덩어리 요약으로 만듭니다.
+    잘려 나간 예전 대화의 예산/카테고리는 이 요약으로 이어집니다.
+    """
+    if analysis is None:
+        return None
+
+    budget = analysis.budget
+    if budget == "INF":
+        budget_text = "상관없음(INF)"
+    elif isinstance(budget, int):
+        budget_text = f"{budget:,}원"
+    else:
+        budget_text = "미확인"
+
+    lines = [
+        "[이전 대화에서 파악된 조건 요약]",
+        f"- 월 지출(budget): {budget_text}",
+        f"- 카테고리: {', '.join(analysis.categories) if analysis.categories else '미확인'}",
+        f"- 직전 검색 쿼리: {analysis.search_query}",
+    ]
+    if intent_history:
+        lines.append(f"- 이전 의도 흐름: {' → '.join(intent_history[-INTENT_HISTORY:])}")
+    lines.append(
+        "새 메시지가 위 조건을 바꾸지 않으면 그대로 유지하고, 바꾸면 새 값으로 갱신하세요."
+    )
+    return SystemMessage(content="\n".join(lines))
+
+
+def analysis_context(
+    messages: Sequence[AnyMessage],
+    analysis: Any = None,
+    intent_history: Optional[Sequence[str]] = None,
+) -> List[AnyMessage]:
+    """analyze_input_node용: 조건 요약 + 최근 대화"""
+    summary = criteria_summary(analysis, intent_history)
+    window = recent_messages(messages)
+    return ([summary] if summary else []) + window
+
+
+def _question_terms(question: str) -> List[str]:
+    return [term for term in re.findall(r"[0-9A-Za-z가-힣]+", question.lower()) if len(term) >= 2]
+
+
+def _matches(text: str, terms: Sequence[str]) -> int:
+    text = text.lower()
+    # 한국어 조사("스타벅스는")를 고려해 앞 2글자 이상 접두어로도 비교
+    return sum(1 for term in terms if term in text or (len(term) > 2 and term[:-1] in text))
+
+
+def trim_cards_for_question(
+    raw_data: Optional[str],
+    question: str,
+    categories: Sequence[str] = (),
+) -> str:
+    """
+    answer_qa_node용: last_raw_data(JSON)를 질문과 관련된 부분만 남겨 줄입니다.
+
+    - 질문에 카드명이 나오면 그 카드만 남김
+    - 카드 기본 정보(이름/카드사/요약) + 질문에 언급된 필드(연회비, 실적 등)
+    - 상세 혜택은 질문 단어/관심 카테고리와 겹치는 것 위주로 카드당 최대 N개
+    """
+    if not raw_data:
+        return "이전 검색 결과 원본이 존재하지 않습니다."
+    try:
+        cards = json.loads(raw_data)
+    except json.JSONDecodeError:
+        return raw_data[: QA_BENEFIT_CHARS * QA_BENEFITS_PER_CARD]
+    if not isinstance(cards, list):
+        return raw_data[: QA_BENEFIT_CHARS * QA_BENEFITS_PER_CARD]
+
+    terms = _question_terms(question)
+    lowered = question.lower()
+    named = [
+        card for card in cards
+        if isinstance(card, dict) and card.get("card_name")
+        and (card["card_name"].lower() in lowered or _matches(card["card_name"], terms) >= 2)
+    ]
+    selected = named or [card for card in cards if isinstance(card, dict)]
+    category_terms = [category.lower() for category in categories]
+
+    trimmed = []
+    for card in selected:
+        entry = {
+            "card_name": card.get("card_name"),
+            "card_company": card.get("card_company"),
+            "benefits_summary": card.get("benefits_summary"),
+        }
+        for field, keywords in FIELD_KEYWORDS.items():
+            if any(keyword in lowered for keyword in keywords):
+                entry[field] = card.get(field)
+
+        benefits = card.get("detailed_benefits") or []
+        scored = []
+        for position, benefit in enumerate(benefits):
+            text = f"{benefit.get('category', '')} {benefit.get('content', '')}"
+            score = _matches(text, terms) * 2 + _matches(text, category_terms)
+            scored.append((-score, position, benefit))
+        scored.sort(key=lambda item: (item[0], item[1]))
+        entry["detailed_benefits"] = [
+            {
+                "category": benefit.get("category"),
+                "content": str(benefit.get("content", ""))[:QA_BENEFIT_CHARS],
+                "conditions": str(benefit.get("conditions", ""))[:QA_BENEFIT_CHARS],
+            }
+            for _, _, benefit in scored[:QA_BENEFITS_PER_CARD]
+        ]
+        trimmed.append(entry)
+
+    return json.dumps(trimmed, ensure_ascii=False)
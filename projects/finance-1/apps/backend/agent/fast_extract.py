@@ -0,0 +1,318 @@
+"""
+analyze_input_node 앞단의 규칙 기반 조건 추출기 (LLM fast path)
+
+"한 달에 60만원, 커피랑 교통"처럼 예산/카테고리가 명확한 메시지는 LLM 없이
+CardSearchCriteria 필드를 채웁니다. 아래 경우에는 None을 반환해 기존 LLM 분석으로 넘깁니다.
+
+- 질문(꼬리 질문 포함), 부정/제외 표현("빼고", "말고", "없이" 등)이 있는 경우
+- 금액이 모호한 경우 ("60 쯤"처럼 단위 없는 숫자, "몇십만", 총액/항목 구분 불가)
+- 금액이 연봉/월급 등 소득이거나 연 단위인 경우, 지출 표현("월", "한 달", "쓰다" 등) 없이 금액만 있는 경우
+- 예산도 카테고리도 찾지 못한 경우, 또는 첫 턴인데 예산이 없는 경우 (잡담/무관한 질문일 수 있음)
+
+카테고리 사전은 agent.py의 CATEGORY_MAP 설명 문구에서 만들고, 자주 쓰는 구어체 표현을 보충합니다.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# CATEGORY_MAP 문구만으로는 부족한 구어체/줄임말
+EXTRA_KEYWORDS: Dict[str, Sequence[str]] = {
+    "General": ("어디서나", "아무데서나", "전 가맹점", "모든 가맹점"),
+    "Shopping": ("쇼핑", "편의점", "마트", "옷", "cu", "gs25", "세븐일레븐", "이마트", "홈플러스", "11번가", "지마켓", "쿠팡"),
+    "Traffic": ("교통", "버스", "지하철", "택시", "주유", "기름값", "차량", "대중교통"),
+    "Food": ("식비", "외식", "배달", "배민", "밥값", "점심", "저녁"),
+    "Coffee": ("커피", "카페", "스벅", "스타벅스", "디저트", "빵"),
+    "Cultural": ("콘서트", "공연", "뮤지컬", "영화", "넷플릭스", "유튜브", "ott", "헬스", "골프", "게임", "전시"),
+    "Travel": ("여행", "항공", "해외", "호텔", "면세"),
+    "Life": ("통신비", "핸드폰", "휴대폰", "폰요금", "관리비", "공과금", "보험료", "렌탈"),
+    "EduHealth": ("교육", "학원", "병원", "약국", "의료", "육아"),
+}
+
+# CATEGORY_MAP에서 뽑히지만 너무 일반적이라 단독으로는 카테고리를 정할 수 없는 단어
+STOP_TERMS = {
+    "결제", "온라인", "오프라인", "서비스", "금융", "생활", "디지털", "문화", "무조건", "범용",
+    "기타", "기타 항목", "납부", "차량", "레저", "스포츠", "자동납부",
+}
+
+# 이 단어 안에 들어 있는 키워드는 무시 ("스마트폰"의 "마트")
+FALSE_POSITIVES: Dict[str, Sequence[str]] = {"마트": ("스마트",), "빵": ("빵빵",), "옷": ()}
+
+QUESTION_PATTERN = re.compile(
+    r"얼마야|얼마에요|얼마예요|얼마나|뭐야|뭔가요|뭐에요|뭔지|어떤|어때|어떻게|알려|있어\?|있나요|되나요|"
+    r"차이|비교|왜|무슨|가능해|가능한가|설명|뭐\s*\w*[지까]\b|뭘"
+)
+NEGATION_PATTERN = re.compile(r"빼고|말고|제외|없이|없고|없어|필요\s*없|싫|안\s*써|안\s*쓰")
+INF_PATTERN = re.compile(
+    r"(?:돈|금액|지출|예산|소비|얼마|카드값|내\s*돈)[^.,!?]{0,12}?"
+    r"(?:상관\s*없[어이고음는다]*|신경\s*(?:안\s*써|쓰지\s*말[고아]?|안\s*쓸게)|무관하[게고]?|관계\s*없[어이고]*)"
+)
+ADDITIVE_PATTERN = re.compile(r"추가|더\s|늘|줄|올려|내려|바꿔|변경|수정")
+VAGUE_AMOUNT_PATTERN = re.compile(r"몇\s*(?:십|백|천)?\s*만")
+# 금액 앞뒤에 붙으면 월 지출 예산이 아님 ("연봉 5000만원", "1년에 600만원", "월급 300")
+INCOME_PATTERN = re.compile(r"연봉|연간|연\s*수입|[1일]\s*년|한\s*해|매년|월급|급여|실수령|세전|세후|소득|수입|벌[어고는]|번다")
+# 금액을 예산으로 보려면 필요한 지출 표현
+SPEND_CUE_PATTERN = re.compile(r"월|달|지출|쓰|써|쓸|씁|씀|소비|결제|나와|나오|나가|카드값|예산|이하|이내|최대")
+TOTAL_PATTERN = re.compile(r"총|전체|그중|그 중|합쳐|합해서|다\s*해서|이렇게\s*해서|통틀어|카드값")
+STUDENT_PATTERN = re.compile(r"학생|대학생|미성년|고등학생|중학생")
+
+KOREAN_DIGITS = {"일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "칠": 7, "팔": 8, "구": 9}
+KOREAN_UNITS = {"십": 10, "백": 100, "천": 1000}
+UNIT_MULTIPLIERS = {"억": 100_000_000, "천만": 10_000_000, "백만": 1_000_000, "만": 10_000, "천": 1_000}
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?|[일이삼사오육칠팔구십백천]+(?=\s*(?:억|천만|백만|만))"
+_UNIT = r"억|천만|백만|만|천"
+AMOUNT_PATTERN = re.compile(
+    rf"(?P<low>{_NUMBER})\s*(?P<low_unit>{_UNIT})?\s*(?P<low_won>원)?"
+    rf"(?:\s*(?:~|-|에서)\s*(?P<high>{_NUMBER})\s*(?P<high_unit>{_UNIT})?\s*(?P<high_won>원)?)?"
+)
+# 금액이 아닌 숫자 (주 3~4회, 2024년, 10% 등)
+NON_MONEY_SUFFIX = re.compile(r"^(?:\s*%|\s*퍼센트|회|번|살|세|개|일|시|분|주|달|월|개월|년|학년|명|장|층|km|키로)")
+
+
+def _korean_number(text: str) -> Optional[float]:
+    total, current = 0, 0
+    for char in text:
+        if char in KOREAN_DIGITS:
+            current = KOREAN_DIGITS[char]
+        elif char in KOREAN_UNITS:
+            total += (current or 1) * KOREAN_UNITS[char]
+            current = 0
+        else:
+            return None
+    return float(total + current)
+
+
+def _to_number(text: str) -> Optional[float]:
+    if text[0].isdigit():
+        try:
+            return float(text.replace(",", ""))
+        except ValueError:
+            return None
+    return _korean_number(text)
+
+
+def build_lexicon(category_map: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    CATEGORY_MAP("Shopping (쇼핑/결제)": "마트, 편의점(CU/GS25 등), ...")을
+    {"Shopping": ["마트", "편의점", "cu", "gs25", ...]} 형태의 키워드 사전으로 변환합니다.
+    """
+    lexicon: Dict[str, List[str]] = {}
+    for key, description in category_map.items():
+        match = re.match(r"\s*(\w+)\s*(?:\(([^)]*)\))?", key)
+        if not match:
+            continue
+        category, aliases = match.group(1), match.group(2) or ""
+        if category == "Others":
+            continue
+        text = f"{aliases}/{description}".replace('"', " ").replace("'", " ")
+        text = re.sub(r"관련 언급 시 매핑|나머지.*$", " ", text)
+        terms = []
+        for raw in re.split(r"[,./()·]|\s등\b|\s및\s", text):
+            term = raw.strip().lower()
+            term = re.sub(r"\s*등$", "", term)
+            if len(term) < 2 or term in STOP_TERMS or term.isdigit():
+                continue
+            terms.append(term)
+        terms.extend(keyword.lower() for keyword in EXTRA_KEYWORDS.get(category, ()))
+        # 긴 표현부터 매칭해야 "배달의민족"이 "배달"보다 먼저 잡힘
+        lexicon[category] = sorted(set(terms) - STOP_TERMS, key=len, reverse=True)
+    return lexicon
+
+
+def _term_pattern(term: str) -> "re.Pattern[str]":
+    if term.isascii():
+        # 영문 약어(cu, kt 등)는 단어 경계에서만 매칭
+        return re.compile(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])")
+    return re.compile(re.escape(term))
+
+
+def _term_spans(text: str, term: str, pattern: "re.Pattern[str]") -> List[Tuple[int, int]]:
+    spans = []
+    for match in pattern.finditer(text):
+        start = match.start()
+        blocked = any(
+            fp in text[max(0, start - len(fp)) : start + len(fp)]
+            for fp in FALSE_POSITIVES.get(term, ())
+        )
+        if not blocked:
+            spans.append((start, match.end()))
+    return spans
+
+
+class FastPathExtractor:
+    """규칙/사전 기반 예산·카테고리 추출기"""
+
+    def __init__(self, category_map: Dict[str, str]):
+        self.category_map = category_map
+        self.lexicon = build_lexicon(category_map)
+        self._patterns = [
+            (category, term, _term_pattern(term))
+            for category, terms in self.lexicon.items()
+            for term in terms
+        ]
+        # "Coffee" -> "카페/디저트" (검색 쿼리 문장용)
+        self.labels: Dict[str, str] = {}
+        for key in category_map:
+            match = re.match(r"\s*(\w+)\s*(?:\(([^)]*)\))?", key)
+            if match:
+                self.labels[match.group(1)] = match.group(2) or match.group(1)
+
+    # ---------------------------< 카테고리 >---------------------------
+    def extract_categories(self, text: str) -> Tuple[List[str], List[Tuple[int, str]], List[str]]:
+        """(카테고리 목록(등장 순), (위치, 카테고리) 목록, 매칭된 키워드(등장 순))"""
+        lowered = text.lower()
+        candidates = [
+            (start, end, term, category)
+            for category, term, pattern in self._patterns
+            for start, end in _term_spans(lowered, term, pattern)
+        ]
+        # 겹치면 긴 표현 우선 ("대중교통" > "교통")
+        candidates.sort(key=lambda item: item[0] - item[1])
+        accepted: List[Tuple[int, int, str, str]] = []
+        for start, end, term, category in candidates:
+            if all(end <= s or start >= e for s, e, _, _ in accepted):
+                accepted.append((start, end, term, category))
+        accepted.sort()
+
+        hits = [(start, category) for start, _, _, category in accepted]
+        categories = list(dict.fromkeys(category for _, category in hits))
+        matched_terms = list(dict.fromkeys(term for _, _, term, _ in accepted))
+        return categories, hits, matched_terms
+
+    # ---------------------------< 예산 >---------------------------
+    def extract_budget(
+        self, text: str, category_hits: Sequence[Tuple[int, str]]
+    ) -> Tuple[Optional[Any], Optional[str], bool]:
+        """
+        Returns:
+            (budget, 원문 금액 표현, 확신 여부)
+            budget: 정수, "INF", 또는 None(언급 없음)
+        """
+        if INF_PATTERN.search(text):
+            return "INF", None, True
+        if VAGUE_AMOUNT_PATTERN.search(text):
+            return None, None, False
+
+        amounts: List[Tuple[int, int, str]] = []  # (위치, 금액, 원문)
+        for match in AMOUNT_PATTERN.finditer(text):
+            low = _to_number(match.group("low"))
+            if low is None:
+                continue
+            unit = match.group("low_unit") or match.group("high_unit")
+            has_won = bool(match.group("low_won") or match.group("high_won"))
+            if unit is None and not has_won and NON_MONEY_SUFFIX.match(text[match.end() :]):
+                continue
+            if unit is None and not has_won and low < 10_000:
+                # "60 쯤"처럼 단위 없는 작은 숫자는 만원인지 원인지 알 수 없음
+                return None, None, False
+            if INCOME_PATTERN.search(text[max(0, match.start() - 12) : match.end() + 8]):
+                return None, None, False
+            # 범위는 보수적으로 최소값 ("20~25만원" -> 200000), 단위는 뒤쪽 숫자 것을 공유
+            value = low * UNIT_MULTIPLIERS[unit] if unit else low
+            amounts.append((match.start(), int(value), match.group(0).strip()))
+
+        if not amounts:
+            return None, None, True
+        if not SPEND_CUE_PATTERN.search(text):
+            return None, None, False
+        if len(amounts) == 1:
+            _, value, raw = amounts[0]
+            return value, raw, True
+
+        # 여러 금액: 총액 표현이 있으면 가장 큰 금액, 항목별 금액이면 합산, 아니면 모호
+        if TOTAL_PATTERN.search(text):
+            value = max(amount for _, amount, _ in amounts)
+            raw = next(raw for _, amount, raw in amounts if amount == value)
+            return value, raw, True
+        itemized = all(
+            any(0 <= position - hit < 15 for hit, _ in category_hits) for position, _, _ in amounts
+        )
+        if itemized:
+            total = sum(amount for _, amount, _ in amounts)
+            return total, f"{total // 10_000}만원" if total % 10_000 == 0 else f"{total:,}원", True
+        return None, None, False
+
+    # ---------------------------< 전체 >---------------------------
+    def extract(self, message: str, previous: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        IntentAnalysis 필드 dict를 반환하거나, 확신할 수 없으면 None (LLM으로 위임).
+
+        Args:
+            message: 이번 턴 사용자 메시지
+            previous: 직전 턴 분석 결과(IntentAnalysis), 없으면 None
+        """
+        text = " ".join(message.split())
+        if not text or len(text) > 200:
+            return None
+        if text.endswith("?") or QUESTION_PATTERN.search(text):
+            return None
+
+        without_inf = INF_PATTERN.sub(" ", text)
+        if NEGATION_PATTERN.search(without_inf):
+            return None
+
+        categories, hits, matched_terms = self.extract_categories(text)
+        budget, budget_text, confident = self.extract_budget(text, hits)
+        if not confident:
+            return None
+        if budget is None and not categories:
+            return None
+
+        has_previous = previous is not None and getattr(previous, "is_relevant", False)
+        if budget is None and not has_previous:
+            # 첫 턴에 카테고리 단어만 있으면 추천 요청인지 잡담("오늘 점심 뭐 먹지")인지 LLM이 판단
+            return None
+        if has_previous and ADDITIVE_PATTERN.search(text) and budget is not None:
+            # "교통비 10만원 추가" 같은 증감 표현은 기존 예산과의 관계를 LLM이 판단
+            return None
+
+        if has_previous and (budget is None or not categories):
+            intent_type = "update_criteria"
+            if budget is None:
+                budget = previous.budget
+            merged = list(previous.categories or [])
+            merged.extend(category for category in categories if category not in merged)
+            categories = merged
+        else:
+            intent_type = "new_search" if not has_previous else "update_criteria"
+
+        if budget is None and categories:
+            missing_info = "budget"
+        elif budget is not None and not categories:
+            missing_info = "categories"
+        else:
+            missing_info = None
+
+        return {
+            "search_query": self._search_query(text, budget, budget_text, categories, matched_terms),
+            "budget": budget,
+            "categories": categories,
+            "intent_type": intent_type,
+            "is_sufficient": missing_info is None,
+            "missing_info": missing_info,
+            "is_relevant": True,
+        }
+
+    def _search_query(
+        self,
+        text: str,
+        budget: Any,
+        budget_text: Optional[str],
+        categories: Sequence[str],
+        matched_terms: Sequence[str],
+    ) -> str:
+        parts = []
+        if budget == "INF":
+            parts.append("지출 금액과 상관없이")
+        elif budget_text:
+            parts.append(f"월 {budget_text} 정도 지출하는")
+        elif isinstance(budget, int):
+            parts.append(f"월 {budget:,}원 정도 지출하는")
+        if matched_terms:
+            parts.append(f"{', '.join(matched_terms)} 등")
+        if categories:
+            labels = ", ".join(self.labels.get(category, category) for category in categories)
+            parts.append(f"{labels} 혜택이 좋은")
+        card_type = "학생용 체크카드" if STUDENT_PATTERN.search(text) else "신용카드"
+        parts.append(f"{card_type} 추천")
+        return " ".join(parts)
@@ -0,0 +1,158 @@
+"""
+Checkpointer soak test: drives thousands of conversation threads through a
+graph with the same state shape as the agent (messages + analysis +
+last_raw_data JSON) and reports process RSS as traffic accumulates.
+
+No LLM or vector store is involved, so the numbers reflect checkpoint
+storage only.
+
+Usage (from the finance-1 root):
+    uv run python -m apps.backend.agent.soak_checkpointer
+    uv run python -m apps.backend.agent.soak_checkpointer --backend memory --threads 5000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Annotated, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.checkpoint.memory import InMemorySaver
+from pydantic import BaseModel
+from typing_extensions import NotRequired, TypedDict
+
+from apps.backend.agent.checkpointer import SQLiteCheckpointSaver
+
+
+class SoakAnalysis(BaseModel):
+    intent_type: str = "recommendation"
+    budget: Optional[int] = None
+    categories: list[str] = []
+
+
+class SoakState(TypedDict):
+    messages: Annotated[list, add_messages]
+    analysis: NotRequired[Optional[SoakAnalysis]]
+    last_raw_data: NotRequired[str]
+
+
+# card_rag_search 결과와 비슷한 크기의 JSON (카드 5장)
+RAW_DATA = json.dumps(
+    [
+        {
+            "card_name": f"Card {i}",
+            "card_company": "Company",
+            "annual_fee": 15000,
+            "min_performance": 300000,
+            "benefits_summary": "커피 10% 할인, 대중교통 10% 할인, 편의점 5% 적립 " * 8,
+        }
+        for i in range(5)
+    ],
+    ensure_ascii=False,
+)
+
+
+def analyze(state: SoakState) -> dict:
+    return {
+        "analysis": SoakAnalysis(
+            budget=300000 + len(state["messages"]), categories=["Coffee", "Traffic"]
+        )
+    }
+
+
+def search(state: SoakState) -> dict:
+    return {
+        "messages": [AIMessage(content="추천 카드 요약입니다. " * 20)],
+        "last_raw_data": RAW_DATA,
+    }
+
+
+def build_app(checkpointer):
+    workflow = StateGraph(SoakState)
+    workflow.add_node("analyze_input", analyze)
+    workflow.add_node("search_cards", search)
+    workflow.add_edge(START, "analyze_input")
+    workflow.add_edge("analyze_input", "search_cards")
+    workflow.add_edge("search_cards", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # macOS 등: 현재값 대신 최대 RSS
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_soak(backend: str, threads: int, turns: int, max_threads: int, report_every: int):
+    if backend == "memory":
+        checkpointer = InMemorySaver()
+        db_path = None
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(), "soak.sqlite")
+        checkpointer = SQLiteCheckpointSaver(
+            db_path, ttl_seconds=None, max_threads=max_threads, prune_every=100
+        )
+    app = build_app(checkpointer)
+
+    print(f"[{backend}] threads={threads} turns/thread={turns}")
+    print(f"[{backend}] start RSS: {rss_mb():.1f} MB")
+    start = time.perf_counter()
+    for i in range(1, threads + 1):
+        config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+        for turn in range(turns):
+            app.invoke({"messages": [HumanMessage(content=f"질문 {turn}")]}, config)
+        if i % report_every == 0 or i == threads:
+            line = f"[{backend}] {i:>6} threads  RSS {rss_mb():7.1f} MB"
+            if db_path:
+                size = os.path.getsize(db_path) / (1024 * 1024)
+                line += f"  db {size:6.1f} MB  live threads {checkpointer.thread_count()}"
+            print(line, flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"[{backend}] {threads * turns / elapsed:.0f} turns/s, final RSS {rss_mb():.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpointer soak test")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "both"], default="both")
+    parser.add_argument("--threads", type=int, default=3000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--max-threads", type=int, default=500)
+    parser.add_argument("--report-every", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.backend != "both":
+        run_soak(args.backend, args.threads, args.turns, args.max_threads, args.report_every)
+        return
+
+    # 백엔드별 RSS가 섞이지 않도록 각각 별도 프로세스에서 실행
+    for backend in ("memory", "sqlite"):
+        subprocess.run(
+            [
+                sys.executable, "-m", "apps.backend.agent.soak_checkpointer",
+                "--backend", backend,
+                "--threads", str(args.threads),
+                "--turns", str(args.turns),
+                "--max-threads", str(args.max_threads),
+                "--report-every", str(args.report_every),
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
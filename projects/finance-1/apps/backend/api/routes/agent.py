@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import json
+import os
 import uuid
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
 
 from apps.backend.agent.agent import app as agent_app
+from apps.backend.core.metrics import RequestTrace, start_trace
+from apps.backend.tools.benefit_digest import bullet_cache
+from apps.backend.tools.rag_search import result_cache
 
 
 router = APIRouter(prefix="/agent", tags=["agent"])
 
+# true 이면 모든 응답에 단계별 타이밍 breakdown 포함 (요청별로는 debug 필드)
+DEBUG_TIMINGS = os.getenv("AGENT_DEBUG_TIMINGS", "false").lower() in ("1", "true", "yes")
+
 
 class ChatRequest(BaseModel):
     message: str = Field(..., description="User message to the agent")
@@ -24,6 +32,10 @@ class ChatRequest(BaseModel):
         default=False,
         description="Force-reset the conversation state by discarding prior memory.",
     )
+    debug: bool = Field(
+        default=False,
+        description="Include a per-step timing breakdown (nodes, LLM, embedding, retrieval) in the response.",
+    )
 
 
 class AgentCard(BaseModel):
@@ -39,6 +51,7 @@ class ChatResponse(BaseModel):
     reply: str
     cards: list[AgentCard] = []
     analysis: Optional[dict[str, Any]] = None
+    timings: Optional[dict[str, Any]] = None
 
 
 def _pick_reply_from_events(events: list[dict[str, Any]]) -> Optional[str]:
@@ -82,27 +95,32 @@ def _pick_reply_from_events(events: list[dict[str, Any]]) -> Optional[str]:
     return reply
 
 
-@router.post("/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest) -> ChatResponse:
+def _build_inputs(payload: ChatRequest) -> tuple[str, dict[str, Any], dict[str, Any]]:
     thread_id = None if payload.reset else payload.thread_id
     thread_id = thread_id or uuid.uuid4().hex
     config = {"configurable": {"thread_id": thread_id}}
 
-    events: list[dict[str, Any]] = []
     inputs: dict[str, Any] = {"messages": [HumanMessage(content=payload.message)]}
 
     if payload.reset or not payload.thread_id:
         inputs["retry_count"] = 0
 
-    try:
-        for event in agent_app.stream(inputs, config=config):
-            events.append(event)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+    return thread_id, config, inputs
+
+
+def _start_trace(payload: ChatRequest) -> Optional[RequestTrace]:
+    return start_trace() if payload.debug or DEBUG_TIMINGS else None
+
 
+async def _build_response(
+    thread_id: str,
+    config: dict[str, Any],
+    events: list[dict[str, Any]],
+    trace: Optional[RequestTrace] = None,
+) -> ChatResponse:
     reply = _pick_reply_from_events(events)
 
-    state = agent_app.get_state(config).values
+    state = (await agent_app.aget_state(config)).values
     analysis_obj = state.get("analysis")
     analysis = analysis_obj.model_dump() if analysis_obj else None
 
@@ -135,9 +153,91 @@ def chat(payload: ChatRequest) -> ChatResponse:
         reply=reply or "",
         cards=cards,
         analysis=analysis,
+        timings=trace.breakdown() if trace is not None else None,
     )
 
 
+@router.post("/chat", response_model=ChatResponse)
+async def chat(payload: ChatRequest) -> ChatResponse:
+    thread_id, config, inputs = _build_inputs(payload)
+    trace = _start_trace(payload)
+
+    events: list[dict[str, Any]] = []
+    try:
+        async for event in agent_app.astream(inputs, config=config):
+            events.append(event)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    return await _build_response(thread_id, config, events, trace)
+
+
+def _ndjson(event: dict[str, Any]) -> bytes:
+    return (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+@router.post("/chat/stream")
+async def chat_stream(payload: ChatRequest) -> StreamingResponse:
+    """
+    Same turn as POST /agent/chat, streamed as NDJSON lines:
+
+    - {"type": "start", "thread_id": ...}          sent immediately
+    - {"type": "node", "node": ..., "analysis": ...} when a graph node finishes
+    - {"type": "token", "node": ..., "content": ...} LLM text tokens as they arrive
+    - {"type": "final", ...ChatResponse}            the usual reply/cards/analysis (+timings if debug)
+    - {"type": "error", "detail": ...}              if the graph raised
+    """
+    thread_id, config, inputs = _build_inputs(payload)
+
+    async def event_stream() -> AsyncIterator[bytes]:
+        # 스트림을 실제로 돌리는 task의 컨텍스트에서 trace 시작
+        trace = _start_trace(payload)
+        yield _ndjson({"type": "start", "thread_id": thread_id})
+
+        events: list[dict[str, Any]] = []
+        try:
+            async for mode, chunk in agent_app.astream(
+                inputs, config=config, stream_mode=["updates", "messages"]
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if isinstance(message, AIMessageChunk) and isinstance(
+                        message.content, str
+                    ) and message.content:
+                        yield _ndjson(
+                            {
+                                "type": "token",
+                                "node": metadata.get("langgraph_node"),
+                                "content": message.content,
+                            }
+                        )
+                    continue
+
+                events.append(chunk)
+                for node, update in chunk.items():
+                    progress: dict[str, Any] = {"type": "node", "node": node}
+                    analysis_obj = (
+                        update.get("analysis") if isinstance(update, dict) else None
+                    )
+                    if analysis_obj is not None:
+                        progress["analysis"] = analysis_obj.model_dump()
+                    yield _ndjson(progress)
+        except Exception as exc:
+            yield _ndjson({"type": "error", "detail": str(exc)})
+            return
+
+        response = await _build_response(thread_id, config, events, trace)
+        yield _ndjson({"type": "final", **response.model_dump()})
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@router.get("/search-cache")
+def search_cache_stats() -> dict[str, Any]:
+    """card_rag_search 결과 캐시의 hit rate / 절약한 지연 시간(ms) + 혜택 불릿 캐시 통계"""
+    return {**result_cache.stats(), "benefit_bullets": bullet_cache.stats()}
+
+
 def _safe_int(value: Any) -> Optional[int]:
     try:
         return int(value)
@@ -0,0 +1,195 @@
+"""
+Chunk -> embed -> upsert pipeline benchmark on a synthetic multi-issuer corpus.
+
+Card texts are rebuilt from datasets/chunks and replicated `--scale` times
+under different issuers. Embedding goes through a stand-in client with a
+fixed per-request latency (no API calls); upserts go to a real Chroma (or
+NumPy) store in a temporary directory, or are dropped (--backend discard) to
+measure the pipeline without the store's own index memory. Each corpus size
+runs in its own process so peak RSS is comparable.
+
+Reported per size: wall time, busy time of each stage (their sum is what a
+back-to-back run would take) and peak RSS.
+
+    uv run python -m apps.backend.chunker.bench_pipeline
+    uv run python -m apps.backend.chunker.bench_pipeline --scales 2 8 32 --embed-latency-ms 300
+    uv run python -m apps.backend.chunker.bench_pipeline --backend discard --scales 8 32 128
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from .chunk_models import EmbeddingRecord
+from .config import get_settings
+from .numpy_index import DEFAULT_CHUNKS_DIR
+from .pipeline import run_pipeline
+from .vector_store import ChromaVectorStore, NumpyVectorStore, VectorStore
+
+ISSUERS = ["KB국민카드", "신한카드", "삼성카드", "현대카드", "롯데카드", "우리카드", "하나카드", "NH농협카드"]
+
+
+class LatencyEmbeddingClient:
+    """Deterministic vectors after a fixed delay per request (stands in for the Upstage API)."""
+
+    def __init__(self, latency_ms: float, dim: int):
+        self.latency_ms = latency_ms
+        self.dim = dim
+        self.requests = 0
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        time.sleep(self.latency_ms / 1000)
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+class DiscardVectorStore(VectorStore):
+    """Drops every write; isolates the pipeline's own time and memory from the store's."""
+
+    def upsert(self, records: Iterable[EmbeddingRecord]) -> None:
+        for _ in records:
+            pass
+
+    def delete(self, ids: Iterable[str]) -> None:
+        pass
+
+
+def write_corpus(text_dir: Path, scale: int) -> int:
+    """Writes one datasets/text-style JSON per (card, copy); returns the card count."""
+    texts: Dict[str, List[str]] = defaultdict(list)
+    for chunk_file in sorted(DEFAULT_CHUNKS_DIR.glob("*.jsonl")):
+        for line in chunk_file.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("chunk_type") != "overview":
+                texts[row["card_name"]].append(row.get("content", ""))
+    if not texts:
+        raise SystemExit(f"No chunks found in {DEFAULT_CHUNKS_DIR}")
+
+    text_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for copy in range(scale):
+        issuer = ISSUERS[copy % len(ISSUERS)]
+        for card_name, parts in texts.items():
+            payload = {
+                "card_name": f"{card_name} #{copy}",
+                "company": issuer,
+                "annual_fee": 10000 + copy,
+                "text": "\n".join(parts),
+            }
+            (text_dir / f"card-{copy:04d}-{count:06d}.json").write_text(
+                json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            )
+            count += 1
+    return count
+
+
+def measure(workdir: Path, backend: str, latency_ms: float, dim: int) -> None:
+    os.environ.setdefault("UPSTAGE_API_KEY", "bench")
+    settings = dataclasses.replace(
+        get_settings(),
+        text_dir=workdir / "text",
+        chunks_dir=workdir / "chunks",
+        digests_dir=workdir / "digests",
+        index_csv=workdir / "index.csv",
+        chroma_dir=workdir / "chroma_db",
+        numpy_index_dir=workdir / "numpy_index",
+        ingest_manifest=workdir / "ingest_manifest.json",
+        vector_db="numpy" if backend == "numpy" else "chroma",
+    )
+    store: VectorStore
+    if backend == "numpy":
+        store = NumpyVectorStore(settings.numpy_index_dir, autosave=False)
+    elif backend == "chroma":
+        store = ChromaVectorStore(settings.chroma_dir)
+    else:
+        store = DiscardVectorStore()
+    client = LatencyEmbeddingClient(latency_ms, dim)
+
+    # run_pipeline prints one line per card; keep only the summary
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            stats = run_pipeline(settings=settings, embedding_client=client, vector_store=store)  # type: ignore[arg-type]
+        finally:
+            sys.stdout = stdout
+    assert stats is not None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    print(
+        json.dumps(
+            {
+                "cards": stats.cards,
+                "chunks": stats.chunks_embedded,
+                "batches": stats.embed_batches,
+                "requests": client.requests,
+                "failed": len(stats.failed_cards),
+                "wall_s": stats.wall_seconds,
+                "chunk_s": stats.chunk_seconds,
+                "embed_s": stats.embed_seconds,
+                "upsert_s": stats.upsert_seconds,
+                "peak_rss_mb": peak_mb,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streaming chunk/embed/upsert pipeline benchmark")
+    parser.add_argument("--scales", type=int, nargs="+", default=[2, 8, 32], help="코퍼스 복제 배수 (배수별로 별도 프로세스)")
+    parser.add_argument("--backend", choices=["chroma", "numpy", "discard"], default="chroma", help="discard: 벡터 스토어 쓰기 없이 파이프라인만 측정")
+    parser.add_argument("--embed-latency-ms", type=float, default=200.0, help="임베딩 요청 1회 지연 (stand-in)")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--measure", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.backend, args.embed_latency_ms, args.dim)
+        return
+
+    print(f"backend {args.backend} | embed latency {args.embed_latency_ms:.0f} ms/request | dim {args.dim}")
+    print(f"{'cards':>6} {'chunks':>7} {'requests':>8} {'wall s':>8} {'chunk s':>8} {'embed s':>8} {'upsert s':>9} {'sum s':>7} {'peak RSS':>9}")
+    for scale in args.scales:
+        workdir = Path(tempfile.mkdtemp(prefix="chunk_pipeline_bench_"))
+        write_corpus(workdir / "text", scale)
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "apps.backend.chunker.bench_pipeline",
+                "--measure", str(workdir), "--backend", args.backend,
+                "--embed-latency-ms", str(args.embed_latency_ms), "--dim", str(args.dim),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        stage_sum = result["chunk_s"] + result["embed_s"] + result["upsert_s"]
+        print(
+            f"{result['cards']:>6} {result['chunks']:>7} {result['requests']:>8} "
+            f"{result['wall_s']:>8.1f} {result['chunk_s']:>8.1f} {result['embed_s']:>8.1f} "
+            f"{result['upsert_s']:>9.1f} {stage_sum:>7.1f} {result['peak_rss_mb']:>7.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
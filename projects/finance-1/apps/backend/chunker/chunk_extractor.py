@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import itertools
 import json
 import re
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from .chunk_models import Chunk
 
@@ -24,49 +26,69 @@ def generate_chunks(
     enable_benefit_regex: bool,
 ) -> List[Chunk]:
     payload = json.loads(text_path.read_text(encoding="utf-8"))
+    return list(
+        iter_chunks(
+            payload,
+            text_path.stem,
+            index_meta,
+            chunk_size,
+            overlap,
+            enable_benefit_regex,
+        )
+    )
+
+
+def iter_chunks(
+    payload: Dict[str, Any],
+    default_name: str,
+    index_meta: Dict[str, str],
+    chunk_size: int,
+    overlap: int,
+    enable_benefit_regex: bool,
+) -> Iterator[Chunk]:
+    """Yield the overview chunk, then benefit (or fallback window) chunks lazily."""
     text = payload.get("text") or ""
     if not text.strip():
-        return []
+        return
 
     company = payload.get("company") or index_meta.get("company") or "Unknown"
     card_name = (
-        payload.get("card_name") or index_meta.get("card_name") or text_path.stem
+        payload.get("card_name") or index_meta.get("card_name") or default_name
     )
     base_slug = slugify(card_name)
+    base_metadata = _base_metadata(payload, index_meta)
 
-    chunks: List[Chunk] = []
-    overview = _build_overview_chunk(
+    yield _build_overview_chunk(
         base_slug,
         company,
         card_name,
         payload,
         index_meta,
     )
-    chunks.append(overview)
 
-    benefit_chunks: List[Chunk] = []
     if enable_benefit_regex:
         benefit_chunks = _extract_benefit_chunks(
             text=text,
             company=company,
             card_name=card_name,
             base_slug=base_slug,
-            base_metadata=_base_metadata(payload, index_meta),
+            base_metadata=base_metadata,
         )
-
-    if not benefit_chunks:
-        benefit_chunks = _window_chunks(
-            text,
-            company,
-            card_name,
-            base_slug,
-            _base_metadata(payload, index_meta),
-            chunk_size,
-            overlap,
-        )
-
-    chunks.extend(benefit_chunks)
-    return chunks
+        first = next(benefit_chunks, None)
+        if first is not None:
+            yield first
+            yield from benefit_chunks
+            return
+
+    yield from _window_chunks(
+        text,
+        company,
+        card_name,
+        base_slug,
+        base_metadata,
+        chunk_size,
+        overlap,
+    )
 
 
 def _base_metadata(
@@ -108,7 +130,7 @@ def _build_overview_chunk(
     )
     return Chunk(
         chunk_id=f"{base_slug}-overview",
-        company=company,
+        card_company=company,
         card_name=card_name,
         chunk_type="overview",
         category=None,
@@ -131,7 +153,7 @@ def _create_chunk(
 
     return Chunk(
         chunk_id=f"{base_slug}-{chunk_type}-{counter:02d}",
-        company=company,
+        card_company=company,
         card_name=card_name,
         chunk_type=chunk_type,
         category=category,
@@ -146,12 +168,17 @@ def _extract_benefit_chunks(
     card_name: str,
     base_slug: str,
     base_metadata: Dict[str, Any],
-) -> List[Chunk]:
-    # More aggressive splitting: normalized newlines + split by any newline sequence
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    sections = [s.strip() for s in re.split(r"\n+", text) if s.strip()]
+) -> Iterator[Chunk]:
+    # More aggressive splitting: normalized newlines + split by any newline sequence.
+    # Sections are scanned lazily so only the current buffer is held in memory.
+    sections = (
+        section
+        for section in (
+            match.group(0).strip() for match in re.finditer(r"[^\r\n]+", text)
+        )
+        if section
+    )
 
-    chunks: List[Chunk] = []
     counter = 1
 
     # Accumulate small sections to form coherent chunks, but cut before limit
@@ -166,10 +193,8 @@ def _extract_benefit_chunks(
         if current_length + len(section) > MAX_CHARS and current_buffer:
             content = "\n".join(current_buffer)
             # Only create chunk if it looks meaningful or just as a fallback
-            chunks.append(
-                _create_chunk(
-                    content, company, card_name, base_slug, counter, base_metadata
-                )
+            yield _create_chunk(
+                content, company, card_name, base_slug, counter, base_metadata
             )
             counter += 1
             current_buffer = []
@@ -192,10 +217,8 @@ def _extract_benefit_chunks(
             # Flush existing buffer
             if current_buffer:
                 content = "\n".join(current_buffer)
-                chunks.append(
-                    _create_chunk(
-                        content, company, card_name, base_slug, counter, base_metadata
-                    )
+                yield _create_chunk(
+                    content, company, card_name, base_slug, counter, base_metadata
                 )
                 counter += 1
                 current_buffer = []
@@ -208,21 +231,17 @@ def _extract_benefit_chunks(
             for sc in sub_chunks:
                 # Rename IDs to fit benefit flow or just append
                 sc.chunk_id = f"{base_slug}-benefit-{counter:02d}"  # Use benefit ID for consistency
-                chunks.append(sc)
+                yield sc
                 counter += 1
             continue
 
     # Flush remaining
     if current_buffer:
         content = "\n".join(current_buffer)
-        chunks.append(
-            _create_chunk(
-                content, company, card_name, base_slug, counter, base_metadata
-            )
+        yield _create_chunk(
+            content, company, card_name, base_slug, counter, base_metadata
         )
 
-    return chunks
-
 
 def _looks_like_benefit(section: str) -> bool:
     lower = section.lower()
@@ -248,28 +267,28 @@ def _window_chunks(
     base_metadata: Dict[str, Any],
     chunk_size: int,
     overlap: int,
-) -> List[Chunk]:
-    tokens = text.split()
-    chunks: List[Chunk] = []
-    start = 0
+) -> Iterator[Chunk]:
+    # Whitespace tokens are read lazily; only the current window is kept.
+    tokens = (match.group(0) for match in re.finditer(r"\S+", text))
+    window = deque(itertools.islice(tokens, chunk_size))
     counter = 1
-    while start < len(tokens):
-        end = min(len(tokens), start + chunk_size)
-        window = " ".join(tokens[start:end]).strip()
-        if window:
-            chunks.append(
-                Chunk(
-                    chunk_id=f"{base_slug}-fallback-{counter:02d}",
-                    company=company,
-                    card_name=card_name,
-                    chunk_type="fallback",
-                    category=None,
-                    content=window,
-                    metadata=base_metadata,
-                )
-            )
-            counter += 1
-        if end == len(tokens):
+    while window:
+        # One token of lookahead tells whether this window reaches the end of the text
+        lookahead = next(tokens, None)
+        yield Chunk(
+            chunk_id=f"{base_slug}-fallback-{counter:02d}",
+            card_company=company,
+            card_name=card_name,
+            chunk_type="fallback",
+            category=None,
+            content=" ".join(window),
+            metadata=base_metadata,
+        )
+        counter += 1
+        if lookahead is None:
             break
-        start = max(end - overlap, start + 1)
-    return chunks
+        # Next window starts `overlap` tokens before the end (always advancing by >= 1)
+        for _ in range(min(len(window), max(chunk_size - overlap, 1))):
+            window.popleft()
+        window.append(lookahead)
+        window.extend(itertools.islice(tokens, chunk_size - len(window)))
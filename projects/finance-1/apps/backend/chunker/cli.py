@@ -22,6 +22,16 @@ def main() -> None:
         action="store_true",
         help="Embed existing chunks without regenerating chunk files",
     )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report added/changed/removed chunks against the ingestion manifest without writing anything",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the ingestion manifest and re-embed every chunk",
+    )
 
     args = parser.parse_args()
 
@@ -32,6 +42,8 @@ def main() -> None:
         card_filter=args.cards,
         chunks_only=args.chunks_only,
         embed_only=args.embed_only,
+        dry_run=args.dry_run,
+        full_refresh=args.full,
     )
 
 
@@ -38,14 +38,19 @@ class Settings:
     pdf_dir: Path
     text_dir: Path
     chunks_dir: Path
+    digests_dir: Path
     index_csv: Path
     chroma_dir: Path
+    numpy_index_dir: Path
+    ingest_manifest: Path
     chunk_token_size: int
     chunk_overlap: int
     enable_benefit_regex: bool
-    vector_db: Literal["chroma"]
+    vector_db: Literal["chroma", "numpy"]
     upstage_api_key: str
     upstage_model: str
+    embed_batch_size: int = 32
+    pipeline_queue_size: int = 4
 
 
 @lru_cache()
@@ -56,7 +61,10 @@ def get_settings() -> Settings:
     text_dir = datasets_dir / "text"
     index_csv = datasets_dir / "index.csv"
     chunks_dir = datasets_dir / "chunks"
+    digests_dir = datasets_dir / "digests"
     chroma_dir = datasets_dir / "embeddings_cache" / "chroma_db"
+    numpy_index_dir = datasets_dir / "embeddings_cache" / "numpy_index"
+    ingest_manifest = datasets_dir / "embeddings_cache" / "ingest_manifest.json"
 
     # Ensure processed directories exist
     chunks_dir.mkdir(parents=True, exist_ok=True)
@@ -75,15 +83,20 @@ def get_settings() -> Settings:
         pdf_dir=pdf_dir,
         text_dir=text_dir,
         chunks_dir=chunks_dir,
+        digests_dir=digests_dir,
         index_csv=index_csv,
         chroma_dir=chroma_dir,
+        numpy_index_dir=numpy_index_dir,
+        ingest_manifest=ingest_manifest,
         chunk_token_size=int(os.environ.get("CHUNK_TOKEN_SIZE", 500)),
         chunk_overlap=int(os.environ.get("CHUNK_OVERLAP", 60)),
         enable_benefit_regex=os.environ.get("ENABLE_BENEFIT_REGEX", "true").lower()
         in ("1", "true", "yes"),
-        vector_db="chroma",
+        vector_db=os.environ.get("VECTOR_DB", "chroma").lower(),  # type: ignore[arg-type]
         upstage_api_key=upstage_api_key,
         upstage_model=os.environ.get(
             "UPSTAGE_EMBEDDING_MODEL", "embedding-query"
         ),
+        embed_batch_size=int(os.environ.get("EMBED_BATCH_SIZE", 32)),
+        pipeline_queue_size=int(os.environ.get("PIPELINE_QUEUE_SIZE", 4)),
     )
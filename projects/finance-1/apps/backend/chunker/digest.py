@@ -0,0 +1,205 @@
+"""
+Per-card benefit digests.
+
+A digest is a compact, per-category list of benefit snippets taken verbatim
+from a card's chunks (so rates, amounts and limits are preserved), plus a few
+card-level condition snippets (previous-month spend, monthly caps). The agent
+sends only the digest entries for the user's categories to the summarization
+prompt instead of every detailed benefit.
+
+Digests are written to datasets/digests/{card}.json by the chunk pipeline.
+To (re)build them from existing chunk files without re-chunking:
+
+    uv run python -m apps.backend.chunker.digest build
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .chunk_extractor import slugify
+from .chunk_models import Chunk
+
+DEFAULT_CHUNKS_DIR = Path("datasets/chunks")
+DEFAULT_DIGESTS_DIR = Path("datasets/digests")
+
+SNIPPETS_PER_CATEGORY = 3
+CONDITION_SNIPPETS = 2
+MAX_SNIPPET_CHARS = 160
+
+# Keywords per agent category (same taxonomy as CardSearchCriteria.categories)
+CATEGORY_KEYWORDS: Dict[str, Sequence[str]] = {
+    "General": ("전 가맹점", "모든 가맹점", "국내외", "가맹점 구분 없이", "무실적"),
+    "Shopping": (
+        "쇼핑", "마트", "편의점", "gs25", "cu", "세븐일레븐", "백화점", "쿠팡", "11번가",
+        "g마켓", "옥션", "올리브영", "무신사", "홈쇼핑", "소셜커머스", "네이버페이", "간편결제",
+    ),
+    "Traffic": ("교통", "버스", "지하철", "택시", "주유", "충전소", "차량", "주차", "모빌리티", "고속도로"),
+    "Food": ("외식", "음식", "배달", "배달의민족", "요기요", "쿠팡이츠", "레스토랑", "패밀리레스토랑", "맛집"),
+    "Coffee": ("커피", "카페", "스타벅스", "커피빈", "투썸", "이디야", "제과", "베이커리", "디저트", "아이스크림"),
+    "Cultural": (
+        "영화", "cgv", "메가박스", "롯데시네마", "공연", "도서", "서점", "넷플릭스", "유튜브",
+        "멜론", "스트리밍", "구독", "디지털콘텐츠", "테마파크", "헬스", "골프", "레저",
+    ),
+    "Travel": ("항공", "여행", "호텔", "면세점", "라운지", "해외", "마일리지", "공항", "여행사"),
+    "Life": ("통신", "이동통신", "skt", "kt", "lg u+", "공과금", "관리비", "자동이체", "자동납부", "보험료", "렌탈", "전기요금"),
+    "EduHealth": ("학원", "교육", "병원", "약국", "의료", "육아", "어린이집", "유치원", "학습지"),
+}
+
+CONDITION_KEYWORDS = ("전월", "이용실적", "실적", "한도", "연회비")
+
+_SPLIT_PATTERN = re.compile(r"\s*(?:[•∙·▶■□※→]|\n|\s\*\s?|(?<=다\.)\s|\s-(?=\S))\s*")
+_NUMBER_PATTERN = re.compile(r"\d[\d,.]*\s*(?:%|원|만원|천원|포인트|P|회|리터|L|마일)")
+_BENEFIT_PATTERN = re.compile(r"할인|적립|캐시백|면제|무료|우대|청구")
+
+
+def _snippets(text: str) -> List[str]:
+    snippets = []
+    for part in _SPLIT_PATTERN.split(text):
+        part = " ".join(part.split()).strip(" -*")
+        if len(part) >= 8:
+            snippets.append(part[:MAX_SNIPPET_CHARS])
+    return snippets
+
+
+def _score(snippet: str) -> int:
+    return 2 * len(_NUMBER_PATTERN.findall(snippet)) + len(_BENEFIT_PATTERN.findall(snippet))
+
+
+def _categories_for(snippet: str) -> List[str]:
+    lowered = snippet.lower()
+    return [
+        category
+        for category, keywords in CATEGORY_KEYWORDS.items()
+        if any(keyword in lowered for keyword in keywords)
+    ]
+
+
+def digest_texts(
+    texts: Iterable[str],
+    per_category: int = SNIPPETS_PER_CATEGORY,
+    conditions: int = CONDITION_SNIPPETS,
+) -> Dict[str, Any]:
+    """
+    Pick the highest-scoring benefit snippets per category from raw texts.
+
+    Snippets with numbers and benefit verbs rank first; the same snippet is
+    never repeated.
+    """
+    by_category: Dict[str, List[tuple]] = {category: [] for category in CATEGORY_KEYWORDS}
+    condition_candidates: List[tuple] = []
+    seen: set[str] = set()
+    position = 0
+
+    for text in texts:
+        for snippet in _snippets(text or ""):
+            if snippet in seen:
+                continue
+            seen.add(snippet)
+            position += 1
+            # merchant lists ("커피: 스타벅스, 커피빈") have no numbers but still
+            # tell which merchants a benefit covers, so they rank last instead of being dropped
+            score = _score(snippet)
+            for category in _categories_for(snippet):
+                by_category[category].append((-score, position, snippet))
+            if score and any(keyword in snippet for keyword in CONDITION_KEYWORDS) and _NUMBER_PATTERN.search(snippet):
+                condition_candidates.append((-score, position, snippet))
+
+    return {
+        "categories": {
+            category: [snippet for _, _, snippet in sorted(candidates)[:per_category]]
+            for category, candidates in by_category.items()
+            if candidates
+        },
+        "conditions": [snippet for _, _, snippet in sorted(condition_candidates)[:conditions]],
+    }
+
+
+def build_card_digest(chunks: Sequence[Chunk]) -> Optional[Dict[str, Any]]:
+    if not chunks:
+        return None
+    first = chunks[0]
+    metadata: Dict[str, Any] = {}
+    for chunk in chunks:
+        metadata.update({k: v for k, v in chunk.metadata.items() if v is not None})
+
+    texts = [chunk.content for chunk in chunks if chunk.chunk_type != "overview"]
+    content_hash = hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+    digest = digest_texts(texts)
+    return {
+        "card_name": first.card_name,
+        "card_company": first.card_company,
+        "annual_fee": metadata.get("annual_fee"),
+        "min_performance": metadata.get("min_performance"),
+        "content_hash": content_hash,
+        **digest,
+    }
+
+
+def digest_path(digests_dir: Path, card_name: str) -> Path:
+    return digests_dir / f"{slugify(card_name)}.json"
+
+
+def dump_digest(digest: Dict[str, Any], digests_dir: Path) -> Path:
+    digests_dir.mkdir(parents=True, exist_ok=True)
+    destination = digest_path(digests_dir, digest["card_name"])
+    tmp_path = destination.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(digest, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(destination)
+    return destination
+
+
+def load_chunk_file(chunk_file: Path) -> List[Chunk]:
+    chunks = []
+    for line in chunk_file.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        chunks.append(
+            Chunk(
+                chunk_id=row["chunk_id"],
+                card_name=row["card_name"],
+                card_company=row.get("card_company") or row.get("company", ""),
+                chunk_type=row.get("chunk_type", "fallback"),
+                content=row.get("content", ""),
+                category=row.get("category"),
+                metadata=row.get("metadata") or {},
+            )
+        )
+    return chunks
+
+
+def build_from_chunks(chunks_dir: Path, digests_dir: Path) -> None:
+    built = 0
+    for chunk_file in sorted(chunks_dir.glob("*.jsonl")):
+        digest = build_card_digest(load_chunk_file(chunk_file))
+        if digest is None:
+            continue
+        dump_digest(digest, digests_dir)
+        built += 1
+        print(
+            f"{digest['card_name']}: {len(digest['categories'])} categories, "
+            f"{sum(len(v) for v in digest['categories'].values())} snippets"
+        )
+    print(f"Wrote {built} digests to {digests_dir}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-card benefit digests")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build digests from datasets/chunks")
+    build.add_argument("--chunks-dir", type=Path, default=DEFAULT_CHUNKS_DIR)
+    build.add_argument("--digests-dir", type=Path, default=DEFAULT_DIGESTS_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_from_chunks(args.chunks_dir, args.digests_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """
 LLM으로 이미 청킹된 JSON 파일을 임베딩하여 ChromaDB에 저장하는 스크립트
 
+매니페스트(chunk_id별 content hash/임베딩 모델/시각)를 기준으로
+새로 추가되거나 변경된 청크만 임베딩하고, 사라진 청크는 삭제합니다.
+
 사용법:
     uv run python -m apps.backend.chunker.embed_chunked_json
+    uv run python -m apps.backend.chunker.embed_chunked_json --dry-run
 """
 
 from __future__ import annotations
@@ -12,12 +16,14 @@ import json
 import os
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 
 from apps.backend.chunker.chunk_models import Chunk, EmbeddingRecord
 from apps.backend.chunker.embedding_client import UpstageEmbeddingClient
+from apps.backend.chunker.manifest import IngestionManifest, ManifestDiff
+from apps.backend.chunker.pipeline import print_diff_report
 from apps.backend.chunker.vector_store import ChromaVectorStore
 
 
@@ -121,22 +127,42 @@ def embed_and_store(
 def process_single_file(
     file_path: Path,
     embedding_client: UpstageEmbeddingClient,
-    vector_store: ChromaVectorStore
-) -> int:
-    """단일 JSON 파일 처리"""
+    vector_store: Optional[ChromaVectorStore],
+    manifest: IngestionManifest,
+    embedding_model: str,
+    dry_run: bool = False,
+    full_refresh: bool = False,
+) -> Optional[ManifestDiff]:
+    """단일 JSON 파일 처리 (변경분만 임베딩)"""
     # print(f"처리 중: {file_path}")
     
     data = load_chunked_json(file_path)
-    chunks = convert_to_chunks(data)
+    chunks = [c for c in convert_to_chunks(data) if c.content and c.content.strip()]
     
     if not chunks:
         # print(f"  → 청크 없음, 건너뜀")
-        return 0
+        return None
+    
+    diff = manifest.diff(
+        chunks[0].card_name, chunks, embedding_model, force=full_refresh
+    )
+    if dry_run or not diff.has_changes:
+        return diff
     
-    count = embed_and_store(chunks, embedding_client, vector_store)
-    # print(f"  → {count}개 청크 임베딩 완료")
+    # 추가/변경된 청크만 임베딩
+    if diff.to_embed:
+        embed_and_store(diff.to_embed, embedding_client, vector_store)
+        manifest.record(diff.to_embed, embedding_model)
     
-    return count
+    # 카드에서 사라진 청크 삭제
+    if diff.removed:
+        vector_store.delete(diff.removed)
+        manifest.forget(diff.removed)
+    
+    manifest.save()
+    # print(f"  → {diff.summary()}")
+    
+    return diff
 
 
 def main():
@@ -166,6 +192,22 @@ def main():
         default="card_disclosures",
         help="ChromaDB 컬렉션 이름 (기본: card_disclosures)"
     )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=Path("datasets/embeddings_cache/chunked_json_manifest.json"),
+        help="증분 임베딩 매니페스트 경로"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="임베딩/저장 없이 추가·변경·삭제될 청크만 출력"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="매니페스트를 무시하고 모든 청크를 다시 임베딩"
+    )
     
     args = parser.parse_args()
     
@@ -178,17 +220,33 @@ def main():
         raise ValueError("UPSTAGE_API_KEY 환경 변수가 설정되지 않았습니다")
     
     # 클라이언트 초기화
+    manifest = IngestionManifest.load(args.manifest)
     embedding_client = UpstageEmbeddingClient(api_key=api_key)
-    vector_store = ChromaVectorStore(
-        persist_directory=args.chroma_dir,
-        collection_name=args.collection
-    )
+    vector_store = None
+    if not args.dry_run:
+        vector_store = ChromaVectorStore(
+            persist_directory=args.chroma_dir,
+            collection_name=args.collection
+        )
+    
+    def _process(json_file: Path) -> Optional[ManifestDiff]:
+        return process_single_file(
+            json_file,
+            embedding_client,
+            vector_store,
+            manifest,
+            embedding_client.model,
+            dry_run=args.dry_run,
+            full_refresh=args.full,
+        )
     
-    total_count = 0
+    diffs: List[ManifestDiff] = []
     
     if args.input:
         # 단일 파일 처리
-        total_count = process_single_file(args.input, embedding_client, vector_store)
+        diff = _process(args.input)
+        if diff:
+            diffs.append(diff)
     
     elif args.input_dir:
         # 디렉토리 내 모든 JSON 파일 처리
@@ -198,10 +256,31 @@ def main():
             return
         
         for json_file in json_files:
-            count = process_single_file(json_file, embedding_client, vector_store)
-            total_count += count
+            diff = _process(json_file)
+            if diff:
+                diffs.append(diff)
+        
+        # 디렉토리에서 사라진 카드의 청크 삭제
+        seen_cards = {diff.card_name for diff in diffs}
+        for card_name in sorted(manifest.card_names() - seen_cards):
+            diff = ManifestDiff(
+                card_name=card_name, removed=manifest.chunk_ids_for(card_name)
+            )
+            diffs.append(diff)
+            if args.dry_run:
+                continue
+            vector_store.delete(diff.removed)
+            manifest.forget(diff.removed)
+            manifest.save()
+    
+    if args.dry_run:
+        print_diff_report(diffs)
+        return
     
-    # print(f"\n총 {total_count}개 청크 임베딩 완료")
+    embedded = sum(len(d.to_embed) for d in diffs)
+    removed = sum(len(d.removed) for d in diffs)
+    unchanged = sum(len(d.unchanged) for d in diffs)
+    print(f"임베딩 {embedded}개, 삭제 {removed}개, 변경 없음 {unchanged}개")
     # print(f"저장 위치: {args.chroma_dir}")
 
 
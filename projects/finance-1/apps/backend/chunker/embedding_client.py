@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import os
 import time
 from typing import Iterable, List
 
 import requests
 
+from apps.backend.core.metrics import metrics, timed
+
 
 class UpstageEmbeddingClient:
     def __init__(
@@ -13,7 +16,9 @@ class UpstageEmbeddingClient:
         self.api_key = api_key
         self.model = model
         self.batch_size = batch_size
-        self.base_url = "https://api.upstage.ai/v1/embeddings"
+        self.base_url = os.environ.get(
+            "UPSTAGE_EMBEDDING_URL", "https://api.upstage.ai/v1/embeddings"
+        )
         self.session = requests.Session()
         self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
 
@@ -31,12 +36,15 @@ class UpstageEmbeddingClient:
 
     def _embed_batch(self, batch: List[str]) -> List[List[float]]:
         payload = {"model": self.model, "input": batch}
+        metrics.inc("smartpick_embedding_texts_total", len(batch), model=self.model)
         for delay in (1, 2, 4, 8):
-            response = self.session.post(self.base_url, json=payload, timeout=60)
+            with timed("smartpick_embedding_latency_ms", model=self.model):
+                response = self.session.post(self.base_url, json=payload, timeout=60)
             if response.status_code == 200:
                 data = response.json().get("data", [])
                 return [item.get("embedding", []) for item in data]
             if response.status_code == 429:
+                metrics.inc("smartpick_embedding_throttled_total", model=self.model)
                 time.sleep(delay)
                 continue
             if response.status_code != 200:
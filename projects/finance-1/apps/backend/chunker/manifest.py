@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .chunk_models import Chunk
+
+
+def chunk_content_hash(chunk: Chunk) -> str:
+    """Hash everything that ends up in the vector store for a chunk.
+
+    Metadata is part of the hash so that a changed annual fee or
+    min_performance is re-upserted even when the text itself is identical.
+    """
+    payload = json.dumps(asdict(chunk), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    card_name: str
+    content_hash: str
+    embedding_model: str
+    updated_at: str
+
+
+@dataclass
+class ManifestDiff:
+    card_name: str
+    added: List[Chunk] = field(default_factory=list)
+    changed: List[Chunk] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def to_embed(self) -> List[Chunk]:
+        return self.added + self.changed
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> str:
+        return (
+            f"{self.card_name}: +{len(self.added)} added, "
+            f"~{len(self.changed)} changed, -{len(self.removed)} removed, "
+            f"={len(self.unchanged)} unchanged"
+        )
+
+
+class IngestionManifest:
+    """chunk_id -> (content hash, embedding model, timestamp) ledger.
+
+    Persisted as JSON next to the Chroma directory so that re-running the
+    pipeline only embeds chunks that are new or whose content/model changed,
+    and removes chunk ids that no longer exist for a card.
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, ManifestEntry]] = None):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+        # card_name -> chunk ids (insertion-ordered), so per-card lookups do
+        # not scan the whole ledger once per card
+        self._card_index: Dict[str, Dict[str, None]] = {}
+        for chunk_id, entry in self.entries.items():
+            self._card_index.setdefault(entry.card_name, {})[chunk_id] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestionManifest":
+        if not path.exists():
+            return cls(path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable ingestion manifest {path}: {e}")
+            return cls(path)
+        entries = {
+            chunk_id: ManifestEntry(**data)
+            for chunk_id, data in raw.get("chunks", {}).items()
+        }
+        return cls(path, entries)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": 1,
+            "chunks": {
+                chunk_id: asdict(entry)
+                for chunk_id, entry in sorted(self.entries.items())
+            },
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        tmp_path.replace(self.path)
+
+    def card_names(self) -> set[str]:
+        return set(self._card_index)
+
+    def chunk_ids_for(self, card_name: str) -> List[str]:
+        return list(self._card_index.get(card_name, ()))
+
+    def diff(
+        self,
+        card_name: str,
+        chunks: Iterable[Chunk],
+        embedding_model: str,
+        force: bool = False,
+    ) -> ManifestDiff:
+        result = ManifestDiff(card_name=card_name)
+        seen: set[str] = set()
+        for chunk in chunks:
+            seen.add(chunk.chunk_id)
+            entry = self.entries.get(chunk.chunk_id)
+            if entry is None:
+                result.added.append(chunk)
+            elif (
+                force
+                or entry.content_hash != chunk_content_hash(chunk)
+                or entry.embedding_model != embedding_model
+            ):
+                result.changed.append(chunk)
+            else:
+                result.unchanged.append(chunk.chunk_id)
+        result.removed = [
+            chunk_id for chunk_id in self.chunk_ids_for(card_name) if chunk_id not in seen
+        ]
+        return result
+
+    def record(self, chunks: Iterable[Chunk], embedding_model: str) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        for chunk in chunks:
+            self._unindex(chunk.chunk_id)
+            self._card_index.setdefault(chunk.card_name, {})[chunk.chunk_id] = None
+            self.entries[chunk.chunk_id] = ManifestEntry(
+                card_name=chunk.card_name,
+                content_hash=chunk_content_hash(chunk),
+                embedding_model=embedding_model,
+                updated_at=now,
+            )
+
+    def forget(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            self._unindex(chunk_id)
+            self.entries.pop(chunk_id, None)
+
+    def _unindex(self, chunk_id: str) -> None:
+        entry = self.entries.get(chunk_id)
+        if entry is None:
+            return
+        card_ids = self._card_index.get(entry.card_name)
+        if card_ids is not None:
+            card_ids.pop(chunk_id, None)
+            if not card_ids:
+                del self._card_index[entry.card_name]
@@ -0,0 +1,212 @@
+"""
+NumpyVectorStore utilities.
+
+    # Export the existing Chroma collection (no re-embedding)
+    uv run python -m apps.backend.chunker.numpy_index build
+
+    # Query latency / memory: Chroma vs NumpyVectorStore on the real index
+    uv run python -m apps.backend.chunker.numpy_index bench
+
+    # Same benchmark on a synthetic corpus built from datasets/chunks
+    uv run python -m apps.backend.chunker.numpy_index bench --synthetic --scale 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .vector_store import ChromaVectorStore, NumpyVectorStore
+
+DEFAULT_CHROMA_DIR = Path("datasets/embeddings_cache/chroma_db")
+DEFAULT_INDEX_DIR = Path("datasets/embeddings_cache/numpy_index")
+DEFAULT_CHUNKS_DIR = Path("datasets/chunks")
+
+BENCH_CATEGORIES = [
+    "General", "Shopping", "Traffic", "Food", "Coffee",
+    "Cultural", "Travel", "Life", "EduHealth", "Others",
+]
+BENCH_BUDGETS = [None, 0, 300000, 500000, 700000, 1000000]
+
+
+def build_from_chroma(chroma_dir: Path, collection: str, index_dir: Path) -> None:
+    chroma_store = ChromaVectorStore(chroma_dir, collection_name=collection)
+    start = time.perf_counter()
+    store = NumpyVectorStore.from_chroma(chroma_store, index_dir)
+    print(
+        f"Exported {len(store)} vectors (dim {store.vectors.shape[1] if len(store) else 0}) "
+        f"to {index_dir} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def build_synthetic(workdir: Path, scale: int, dim: int, seed: int) -> None:
+    """datasets/chunks 내용을 `scale`배 복제하고 랜덤 벡터/메타데이터로 두 스토어를 만듭니다."""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+
+    rows: List[Dict[str, Any]] = []
+    for chunk_file in sorted(DEFAULT_CHUNKS_DIR.glob("*.jsonl")):
+        for line in chunk_file.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                rows.append(json.loads(line))
+    if not rows:
+        raise SystemExit(f"No chunks found in {DEFAULT_CHUNKS_DIR}")
+
+    ids: List[str] = []
+    documents: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    for copy in range(scale):
+        for row in rows:
+            metadata: Dict[str, Any] = {
+                "chunk_type": row.get("chunk_type", "benefit"),
+                "card_name": f"{row['card_name']}#{copy}",
+                "card_company": row.get("company", ""),
+            }
+            budget = rng.choice(BENCH_BUDGETS)
+            if budget is not None:
+                metadata["min_performance"] = budget
+            if row.get("chunk_type") != "overview":
+                metadata["major_categories"] = ", ".join(
+                    rng.sample(BENCH_CATEGORIES, rng.randint(1, 3))
+                )
+            ids.append(f"{row['chunk_id']}#{copy}")
+            documents.append(row.get("content", ""))
+            metadatas.append(metadata)
+
+    vectors = np_rng.standard_normal((len(ids), dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    chroma_store = ChromaVectorStore(workdir / "chroma_db")
+    batch = 2000
+    for start in range(0, len(ids), batch):
+        chroma_store.collection.upsert(
+            ids=ids[start : start + batch],
+            embeddings=vectors[start : start + batch].tolist(),
+            documents=documents[start : start + batch],
+            metadatas=metadatas[start : start + batch],
+        )
+    NumpyVectorStore(workdir / "numpy_index").add(ids, vectors, documents, metadatas)
+    print(f"Synthetic corpus: {len(ids)} chunks, dim {dim} ({workdir})")
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(backend: str, chroma_dir: Path, index_dir: Path, queries: int, top_k: int, seed: int) -> None:
+    """한 프로세스에서 한 백엔드만 로드해 RSS 증가량과 검색 지연을 측정합니다."""
+    from apps.backend.tools.retriever import CardRetriever
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    retriever = CardRetriever(
+        persist_directory=str(chroma_dir), backend=backend, index_directory=str(index_dir)
+    )
+    if backend == "numpy":
+        dim = retriever.vector_store.vectors.shape[1]
+    else:
+        sample = retriever.vector_store.collection.get(limit=1, include=["embeddings"])
+        dim = len(sample["embeddings"][0])
+    load_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    latencies: List[float] = []
+    returned = 0
+    for _ in range(queries):
+        vector = np_rng.standard_normal(dim, dtype=np.float32)
+        vector /= np.linalg.norm(vector)
+        budget = rng.choice([300000, 500000, 1000000])
+        categories = rng.sample(BENCH_CATEGORIES, rng.randint(1, 2))
+        t0 = time.perf_counter()
+        results = retriever.search_by_vector(vector.tolist(), budget, categories, top_k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        returned += len(results)
+
+    latencies.sort()
+    print(
+        f"{backend:>6}: load {load_ms:7.1f} ms | "
+        f"p50 {statistics.median(latencies):6.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:6.2f} ms | "
+        f"avg results {returned / queries:4.1f}/{top_k} | "
+        f"RSS +{_rss_mb() - rss_before:.1f} MB",
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NumpyVectorStore build / benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Chroma 컬렉션을 numpy 인덱스로 내보내기")
+    build.add_argument("--chroma-dir", type=Path, default=DEFAULT_CHROMA_DIR)
+    build.add_argument("--collection", default="card_disclosures")
+    build.add_argument("--index-dir", type=Path, default=DEFAULT_INDEX_DIR)
+
+    bench = sub.add_parser("bench", help="Chroma vs numpy 검색 지연/메모리 비교")
+    bench.add_argument("--chroma-dir", type=Path, default=DEFAULT_CHROMA_DIR)
+    bench.add_argument("--index-dir", type=Path, default=DEFAULT_INDEX_DIR)
+    bench.add_argument("--synthetic", action="store_true", help="datasets/chunks로 합성 코퍼스 생성")
+    bench.add_argument("--scale", type=int, default=10, help="합성 코퍼스 복제 배수")
+    bench.add_argument("--dim", type=int, default=4096)
+    bench.add_argument("--queries", type=int, default=200)
+    bench.add_argument("--top-k", type=int, default=10)
+    bench.add_argument("--seed", type=int, default=7)
+    bench.add_argument("--measure", choices=["chroma", "numpy"], help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_from_chroma(args.chroma_dir, args.collection, args.index_dir)
+        return
+
+    if args.measure:
+        measure(args.measure, args.chroma_dir, args.index_dir, args.queries, args.top_k, args.seed)
+        return
+
+    chroma_dir, index_dir = args.chroma_dir, args.index_dir
+    if args.synthetic:
+        workdir = Path(tempfile.mkdtemp(prefix="numpy_index_bench_"))
+        build_synthetic(workdir, args.scale, args.dim, args.seed)
+        chroma_dir, index_dir = workdir / "chroma_db", workdir / "numpy_index"
+    elif not (index_dir / "records.json").exists():
+        build_from_chroma(chroma_dir, "card_disclosures", index_dir)
+
+    # 백엔드별 메모리가 섞이지 않도록 각각 별도 프로세스에서 측정
+    for backend in ("chroma", "numpy"):
+        subprocess.run(
+            [
+                sys.executable, "-m", "apps.backend.chunker.numpy_index", "bench",
+                "--measure", backend,
+                "--chroma-dir", str(chroma_dir),
+                "--index-dir", str(index_dir),
+                "--queries", str(args.queries),
+                "--top-k", str(args.top_k),
+                "--seed", str(args.seed),
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
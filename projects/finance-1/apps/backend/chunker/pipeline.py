@@ -2,15 +2,33 @@ from __future__ import annotations
 
 import csv
 import json
-from dataclasses import asdict
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from .chunk_extractor import generate_chunks, slugify
+from .chunk_extractor import iter_chunks, slugify
 from .chunk_models import Chunk, EmbeddingRecord
-from .config import get_settings
+from .config import Settings, get_settings
+from .digest import build_card_digest, digest_path, dump_digest
 from .embedding_client import UpstageEmbeddingClient
-from .vector_store import ChromaVectorStore
+from .manifest import IngestionManifest, ManifestDiff
+from .vector_store import ChromaVectorStore, NumpyVectorStore, VectorStore
+
+# Partial embedding batches are sent once no new card arrives within this window
+BATCH_LINGER_SECONDS = 0.05
+# Manifest is rewritten at most this often while cards finish (and once at the
+# end); saving is O(ledger), so a per-card-count interval goes quadratic
+MANIFEST_SAVE_SECONDS = 5.0
+# Idle stages re-check the stop flag this often
+STOP_POLL_SECONDS = 0.5
+# How long an aborted run waits for stages (e.g. an in-flight embed request)
+STAGE_JOIN_SECONDS = 10.0
+
+_END = object()
 
 
 def load_index(index_path: Path) -> Dict[str, Dict[str, str]]:
@@ -26,77 +44,445 @@ def load_index(index_path: Path) -> Dict[str, Dict[str, str]]:
     return mapping
 
 
-def dump_chunks(chunks: List[Chunk], destination: Path) -> None:
+def dump_chunks(chunks: Iterable[Chunk], destination: Path) -> None:
     destination.parent.mkdir(parents=True, exist_ok=True)
     with destination.open("w", encoding="utf-8") as handle:
         for chunk in chunks:
             handle.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
 
 
+@dataclass
+class PipelineStats:
+    """Per-stage busy time; with overlapping stages wall time < sum of busy times."""
+
+    cards: int = 0
+    chunks_embedded: int = 0
+    embed_batches: int = 0
+    failed_cards: Set[str] = field(default_factory=set)
+    chunk_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Pipeline: {self.cards} cards, {self.chunks_embedded} chunks embedded in "
+            f"{self.embed_batches} batches, {len(self.failed_cards)} failed | "
+            f"wall {self.wall_seconds:.1f}s (chunk {self.chunk_seconds:.1f}s, "
+            f"embed {self.embed_seconds:.1f}s, upsert {self.upsert_seconds:.1f}s)"
+        )
+
+
+@dataclass
+class _CardDone:
+    """Marker that every embedding batch of a card has been queued before it."""
+
+    diff: ManifestDiff
+
+
+class _Stage(threading.Thread):
+    """Daemon thread that always signals the next queue, even when it fails."""
+
+    def __init__(
+        self,
+        name: str,
+        target: Callable[[], None],
+        output: "queue.Queue[Any]",
+        stop: threading.Event,
+    ):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self._output = output
+        self._stop_event = stop
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except BaseException as e:  # re-raised by the consumer in the main thread
+            self.error = e
+        finally:
+            _put(self._output, _END, self._stop_event)
+
+
 def run_pipeline(
     card_filter: Optional[Iterable[str]] = None,
     chunks_only: bool = False,
     embed_only: bool = False,
-) -> None:
-    settings = get_settings()
+    dry_run: bool = False,
+    full_refresh: bool = False,
+    settings: Optional[Settings] = None,
+    embedding_client: Optional[UpstageEmbeddingClient] = None,
+    vector_store: Optional[VectorStore] = None,
+) -> Optional[PipelineStats]:
+    """Chunk -> embed -> upsert as three overlapping stages.
+
+    The chunk stage reads one text file at a time and puts per-card diffs on
+    a bounded queue; the embed stage packs chunks from consecutive cards into
+    API-sized batches and puts embedded batches on a second bounded queue;
+    the calling thread upserts them. Memory is bounded by the queue sizes
+    and the largest single card, not by the corpus.
+    """
+    settings = settings or get_settings()
     index_map = load_index(settings.index_csv)
     card_filter_set = {name.strip() for name in card_filter} if card_filter else None
 
     text_files = sorted(settings.text_dir.rglob("*.json"))
     if not text_files:
         print("No extracted text files found in datasets/text")
-        return
+        return None
+
+    manifest = IngestionManifest.load(settings.ingest_manifest)
+    manifest_lock = threading.Lock()
+    skip_vectors = chunks_only or dry_run
+    stats = PipelineStats()
+    seen_cards: set[str] = set()
+    diffs: List[ManifestDiff] = []
+    started = time.perf_counter()
 
-    embedding_client = (
-        None
-        if chunks_only
-        else UpstageEmbeddingClient(
+    card_diffs = _iter_card_diffs(
+        settings,
+        text_files,
+        index_map,
+        card_filter_set,
+        manifest,
+        manifest_lock,
+        seen_cards,
+        stats,
+        write_files=not embed_only and not dry_run,
+        compute_diffs=not chunks_only,
+        full_refresh=full_refresh,
+    )
+
+    if skip_vectors:
+        diffs.extend(card_diffs)
+    else:
+        embedding_client = embedding_client or UpstageEmbeddingClient(
             api_key=settings.upstage_api_key,
             model=settings.upstage_model,
         )
-    )
-    vector_store = None if chunks_only else ChromaVectorStore(settings.chroma_dir)
+        if vector_store is None:
+            vector_store = (
+                NumpyVectorStore(settings.numpy_index_dir, autosave=False)
+                if settings.vector_db == "numpy"
+                else ChromaVectorStore(settings.chroma_dir)
+            )
+        _run_stages(
+            card_diffs,
+            embedding_client,
+            vector_store,
+            manifest,
+            manifest_lock,
+            settings,
+            stats,
+        )
+
+    # Cards that no longer have a text file are dropped entirely, but only on
+    # unfiltered runs so that `--cards X` never deletes other cards.
+    if not card_filter_set and not chunks_only:
+        missing = sorted(manifest.card_names() - seen_cards)
+        for card_name in missing:
+            diff = ManifestDiff(
+                card_name=card_name, removed=manifest.chunk_ids_for(card_name)
+            )
+            diffs.append(diff)
+            if dry_run:
+                continue
+            vector_store.delete(diff.removed)  # type: ignore[union-attr]
+            manifest.forget(diff.removed)
+            digest_path(settings.digests_dir, card_name).unlink(missing_ok=True)
+            print(diff.summary())
+        if missing and not dry_run:
+            vector_store.flush()  # type: ignore[union-attr]
+            manifest.save()
+
+    if dry_run:
+        print_diff_report(diffs)
+        return None
+
+    stats.wall_seconds = time.perf_counter() - started
+    if not chunks_only:
+        print(stats.summary())
+    return stats
 
+
+def _iter_card_diffs(
+    settings: Settings,
+    text_files: List[Path],
+    index_map: Dict[str, Dict[str, str]],
+    card_filter_set: Optional[Set[str]],
+    manifest: IngestionManifest,
+    manifest_lock: threading.Lock,
+    seen_cards: Set[str],
+    stats: PipelineStats,
+    write_files: bool,
+    compute_diffs: bool,
+    full_refresh: bool,
+) -> Iterator[ManifestDiff]:
+    """Stage 1: one text file at a time -> chunk/digest files -> manifest diff."""
     for text_file in text_files:
+        started = time.perf_counter()
         payload = json.loads(text_file.read_text(encoding="utf-8"))
         card_name = payload.get("card_name") or text_file.stem
         if card_filter_set and card_name not in card_filter_set:
             continue
+        seen_cards.add(card_name)
+        stats.cards += 1
 
-        index_meta = index_map.get(card_name, {})
-        chunks = generate_chunks(
-            text_path=text_file,
-            index_meta=index_meta,
-            chunk_size=settings.chunk_token_size,
-            overlap=settings.chunk_overlap,
-            enable_benefit_regex=settings.enable_benefit_regex,
+        chunks = list(
+            iter_chunks(
+                payload,
+                text_file.stem,
+                index_map.get(card_name, {}),
+                settings.chunk_token_size,
+                settings.chunk_overlap,
+                settings.enable_benefit_regex,
+            )
         )
+        del payload
         if not chunks:
             print(f"Skipping {card_name}: no chunks generated")
+            if write_files:
+                (settings.chunks_dir / f"{slugify(card_name)}.jsonl").unlink(missing_ok=True)
+                digest_path(settings.digests_dir, card_name).unlink(missing_ok=True)
+            if compute_diffs:
+                # The card is still "seen", so its previous chunk ids must be
+                # removed here rather than by the missing-card sweep
+                with manifest_lock:
+                    diff = manifest.diff(card_name, [], settings.upstage_model)
+                stats.chunk_seconds += time.perf_counter() - started
+                if diff.removed:
+                    yield diff
             continue
 
-        chunk_file = settings.chunks_dir / f"{slugify(card_name)}.jsonl"
-        if not embed_only:
-            dump_chunks(chunks, chunk_file)
+        if write_files:
+            dump_chunks(chunks, settings.chunks_dir / f"{slugify(card_name)}.jsonl")
+            digest = build_card_digest(chunks)
+            if digest:
+                dump_digest(digest, settings.digests_dir)
 
-        if chunks_only:
+        if not compute_diffs:
+            stats.chunk_seconds += time.perf_counter() - started
             continue
 
         # Filter chunks with valid content before embedding
         valid_chunks = [c for c in chunks if c.content and c.content.strip()]
-        if not valid_chunks:
-            print(f"Skipping {card_name}: no valid text content to embed")
-            continue
+        with manifest_lock:
+            diff = manifest.diff(
+                card_name, valid_chunks, settings.upstage_model, force=full_refresh
+            )
+        stats.chunk_seconds += time.perf_counter() - started
+        yield diff
+
 
+def _run_stages(
+    card_diffs: Iterator[ManifestDiff],
+    embedding_client: UpstageEmbeddingClient,
+    vector_store: VectorStore,
+    manifest: IngestionManifest,
+    manifest_lock: threading.Lock,
+    settings: Settings,
+    stats: PipelineStats,
+) -> None:
+    card_queue: "queue.Queue[Any]" = queue.Queue(maxsize=settings.pipeline_queue_size)
+    record_queue: "queue.Queue[Any]" = queue.Queue(maxsize=settings.pipeline_queue_size)
+    stop = threading.Event()
+
+    def produce_cards() -> None:
+        # diffs are not retained here: each card's chunks are released once
+        # the card is upserted (only dry runs keep diffs for the report)
+        for diff in card_diffs:
+            if stop.is_set():
+                return
+            if not diff.has_changes:
+                print(f"Up to date: {diff.card_name} ({len(diff.unchanged)} chunks)")
+                continue
+            if not _put(card_queue, diff, stop):
+                return
+
+    def embed_batches() -> None:
+        _embed_stage(
+            card_queue, record_queue, embedding_client, settings.embed_batch_size, stats, stop
+        )
+
+    chunk_stage = _Stage("chunk", produce_cards, card_queue, stop)
+    embed_stage = _Stage("embed", embed_batches, record_queue, stop)
+    chunk_stage.start()
+    embed_stage.start()
+
+    last_save = time.perf_counter()
+    aborted = False
+    try:
+        while True:
+            item = record_queue.get()
+            if item is _END:
+                break
+            if isinstance(item, _CardDone):
+                _finish_card(
+                    item.diff, vector_store, manifest, manifest_lock, settings, stats
+                )
+                if time.perf_counter() - last_save >= MANIFEST_SAVE_SECONDS:
+                    # vectors first: the manifest must never list chunks the
+                    # store has not persisted
+                    vector_store.flush()
+                    with manifest_lock:
+                        manifest.save()
+                    last_save = time.perf_counter()
+                continue
+
+            records: List[EmbeddingRecord] = item
+            started = time.perf_counter()
+            try:
+                vector_store.upsert(records)
+            except Exception as e:
+                failed = {record.chunk.card_name for record in records}
+                stats.failed_cards |= failed
+                print(f"Upsert failed for {', '.join(sorted(failed))}: {e}")
+            stats.upsert_seconds += time.perf_counter() - started
+    except BaseException:
+        aborted = True
+        raise
+    finally:
+        # Stages blocked on a queue see the flag within STOP_POLL_SECONDS
+        stop.set()
+        for stage in (chunk_stage, embed_stage):
+            stage.join(timeout=STAGE_JOIN_SECONDS)
+            if stage.is_alive():
+                print(f"{stage.name} stage still running after {STAGE_JOIN_SECONDS:.0f}s, abandoning it")
         try:
-            vectors = embedding_client.embed_texts(
-                [chunk.content for chunk in valid_chunks]
-            )  # type: ignore[arg-type]
-            records = [
-                EmbeddingRecord(chunk=chunk, vector=vector)
-                for chunk, vector in zip(valid_chunks, vectors)
-            ]
-            vector_store.upsert(records)  # type: ignore[union-attr]
-            print(f"Embedded {len(records)} chunks for {card_name}")
+            vector_store.flush()
+            with manifest_lock:
+                manifest.save()
         except Exception as e:
-            print(f"Embedding failed for {card_name}: {e}")
+            if not aborted:
+                raise
+            # keep the original error; only finished cards are in the manifest
+            print(f"Could not save progress after the failure: {e}")
+
+    for stage in (chunk_stage, embed_stage):
+        if stage.error is not None:
+            raise stage.error
+
+
+def _embed_stage(
+    card_queue: "queue.Queue[Any]",
+    record_queue: "queue.Queue[Any]",
+    embedding_client: UpstageEmbeddingClient,
+    batch_size: int,
+    stats: PipelineStats,
+    stop: threading.Event,
+) -> None:
+    """Stage 2: pack chunks of consecutive cards into batches of `batch_size`.
+
+    A card's _CardDone marker is emitted right after the batch holding its
+    last chunk, so the upsert stage sees every record of a card before it
+    finalizes the card in the manifest.
+    """
+    buffer: List[Chunk] = []
+    pending: Deque[Tuple[int, ManifestDiff]] = deque()  # (chunk sequence end, card)
+    sequence = 0
+
+    def flush() -> bool:
+        if buffer:
+            batch = list(buffer)
+            buffer.clear()
+            started = time.perf_counter()
+            try:
+                vectors = embedding_client.embed_texts([chunk.content for chunk in batch])
+                if len(vectors) != len(batch):
+                    raise RuntimeError(
+                        f"expected {len(batch)} embeddings, got {len(vectors)}"
+                    )
+            except Exception as e:
+                failed = {chunk.card_name for chunk in batch}
+                stats.failed_cards |= failed
+                print(f"Embedding failed for {', '.join(sorted(failed))}: {e}")
+            else:
+                stats.embed_batches += 1
+                stats.chunks_embedded += len(batch)
+                records = [
+                    EmbeddingRecord(chunk=chunk, vector=vector)
+                    for chunk, vector in zip(batch, vectors)
+                ]
+                if not _put(record_queue, records, stop):
+                    return False
+            finally:
+                stats.embed_seconds += time.perf_counter() - started
+        while pending and pending[0][0] <= sequence - len(buffer):
+            if not _put(record_queue, _CardDone(pending.popleft()[1]), stop):
+                return False
+        return True
+
+    while True:
+        try:
+            item = card_queue.get(
+                timeout=BATCH_LINGER_SECONDS if buffer or pending else STOP_POLL_SECONDS
+            )
+        except queue.Empty:
+            if stop.is_set() or not flush():
+                return
+            continue
+        if item is _END:
+            break
+        diff: ManifestDiff = item
+        for chunk in diff.to_embed:
+            buffer.append(chunk)
+            sequence += 1
+            if len(buffer) >= batch_size and not flush():
+                return
+        pending.append((sequence, diff))
+        if not buffer and not flush():
+            return
+    flush()
+
+
+def _finish_card(
+    diff: ManifestDiff,
+    vector_store: VectorStore,
+    manifest: IngestionManifest,
+    manifest_lock: threading.Lock,
+    settings: Settings,
+    stats: PipelineStats,
+) -> None:
+    """Stage 3 bookkeeping: drop removed chunk ids and record the card."""
+    if diff.card_name in stats.failed_cards:
+        # Not recorded in the manifest, so the next run retries the whole card
+        return
+    started = time.perf_counter()
+    try:
+        vector_store.delete(diff.removed)
+    except Exception as e:
+        stats.failed_cards.add(diff.card_name)
+        print(f"Delete failed for {diff.card_name}: {e}")
+        return
+    finally:
+        stats.upsert_seconds += time.perf_counter() - started
+    with manifest_lock:
+        manifest.record(diff.to_embed, settings.upstage_model)
+        manifest.forget(diff.removed)
+    print(diff.summary())
+
+
+def _put(target: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def print_diff_report(diffs: List[ManifestDiff]) -> None:
+    print("Dry run - no embeddings or vector store writes were made")
+    for diff in diffs:
+        marker = "*" if diff.has_changes else " "
+        print(f" {marker} {diff.summary()}")
+    print(
+        "Total: "
+        f"{sum(len(d.added) for d in diffs)} to add, "
+        f"{sum(len(d.changed) for d in diffs)} to re-embed, "
+        f"{sum(len(d.removed) for d in diffs)} to delete, "
+        f"{sum(len(d.unchanged) for d in diffs)} unchanged"
+    )
@@ -1,19 +1,55 @@
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import chromadb
+import numpy as np
 
 from .chunk_models import Chunk, EmbeddingRecord
 
 
+def chunk_metadata(chunk: Chunk) -> dict:
+    # 메타데이터 구성 - RAG 검색에 필요한 모든 필드 포함
+    metadata = {
+        "chunk_type": chunk.chunk_type,
+        "card_name": chunk.card_name,
+        "card_company": chunk.card_company,
+    }
+
+    # Optional 필드들 - None이 아닌 경우만 추가
+    if chunk.category:
+        metadata["category"] = chunk.category
+    if chunk.annual_fee is not None:
+        metadata["annual_fee"] = chunk.annual_fee
+    if chunk.min_performance is not None:
+        metadata["min_performance"] = chunk.min_performance
+    if chunk.major_categories:
+        metadata["major_categories"] = chunk.major_categories
+    if chunk.benefits_summary:
+        metadata["benefits_summary"] = chunk.benefits_summary
+    if chunk.conditions:
+        metadata["conditions"] = chunk.conditions
+
+    # 추가 메타데이터 (있는 경우)
+    metadata.update({k: str(v) for k, v in chunk.metadata.items() if v is not None})
+    return metadata
+
+
 class VectorStore:
     def upsert(
         self, records: Iterable[EmbeddingRecord]
     ) -> None:  # pragma: no cover - interface
         raise NotImplementedError
 
+    def delete(self, ids: Iterable[str]) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Persists buffered writes; stores that write through need nothing here."""
+
 
 class ChromaVectorStore(VectorStore):
     def __init__(
@@ -34,33 +70,7 @@ class ChromaVectorStore(VectorStore):
             ids.append(chunk.chunk_id)
             documents.append(chunk.content)
             embeddings.append(record.vector)
-            
-            # 메타데이터 구성 - RAG 검색에 필요한 모든 필드 포함
-            metadata = {
-                "chunk_type": chunk.chunk_type,
-                "card_name": chunk.card_name,
-                "card_company": chunk.card_company,
-            }
-            
-            # Optional 필드들 - None이 아닌 경우만 추가
-            if chunk.category:
-                metadata["category"] = chunk.category
-            if chunk.annual_fee is not None:
-                metadata["annual_fee"] = chunk.annual_fee
-            if chunk.min_performance is not None:
-                metadata["min_performance"] = chunk.min_performance
-            if chunk.major_categories:
-                metadata["major_categories"] = chunk.major_categories
-            if chunk.benefits_summary:
-                metadata["benefits_summary"] = chunk.benefits_summary
-            if chunk.conditions:
-                metadata["conditions"] = chunk.conditions
-
-            # 추가 메타데이터 (있는 경우)
-            metadata.update(
-                {k: str(v) for k, v in chunk.metadata.items() if v is not None}
-            )
-            metadatas.append(metadata)
+            metadatas.append(chunk_metadata(chunk))
 
         if not documents:
             return
@@ -71,3 +81,388 @@ class ChromaVectorStore(VectorStore):
             documents=documents,
             metadatas=metadatas,
         )
+
+    def delete(self, ids: Iterable[str]) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        self.collection.delete(ids=ids)
+
+
+def _parse_categories(value: Any) -> List[str]:
+    """major_categories ("General, Shopping" / JSON 리스트 / list)를 소문자 리스트로."""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+    else:
+        raw = str(value).strip()
+        if not raw or raw == "N/A":
+            return []
+        try:
+            loaded = json.loads(raw)
+            items = loaded if isinstance(loaded, list) else raw.split(",")
+        except json.JSONDecodeError:
+            items = raw.split(",")
+    return [
+        str(item).strip().strip("\"'[]").lower()
+        for item in items
+        if str(item).strip().strip("\"'[]")
+    ]
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        cleaned = value.strip().replace(",", "").replace("원", "")
+        if cleaned.isdigit():
+            return int(cleaned)
+    return None
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector index for a small corpus (Chroma 대체 백엔드).
+
+    On-disk layout (`index_directory/`):
+    - vectors.npy          float32 (N, D), memory-mapped on load
+    - sq_norms.npy         float32 (N,)  squared L2 norm of each row
+    - min_performance.npy  int64 (N,)    -1 when the chunk has no threshold
+    - category_mask.npy    uint64 (N,)   bit i set = category_vocab[i]
+    - card_index.npy       int32 (N,)    index into card_names
+    - records.json         ids, documents, metadatas, card_names, category_vocab
+
+    `search` applies the budget/category filters as a boolean mask over the
+    columns and ranks with one matrix-vector product. Distances are squared
+    L2, the same scale Chroma's default collections return.
+
+    Writes update the in-memory columns for the touched rows only (new ids
+    are appended into a growable buffer). With `autosave=False` nothing is
+    written to disk until `flush()`, so bulk ingestion persists once instead
+    of once per batch.
+    """
+
+    _ARRAYS = ("vectors", "sq_norms", "min_performance", "category_mask", "card_index")
+
+    def __init__(self, index_directory: Path, autosave: bool = True) -> None:
+        self.index_directory = Path(index_directory)
+        self.autosave = autosave
+        self._dirty = False
+        self._positions: Dict[str, int] = {}
+        self._card_positions: Dict[str, int] = {}
+        # writable (capacity, D) buffer; self.vectors is a view of its first N rows
+        self._vector_buffer: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.card_names: List[str] = []
+        self.category_vocab: List[str] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+        self.min_performance = np.zeros(0, dtype=np.int64)
+        self.category_mask = np.zeros(0, dtype=np.uint64)
+        self.card_index = np.zeros(0, dtype=np.int32)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------------------------< load / save >---------------------------
+
+    def _load(self) -> None:
+        records_path = self.index_directory / "records.json"
+        if not records_path.exists():
+            return
+        self._vector_buffer = None
+        records = json.loads(records_path.read_text(encoding="utf-8"))
+        self.ids = records["ids"]
+        self.documents = records["documents"]
+        self.metadatas = records["metadatas"]
+        self.card_names = records["card_names"]
+        self.category_vocab = records["category_vocab"]
+        for name in self._ARRAYS:
+            mode = "r" if name == "vectors" else None
+            setattr(
+                self, name, np.load(self.index_directory / f"{name}.npy", mmap_mode=mode)
+            )
+        if len(self.vectors) != len(self.ids):
+            raise RuntimeError(
+                f"Corrupt numpy index at {self.index_directory}: "
+                f"{len(self.vectors)} vectors for {len(self.ids)} ids"
+            )
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._card_positions = {name: i for i, name in enumerate(self.card_names)}
+
+    def _save(self) -> None:
+        self.index_directory.mkdir(parents=True, exist_ok=True)
+        # 배열을 먼저 교체하고 records.json을 마지막에 교체 (로드 시 개수로 검증)
+        for name in self._ARRAYS:
+            path = self.index_directory / f"{name}.npy"
+            tmp_path = self.index_directory / f"{name}.tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, path)
+        records_path = self.index_directory / "records.json"
+        tmp_records = records_path.with_suffix(".json.tmp")
+        tmp_records.write_text(
+            json.dumps(
+                {
+                    "ids": self.ids,
+                    "documents": self.documents,
+                    "metadatas": self.metadatas,
+                    "card_names": self.card_names,
+                    "category_vocab": self.category_vocab,
+                },
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_records, records_path)
+        self._load()
+
+    def flush(self) -> None:
+        if self._dirty:
+            self._save()
+            self._dirty = False
+
+    def _written(self) -> None:
+        self._dirty = True
+        if self.autosave:
+            self.flush()
+
+    # ---------------------------< write >---------------------------
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Chroma collection.upsert와 같은 형태로 행을 추가/교체합니다."""
+        if not ids:
+            return
+        new_vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        # 같은 호출 안에서 중복된 id는 마지막 값이 남음 (Chroma upsert와 동일)
+        latest = {doc_id: k for k, doc_id in enumerate(ids)}
+        replaced = [(self._positions[d], k) for d, k in latest.items() if d in self._positions]
+        appended = [(d, k) for d, k in latest.items() if d not in self._positions]
+
+        vectors = self._reserve(len(appended), new_vectors.shape[1])
+        for row, k in replaced:
+            vectors[row] = new_vectors[k]
+            self.documents[row] = documents[k]
+            self.metadatas[row] = metadatas[k]
+        if replaced:
+            rows = [row for row, _ in replaced]
+            masks, min_perf, card_index = self._columns([self.metadatas[row] for row in rows])
+            self.category_mask[rows] = masks
+            self.min_performance[rows] = min_perf
+            self.card_index[rows] = card_index
+            self.sq_norms[rows] = np.einsum("ij,ij->i", vectors[rows], vectors[rows])
+
+        if appended:
+            start = len(self.ids)
+            end = start + len(appended)
+            order = [k for _, k in appended]
+            vectors[start:end] = new_vectors[order]
+            for doc_id, k in appended:
+                self._positions[doc_id] = len(self.ids)
+                self.ids.append(doc_id)
+                self.documents.append(documents[k])
+                self.metadatas.append(metadatas[k])
+            masks, min_perf, card_index = self._columns(self.metadatas[start:end])
+            self.category_mask = np.concatenate([self.category_mask, masks])
+            self.min_performance = np.concatenate([self.min_performance, min_perf])
+            self.card_index = np.concatenate([self.card_index, card_index])
+            self.sq_norms = np.concatenate(
+                [self.sq_norms, np.einsum("ij,ij->i", vectors[start:end], vectors[start:end])]
+            )
+        self.vectors = vectors[: len(self.ids)]
+        self._written()
+
+    def _reserve(self, extra: int, dim: int) -> np.ndarray:
+        """Writable buffer with room for `extra` more rows (grows by doubling)."""
+        count = len(self.ids)
+        buffer = self._vector_buffer
+        if count and self.vectors.shape[1] != dim:
+            raise ValueError(f"Embedding dim {dim} does not match index dim {self.vectors.shape[1]}")
+        if buffer is None or len(buffer) < count + extra:
+            capacity = max(count + extra, 2 * count, 1024)
+            grown = np.empty((capacity, dim), dtype=np.float32)
+            if count:
+                grown[:count] = self.vectors[:count]
+            buffer = self._vector_buffer = grown
+        return buffer
+
+    def upsert(self, records: Iterable[EmbeddingRecord]) -> None:
+        records = list(records)
+        if not records:
+            return
+        self.add(
+            [record.chunk.chunk_id for record in records],
+            [record.vector for record in records],
+            [record.chunk.content for record in records],
+            [chunk_metadata(record.chunk) for record in records],
+        )
+
+    def delete(self, ids: Iterable[str]) -> None:
+        removed = set(ids)
+        if not removed:
+            return
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in removed]
+        if len(keep) == len(self.ids):
+            return
+        self.ids = [self.ids[i] for i in keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        # 삭제는 행을 압축하므로 카드 목록도 남은 행 기준으로 다시 만듦
+        self.card_names = []
+        self._card_positions = {}
+        self.category_mask, self.min_performance, self.card_index = self._columns(self.metadatas)
+        self.vectors = np.array(self.vectors[keep], dtype=np.float32)
+        self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        self._vector_buffer = None
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._written()
+
+    def _columns(
+        self, metadatas: Sequence[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(category_mask, min_performance, card_index) columns for the given rows."""
+        masks = np.zeros(len(metadatas), dtype=np.uint64)
+        min_perf = np.full(len(metadatas), -1, dtype=np.int64)
+        card_index = np.zeros(len(metadatas), dtype=np.int32)
+        for i, metadata in enumerate(metadatas):
+            for category in _parse_categories(metadata.get("major_categories")):
+                if category not in self.category_vocab:
+                    if len(self.category_vocab) >= 64:
+                        raise ValueError("category_mask supports at most 64 categories")
+                    self.category_vocab.append(category)
+                masks[i] |= np.uint64(1 << self.category_vocab.index(category))
+            value = _parse_int(metadata.get("min_performance"))
+            if value is not None:
+                min_perf[i] = value
+            card_name = str(metadata.get("card_name", ""))
+            if card_name not in self._card_positions:
+                self._card_positions[card_name] = len(self.card_names)
+                self.card_names.append(card_name)
+            card_index[i] = self._card_positions[card_name]
+        return masks, min_perf, card_index
+
+    # ---------------------------< read >---------------------------
+
+    def _category_bits(self, categories: Iterable[str]) -> int:
+        bits = 0
+        for category in categories:
+            category = category.strip().lower()
+            if category in self.category_vocab:
+                bits |= 1 << self.category_vocab.index(category)
+        return bits
+
+    def filter_mask(
+        self, budget_filter: Optional[int], category_filter: Optional[List[str]]
+    ) -> np.ndarray:
+        """CardRetriever의 예산/카테고리 후처리 필터와 같은 규칙의 boolean mask."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        if budget_filter is not None:
+            mask &= (self.min_performance < 0) | (self.min_performance <= budget_filter)
+        if category_filter:
+            bits = np.uint64(self._category_bits(category_filter))
+            # major_categories가 없는 청크(overview 등)는 통과
+            mask &= (self.category_mask == 0) | ((self.category_mask & bits) != 0)
+        return mask
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        top_k: int,
+        budget_filter: Optional[int] = None,
+        category_filter: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.search_many([query_vector], top_k, budget_filter, [category_filter])[0]
+
+    def search_many(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        top_k: int,
+        budget_filter: Optional[int] = None,
+        category_filters: Optional[Sequence[Optional[List[str]]]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """쿼리 행렬 (Q, D) 하나로 모든 쿼리의 거리를 한 번에 계산합니다."""
+        if category_filters is None:
+            category_filters = [None] * len(query_vectors)
+        if not self.ids or top_k <= 0 or len(query_vectors) == 0:
+            return [[] for _ in query_vectors]
+
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(len(query_vectors), -1)
+        distances = (
+            self.sq_norms[None, :]
+            - 2.0 * (queries @ self.vectors.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
+        )
+
+        per_query: List[List[Dict[str, Any]]] = []
+        for row, category_filter in zip(distances, category_filters):
+            candidates = np.flatnonzero(self.filter_mask(budget_filter, category_filter))
+            if candidates.size > top_k:
+                nearest = np.argpartition(row[candidates], top_k - 1)[:top_k]
+                candidates = candidates[nearest]
+            candidates = candidates[np.argsort(row[candidates], kind="stable")]
+            per_query.append(
+                [
+                    {
+                        "id": self.ids[i],
+                        "content": self.documents[i],
+                        "metadata": self.metadatas[i],
+                        "distance": float(row[i]),
+                    }
+                    for i in candidates
+                ]
+            )
+        return per_query
+
+    def get_card_chunks(self, card_name: str) -> List[Dict[str, Any]]:
+        if card_name not in self._card_positions:
+            return []
+        rows = np.flatnonzero(self.card_index == self._card_positions[card_name])
+        return [
+            {"id": self.ids[i], "content": self.documents[i], "metadata": self.metadatas[i]}
+            for i in rows
+        ]
+
+    @classmethod
+    def from_chroma(
+        cls,
+        chroma_store: ChromaVectorStore,
+        index_directory: Path,
+        batch_size: int = 1000,
+    ) -> "NumpyVectorStore":
+        """기존 Chroma 컬렉션을 재임베딩 없이 numpy 인덱스로 내보냅니다."""
+        store = cls(index_directory, autosave=False)
+        ids: List[str] = []
+        embeddings: List[Any] = []
+        documents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        total = chroma_store.collection.count()
+        for offset in range(0, total, batch_size):
+            batch = chroma_store.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"],
+            )
+            ids.extend(batch["ids"])
+            embeddings.extend(batch["embeddings"])
+            documents.extend(batch["documents"])
+            metadatas.extend(batch["metadatas"])
+        store.delete(list(store.ids))
+        store.add(ids, embeddings, documents, metadatas)
+        store.flush()
+        store.autosave = True
+        return store
+
@@ -0,0 +1,339 @@
+"""
+백엔드 계측: 호출 횟수 / 지연 히스토그램 / LLM 토큰 / 캐시 hit 카운터
+
+역할:
+- 프로세스 단위 레지스트리(`metrics`)에 카운터와 지연 히스토그램(ms)을 누적
+  -> GET /metrics (Prometheus 텍스트, ?format=json 이면 JSON)
+- 요청 단위 RequestTrace(contextvar)에 같은 구간을 span으로 기록
+  -> 디버그 모드에서 응답에 타이밍 breakdown으로 포함
+- LangChain 콜백(LLMMetricsCallback)으로 LLM 호출 지연 / 토큰을 노드별로 집계
+
+사용:
+    with timed("smartpick_retriever_latency_ms", op="get_full_card_info"): ...
+
+    @instrument("smartpick_embedding_latency_ms", op="embed_batch")
+    def _embed_batch(...): ...
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# 지연 히스토그램 bucket 상한 (ms)
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000,
+)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _span_name(metric: str, labels: LabelKey) -> str:
+    base = metric.removeprefix("smartpick_").removesuffix("_latency_ms")
+    return ":".join([base, *(value for _, value in labels)])
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """bucket 상한 기준 근사 분위수"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    """스레드 안전한 카운터/히스토그램 저장소"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._started = time.time()
+
+    def inc(self, metric: str, value: float = 1, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(metric, {})
+            series[key] = series.get(key, 0) + value
+        trace = current_trace()
+        if trace is not None:
+            trace.count(metric, key, value)
+
+    def observe(self, metric: str, value_ms: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(metric, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value_ms)
+        trace = current_trace()
+        if trace is not None:
+            trace.span(_span_name(metric, key), value_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON용 요약: 카운터 값 + 히스토그램별 calls / 평균 / p50·p95·p99(근사) / max"""
+        with self._lock:
+            counters = {
+                metric: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for metric, series in sorted(self._counters.items())
+            }
+            histograms = {
+                metric: [
+                    {
+                        "labels": dict(key),
+                        "calls": h.count,
+                        "mean_ms": round(h.sum / h.count, 2) if h.count else 0.0,
+                        "p50_ms": h.quantile(0.50),
+                        "p95_ms": h.quantile(0.95),
+                        "p99_ms": h.quantile(0.99),
+                        "max_ms": round(h.max, 2),
+                    }
+                    for key, h in series.items()
+                ]
+                for metric, series in sorted(self._histograms.items())
+            }
+        return {
+            "uptime_s": round(time.time() - self._started, 1),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+
+        def fmt(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(key) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for metric, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{fmt(key)} {value:g}")
+            for metric, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {metric} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(h.buckets, h.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{metric}_bucket{fmt(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{metric}_bucket{fmt(key, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{metric}_sum{fmt(key)} {h.sum:.3f}")
+                    lines.append(f"{metric}_count{fmt(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestTrace:
+    """요청 1건 동안의 span(이름, 시작 오프셋, ms)과 카운터 증가분"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+
+    def span(self, name: str, duration_ms: float) -> None:
+        end_ms = (time.perf_counter() - self._started) * 1000
+        with self._lock:
+            self.spans.append(
+                {"name": name, "start_ms": round(end_ms - duration_ms, 1), "ms": round(duration_ms, 1)}
+            )
+
+    def count(self, metric: str, key: LabelKey, value: float) -> None:
+        name = _span_name(metric.removesuffix("_total"), key)
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def breakdown(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+            totals: Dict[str, float] = {}
+            for span in spans:
+                totals[span["name"]] = round(totals.get(span["name"], 0) + span["ms"], 1)
+            return {
+                "total_ms": round((time.perf_counter() - self._started) * 1000, 1),
+                "totals_ms": totals,
+                "counters": dict(self.counters),
+                "spans": spans,
+            }
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "smartpick_request_trace", default=None
+)
+
+
+def start_trace() -> RequestTrace:
+    """현재 컨텍스트(및 이후 생성되는 task/executor 스레드)에 요청 trace를 연결합니다."""
+    trace = RequestTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def timed(metric: str, **labels: Any) -> Iterator[None]:
+    """블록 실행 시간을 `metric` 히스토그램에 기록 (예외 시 smartpick_errors_total 증가)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.inc("smartpick_errors_total", metric=metric, **labels)
+        raise
+    finally:
+        metrics.observe(metric, (time.perf_counter() - start) * 1000, **labels)
+
+
+def instrument(metric: str, **labels: Any) -> Callable[[Callable], Callable]:
+    """함수 호출 전체를 timed()로 감싸는 데코레이터"""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(metric, **labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """LangGraph 노드 함수 래퍼 (smartpick_node_latency_ms{node=...})"""
+    return instrument("smartpick_node_latency_ms", node=name)(fn)
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    LLM 호출별 지연 / prompt·completion 토큰을 LangGraph 노드 단위로 집계
+
+    init_chat_model(..., callbacks=[llm_metrics_callback]) 로 붙이면
+    with_structured_output 등 파생 runnable의 호출도 함께 잡힙니다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runs: Dict[UUID, Tuple[float, str, Optional[RequestTrace]]] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]) -> None:
+        node = (metadata or {}).get("langgraph_node") or "none"
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), node, current_trace())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs) -> None:
+        self._start(run_id, metadata)
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[float, str, Optional[RequestTrace]]]:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        start, node, trace = run
+        # 콜백이 다른 컨텍스트(executor 스레드)에서 불려도 시작 시점의 trace에 기록
+        token = _current_trace.set(trace)
+        try:
+            metrics.observe("smartpick_llm_latency_ms", (time.perf_counter() - start) * 1000, node=node)
+        finally:
+            _current_trace.reset(token)
+        return run
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        run = self._finish(run_id)
+        if run is None:
+            return
+        _, node, trace = run
+        prompt_tokens, completion_tokens = _token_usage(response)
+        token = _current_trace.set(trace)
+        try:
+            if prompt_tokens:
+                metrics.inc("smartpick_llm_tokens_total", prompt_tokens, node=node, kind="prompt")
+            if completion_tokens:
+                metrics.inc("smartpick_llm_tokens_total", completion_tokens, node=node, kind="completion")
+        finally:
+            _current_trace.reset(token)
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs) -> None:
+        run = self._finish(run_id)
+        if run is not None:
+            metrics.inc("smartpick_errors_total", metric="smartpick_llm_latency_ms", node=run[1])
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """usage_metadata(메시지) -> llm_output.token_usage 순으로 토큰 수를 찾습니다."""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if prompt_tokens or completion_tokens:
+        return prompt_tokens, completion_tokens
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+
+
+llm_metrics_callback = LLMMetricsCallback()
@@ -1,3 +1,4 @@
+import os
 from typing import List, Dict
 
 TARGET_CARDS = {
@@ -79,3 +80,16 @@ CARD_NAME_MAPPING = {
 DOWNLOAD_DIR = "datasets/pdfs"
 DATA_OUTPUT_DIR = "datasets/text"
 INDEX_FILE = "datasets/index.csv"
+CRAWL_MANIFEST = "datasets/crawl_manifest.json"
+EXTRACT_CACHE_DIR = "datasets/extract_cache"
+
+# PDF text extraction runs on a process pool (pdfplumber is CPU-bound Python).
+# Large PDFs are split into page ranges so a single manual can use several cores.
+EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", 0)) or os.cpu_count() or 1
+EXTRACT_PAGES_PER_TASK = int(os.environ.get("PDF_EXTRACT_PAGES_PER_TASK", 8))
+
+# Crawl scheduling: companies run in parallel, direct PDF URLs share one pooled
+# HTTP session, and JS/click downloads are spread over a small pool of browser pages.
+CRAWL_DOWNLOAD_WORKERS = int(os.environ.get("CRAWL_DOWNLOAD_WORKERS", 8))
+CRAWL_BROWSER_PAGES = int(os.environ.get("CRAWL_BROWSER_PAGES", 2))
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -1,17 +1,36 @@
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
 from typing import List, Dict, Optional
 import os
-import requests
+import threading
+from urllib.parse import urljoin
 from playwright.sync_api import sync_playwright, Page
-from apps.backend.crawler.config import DATA_OUTPUT_DIR, DOWNLOAD_DIR
+from apps.backend.crawler.config import (
+    CRAWL_BROWSER_PAGES,
+    CRAWL_DOWNLOAD_WORKERS,
+    DATA_OUTPUT_DIR,
+    DOWNLOAD_DIR,
+    USER_AGENT,
+)
 from apps.backend.crawler.utils.card_matcher import CardMatcher
+from apps.backend.crawler.utils.downloader import DownloadResult, PooledDownloader
 
 
 class BaseCrawler(ABC):
-    def __init__(self, company_name: str, use_playwright: bool = True):
+    def __init__(
+        self,
+        company_name: str,
+        use_playwright: bool = True,
+        downloader: Optional[PooledDownloader] = None,
+    ):
         self.company_name = company_name
         self.matcher = CardMatcher()
         self.use_playwright = use_playwright
+        # CrawlScheduler replaces this with one downloader shared by all companies
+        self.downloader = downloader or PooledDownloader()
+        self.download_workers = CRAWL_DOWNLOAD_WORKERS
+        self.browser_pages = CRAWL_BROWSER_PAGES
         # Ensure directories exist
         os.makedirs(DOWNLOAD_DIR, exist_ok=True)
         os.makedirs(DATA_OUTPUT_DIR, exist_ok=True)
@@ -23,132 +42,203 @@ class BaseCrawler(ABC):
     def find_pdf_links_requests(self) -> List[Dict]:
         raise NotImplementedError
 
+    def _target_path(self, url_or_js: str, title: str, card_name: str) -> str:
+        # Sanitize filename
+        safe_title = "".join(
+            c for c in title if c.isalnum() or c in (" ", "-", "_")
+        ).strip()
+        safe_card = "".join(
+            c for c in card_name if c.isalnum() or c in (" ", "-", "_")
+        ).strip()
+        filename = f"{self.company_name}_{safe_card}_{safe_title}.pdf"
+
+        # Determine subfolder based on content
+        subfolder = "manuals"
+        if (
+            "terms" in filename.lower()
+            or "stpul" in url_or_js.lower()
+            or "agreement" in url_or_js.lower()
+        ):
+            subfolder = "terms"
+        elif "manual" in filename.lower() or "prdctopmn" in url_or_js.lower():
+            subfolder = "manuals"
+
+        # Create company-specific structure: datasets/pdfs/{company}/{subfolder}
+        company_dir = os.path.join(DOWNLOAD_DIR, self.company_name.lower(), subfolder)
+        os.makedirs(company_dir, exist_ok=True)
+
+        return os.path.join(company_dir, filename)
+
     def download_pdf(
         self, page: Optional[Page], url_or_js: str, title: str, card_name: str
     ) -> Optional[str]:
+        result = self._download(page, url_or_js, title, card_name)
+        return result.path if result else None
+
+    def _download(
+        self, page: Optional[Page], url_or_js: str, title: str, card_name: str
+    ) -> Optional[DownloadResult]:
         try:
             if page and url_or_js.startswith("/") and not url_or_js.startswith("//"):
-                from urllib.parse import urljoin
-
                 url_or_js = urljoin(page.url, url_or_js)
 
-            # Sanitize filename
-            safe_title = "".join(
-                c for c in title if c.isalnum() or c in (" ", "-", "_")
-            ).strip()
-            safe_card = "".join(
-                c for c in card_name if c.isalnum() or c in (" ", "-", "_")
-            ).strip()
-            filename = f"{self.company_name}_{safe_card}_{safe_title}.pdf"
+            filepath = self._target_path(url_or_js, title, card_name)
 
-            # Determine subfolder based on content
-            subfolder = "manuals"
-            if (
-                "terms" in filename.lower()
-                or "stpul" in url_or_js.lower()
-                or "agreement" in url_or_js.lower()
-            ):
-                subfolder = "terms"
-            elif "manual" in filename.lower() or "prdctopmn" in url_or_js.lower():
-                subfolder = "manuals"
-
-            # Create company-specific structure: datasets/pdfs/{company}/{subfolder}
-            company_dir = os.path.join(
-                DOWNLOAD_DIR, self.company_name.lower(), subfolder
-            )
-            os.makedirs(company_dir, exist_ok=True)
-
-            filepath = os.path.join(company_dir, filename)
-
-            if page:
-                if url_or_js.startswith("http"):
-                    try:
-                        with page.expect_download(timeout=60000) as download_info:
-                            try:
-                                page.goto(url_or_js)
-                            except Exception as e:
-                                # Playwright throws this if the navigation becomes a download
-                                if "Download is starting" not in str(
-                                    e
-                                ) and "net::ERR_ABORTED" not in str(e):
-                                    raise e
-                        download = download_info.value
-                        download.save_as(filepath)
-                    except Exception as e:
-                        print(
-                            f"Playwright download failed, falling back to requests: {e}"
-                        )
-                        # Fallback to requests
-                        response = requests.get(url_or_js, stream=True, timeout=30)
-                        response.raise_for_status()
-                        with open(filepath, "wb") as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                f.write(chunk)
-                elif url_or_js.startswith("js:"):
-                    js_code = url_or_js.replace("js:", "")
-                    with page.expect_download(timeout=60000) as download_info:
-                        page.evaluate(js_code)
-                    download = download_info.value
-                    download.save_as(filepath)
-                else:
-                    with page.expect_download(timeout=60000) as download_info:
-                        page.click(f"a[href='{url_or_js}']")
-                    download = download_info.value
-                    download.save_as(filepath)
-            else:
-                response = requests.get(url_or_js, stream=True, timeout=30)
-                response.raise_for_status()
-                with open(filepath, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            if not page:
+                return self.downloader.fetch(url_or_js, filepath)
+
+            if url_or_js.startswith("http"):
+                try:
+                    return self._download_with_page(page, url_or_js, filepath)
+                except Exception as e:
+                    print(f"Playwright download failed, falling back to requests: {e}")
+                    return self.downloader.fetch(url_or_js, filepath)
 
-            return filepath
+            return self._download_with_page(page, url_or_js, filepath)
         except Exception as e:
             print(f"Error downloading {url_or_js}: {e}")
             return None
 
+    def _download_with_page(
+        self, page: Page, url_or_js: str, filepath: str
+    ) -> DownloadResult:
+        part_path = f"{filepath}.part"
+        with page.expect_download(timeout=60000) as download_info:
+            if url_or_js.startswith("http"):
+                try:
+                    page.goto(url_or_js)
+                except Exception as e:
+                    # Playwright throws this if the navigation becomes a download
+                    if "Download is starting" not in str(
+                        e
+                    ) and "net::ERR_ABORTED" not in str(e):
+                        raise e
+            elif url_or_js.startswith("js:"):
+                page.evaluate(url_or_js.replace("js:", ""))
+            else:
+                page.click(f"a[href='{url_or_js}']")
+        download_info.value.save_as(part_path)
+        return self.downloader.commit(url_or_js, filepath, part_path)
+
     def run(self):
-        results = []
         if self.use_playwright:
             print(f"Starting Playwright crawler for {self.company_name}...")
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
+                context = browser.new_context(user_agent=USER_AGENT)
                 page = context.new_page()
                 links = self.find_pdf_links_playwright(page)
-                print(f"Found {len(links)} potential PDF links.")
-                for link in links:
-                    results.extend(self._process_link(page, link))
                 browser.close()
         else:
             print(f"Starting requests crawler for {self.company_name}...")
             links = self.find_pdf_links_requests()
-            print(f"Found {len(links)} potential PDF links.")
-            for link in links:
-                results.extend(self._process_link(None, link))
+        print(f"Found {len(links)} potential PDF links.")
+        return self._download_links(links)
+
+    def _download_links(self, links: List[Dict]) -> List[Dict]:
+        """
+        Direct http(s) links are fetched concurrently over the pooled session.
+        JS/click links, and direct links that failed there, go to browser pages.
+        """
+        direct: List[Dict] = []
+        page_bound: List[Dict] = []
+        for link in links:
+            (direct if link.get("url", "").startswith("http") else page_bound).append(link)
+
+        results: List[Dict] = []
+        retry_with_page: List[Dict] = []
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            for link, output in zip(direct, executor.map(self._process_direct, direct)):
+                if output is None:
+                    retry_with_page.append(link)
+                else:
+                    results.extend(output)
+
+        if self.use_playwright:
+            results.extend(self._run_page_workers(page_bound + retry_with_page))
+        return results
+
+    def _process_direct(self, link: Dict) -> Optional[List[Dict]]:
+        output = self._process_link(None, link)
+        if not output and self.use_playwright and self._resolve_card_name(link):
+            return None
+        return output
+
+    def _run_page_workers(self, links: List[Dict]) -> List[Dict]:
+        if not links:
+            return []
+
+        queue: "Queue[Dict]" = Queue()
+        for link in links:
+            queue.put(link)
+        results: List[Dict] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            # Playwright's sync API is per-thread, so every worker owns its browser
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                context = browser.new_context(user_agent=USER_AGENT)
+                page = context.new_page()
+                try:
+                    while True:
+                        try:
+                            link = queue.get_nowait()
+                        except Empty:
+                            break
+                        source_page = link.get("source_page")
+                        try:
+                            if source_page and page.url != source_page:
+                                page.goto(
+                                    source_page,
+                                    wait_until="domcontentloaded",
+                                    timeout=60000,
+                                )
+                            output = self._process_link(page, link)
+                        except Exception as e:
+                            print(f"Error processing {link.get('url')}: {e}")
+                            continue
+                        with lock:
+                            results.extend(output)
+                finally:
+                    browser.close()
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(max(1, min(self.browser_pages, len(links))))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
         return results
 
+    def _resolve_card_name(self, link: Dict) -> Optional[str]:
+        card_name = link.get("card_name")
+        if not card_name:
+            card_name = self.matcher.find_best_match(
+                self.company_name, [link.get("title", ""), link.get("url", "")]
+            )
+        return card_name
+
     def _process_link(self, page: Optional[Page], link: Dict) -> List[Dict]:
         output: List[Dict] = []
         title = link.get("title", "")
         url = link.get("url", "")
-        card_name = link.get("card_name")
-        if not card_name:
-            card_name = self.matcher.find_best_match(self.company_name, [title, url])
+        card_name = self._resolve_card_name(link)
         if not card_name:
             return output
         print(f"Processing target card PDF: {card_name} - {title}")
-        local_path = self.download_pdf(page, url, title, card_name)
-        if local_path:
+        result = self._download(page, url, title, card_name)
+        if result:
             output.append(
                 {
                     "company": self.company_name,
                     "card_name": card_name,
                     "pdf_title": title,
                     "source_url": url,
-                    "local_path": local_path,
+                    "local_path": result.path,
+                    "download_status": result.status,
                 }
             )
         return output
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence
+
+from apps.backend.crawler.crawlers.base import BaseCrawler
+from apps.backend.crawler.utils.downloader import CrawlManifest, PooledDownloader
+
+
+class CrawlScheduler:
+    """
+    Runs company crawlers in parallel. All crawlers share one pooled
+    downloader (and therefore one crawl manifest), so unchanged PDFs are
+    skipped no matter which company thread discovers them.
+    """
+
+    def __init__(
+        self,
+        crawlers: Sequence[BaseCrawler],
+        downloader: Optional[PooledDownloader] = None,
+        max_parallel: Optional[int] = None,
+    ):
+        self.crawlers = list(crawlers)
+        self.downloader = downloader or PooledDownloader(CrawlManifest())
+        self.max_parallel = max_parallel or max(1, len(self.crawlers))
+        for crawler in self.crawlers:
+            crawler.downloader = self.downloader
+
+    def run(self) -> List[Dict]:
+        all_results: List[Dict] = []
+        if not self.crawlers:
+            return all_results
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            futures = {
+                executor.submit(crawler.run): crawler for crawler in self.crawlers
+            }
+            for future in as_completed(futures):
+                crawler = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"Crawler {crawler.company_name} failed: {e}")
+                    continue
+                if results:
+                    all_results.extend(results)
+
+        statuses: Dict[str, int] = {}
+        for record in all_results:
+            status = record.get("download_status", "downloaded")
+            statuses[status] = statuses.get(status, 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
+        print(f"Crawl finished: {summary or 'no PDFs'}")
+        return all_results
@@ -0,0 +1,300 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from apps.backend.crawler.config import (
+    CRAWL_DOWNLOAD_WORKERS,
+    CRAWL_MANIFEST,
+    USER_AGENT,
+)
+from apps.backend.crawler.utils.parallel_extractor import file_sha256
+
+
+class CrawlManifest:
+    """
+    Per-URL record of the last successful download (size, ETag,
+    Last-Modified, SHA-256). Shared by every crawler thread.
+    """
+
+    def __init__(self, path: str = CRAWL_MANIFEST):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable crawl manifest {path}: {e}")
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.entries.get(url, {}))
+
+    def update(self, url: str, **fields: Any) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(url, {})
+            entry.update(fields)
+            for key in [k for k, v in entry.items() if v is None]:
+                del entry[key]
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class DownloadResult:
+    path: str
+    status: str  # "downloaded" | "resumed" | "unchanged"
+
+
+class PooledDownloader:
+    """
+    Thread-safe PDF downloader over one pooled `requests.Session`.
+
+    - Sends If-None-Match / If-Modified-Since from the crawl manifest and
+      skips the body on 304, or when ETag + Content-Length still match.
+    - Writes to `<file>.part` and resumes it with a Range request when the
+      server still reports the same ETag.
+    - Only replaces the local PDF when its SHA-256 actually changed.
+    """
+
+    def __init__(
+        self,
+        manifest: Optional[CrawlManifest] = None,
+        pool_size: int = CRAWL_DOWNLOAD_WORKERS,
+        timeout: int = 30,
+    ):
+        self.manifest = manifest if manifest is not None else CrawlManifest()
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _has_current_copy(self, entry: Dict[str, Any], filepath: str) -> bool:
+        return (
+            bool(entry)
+            and os.path.exists(filepath)
+            and os.path.getsize(filepath) == entry.get("size")
+        )
+
+    def fetch(self, url: str, filepath: str) -> DownloadResult:
+        entry = self.manifest.get(url)
+        part_path = f"{filepath}.part"
+        has_copy = self._has_current_copy(entry, filepath)
+
+        headers: Dict[str, str] = {}
+        resume_from = 0
+        if os.path.exists(part_path) and entry.get("part_etag"):
+            resume_from = os.path.getsize(part_path)
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = entry["part_etag"]
+        elif has_copy:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self.session.get(
+            url, headers=headers, stream=True, timeout=self.timeout
+        ) as response:
+            if response.status_code == 304 and has_copy:
+                return DownloadResult(filepath, "unchanged")
+            response.raise_for_status()
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            length = response.headers.get("Content-Length")
+            if (
+                response.status_code == 200
+                and has_copy
+                and etag
+                and etag == entry.get("etag")
+                and length is not None
+                and int(length) == entry.get("size")
+            ):
+                return DownloadResult(filepath, "unchanged")
+
+            resumed = response.status_code == 206
+            self.manifest.update(url, part_etag=etag)
+            with open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+
+        return self.commit(
+            url,
+            filepath,
+            part_path,
+            etag=etag,
+            last_modified=last_modified,
+            status="resumed" if resumed else "downloaded",
+        )
+
+    def commit(
+        self,
+        url: str,
+        filepath: str,
+        part_path: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        status: str = "downloaded",
+    ) -> DownloadResult:
+        """
+        Move a finished `.part` file into place unless its content hash equals
+        the copy we already have. Also used for Playwright-saved downloads.
+        """
+        entry = self.manifest.get(url)
+        digest = file_sha256(part_path)
+        if os.path.exists(filepath) and entry.get("sha256") == digest:
+            os.remove(part_path)
+            status = "unchanged"
+        else:
+            os.replace(part_path, filepath)
+
+        self.manifest.update(
+            url,
+            local_path=filepath,
+            size=os.path.getsize(filepath),
+            etag=etag,
+            last_modified=last_modified,
+            sha256=digest,
+            fetched_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            part_etag=None,
+        )
+        return DownloadResult(filepath, status)
+
+
+# 로컬 HTTP 서버(생성한 fixture PDF)로 변경 감지/이어받기 동작 검증
+#   uv run python -m apps.backend.crawler.utils.downloader
+if __name__ == "__main__":
+    import hashlib
+    import tempfile
+    from email.utils import formatdate
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    def make_pdf(body: str) -> bytes:
+        stream = f"BT /F1 12 Tf 72 720 Td ({body}) Tj ET".encode("latin-1")
+        return (
+            b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\n"
+            + b"2 0 obj << /Length %d >> stream\n" % len(stream)
+            + stream
+            + b"\nendstream endobj\n%%EOF\n" * 200
+        )
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        """Serves one PDF with ETag / Last-Modified / conditional GET / Range."""
+
+        content = make_pdf("v1")
+        modified = 1_700_000_000.0
+        requests_seen: list = []
+
+        def do_GET(self) -> None:
+            cls = type(self)
+            etag = '"%s"' % hashlib.sha256(cls.content).hexdigest()[:16]
+            cls.requests_seen.append(dict(self.headers))
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            body, status = cls.content, 200
+            range_header = self.headers.get("Range")
+            if range_header and self.headers.get("If-Range", etag) == etag:
+                start = int(range_header.split("=")[1].rstrip("-"))
+                body, status = cls.content[start:], 206
+                self.send_response(status)
+                self.send_header(
+                    "Content-Range", f"bytes {start}-{len(cls.content) - 1}/{len(cls.content)}"
+                )
+            else:
+                self.send_response(status)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(cls.modified, usegmt=True))
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/fixture.pdf"
+    out_dir = tempfile.mkdtemp()
+    target = os.path.join(out_dir, "fixture.pdf")
+
+    def read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    try:
+        manifest = CrawlManifest(os.path.join(out_dir, "manifest.json"))
+        downloader = PooledDownloader(manifest)
+
+        result = downloader.fetch(url, target)
+        assert result.status == "downloaded", result
+        assert read(target) == FixtureHandler.content
+
+        result = downloader.fetch(url, target)
+        assert result.status == "unchanged", result
+        assert FixtureHandler.requests_seen[-1].get("If-None-Match"), "conditional GET expected"
+
+        FixtureHandler.content = make_pdf("v2")
+        FixtureHandler.modified += 60
+        result = downloader.fetch(url, target)
+        assert result.status == "downloaded", result
+        assert read(target) == FixtureHandler.content
+        assert manifest.get(url)["sha256"] == hashlib.sha256(FixtureHandler.content).hexdigest()
+
+        # Interrupted download: half of v3 sits in .part with the server's ETag
+        FixtureHandler.content = make_pdf("v3")
+        half = len(FixtureHandler.content) // 2
+        with open(f"{target}.part", "wb") as f:
+            f.write(FixtureHandler.content[:half])
+        etag = '"%s"' % hashlib.sha256(FixtureHandler.content).hexdigest()[:16]
+        manifest.update(url, part_etag=etag)
+        result = downloader.fetch(url, target)
+        assert result.status == "resumed", result
+        assert FixtureHandler.requests_seen[-1].get("Range") == f"bytes={half}-"
+        assert read(target) == FixtureHandler.content
+        assert not os.path.exists(f"{target}.part")
+
+        # A stale .part (server content changed since) is discarded, not appended to
+        with open(f"{target}.part", "wb") as f:
+            f.write(b"stale")
+        manifest.update(url, part_etag='"outdated"')
+        FixtureHandler.content = make_pdf("v4")
+        result = downloader.fetch(url, target)
+        assert result.status == "downloaded", result
+        assert read(target) == FixtureHandler.content
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("downloader checks passed")
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from apps.backend.crawler.config import (
+    EXTRACT_CACHE_DIR,
+    EXTRACT_PAGES_PER_TASK,
+    EXTRACT_WORKERS,
+)
+from apps.backend.crawler.utils.pdf_extractor import PDFExtractor
+
+# Bump when PDFExtractor output changes so stale cache entries are ignored.
+EXTRACTOR_VERSION = 1
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Extracted text keyed by PDF SHA-256, one JSON file per document.
+    Unchanged PDFs are served from here without opening pdfplumber.
+    """
+
+    def __init__(self, cache_dir: str = EXTRACT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        path = self._path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if entry.get("extractor_version") != EXTRACTOR_VERSION:
+            return None
+        return entry.get("result")
+
+    def put(self, digest: str, result: Dict[str, Any]) -> None:
+        path = self._path(digest)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"extractor_version": EXTRACTOR_VERSION, "result": result},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+
+
+def _extract_range(file_path: str, start: int, end: int) -> List[str]:
+    # Top-level so it can be pickled into worker processes.
+    return PDFExtractor.extract_page_range(file_path, start, end)
+
+
+class _PendingDocument:
+    def __init__(self, digest: str, file_size: int, page_count: int, parts: int):
+        self.digest = digest
+        self.file_size = file_size
+        self.page_count = page_count
+        self.remaining = parts
+        self.texts: Dict[int, List[str]] = {}
+        self.error: Optional[BaseException] = None
+
+    def result(self) -> Dict[str, Any]:
+        if self.error is not None:
+            return PDFExtractor.build_error(self.file_size, self.error)
+        page_texts = [text for start in sorted(self.texts) for text in self.texts[start]]
+        return PDFExtractor.build_result(self.file_size, self.page_count, page_texts)
+
+
+class ParallelPDFExtractor:
+    """
+    Process-pool PDF extraction stage.
+
+    - Cache hits (same SHA-256) are yielded immediately.
+    - Remaining PDFs are split into page ranges of `pages_per_task` pages and
+      fanned out across `max_workers` processes.
+    - Each document is yielded as soon as all of its ranges finish, so callers
+      can write results while the rest of the corpus is still extracting.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = EXTRACT_WORKERS,
+        pages_per_task: int = EXTRACT_PAGES_PER_TASK,
+        cache: Optional[ExtractionCache] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.cache = cache if cache is not None else ExtractionCache()
+
+    def extract_many(
+        self, file_paths: Iterable[str]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        to_extract: List[Tuple[str, str, int]] = []
+        for file_path in dict.fromkeys(file_paths):
+            if not os.path.exists(file_path):
+                continue
+            file_size = os.path.getsize(file_path)
+            digest = file_sha256(file_path)
+            cached = self.cache.get(digest)
+            if cached is not None:
+                yield file_path, cached
+                continue
+            to_extract.append((file_path, digest, file_size))
+
+        if not to_extract:
+            return
+
+        pending: Dict[str, _PendingDocument] = {}
+        futures: Dict[Future, Tuple[str, int]] = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for file_path, digest, file_size in to_extract:
+                try:
+                    page_count = PDFExtractor.page_count(file_path)
+                except Exception as e:
+                    print(f"Error extracting text from {file_path}: {e}")
+                    yield file_path, PDFExtractor.build_error(file_size, e)
+                    continue
+
+                ranges = [
+                    (start, min(start + self.pages_per_task, page_count))
+                    for start in range(0, page_count, self.pages_per_task)
+                ] or [(0, 0)]
+                pending[file_path] = _PendingDocument(
+                    digest, file_size, page_count, len(ranges)
+                )
+                for start, end in ranges:
+                    future = executor.submit(_extract_range, file_path, start, end)
+                    futures[future] = (file_path, start)
+
+            for future in as_completed(futures):
+                file_path, start = futures[future]
+                doc = pending[file_path]
+                try:
+                    doc.texts[start] = future.result()
+                except Exception as e:
+                    doc.error = doc.error or e
+                doc.remaining -= 1
+                if doc.remaining:
+                    continue
+
+                del pending[file_path]
+                result = doc.result()
+                if doc.error is None:
+                    self.cache.put(doc.digest, result)
+                else:
+                    print(f"Error extracting text from {file_path}: {doc.error}")
+                yield file_path, result
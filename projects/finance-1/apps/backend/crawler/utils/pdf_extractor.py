@@ -1,7 +1,7 @@
 import pdfplumber
 import os
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 class PDFExtractor:
@@ -14,35 +14,57 @@ class PDFExtractor:
             raise FileNotFoundError(f"PDF file not found: {file_path}")
 
         file_size = os.path.getsize(file_path)
-        text_content = []
-        page_count = 0
 
         try:
-            with pdfplumber.open(file_path) as pdf:
-                page_count = len(pdf.pages)
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_content.append(text)
-
-            full_text = "\n".join(text_content)
-            normalized_text = PDFExtractor._normalize_text(full_text)
-
-            return {
-                "file_size_bytes": file_size,
-                "page_count": page_count,
-                "text": normalized_text,
-                "ocr_required": False,  # Placeholder logic
-            }
+            page_count = PDFExtractor.page_count(file_path)
+            page_texts = PDFExtractor.extract_page_range(file_path, 0, page_count)
+            return PDFExtractor.build_result(file_size, page_count, page_texts)
 
         except Exception as e:
             print(f"Error extracting text from {file_path}: {e}")
-            return {
-                "file_size_bytes": file_size,
-                "page_count": 0,
-                "text": "",
-                "error": str(e),
-            }
+            return PDFExtractor.build_error(file_size, e)
+
+    @staticmethod
+    def page_count(file_path: str) -> int:
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+
+    @staticmethod
+    def extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+        """
+        Extract raw text for pages [start, end). Empty pages are skipped,
+        matching what `extract` concatenates.
+        """
+        text_content = []
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages[start:end]:
+                text = page.extract_text()
+                if text:
+                    text_content.append(text)
+        return text_content
+
+    @staticmethod
+    def build_result(
+        file_size: int, page_count: int, page_texts: List[str]
+    ) -> Dict[str, Any]:
+        full_text = "\n".join(page_texts)
+        normalized_text = PDFExtractor._normalize_text(full_text)
+
+        return {
+            "file_size_bytes": file_size,
+            "page_count": page_count,
+            "text": normalized_text,
+            "ocr_required": False,  # Placeholder logic
+        }
+
+    @staticmethod
+    def build_error(file_size: int, error: Optional[BaseException]) -> Dict[str, Any]:
+        return {
+            "file_size_bytes": file_size,
+            "page_count": 0,
+            "text": "",
+            "error": str(error),
+        }
 
     @staticmethod
     def _normalize_text(text: str) -> str:
@@ -0,0 +1,309 @@
+"""
+SmartPick API load test against local LLM/embedding stand-ins.
+
+Builds a synthetic NumPy index, starts the stub Upstage server
+(apps.backend.loadtest.stubs) and the FastAPI app as subprocesses on free
+ports, then replays multi-turn scenarios over POST /agent/chat/stream with
+many thread ids concurrently. Reports throughput, turn latency
+(p50/p95/p99), per-node latency (time between consecutive "node" events)
+and error rates, plus the stub call counters, the backend cache stats and
+the server-side /metrics snapshot.
+
+Nothing leaves the machine: UPSTAGE_API_BASE / UPSTAGE_EMBEDDING_URL point
+the backend at the stubs, so the numbers measure the backend itself (graph,
+checkpointer, retrieval, caches) with the configured model latency added.
+
+Usage (from the finance-1 root):
+    uv run python -m apps.backend.loadtest.run
+    uv run python -m apps.backend.loadtest.run --users 32 --sessions 200 --chat-latency-ms 1500
+    uv run python -m apps.backend.loadtest.run --no-fast-path --json-out loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from apps.backend.chunker.numpy_index import build_synthetic
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# 각 시나리오 = 한 thread_id에서 순서대로 보내는 유저 메시지
+SCENARIOS: List[List[str]] = [
+    [
+        "나 스타벅스랑 편의점 자주 가는데 카드 좀 추천해줘",
+        "아, 돈은 한 달에 30만원 정도 써.",
+        "첫 번째 카드 연회비 얼마야?",
+    ],
+    [
+        "교통에 10만원 식비 30만원 쇼핑 20만원 쓰는 것 같아. 카드를 추천해줘!",
+        "전월 실적 조건은 어떻게 돼?",
+        "교통비도 추가해줘",
+    ],
+    [
+        "해외여행 자주 가고 면세점도 이용해. 한 달에 150만원 정도 써",
+        "두 번째 카드는 공항 라운지 돼?",
+    ],
+    [
+        "아무 카드나 추천 좀",
+        "한 달에 60만원, 커피랑 교통",
+        "커피는 빼고 쇼핑만 봐줘",
+        "그 카드 포인트 적립률은?",
+    ],
+    [
+        "배달의민족 요기요 주로 써 한달 45만원",
+        "예산은 50만원으로 늘릴게",
+    ],
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(_percentile(values, 50), 1),
+        "p95": round(_percentile(values, 95), 1),
+        "p99": round(_percentile(values, 99), 1),
+        "mean": round(statistics.mean(values), 1) if values else 0.0,
+    }
+
+
+def _start_server(app_path: str, port: int, env: Dict[str, str], cwd: Path, log_path: Path) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, log_path: Path, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise SystemExit(f"{url} exited early:\n{log_path.read_text()[-2000:]}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"{url} not ready after {timeout:.0f}s")
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.turns: List[float] = []
+        self.first_event: List[float] = []
+        self.nodes: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.sessions = 0
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        total = len(self.turns) + sum(self.errors.values())
+        return {
+            "sessions": self.sessions,
+            "turns": total,
+            "ok_turns": len(self.turns),
+            "elapsed_s": round(elapsed, 2),
+            "throughput_turns_per_s": round(len(self.turns) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0.0,
+            "errors": dict(self.errors),
+            "turn_ms": _summary(self.turns),
+            "first_event_ms": _summary(self.first_event),
+            "node_ms": {node: _summary(values) for node, values in sorted(self.nodes.items())},
+        }
+
+
+async def _turn(client: httpx.AsyncClient, recorder: Recorder, thread_id: str, message: str) -> bool:
+    start = time.perf_counter()
+    last = start
+    first_seen = False
+    final = False
+    try:
+        async with client.stream(
+            "POST", "/agent/chat/stream", json={"message": message, "thread_id": thread_id}
+        ) as response:
+            if response.status_code != 200:
+                recorder.errors[f"http_{response.status_code}"] += 1
+                return False
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                now = time.perf_counter()
+                if not first_seen and event["type"] != "start":
+                    recorder.first_event.append((now - start) * 1000)
+                    first_seen = True
+                if event["type"] == "node":
+                    recorder.nodes[event["node"]].append((now - last) * 1000)
+                    last = now
+                elif event["type"] == "error":
+                    recorder.errors["graph_error"] += 1
+                    return False
+                elif event["type"] == "final":
+                    final = True
+    except (httpx.HTTPError, json.JSONDecodeError) as exc:
+        recorder.errors[type(exc).__name__] += 1
+        return False
+    if not final:
+        recorder.errors["no_final"] += 1
+        return False
+    recorder.turns.append((time.perf_counter() - start) * 1000)
+    return True
+
+
+async def _user(queue: "asyncio.Queue[List[str]]", client: httpx.AsyncClient, recorder: Recorder) -> None:
+    while True:
+        try:
+            scenario = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        thread_id = uuid.uuid4().hex
+        for message in scenario:
+            if not await _turn(client, recorder, thread_id, message):
+                break
+        recorder.sessions += 1
+
+
+async def replay(base_url: str, users: int, sessions: int, seed: int, timeout: float) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    queue: "asyncio.Queue[List[str]]" = asyncio.Queue()
+    for _ in range(sessions):
+        queue.put_nowait(rng.choice(SCENARIOS))
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(_user(queue, client, recorder) for _ in range(users)))
+        elapsed = time.perf_counter() - start
+        report = recorder.report(elapsed)
+        report["search_cache"] = (await client.get("/agent/search-cache")).json()
+        report["server_metrics"] = (await client.get("/metrics", params={"format": "json"})).json()
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    turn = report["turn_ms"]
+    print(
+        f"\nsessions {report['sessions']} | turns {report['ok_turns']}/{report['turns']} ok | "
+        f"{report['elapsed_s']} s | {report['throughput_turns_per_s']} turns/s | "
+        f"error rate {100 * report['error_rate']:.1f}% {report['errors'] or ''}"
+    )
+    print(f"turn latency ms:        p50 {turn['p50']:>8} | p95 {turn['p95']:>8} | p99 {turn['p99']:>8}")
+    first = report["first_event_ms"]
+    print(f"first event ms:         p50 {first['p50']:>8} | p95 {first['p95']:>8} | p99 {first['p99']:>8}")
+    print("per-node latency ms:")
+    for node, stats in report["node_ms"].items():
+        print(f"  {node:<22}n={stats['count']:<5} p50 {stats['p50']:>8} | p95 {stats['p95']:>8} | p99 {stats['p99']:>8}")
+    print(f"stub calls: {report['stub_stats']}")
+    tokens: Dict[str, float] = defaultdict(float)
+    for series in report["server_metrics"]["counters"].get("smartpick_llm_tokens_total", []):
+        tokens[series["labels"]["kind"]] += series["value"]
+    print(f"server LLM tokens: {dict(tokens)} (GET /metrics)")
+    print(f"search cache: {report['search_cache']}")
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="smartpick-loadtest-"))
+    cache_dir = workdir / "datasets" / "embeddings_cache"
+    if not (cache_dir / "numpy_index").exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        build_synthetic(cache_dir, args.scale, args.dim, args.seed)
+
+    stub_port, api_port = _free_port(), _free_port()
+    base_env = {**os.environ, "PYTHONPATH": str(ROOT), "LANGSMITH_TRACING": "false"}
+    stub_env = {
+        **base_env,
+        "STUB_CHAT_LATENCY_MS": str(args.chat_latency_ms),
+        "STUB_EMBED_LATENCY_MS": str(args.embed_latency_ms),
+        "STUB_EMBED_DIM": str(args.dim),
+    }
+    api_env = {
+        **base_env,
+        "UPSTAGE_API_KEY": "stub",
+        "UPSTAGE_API_BASE": f"http://127.0.0.1:{stub_port}/v1/solar",
+        "UPSTAGE_EMBEDDING_URL": f"http://127.0.0.1:{stub_port}/v1/embeddings",
+        "VECTOR_DB": "numpy",
+        "AGENT_CHECKPOINT_DB": str(workdir / "checkpoints.sqlite"),
+        "AGENT_FAST_PATH": "1" if args.fast_path else "0",
+        "BENEFIT_DIGEST_DIR": str(ROOT / "datasets" / "digests"),
+    }
+
+    stub = _start_server("apps.backend.loadtest.stubs:app", stub_port, stub_env, ROOT, workdir / "stub.log")
+    api = _start_server("apps.backend.main:app", api_port, api_env, workdir, workdir / "api.log")
+    try:
+        await _wait_ready(f"http://127.0.0.1:{stub_port}/stats", stub, workdir / "stub.log")
+        await _wait_ready(f"http://127.0.0.1:{api_port}/health", api, workdir / "api.log")
+        print(
+            f"users {args.users} | sessions {args.sessions} | chat {args.chat_latency_ms} ms | "
+            f"embed {args.embed_latency_ms} ms | fast path {'on' if args.fast_path else 'off'} | {workdir}"
+        )
+        report = await replay(f"http://127.0.0.1:{api_port}", args.users, args.sessions, args.seed, args.timeout)
+        async with httpx.AsyncClient() as client:
+            report["stub_stats"] = (await client.get(f"http://127.0.0.1:{stub_port}/stats")).json()
+        report["config"] = {key: value for key, value in vars(args).items() if key != "json_out"}
+        return report
+    finally:
+        for proc in (api, stub):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SmartPick API load test with stub LLM/embedding servers")
+    parser.add_argument("--users", type=int, default=16, help="동시에 대화하는 가상 유저 수")
+    parser.add_argument("--sessions", type=int, default=64, help="재생할 대화(thread) 수")
+    parser.add_argument("--chat-latency-ms", type=float, default=800.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=80.0)
+    parser.add_argument("--scale", type=int, default=2, help="synthetic 인덱스 복제 배수")
+    parser.add_argument("--dim", type=int, default=4096, help="임베딩 차원")
+    parser.add_argument("--no-fast-path", dest="fast_path", action="store_false", help="AGENT_FAST_PATH=0")
+    parser.add_argument("--timeout", type=float, default=120.0, help="턴 하나의 HTTP timeout (s)")
+    parser.add_argument("--workdir", help="인덱스/체크포인트/로그 경로 (기본: 임시 디렉터리, 재사용 가능)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json-out", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    _print_report(report)
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"saved {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
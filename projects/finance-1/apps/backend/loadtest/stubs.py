@@ -0,0 +1,224 @@
+"""
+Local stand-ins for the Upstage chat and embedding APIs.
+
+Serves the two endpoints the backend calls, with configurable latency and
+deterministic outputs so load-test runs are repeatable and cost nothing:
+
+- POST /v1/solar/chat/completions  (OpenAI-compatible, used by ChatUpstage)
+    * structured output (tools) -> IntentAnalysis arguments derived from the
+      last user message with the rule-based extractor
+    * benefit summarization     -> JSON bullets for every card in the prompt
+    * anything else (QA)        -> fixed answer text
+    * stream=true is answered with SSE chunks
+- POST /v1/embeddings -> unit vectors seeded by the SHA-256 of each text
+- GET  /stats         -> call counters
+
+Settings (env):
+    STUB_CHAT_LATENCY_MS   (default 800)   time to first token / full reply
+    STUB_EMBED_LATENCY_MS  (default 80)    per embeddings request
+    STUB_JITTER            (default 0.2)   +/- fraction applied to latencies
+    STUB_EMBED_DIM         (default 4096)
+
+    uv run uvicorn apps.backend.loadtest.stubs:app --port 9100
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from apps.backend.agent.categories import CATEGORY_MAP
+from apps.backend.agent.fast_extract import QUESTION_PATTERN, FastPathExtractor
+
+CHAT_LATENCY_MS = float(os.getenv("STUB_CHAT_LATENCY_MS", "800"))
+EMBED_LATENCY_MS = float(os.getenv("STUB_EMBED_LATENCY_MS", "80"))
+JITTER = float(os.getenv("STUB_JITTER", "0.2"))
+EMBED_DIM = int(os.getenv("STUB_EMBED_DIM", "4096"))
+
+BENEFIT_MARKER = "혜택 발췌:"
+QA_ANSWER = "해당 카드는 전월 이용실적 30만원 이상 시 커피 10% 할인이 제공되며, 월 할인 한도는 1만원입니다."
+
+app = FastAPI(title="Upstage API stub")
+extractor = FastPathExtractor(CATEGORY_MAP)
+rng = random.Random(0)
+stats: Dict[str, int] = {"chat": 0, "chat_stream": 0, "structured": 0, "embeddings": 0, "embedded_texts": 0}
+
+
+async def _sleep(latency_ms: float) -> None:
+    if latency_ms <= 0:
+        return
+    factor = 1 + rng.uniform(-JITTER, JITTER)
+    await asyncio.sleep(latency_ms * factor / 1000)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _intent_arguments(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    user_messages = [_message_text(m) for m in messages if m.get("role") == "user"]
+    last = user_messages[-1] if user_messages else ""
+    extracted = extractor.extract(last)
+    if extracted is not None:
+        return extracted
+    is_question = last.strip().endswith("?") or bool(QUESTION_PATTERN.search(last))
+    return {
+        "search_query": last or "카드 추천",
+        "budget": None,
+        "categories": [],
+        "intent_type": "qa_on_results" if is_question else "new_search",
+        "is_sufficient": is_question,
+        "missing_info": None if is_question else "both",
+        "is_relevant": True,
+    }
+
+
+def _benefit_bullets(prompt: str) -> Optional[str]:
+    start = prompt.find(BENEFIT_MARKER)
+    if start < 0:
+        return None
+    brace = prompt.find("{", start)
+    try:
+        cards, _ = json.JSONDecoder().raw_decode(prompt[brace:])
+    except (ValueError, json.JSONDecodeError):
+        return None
+    return json.dumps(
+        {name: "- 관심 분야 5% 할인\n- 전월 실적 30만원 이상 시 제공" for name in cards},
+        ensure_ascii=False,
+    )
+
+
+def _completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    """요청 종류에 맞는 assistant 메시지 (content 또는 tool_calls)"""
+    messages = body.get("messages") or []
+    tools = body.get("tools") or []
+    if tools:
+        stats["structured"] += 1
+        name = tools[0].get("function", {}).get("name", "IntentAnalysis")
+        arguments = json.dumps(_intent_arguments(messages), ensure_ascii=False)
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": arguments},
+                }
+            ],
+        }
+    prompt = "\n".join(_message_text(m) for m in messages if m.get("role") == "system")
+    content = _benefit_bullets(prompt) or QA_ANSWER
+    return {"role": "assistant", "content": content}
+
+
+def _usage(body: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, int]:
+    prompt_chars = sum(len(_message_text(m)) for m in body.get("messages") or [])
+    output = message.get("content") or json.dumps(message.get("tool_calls"), ensure_ascii=False)
+    prompt_tokens, completion_tokens = prompt_chars // 2, len(output) // 2
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _stream_chunks(body: Dict[str, Any], message: Dict[str, Any], completion_id: str):
+    base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model", "stub")}
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+        payload = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+    async def generate():
+        await _sleep(CHAT_LATENCY_MS)
+        if message.get("tool_calls"):
+            call = message["tool_calls"][0]
+            yield chunk({"role": "assistant", "tool_calls": [{"index": 0, **call}]})
+            yield chunk({}, "tool_calls")
+        else:
+            content = message["content"]
+            step = max(1, len(content) // 8)
+            yield chunk({"role": "assistant", "content": ""})
+            for start in range(0, len(content), step):
+                yield chunk({"content": content[start : start + step]})
+            yield chunk({}, "stop")
+        usage = {**base, "choices": [], "usage": _usage(body, message)}
+        yield f"data: {json.dumps(usage, ensure_ascii=False)}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+    return generate()
+
+
+@app.post("/v1/solar/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    message = _completion(body)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+
+    if body.get("stream"):
+        stats["chat_stream"] += 1
+        return StreamingResponse(
+            _stream_chunks(body, message, completion_id), media_type="text/event-stream"
+        )
+
+    stats["chat"] += 1
+    await _sleep(CHAT_LATENCY_MS)
+    return JSONResponse(
+        {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                }
+            ],
+            "usage": _usage(body, message),
+        }
+    )
+
+
+def embed(text: str, dim: int = EMBED_DIM) -> List[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.tolist()
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    texts = body.get("input") or []
+    if isinstance(texts, str):
+        texts = [texts]
+    stats["embeddings"] += 1
+    stats["embedded_texts"] += len(texts)
+    await _sleep(EMBED_LATENCY_MS)
+    return {
+        "object": "list",
+        "model": body.get("model", "stub"),
+        "data": [{"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(texts)],
+        "usage": {"prompt_tokens": sum(len(t) for t in texts) // 2, "total_tokens": sum(len(t) for t in texts) // 2},
+    }
+
+
+@app.get("/stats")
+def get_stats() -> Dict[str, int]:
+    return dict(stats)
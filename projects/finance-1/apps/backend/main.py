@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import json
 import os
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from apps.backend.api.routes.agent import router as agent_router
+from apps.backend.core.metrics import metrics
 
 
 def get_cors_origins() -> list[str]:
@@ -30,6 +32,19 @@ def create_app() -> FastAPI:
     def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/metrics")
+    def get_metrics(format: str = "prometheus") -> Response:
+        """노드/임베딩/검색/LLM 호출 수·지연 히스토그램·토큰·캐시 hit (Prometheus 텍스트 또는 JSON)"""
+        if format == "json":
+            return Response(
+                content=json.dumps(metrics.snapshot(), ensure_ascii=False),
+                media_type="application/json",
+            )
+        return Response(
+            content=metrics.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
     app.include_router(agent_router)
     return app
 
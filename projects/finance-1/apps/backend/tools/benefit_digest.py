@@ -0,0 +1,132 @@
+"""
+카드 혜택 요약 프롬프트용 digest 조회 + 불릿 캐시
+
+역할:
+- 수집 단계에서 만든 카드별·카테고리별 digest(datasets/digests/*.json)를 읽어
+  유저 관심 카테고리에 해당하는 혜택 문장만 반환
+- digest 파일이 없는 카드는 formatter 결과(detailed_benefits)로 즉석에서 digest 생성
+- LLM이 만든 불릿 텍스트를 (카드명, 카테고리, digest 버전) 단위로 캐시 (LRU)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from apps.backend.chunker.digest import digest_path, digest_texts
+
+DIGEST_DIR = os.getenv("BENEFIT_DIGEST_DIR", "datasets/digests")
+BULLET_CACHE_SIZE = int(os.getenv("BENEFIT_BULLET_CACHE_SIZE", "512"))
+
+
+class DigestStore:
+    """카드별 digest 파일 로더 (파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, digest_directory: str = DIGEST_DIR):
+        self.digest_directory = Path(digest_directory)
+        self._cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, card_name: str) -> Optional[Dict[str, Any]]:
+        path = digest_path(self.digest_directory, card_name)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._cache.get(card_name)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        try:
+            digest = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        with self._lock:
+            self._cache[card_name] = (mtime, digest)
+        return digest
+
+    def for_card(self, card_info: Dict[str, Any]) -> Dict[str, Any]:
+        """digest 파일이 없으면 detailed_benefits로 같은 형태의 digest를 만듭니다."""
+        digest = self.get(card_info.get("card_name", ""))
+        if digest is not None:
+            return digest
+        texts = [
+            f"{benefit.get('content', '')} {benefit.get('conditions', '')}"
+            for benefit in card_info.get("detailed_benefits") or []
+        ]
+        content_hash = hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+        return {"content_hash": content_hash, **digest_texts(texts)}
+
+
+def select_digest(
+    digest: Dict[str, Any], card_info: Dict[str, Any], categories: Iterable[str]
+) -> Dict[str, Any]:
+    """프롬프트에 넣을 카드 1장 분량: 기본 정보 + 관심 카테고리 혜택 + 공통 조건"""
+    by_category = digest.get("categories") or {}
+    selected = {category: by_category[category] for category in categories if by_category.get(category)}
+    if not selected:
+        # 관심 카테고리 혜택이 없으면 가장 많이 언급된 카테고리 1개로 대체
+        fallback = max(by_category.items(), key=lambda item: len(item[1]), default=None)
+        if fallback:
+            selected = {fallback[0]: fallback[1]}
+    return {
+        "card_company": card_info.get("card_company"),
+        "annual_fee": card_info.get("annual_fee"),
+        "min_performance": card_info.get("min_performance"),
+        "benefits_summary": card_info.get("benefits_summary"),
+        "benefits": selected,
+        "conditions": digest.get("conditions") or [],
+    }
+
+
+class BulletCache:
+    """LLM이 만든 카드별 맞춤 혜택 불릿 캐시"""
+
+    def __init__(self, max_entries: int = BULLET_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...], Any], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(card_name: str, categories: Iterable[str], version: Any) -> Tuple[str, Tuple[str, ...], Any]:
+        return card_name, tuple(sorted(set(categories))), version
+
+    def get(self, key: Tuple[str, Tuple[str, ...], Any]) -> Optional[str]:
+        with self._lock:
+            bullets = self._entries.get(key)
+            if bullets is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return bullets
+
+    def put(self, key: Tuple[str, Tuple[str, ...], Any], bullets: str) -> None:
+        with self._lock:
+            self._entries[key] = bullets
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+digest_store = DigestStore()
+bullet_cache = BulletCache()
@@ -3,12 +3,27 @@ RAG 검색 메인 컨트롤러
 전체 흐름: retriever → scorer → ranker → formatter
 """
 
+import time
+from functools import lru_cache
+
 from langchain_core.tools import tool
 
+from apps.backend.core.metrics import instrument, metrics
 from apps.backend.tools.retriever import CardRetriever
 from apps.backend.tools.scorer import CardScorer
 from apps.backend.tools.ranker import CardRanker
 from apps.backend.tools.formatter import CardFormatter
+from apps.backend.tools.result_cache import SemanticResultCache
+
+
+# 비슷한 질의(카테고리·예산 구간이 같고 임베딩이 가까운 질의)는 캐시된 카드 목록을 재사용
+result_cache = SemanticResultCache()
+
+
+@lru_cache(maxsize=1)
+def _get_components():
+    """벡터 DB 클라이언트 등은 요청마다 새로 만들지 않고 프로세스당 1회만 생성"""
+    return CardRetriever(), CardScorer(), CardRanker(), CardFormatter()
 
 
 # tool 요청 스키마 산야님 개발 항목에 해당 내용 있으면 CardSearchInput 제거 후 class 연결
@@ -50,18 +65,35 @@ class CardSearchInput(BaseModel):
         return [kw.strip().lower() for kw in v if kw.strip()]
 
 
+def _build_sub_queries(query: str, keywords: List[str]) -> tuple[list[str], list[list[str]]]:
+    """
+    전체 질의 1개 + 카테고리별 서브 쿼리(해당 카테고리만 필터링)를 만듭니다.
+    카테고리가 1개면 서브 쿼리가 전체 질의와 같으므로 전체 질의만 사용합니다.
+    """
+    queries = [query]
+    category_filters = [keywords]
+    if len(keywords) > 1:
+        for keyword in keywords:
+            queries.append(f"{query} ({keyword})")
+            category_filters.append([keyword])
+    return queries, category_filters
+
+
 # tool 함수 (워크플로우 7단계)
 @tool("card_rag_search", args_schema=CardSearchInput)
+@instrument("smartpick_tool_latency_ms", tool="card_rag_search")
 def card_rag_search(query: str, budget_filter: int, keywords: list) -> list[dict]:
     """
     사용자 소비패턴과 예산에 맞는 카드를 RAG에서 검색 후 사용자 소비 패턴에 맞는 카드 목록을 반환하는 도구 함수
 
     흐름:
-    1. retriever: budget과 keywords로 필터링 후 query로 유사도 검색
-    2. scorer: 검색 결과에서 동일 card_name 등장 횟수로 점수 계산
-    3. ranker: 점수 기준 내림차순 정렬
+    1. retriever: 전체 질의 + 카테고리별 서브 쿼리를 한 번에 임베딩/검색
+       (budget과 각 서브 쿼리의 keywords로 필터링)
+    2. scorer: 청크 distance/순위를 카드 단위로 집계 (기본 RRF)
+    3. ranker: 점수 기준 내림차순 정렬 후 상위 N개
     4. retriever: 상위 카드들의 전체 혜택 재검색
     5. formatter: 최종 출력 형태로 정리
+    (같은 카테고리·예산 구간의 비슷한 질의는 result_cache에서 바로 반환)
     
     Args:
         query: 사용자의 카드 혜택 관련 질문
@@ -72,28 +104,44 @@ def card_rag_search(query: str, budget_filter: int, keywords: list) -> list[dict
         List[dict]: 추천 카드 정보 리스트
     """
 
-    # Step 1: 컴포넌트 초기화
-    retriever = CardRetriever()
-    scorer = CardScorer()
-    ranker = CardRanker()
-    formatter = CardFormatter()
-    
-    # Step 2: 필터링 + 유사도 검색
-    # budget으로 min_performance 필터링, keywords로 major_categories 필터링
+    # Step 1: 컴포넌트 준비 + 서브 쿼리 임베딩 (API 1회 호출)
+    retriever, scorer, ranker, formatter = _get_components()
+    sub_queries, category_filters = _build_sub_queries(query, keywords)
+    query_vectors = retriever.embed_queries(sub_queries)
+    if not query_vectors:
+        return []
+    query_vector = query_vectors[0]
+
+    # 캐시 확인: 인덱스가 재적재되었으면 lookup에서 전체 무효화
+    index_version = retriever.index_version()
+    cached = result_cache.lookup(keywords, budget_filter, query_vector, index_version)
+    metrics.inc(
+        "smartpick_cache_requests_total",
+        cache="search_result",
+        result="miss" if cached is None else "hit",
+    )
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
+
+    # Step 2: 필터링 + 유사도 검색 (벡터 DB 1회 호출)
+    # budget으로 min_performance 필터링, 서브 쿼리별 keywords로 major_categories 필터링
     # query로 content 유사도 검색
-    search_results = retriever.search(
-        query=query,
+    per_query_results = retriever.search_by_vectors(
+        query_vectors,
         budget_filter=budget_filter,
-        category_filter=keywords,
+        category_filters=category_filters,
     )
+    search_results = [result for results in per_query_results for result in results]
     
     if not search_results:
         return []
     
-    # Step 3: 점수 계산 (동일 card_name 등장 횟수)
+    # Step 3: 점수 계산 (서브 쿼리별 순위/distance를 카드 단위로 집계)
     card_scores = scorer.calculate_scores(search_results)
     
-    # Step 4: 점수 기준 정렬
+    # Step 4: 점수 기준 정렬 (상위 N개)
     ranked_cards = ranker.rank(card_scores)
     
     # Step 5: 상위 카드들의 전체 혜택 검색
@@ -102,6 +150,15 @@ def card_rag_search(query: str, budget_filter: int, keywords: list) -> list[dict
     
     # Step 6: 최종 출력 형태로 정리
     formatted_results = formatter.format(full_card_data)
+
+    result_cache.store(
+        keywords,
+        budget_filter,
+        query_vector,
+        formatted_results,
+        cost_ms=(time.perf_counter() - started) * 1000,
+        index_version=index_version,
+    )
     
     return formatted_results
 
@@ -117,4 +174,5 @@ if __name__ == "__main__":
     
     import json
     print(json.dumps(result, ensure_ascii=False, indent=2))
+    print("캐시 통계:", result_cache.stats())
 
@@ -1,44 +1,64 @@
-
 """
 카드 순위 결정
 
 역할:
 - scorer에서 계산된 점수를 기준으로 내림차순 정렬
+- 상위 top_n개만 반환 (RAG_TOP_CARDS 환경 변수, 기본 5)
 """
 
+import os
+from typing import List, Dict, Any, Optional
+
+import numpy as np
 
-from typing import List, Dict, Any
+
+TOP_CARDS = int(os.getenv("RAG_TOP_CARDS", "5"))
 
 
 class CardRanker:
     """카드 순위 결정기"""
-    
+
+    def __init__(self, top_n: Optional[int] = TOP_CARDS):
+        self.top_n = top_n
+
     def rank(
         self,
-        card_scores: List[Dict[str, Any]]
+        card_scores: List[Dict[str, Any]],
+        top_n: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         점수 기준 내림차순 정렬
         
         Args:
             card_scores: scorer에서 반환된 카드별 점수 리스트
-                [{"card_name": str, "score": int}, ...]
+                [{"card_name": str, "score": float}, ...]
+            top_n: 반환할 카드 수 (None이면 생성자의 top_n, 그것도 None이면 전체)
         
         Returns:
-            점수 내림차순으로 정렬된 카드 리스트
+            점수 내림차순으로 정렬된 상위 카드 리스트
         """
         if not card_scores:
             return []
-        
-        # 점수 기준 내림차순 정렬
-        # 점수가 같으면 card_name 알파벳순 (일관성 유지)
-        sorted_cards = sorted(
-            card_scores,
-            key=lambda x: (-x["score"], x["card_name"])
+
+        top_n = top_n if top_n is not None else self.top_n
+        if top_n is None or top_n > len(card_scores):
+            top_n = len(card_scores)
+
+        scores = np.fromiter(
+            (card["score"] for card in card_scores), dtype=np.float64, count=len(card_scores)
         )
-        
-        # 상위 N개만 반환
-        return sorted_cards
+        names = np.asarray([card["card_name"] for card in card_scores], dtype=str)
+
+        # 전체 정렬 대신 상위 top_n 후보만 골라서 정렬
+        candidates = np.arange(len(card_scores))
+        if top_n < len(card_scores):
+            threshold = np.partition(-scores, top_n - 1)[top_n - 1]
+            # 경계 점수와 같은 카드는 모두 후보에 넣어 이름순 tie-break가 유지되도록 함
+            candidates = np.flatnonzero(-scores <= threshold)
+
+        # 점수가 같으면 card_name 알파벳순 (일관성 유지)
+        order = candidates[np.lexsort((names[candidates], -scores[candidates]))][:top_n]
+        return [card_scores[i] for i in order]
 
 
 # 테스트용 실행
@@ -53,6 +73,8 @@ if __name__ == "__main__":
     
     ranker = CardRanker()
     ranked = ranker.rank(mock_scores)
+
+    print("상위 2개:", [card["card_name"] for card in ranker.rank(mock_scores, top_n=2)])
     
     print("정렬 결과:")
     for i, card in enumerate(ranked, 1):
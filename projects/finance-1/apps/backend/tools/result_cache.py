@@ -0,0 +1,180 @@
+"""
+card_rag_search 결과 캐시 (semantic cache)
+
+역할:
+- (정규화된 카테고리, 예산 구간)이 같고 쿼리 임베딩의 코사인 유사도가
+  threshold 이상인 이전 검색이 있으면, formatter까지 끝난 카드 리스트를 그대로 반환
+- TTL이 지난 항목과 max_entries를 넘는 오래된 항목은 제거 (LRU)
+- 벡터 인덱스가 다시 적재되면(index_version 변경) 전체 무효화
+- hit rate, 절약한 지연 시간(saved_ms) 통계 제공
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+SIMILARITY_THRESHOLD = float(os.getenv("RAG_CACHE_SIMILARITY", "0.95"))
+TTL_SECONDS = float(os.getenv("RAG_CACHE_TTL_SECONDS", "600"))
+MAX_ENTRIES = int(os.getenv("RAG_CACHE_MAX_ENTRIES", "256"))
+# 전월실적 조건이 보통 10만원 단위라서 같은 구간이면 필터 결과가 같다고 봅니다.
+BUDGET_BUCKET = int(os.getenv("RAG_CACHE_BUDGET_BUCKET", "100000"))
+
+
+@dataclass
+class _CacheEntry:
+    vector: np.ndarray
+    results: List[Dict[str, Any]]
+    cost_ms: float
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SemanticResultCache:
+    """카드 검색 결과 캐시"""
+
+    def __init__(
+        self,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+        ttl_seconds: float = TTL_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+        budget_bucket: int = BUDGET_BUCKET,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.budget_bucket = max(1, budget_bucket)
+        self._entries: "OrderedDict[Tuple[Tuple[str, ...], int, int], _CacheEntry]" = OrderedDict()
+        self._next_id = 0
+        self._index_version: Any = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def bucket_key(self, keywords: Iterable[str], budget: int) -> Tuple[Tuple[str, ...], int]:
+        categories = tuple(sorted({kw.strip().lower() for kw in keywords if kw.strip()}))
+        return categories, budget // self.budget_bucket
+
+    def _normalize(self, vector: Iterable[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+
+    def _sync_version(self, index_version: Any) -> None:
+        if index_version != self._index_version:
+            self._entries.clear()
+            self._index_version = index_version
+
+    def lookup(
+        self,
+        keywords: Iterable[str],
+        budget: int,
+        query_vector: Iterable[float],
+        index_version: Any = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """조건에 맞는 캐시 결과가 있으면 복사본을 반환, 없으면 None"""
+        started = time.perf_counter()
+        key = self.bucket_key(keywords, budget)
+        query = self._normalize(query_vector)
+        now = time.monotonic()
+
+        with self._lock:
+            self._sync_version(index_version)
+            best_id = None
+            best_similarity = self.similarity_threshold
+            for entry_id, entry in list(self._entries.items()):
+                if now - entry.created_at > self.ttl_seconds:
+                    del self._entries[entry_id]
+                    continue
+                if entry_id[:2] != key or entry.vector.shape != query.shape:
+                    continue
+                similarity = float(entry.vector @ query)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_id]
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            lookup_ms = (time.perf_counter() - started) * 1000
+            self.saved_ms += max(0.0, entry.cost_ms - lookup_ms)
+            return copy.deepcopy(entry.results)
+
+    def store(
+        self,
+        keywords: Iterable[str],
+        budget: int,
+        query_vector: Iterable[float],
+        results: List[Dict[str, Any]],
+        cost_ms: float,
+        index_version: Any = None,
+    ) -> None:
+        """
+        Args:
+            cost_ms: 이 결과를 계산하는 데 걸린 시간 (hit 시 saved_ms 계산용)
+        """
+        categories, bucket = self.bucket_key(keywords, budget)
+        entry = _CacheEntry(
+            vector=self._normalize(query_vector),
+            results=copy.deepcopy(results),
+            cost_ms=cost_ms,
+        )
+        with self._lock:
+            self._sync_version(index_version)
+            self._entries[(categories, bucket, self._next_id)] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "saved_ms": round(self.saved_ms, 1),
+            }
+
+
+# 테스트용 실행
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    cache = SemanticResultCache()
+
+    # 비슷한 의도의 쿼리 3개 묶음 (같은 기준 벡터 + 작은 노이즈)
+    intents = {
+        ("coffee",): rng.standard_normal(4096),
+        ("traffic",): rng.standard_normal(4096),
+        ("coffee", "shopping"): rng.standard_normal(4096),
+    }
+    mock_results = [{"card_name": "현대카드 X", "detailed_benefits": []}]
+
+    for turn in range(60):
+        keywords = list(list(intents)[turn % len(intents)])
+        base = intents[tuple(keywords)]
+        query_vector = base + rng.standard_normal(4096) * 0.05
+        budget = int(rng.choice([300000, 350000, 500000]))
+
+        if cache.lookup(keywords, budget, query_vector, index_version=1) is None:
+            cache.store(keywords, budget, query_vector, mock_results, cost_ms=850.0, index_version=1)
+
+    print("캐시 통계:", cache.stats())
+
+    # 인덱스 재적재 -> 무효화
+    cache.lookup(["coffee"], 300000, intents[("coffee",)], index_version=2)
+    print("재적재 후:", cache.stats())
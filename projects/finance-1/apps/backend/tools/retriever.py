@@ -6,6 +6,9 @@
 2. category_filter(keywords)로 major_categories 필터링 (Python 후처리)
 3. query를 임베딩하여 content와 유사도 검색
 4. card_name으로 전체 혜택 검색
+
+VECTOR_DB=numpy 이면 Chroma 대신 NumpyVectorStore(메모리 매핑 행렬 + 컬럼형 메타데이터)를
+사용하며, 예산/카테고리 필터를 mask로 먼저 적용한 뒤 top_k를 뽑습니다.
 """
 
 import os
@@ -15,7 +18,8 @@ from pathlib import Path
 from typing import List, Optional, Dict, Any
 
 from apps.backend.chunker.embedding_client import UpstageEmbeddingClient
-from apps.backend.chunker.vector_store import ChromaVectorStore
+from apps.backend.core.metrics import instrument
+from apps.backend.chunker.vector_store import ChromaVectorStore, NumpyVectorStore
 
 # UpstageEmbeddingClient = None
 # ChromaVectorStore = None
@@ -28,24 +32,51 @@ class CardRetriever:
         self,
         persist_directory: str = "datasets/embeddings_cache/chroma_db",
         collection_name: str = "card_disclosures",
+        backend: Optional[str] = None,
+        index_directory: str = "datasets/embeddings_cache/numpy_index",
     ):
         """
         Args:
             persist_directory: ChromaDB 저장 경로
             collection_name: 컬렉션 이름
+            backend: "chroma" | "numpy" (기본값: VECTOR_DB 환경 변수, 없으면 chroma)
+            index_directory: NumpyVectorStore 저장 경로
         """
         self.persist_directory = Path(persist_directory)
         self.collection_name = collection_name
+        self.backend = (backend or os.environ.get("VECTOR_DB", "chroma")).lower()
 
         # 임베딩 클라이언트 초기화
         api_key = os.environ.get("UPSTAGE_API_KEY", "")
         self.embedding_client = UpstageEmbeddingClient(api_key=api_key)
 
         # 벡터 스토어 초기화
-        self.vector_store = ChromaVectorStore(
-            persist_directory=self.persist_directory,
-            collection_name=self.collection_name,
-        )
+        if self.backend == "numpy":
+            self.vector_store = NumpyVectorStore(Path(index_directory))
+        else:
+            self.vector_store = ChromaVectorStore(
+                persist_directory=self.persist_directory,
+                collection_name=self.collection_name,
+            )
+
+    def embed_query(self, query: str) -> Optional[List[float]]:
+        """쿼리 임베딩 1개 생성 (실패 시 None)"""
+        query_embeddings = self.embedding_client.embed_texts([query])
+        return query_embeddings[0] if query_embeddings else None
+
+    def index_version(self) -> tuple:
+        """
+        벡터 인덱스 파일의 수정 시각. 재적재(upsert/delete)되면 값이 바뀌므로
+        결과 캐시 무효화 기준으로 사용합니다.
+        """
+        if self.backend == "numpy":
+            paths = [self.vector_store.index_directory / "records.json"]
+        else:
+            paths = [
+                self.persist_directory / "chroma.sqlite3",
+                self.persist_directory / "chroma.sqlite3-wal",
+            ]
+        return tuple(path.stat().st_mtime_ns if path.exists() else 0 for path in paths)
 
     def _parse_min_performance(self, value: Any) -> Optional[int]:
         """min_performance 값을 정수로 정규화합니다."""
@@ -136,6 +167,7 @@ class CardRetriever:
         # 교집합이 있으면 True (OR 조건: 하나라도 매칭되면 OK)
         return bool(db_categories & filter_categories)
 
+    @instrument("smartpick_retriever_latency_ms", op="search")
     def search(
         self,
         query: str,
@@ -165,31 +197,100 @@ class CardRetriever:
         """
 
         # Step 1: 쿼리 임베딩 생성
-        query_embeddings = self.embedding_client.embed_texts([query])
-        if not query_embeddings:
+        query_vector = self.embed_query(query)
+        if query_vector is None:
+            return []
+        return self.search_by_vector(
+            query_vector, budget_filter, category_filter, top_k, pre_filter_k
+        )
+
+    def search_by_vector(
+        self,
+        query_vector: List[float],
+        budget_filter: int,
+        category_filter: List[str],
+        top_k: int = 10,
+        pre_filter_k: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """이미 임베딩된 쿼리 벡터로 search()의 2~4단계를 수행합니다."""
+        return self.search_by_vectors(
+            [query_vector], budget_filter, [category_filter], top_k, pre_filter_k
+        )[0]
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """여러 서브 쿼리를 한 번의 임베딩 API 호출로 임베딩합니다."""
+        vectors = self.embedding_client.embed_texts(queries)
+        return vectors if len(vectors) == len(queries) else []
+
+    @instrument("smartpick_retriever_latency_ms", op="search_by_vectors")
+    def search_by_vectors(
+        self,
+        query_vectors: List[List[float]],
+        budget_filter: int,
+        category_filters: List[List[str]],
+        top_k: int = 10,
+        pre_filter_k: int = 50,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리 벡터를 한 번의 벡터 DB 호출로 검색 (서브 쿼리별 카테고리 필터 적용)
+
+        Returns:
+            쿼리별 검색 결과 리스트. 각 결과에는 "query_index"(몇 번째 쿼리인지)와
+            "rank"(그 쿼리 안에서의 순위, 0부터)가 추가됩니다.
+        """
+        if not query_vectors:
             return []
-        query_vector = query_embeddings[0]
 
+        if self.backend == "numpy":
+            # 필터 mask 적용 후 한 번의 행렬 곱으로 쿼리별 top_k 선택
+            per_query = self.vector_store.search_many(
+                query_vectors, top_k, budget_filter, category_filters
+            )
+        else:
+            per_query = self._search_chroma(
+                query_vectors, budget_filter, category_filters, top_k, pre_filter_k
+            )
+
+        for query_index, results in enumerate(per_query):
+            for rank, result in enumerate(results):
+                result["query_index"] = query_index
+                result["rank"] = rank
+        return per_query
+
+    def _search_chroma(
+        self,
+        query_vectors: List[List[float]],
+        budget_filter: int,
+        category_filters: List[List[str]],
+        top_k: int,
+        pre_filter_k: int,
+    ) -> List[List[Dict[str, Any]]]:
         # Step 2: ChromaDB 검색 수행
         # 후처리 필터링을 고려하여 더 많은 결과를 먼저 가져옴
         try:
             results = self.vector_store.collection.query(
-                query_embeddings=[query_vector],
+                query_embeddings=query_vectors,
                 n_results=pre_filter_k,
                 include=["documents", "metadatas", "distances"],
             )
         except Exception as e:
             print(f"ChromaDB 검색 오류: {e}")
-            return []
+            return [[] for _ in query_vectors]
 
         # Step 3: 결과 정리 + 예산/카테고리 후처리 필터링
-        search_results = []
+        per_query: List[List[Dict[str, Any]]] = []
+        results = results or {}
+
+        def _row(key: str, q: int) -> list:
+            rows = results.get(key) or []
+            return rows[q] if q < len(rows) else []
 
-        if results and results.get("ids") and results["ids"][0]:
-            ids = results["ids"][0]
-            documents = results.get("documents", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
+        for q, category_filter in enumerate(category_filters):
+            search_results = []
+            ids = _row("ids", q)
+            documents = _row("documents", q)
+            metadatas = _row("metadatas", q)
+            distances = _row("distances", q)
 
             for i, doc_id in enumerate(ids):
                 metadata = metadatas[i] if i < len(metadatas) else {}
@@ -218,8 +319,11 @@ class CardRetriever:
                 if len(search_results) >= top_k:
                     break
 
-        return search_results
+            per_query.append(search_results)
 
+        return per_query
+
+    @instrument("smartpick_retriever_latency_ms", op="get_full_card_info")
     def get_full_card_info(
         self, card_names: List[str]
     ) -> Dict[str, List[Dict[str, Any]]]:
@@ -234,6 +338,12 @@ class CardRetriever:
         """
         card_data = {}
 
+        if self.backend == "numpy":
+            return {
+                card_name: self.vector_store.get_card_chunks(card_name)
+                for card_name in card_names
+            }
+
         for card_name in card_names:
             try:
                 # card_name으로 필터링하여 해당 카드의 모든 청크 검색
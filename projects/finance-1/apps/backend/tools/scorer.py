@@ -2,47 +2,97 @@
 카드별 점수 계산
 
 역할:
-- 검색 결과에서 동일한 card_name이 몇 번 등장하는지 카운트
-- 등장 횟수 = score
+- 검색 결과(청크)의 distance/순위를 카드 단위로 집계하여 점수 계산
+- 집계 방식 (RAG_SCORE_AGGREGATION 환경 변수 또는 생성자 인자)
+  - count: 카드가 가진 청크 수 (기존 방식)
+  - sum:   청크 유사도 합  (유사도 = 1 / (1 + distance))
+  - max:   가장 가까운 청크의 유사도
+  - rrf:   Reciprocal Rank Fusion, 서브 쿼리(카테고리별)마다의 순위를 1 / (k + rank)로 합산
+- 모든 집계는 NumPy 배열 연산으로 수행
 """
 
-from collections import Counter
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Literal
+
+import numpy as np
+
+
+Aggregation = Literal["count", "sum", "max", "rrf"]
+
+AGGREGATION: Aggregation = os.getenv("RAG_SCORE_AGGREGATION", "rrf")  # type: ignore[assignment]
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
 
 
 class CardScorer:
     """카드 점수 계산기"""
-    
+
+    def __init__(self, aggregation: Aggregation = AGGREGATION, rrf_k: int = RRF_K):
+        if aggregation not in ("count", "sum", "max", "rrf"):
+            raise ValueError(f"지원하지 않는 집계 방식입니다: {aggregation}")
+        self.aggregation = aggregation
+        self.rrf_k = rrf_k
+
     def calculate_scores(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        검색 결과에서 card_name 등장 횟수로 점수 계산
+        검색 결과를 카드 단위로 집계하여 점수 계산
         
         Args:
             search_results: retriever에서 반환된 검색 결과 리스트
                 각 항목은 {"id", "content", "metadata", "distance"} 형태
                 metadata에 card_name이 포함되어 있음
+                search_by_vectors 결과라면 "query_index", "rank"도 포함
+                (없으면 query_index=0, rank=리스트 내 순서로 간주)
         
         Returns:
-            [{"card_name": str, "score": int}, ...]
-            card_name과 등장 횟수(score)만 반환
+            [{"card_name": str, "score": float}, ...]
+            card_name과 점수(score)만 반환 (정렬은 ranker 담당)
         """
         if not search_results:
             return []
-        
-        # card_name 등장 횟수 카운트
+
+        if self.aggregation != "rrf":
+            # 같은 청크가 여러 서브 쿼리에서 나오면 가장 가까운 것 하나만 사용
+            best: Dict[Any, Dict[str, Any]] = {}
+            for result in search_results:
+                key = result.get("id", id(result))
+                if key not in best or result.get("distance", 0.0) < best[key].get("distance", 0.0):
+                    best[key] = result
+            search_results = list(best.values())
+
         card_names = [
             result.get("metadata", {}).get("card_name", "Unknown")
             for result in search_results
         ]
-        card_counts = Counter(card_names)
-        
-        # 결과 생성
-        card_scores = [
-            {"card_name": card_name, "score": count}
-            for card_name, count in card_counts.items()
+        names, card_index = np.unique(np.asarray(card_names, dtype=object), return_inverse=True)
+
+        if self.aggregation == "count":
+            scores = np.bincount(card_index, minlength=len(names)).astype(np.float64)
+        elif self.aggregation == "rrf":
+            ranks = np.fromiter(
+                (result.get("rank", i) for i, result in enumerate(search_results)),
+                dtype=np.float64,
+                count=len(search_results),
+            )
+            scores = np.bincount(
+                card_index, weights=1.0 / (self.rrf_k + ranks + 1.0), minlength=len(names)
+            )
+        else:
+            distances = np.fromiter(
+                (float(result.get("distance", 0.0)) for result in search_results),
+                dtype=np.float64,
+                count=len(search_results),
+            )
+            similarities = 1.0 / (1.0 + np.maximum(distances, 0.0))
+            if self.aggregation == "sum":
+                scores = np.bincount(card_index, weights=similarities, minlength=len(names))
+            else:
+                scores = np.zeros(len(names))
+                np.maximum.at(scores, card_index, similarities)
+
+        return [
+            {"card_name": str(card_name), "score": float(score)}
+            for card_name, score in zip(names, scores)
         ]
-        
-        return card_scores
 
 
 # 테스트용 실행
@@ -56,10 +106,11 @@ if __name__ == "__main__":
         {"id": "5", "content": "대중교통 5% 할인", "metadata": {"card_name": "신한카드 Mr.Life"}, "distance": 0.3}
     ]
     
-    scorer = CardScorer()
-    scores = scorer.calculate_scores(mock_results)
-    
-    print("점수 계산 결과:")
-    for card in scores:
-        print(f"- {card['card_name']}: {card['score']}점")
+    for aggregation in ("count", "sum", "max", "rrf"):
+        scorer = CardScorer(aggregation=aggregation)
+        scores = scorer.calculate_scores(mock_results)
+
+        print(f"점수 계산 결과 ({aggregation}):")
+        for card in scores:
+            print(f"- {card['card_name']}: {card['score']:.4f}점")
 
@@ -0,0 +1,264 @@
+"""
+Context Window - 에이전트 공용 대화 컨텍스트 관리
+
+책임:
+- 오래된 대화를 롤링 요약(rule 또는 LLM)으로 접고, 최근 N개 메시지는 원문 유지
+- 에이전트별 토큰 예산(`CONTEXT_TOKEN_BUDGETS`)에 맞춰 에이전트에 넘길 history 구성
+- 에이전트가 돌려준 history에서 새 메시지만 골라 전체 history에 합치기
+
+세션 history 자체는 그대로 저장되고(Redis는 `SESSION_HISTORY_MAX_MESSAGES`로 상한),
+에이전트는 `[요약 메시지] + 최근 메시지`만 받습니다. 요약 상태는
+`agent_specific_state["context_summary"]`에 저장되어 턴 사이에 이어집니다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from backend.config import get_settings
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 요약은 history에서 이 role의 메시지 1건으로 에이전트에 전달됨
+SUMMARY_ROLE = "Summary"
+# agent_specific_state에 저장되는 요약 상태 키
+CONTEXT_SUMMARY_KEY = "context_summary"
+
+# 메시지 1건당 role/구분자 오버헤드 (대략치)
+_MESSAGE_OVERHEAD_TOKENS = 4
+_RULE_SUMMARY_LINE_CHARS = 120
+
+SUMMARY_SYSTEM_PROMPT = "당신은 무역 실무 상담 대화를 요약하는 도우미입니다."
+SUMMARY_PROMPT = """기존 요약과 이어지는 대화를 합쳐 하나의 요약으로 갱신하세요.
+- 거래 조건, 금액, 국가, 일정, 사용자가 요청한 작업과 결정 사항은 반드시 남기세요.
+- 인사말이나 반복 설명은 생략하세요.
+- 한국어 bullet 목록으로, {max_tokens} 토큰 이내로 작성하세요.
+
+[기존 요약]
+{summary}
+
+[이어지는 대화]
+{messages}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 ASCII chars per token, ~1 token per non-ASCII (Hangul) char."""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return estimate_tokens(str(message.get("content", ""))) + _MESSAGE_OVERHEAD_TOKENS
+
+
+def _fingerprint(message: Dict[str, Any]) -> str:
+    raw = json.dumps(message, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """Cuts `text` to roughly `max_tokens`, keeping the head or the tail."""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:  # longest prefix/suffix that fits
+        mid = (low + high + 1) // 2
+        part = text[:mid] if keep == "head" else text[-mid:]
+        if estimate_tokens(part) + 1 <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + "…" if keep == "head" else "…" + text[len(text) - low:]
+
+
+def as_chat_messages(history: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Maps orchestrator history roles to OpenAI chat roles (summary -> system)."""
+    messages = []
+    for turn in history:
+        role = turn.get("role")
+        if role == SUMMARY_ROLE:
+            chat_role = "system"
+        elif role in ("Agent", "assistant"):
+            chat_role = "assistant"
+        else:
+            chat_role = "user"
+        messages.append({"role": chat_role, "content": str(turn.get("content", ""))})
+    return messages
+
+
+def without_summary(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [turn for turn in history or [] if turn.get("role") != SUMMARY_ROLE]
+
+
+class ContextWindow:
+    """Rolling summary + recent turns, bounded per agent by a token budget."""
+
+    def __init__(self, settings=None, summarizer=None):
+        self.settings = settings or get_settings()
+        # async (previous_summary, messages) -> str. None이면 CONTEXT_SUMMARY_MODE에 따름
+        self._summarizer = summarizer
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings.context_window_enabled)
+
+    @property
+    def recent_messages(self) -> int:
+        return max(1, int(self.settings.context_recent_messages))
+
+    def token_budget(self, agent_name: Optional[str]) -> int:
+        budgets = self.settings.context_token_budgets or {}
+        return int(budgets.get(agent_name, budgets.get("default", 2000)))
+
+    # --- rolling summary ---
+
+    def _covered_count(self, history: List[Dict[str, Any]], summary_state: Dict[str, Any]) -> int:
+        """Number of leading history messages already folded into the summary."""
+        covered = int(summary_state.get("covered", 0))
+        boundary = summary_state.get("boundary")
+        if not boundary:
+            return 0
+        if 0 < covered <= len(history) and _fingerprint(history[covered - 1]) == boundary:
+            return covered
+        # 저장소가 앞쪽을 잘라냈으면(LTRIM) 경계 메시지 위치가 당겨짐
+        for index in range(min(covered, len(history)) - 1, -1, -1):
+            if _fingerprint(history[index]) == boundary:
+                return index + 1
+        # 경계 메시지까지 잘려 나갔으면 남은 메시지는 모두 요약 이후 것
+        return 0
+
+    async def update_summary(
+        self,
+        history: List[Dict[str, Any]],
+        summary_state: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Folds messages older than the recent window into the rolling summary.
+
+        Messages are folded in batches of `context_summary_batch_messages`, so the
+        summarizer runs every few turns instead of every turn.
+
+        Returns:
+            Summary state: {"text", "covered", "boundary", "folded_total"}
+        """
+        summary_state = dict(summary_state or {})
+        summary_state.setdefault("text", "")
+        if not self.enabled:
+            return summary_state
+
+        covered = self._covered_count(history, summary_state)
+        fold_until = len(history) - self.recent_messages
+        batch = max(1, int(self.settings.context_summary_batch_messages))
+        if fold_until - covered < batch:
+            summary_state["covered"] = covered
+            return summary_state
+
+        to_fold = without_summary(history[covered:fold_until])
+        summary_state["text"] = await self._summarize(summary_state["text"], to_fold)
+        summary_state["covered"] = fold_until
+        summary_state["boundary"] = _fingerprint(history[fold_until - 1])
+        summary_state["folded_total"] = int(summary_state.get("folded_total", 0)) + len(to_fold)
+        logger.debug(
+            "Context summary updated: folded=%s total=%s tokens=%s",
+            len(to_fold),
+            summary_state["folded_total"],
+            estimate_tokens(summary_state["text"]),
+        )
+        return summary_state
+
+    async def _summarize(self, previous: str, messages: List[Dict[str, Any]]) -> str:
+        max_tokens = int(self.settings.context_summary_max_tokens)
+        summarizer = self._summarizer
+        if summarizer is None and self.settings.context_summary_mode == "llm" and self.settings.upstage_api_key:
+            summarizer = self._llm_summary
+        if summarizer is not None:
+            try:
+                summary = await summarizer(previous, messages)
+                if summary:
+                    return _truncate_to_tokens(summary.strip(), max_tokens, keep="tail")
+            except Exception as e:
+                logger.warning("Context summary via LLM failed (%s); using rule-based summary.", e)
+        return self._rule_summary(previous, messages, max_tokens)
+
+    @staticmethod
+    def _rule_summary(previous: str, messages: List[Dict[str, Any]], max_tokens: int) -> str:
+        """Keeps one shortened line per message; drops the oldest lines beyond the budget."""
+        lines = [line for line in previous.splitlines() if line.strip()]
+        for turn in messages:
+            content = " ".join(str(turn.get("content", "")).split())
+            if not content:
+                continue
+            if len(content) > _RULE_SUMMARY_LINE_CHARS:
+                content = content[:_RULE_SUMMARY_LINE_CHARS] + "…"
+            lines.append(f"- {turn.get('role', 'User')}: {content}")
+
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+            lines.pop(0)
+        return _truncate_to_tokens("\n".join(lines), max_tokens, keep="tail")
+
+    async def _llm_summary(self, previous: str, messages: List[Dict[str, Any]]) -> str:
+        from backend.utils.llm import call_llm
+
+        transcript = "\n".join(f"{turn.get('role', 'User')}: {turn.get('content', '')}" for turn in messages)
+        prompt = SUMMARY_PROMPT.format(
+            max_tokens=self.settings.context_summary_max_tokens,
+            summary=previous or "(없음)",
+            messages=transcript,
+        )
+        return await call_llm(
+            prompt, system_prompt=SUMMARY_SYSTEM_PROMPT, temperature=0.2, agent="orchestrator"
+        )
+
+    # --- per-agent view ---
+
+    def build(
+        self,
+        history: List[Dict[str, Any]],
+        summary_state: Optional[Dict[str, Any]],
+        agent_name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        History handed to an agent: summary message + unsummarized recent messages,
+        trimmed (oldest first) to the agent's token budget.
+        """
+        if not self.enabled:
+            return list(history)
+
+        summary_state = summary_state or {}
+        budget = self.token_budget(agent_name)
+        recent = without_summary(history[self._covered_count(history, summary_state):])
+
+        used = sum(message_tokens(turn) for turn in recent)
+        while len(recent) > 1 and used > budget:
+            used -= message_tokens(recent.pop(0))
+        if recent and used > budget:
+            # 메시지 1건이 예산보다 큼: 앞부분만 남김
+            only = recent[0]
+            recent = [dict(only, content=_truncate_to_tokens(
+                str(only.get("content", "")), budget - _MESSAGE_OVERHEAD_TOKENS
+            ))]
+            used = message_tokens(recent[0])
+
+        summary_text = summary_state.get("text") or ""
+        summary_budget = budget - used - _MESSAGE_OVERHEAD_TOKENS
+        if summary_text and summary_budget > 0:
+            summary_text = _truncate_to_tokens(summary_text, summary_budget, keep="tail")
+            return [{"role": SUMMARY_ROLE, "content": f"이전 대화 요약:\n{summary_text}"}] + recent
+        return recent
+
+    @staticmethod
+    def merge(
+        history: List[Dict[str, Any]],
+        agent_history: List[Dict[str, Any]],
+        returned_history: Optional[List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Appends the messages an agent added to its view back onto the full history."""
+        if not isinstance(returned_history, list) or len(returned_history) <= len(agent_history):
+            return list(history)
+        return list(history) + without_summary(returned_history[len(agent_history):])
@@ -3,9 +3,10 @@ from __future__ import annotations
 import os
 import json
 from typing import Any, Dict, List, Optional, Tuple
-from openai import AsyncOpenAI
 from backend.agents.base import BaseAgent
+from backend.agents.context_window import as_chat_messages
 from backend.config import get_settings
+from backend.utils.llm_gateway import UPSTAGE_SOLAR_BASE_URL, get_llm_gateway
 
 class DefaultChatAgent(BaseAgent):
     """
@@ -19,10 +20,7 @@ class DefaultChatAgent(BaseAgent):
         self.settings = get_settings()
         self.client = None
         if self.settings.upstage_api_key:
-            self.client = AsyncOpenAI(
-                api_key=self.settings.upstage_api_key,
-                base_url="https://api.upstage.ai/v1/solar"
-            )
+            self.client = get_llm_gateway().client("default_chat", base_url=UPSTAGE_SOLAR_BASE_URL)
         self.system_prompt = self._load_system_prompt()
 
     def _load_system_prompt(self) -> str:
@@ -54,11 +52,8 @@ class DefaultChatAgent(BaseAgent):
         # Prepare messages including history
         messages = [{"role": "system", "content": self.system_prompt}]
         
-        # Add filtered history (last N turns)
-        for turn in conversation_history[-10:]:
-            # Map history roles to LLM roles
-            role = "assistant" if turn.get("role") in ["Agent", "assistant"] else "user"
-            messages.append({"role": role, "content": turn.get("content", "")})
+        # History is already windowed by the orchestrator (summary + recent turns within budget)
+        messages.extend(as_chat_messages(conversation_history))
             
         # Add current user input
         messages.append({"role": "user", "content": user_input})
@@ -6,7 +6,6 @@ import json
 import re
 from typing import Dict, Any, List, Optional, cast
 import openai
-from openai import AsyncOpenAI
 
 # Ensure backend directory is in path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,8 +15,10 @@ sys.path.append(project_root)
 # Local imports
 from backend.config import get_settings
 from backend.utils.logger import get_logger
+from backend.utils.llm_gateway import get_llm_gateway
 # RAG and validation functionality now provided by tools.py
 from backend.agents.email_agent.state import EmailGraphState
+from backend.agents.context_window import without_summary
 
 # --- Constants ---
 EMAIL_AGENT_TYPE = "email"
@@ -425,10 +426,7 @@ class EmailAgentComponents:
 
         self.llm = None
         if self.settings.upstage_api_key:
-            self.llm = AsyncOpenAI(
-                base_url="https://api.upstage.ai/v1",
-                api_key=self.settings.upstage_api_key
-            )
+            self.llm = get_llm_gateway().client("email")
         else:
             logger.warning("UPSTAGE_API_KEY is not set for EmailAgent. LLM calls will fail.")
         
@@ -444,7 +442,7 @@ EMAIL_AGENT_COMPONENTS = EmailAgentComponents()
 
 # --- Node Functions ---
 
-def perform_rag_search_node(state: EmailGraphState) -> Dict[str, Any]:
+async def perform_rag_search_node(state: EmailGraphState) -> Dict[str, Any]:
     state_dict = cast(Dict[str, Any], state)
 
     user_input = state_dict["user_input"]
@@ -465,7 +463,7 @@ def perform_rag_search_node(state: EmailGraphState) -> Dict[str, Any]:
         task_type = _detect_email_task_type(user_input, context)
         search_type = "mistakes" if task_type == "review" else "all"
 
-        retrieved_documents = search_email_references.invoke(
+        retrieved_documents = await search_email_references.ainvoke(
             {
                 "query": rag_query,
                 "k": 3,
@@ -500,7 +498,8 @@ def prepare_llm_messages_node(state: EmailGraphState) -> Dict[str, Any]:
 
     user_input = state_dict["user_input"]
     context = state_dict.get("context") or {}
-    conversation_history = state_dict.get("conversation_history") or []
+    # 요약 메시지는 이메일 본문 추출 대상이 아님
+    conversation_history = without_summary(state_dict.get("conversation_history"))
     retrieved_documents = state_dict.get("retrieved_documents") or []
 
     task_type = _detect_email_task_type(user_input, context)
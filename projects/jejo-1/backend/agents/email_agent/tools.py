@@ -16,7 +16,12 @@ import json
 from typing import List, Dict, Any, Optional
 from langchain.tools import tool
 from backend.rag.retriever import search as rag_search
-from backend.rag.retriever import search_with_filter
+from backend.rag.retriever import (
+    aembed_query,
+    embed_query,
+    run_in_retrieval_executor,
+    search_filter_groups,
+)
 from backend.config import get_settings
 
 
@@ -38,6 +43,56 @@ def _dedupe_and_rank(results: List[Dict[str, Any]], k: int) -> List[Dict[str, An
     return deduped
 
 
+def _search_email_references(
+    query: str,
+    k: int,
+    search_type: str,
+    query_embedding: List[float]
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    if search_type == "mistakes":
+        target_doc_types = ["common_mistake", "error_checklist"]
+    elif search_type == "emails":
+        target_doc_types = ["email", "process_flow"]
+    else:
+        target_doc_types = ["email", "common_mistake", "error_checklist", "process_flow"]
+
+    per_type_k = max(1, min(3, k))
+    for docs in search_filter_groups(
+        query=query,
+        filter_groups=[{"document_type": doc_type} for doc_type in target_doc_types],
+        k=per_type_k,
+        query_embedding=query_embedding,
+    ):
+        results.extend(docs)
+
+    results = _dedupe_and_rank(results, k=max(k, 6))
+
+    if not results:
+        broad = rag_search(query=query, k=max(k, 8), query_embedding=query_embedding)
+        target_set = {doc_type.lower() for doc_type in target_doc_types}
+        filtered = [
+            doc
+            for doc in broad
+            if str(doc.get("metadata", {}).get("document_type", "")).lower() in target_set
+        ]
+        results = filtered if filtered else broad
+
+    results = _dedupe_and_rank(results, k=k)
+
+    # Format results
+    formatted_results = []
+    for doc in results:
+        formatted_results.append({
+            "document": doc["document"],
+            "metadata": doc.get("metadata", {}),
+            "source": doc.get("metadata", {}).get("source_dataset", "unknown"),
+            "type": doc.get("metadata", {}).get("document_type", "unknown")
+        })
+
+    return formatted_results
+
+
 @tool
 def search_email_references(
     query: str,
@@ -64,55 +119,39 @@ def search_email_references(
     get_settings()  # settings access kept for side effects / config validation
 
     try:
-        results: List[Dict[str, Any]] = []
-        if search_type == "mistakes":
-            target_doc_types = ["common_mistake", "error_checklist"]
-        elif search_type == "emails":
-            target_doc_types = ["email", "process_flow"]
-        else:
-            target_doc_types = ["email", "common_mistake", "error_checklist", "process_flow"]
-
-        per_type_k = max(1, min(3, k))
-        for doc_type in target_doc_types:
-            results.extend(
-                search_with_filter(
-                    query=query,
-                    k=per_type_k,
-                    document_type=doc_type,
-                )
-            )
-
-        results = _dedupe_and_rank(results, k=max(k, 6))
-
-        if not results:
-            broad = rag_search(query=query, k=max(k, 8))
-            target_set = {doc_type.lower() for doc_type in target_doc_types}
-            filtered = [
-                doc
-                for doc in broad
-                if str(doc.get("metadata", {}).get("document_type", "")).lower() in target_set
-            ]
-            results = filtered if filtered else broad
-
-        results = _dedupe_and_rank(results, k=k)
-
-        # Format results
-        formatted_results = []
-        for doc in results:
-            formatted_results.append({
-                "document": doc["document"],
-                "metadata": doc.get("metadata", {}),
-                "source": doc.get("metadata", {}).get("source_dataset", "unknown"),
-                "type": doc.get("metadata", {}).get("document_type", "unknown")
-            })
+        # 쿼리 임베딩은 1회만 만들고 타입별 검색/fallback 검색에 재사용
+        query_embedding = embed_query(query)
+        if query_embedding is None:
+            return []
+        return _search_email_references(query, k, search_type, query_embedding)
+    except Exception as e:
+        print(f"Error in search_email_references: {e}")
+        return []
 
-        return formatted_results
 
+async def _asearch_email_references(
+    query: str,
+    k: int = 3,
+    search_type: str = "all"
+) -> List[Dict[str, Any]]:
+    """`search_email_references.ainvoke`: async embedding, Chroma on the retrieval pool."""
+    get_settings()
+
+    try:
+        query_embedding = await aembed_query(query)
+        if query_embedding is None:
+            return []
+        return await run_in_retrieval_executor(
+            _search_email_references, query, k, search_type, query_embedding
+        )
     except Exception as e:
         print(f"Error in search_email_references: {e}")
         return []
 
 
+search_email_references.coroutine = _asearch_email_references
+
+
 @tool
 def detect_email_risks(
     email_content: str,
@@ -16,6 +16,7 @@
   - 이전: 독립 에이전트(EvalAgent), 3축 점수(grounding/educational/insight)
   - 현재: Tool 함수, 문제별 is_valid(bool) + issues(list) 배열 반환
 """
+import asyncio
 import json
 import os
 from typing import Dict, Any, List
@@ -23,7 +24,7 @@ from typing import Dict, Any, List
 from langsmith import traceable
 
 from backend.utils.llm import call_llm
-from backend.rag.retriever import search_with_filter
+from backend.rag.retriever import asearch_with_filter
 
 # ──────────────────────────────────────────────
 # 상수
@@ -92,16 +93,18 @@ async def evaluate_quiz_list(
     if not quiz_list:
         return []
 
-    # 1) 각 문제의 정답 텍스트로 RAG 검색 → 원본 데이터 수집
-    all_reference_texts = []
+    # 1) 각 문제의 정답 텍스트로 RAG 검색 → 원본 데이터 수집 (문제별 검색은 동시에)
+    search_queries = []
     for q in quiz_list:
         question_text = q.get("question", "")
         correct_idx = q.get("answer", 0)
         choices = q.get("choices", [])
         correct_text = choices[correct_idx] if correct_idx < len(choices) else ""
-        search_query = f"{question_text} {correct_text}"
-        docs = search_with_filter(query=search_query, k=5)
-        all_reference_texts.append(_format_reference_data(docs))
+        search_queries.append(f"{question_text} {correct_text}")
+    docs_per_question = await asyncio.gather(
+        *(asearch_with_filter(query=search_query, k=5) for search_query in search_queries)
+    )
+    all_reference_texts = [_format_reference_data(docs) for docs in docs_per_question]
 
     # 2) 프롬프트 조립
     #    각 문제와 해당 RAG 결과를 묶어서 전달
@@ -127,6 +130,7 @@ async def evaluate_quiz_list(
         user_message="위 퀴즈들을 원본 데이터와 대조하여 문제별로 검증해주세요.",
         system_prompt=prompt,
         temperature=0.3,
+        agent="quiz",
     )
 
     # 4) 파싱
@@ -9,17 +9,18 @@ import inspect
 from typing import Dict, Any, List, Optional, Type, cast
 
 import openai
-from openai import AsyncOpenAI
 from langsmith import traceable # traceable will be applied at graph level or individual agent level if needed
 
 # External imports
 from backend.config import get_settings
 from backend.core.response_converter import normalize_response
 from backend.utils.logger import get_logger
+from backend.utils.llm_gateway import get_llm_gateway
 
 # Internal imports for Orchestrator package
 from .state import OrchestratorGraphState
-from .session_store import create_conversation_store
+from .session_store import PERSISTED_KEY, create_conversation_store
+from backend.agents.context_window import CONTEXT_SUMMARY_KEY, ContextWindow
 
 from backend.agents.default_chat.default_chat_agent import DefaultChatAgent # Actual DefaultChatAgent import
 from backend.agents.riskmanaging.graph import RiskManagingAgent # Actual RiskManagingAgent import
@@ -60,13 +61,11 @@ class OrchestratorComponents:
     def __init__(self):
         self.settings = get_settings()
         self.conversation_store = create_conversation_store()  # Factory function chooses InMemory or Redis
+        self.context_window = ContextWindow(self.settings)  # Summary + recent turns handed to agents
         
         self.llm = None
         if self.settings.upstage_api_key:
-            self.llm = AsyncOpenAI(
-                base_url="https://api.upstage.ai/v1",
-                api_key=self.settings.upstage_api_key
-            )
+            self.llm = get_llm_gateway().client("orchestrator")
         else:
             logger.warning(
                 "UPSTAGE_API_KEY is not set; orchestrator LLM intent classification will fallback."
@@ -92,14 +91,14 @@ ORCHESTRATOR_COMPONENTS = OrchestratorComponents()
 
 # --- Orchestrator Node Functions ---
 
-def load_session_state_node(state: OrchestratorGraphState) -> Dict[str, Any]:
+async def load_session_state_node(state: OrchestratorGraphState) -> Dict[str, Any]:
     # Need to convert TypedDict to dict for manipulation
     state_dict = cast(Dict[str, Any], state)
     
     session_id = state_dict["session_id"]
     conversation_store = ORCHESTRATOR_COMPONENTS.conversation_store
     
-    session_data = conversation_store.get_state(session_id)
+    session_data = await conversation_store.aget_state(session_id)
     if not session_data:
         session_data = {
             "active_agent": None,
@@ -119,6 +118,8 @@ def load_session_state_node(state: OrchestratorGraphState) -> Dict[str, Any]:
     state_dict["conversation_history"] = session_data["conversation_history"]
     state_dict["active_agent"] = session_data["active_agent"]
     state_dict["agent_specific_state"] = session_data["agent_specific_state"]
+    # Redis 저장소가 읽어 온 시점의 저장 상태 (저장 시 변경분만 쓰는 데 사용)
+    state_dict["session_persisted"] = session_data.get(PERSISTED_KEY)
     # state_dict["last_interaction_timestamp"] = session_data["last_interaction_timestamp"] # Handled by update node
 
     return state_dict
@@ -363,15 +364,25 @@ async def call_agent_node(state: OrchestratorGraphState) -> Dict[str, Any]:
     if selected_agent_name == "quiz":
         agent_context["_agent_specific_state"] = agent_specific_state
 
+    # Agents get the rolling summary + recent turns within their token budget, not the whole history
+    context_window = ORCHESTRATOR_COMPONENTS.context_window
+    summary_state = await context_window.update_summary(
+        conversation_history, agent_specific_state.get(CONTEXT_SUMMARY_KEY)
+    )
+    agent_specific_state[CONTEXT_SUMMARY_KEY] = summary_state
+    agent_history = context_window.build(conversation_history, summary_state, selected_agent_name)
+
     agent_output = await agent_instance.run(
         user_input=user_input,
-        conversation_history=conversation_history,
+        conversation_history=agent_history,
         analysis_in_progress=agent_specific_state.get("analysis_in_progress", False),
         context=agent_context
     )
 
     state_dict["orchestrator_response"] = agent_output.get("response", {"response": "에이전트 응답 오류", "agent_type": "orchestrator", "metadata": {}})
-    state_dict["conversation_history"] = agent_output.get("conversation_history", conversation_history)
+    state_dict["conversation_history"] = context_window.merge(
+        conversation_history, agent_history, agent_output.get("conversation_history")
+    )
     
     if "analysis_in_progress" in agent_output:
         state_dict["agent_specific_state"]["analysis_in_progress"] = agent_output["analysis_in_progress"]
@@ -392,7 +403,7 @@ async def call_agent_node(state: OrchestratorGraphState) -> Dict[str, Any]:
     return state_dict
 
 
-def finalize_and_save_state_node(state: OrchestratorGraphState) -> Dict[str, Any]:
+async def finalize_and_save_state_node(state: OrchestratorGraphState) -> Dict[str, Any]:
     state_dict = cast(Dict[str, Any], state)
 
     session_id = state_dict["session_id"]
@@ -404,8 +415,9 @@ def finalize_and_save_state_node(state: OrchestratorGraphState) -> Dict[str, Any
         "conversation_history": state_dict["conversation_history"],
         "agent_specific_state": state_dict["agent_specific_state"],
         "last_interaction_timestamp": time.time(), # Update timestamp
+        PERSISTED_KEY: state_dict.get("session_persisted"),
     }
-    conversation_store.save_state(session_id, session_state_to_save)
+    await conversation_store.asave_state(session_id, session_state_to_save)
     
     return state_dict # Return the updated state, graph will then pass to normalizer
 
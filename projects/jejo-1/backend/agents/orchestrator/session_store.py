@@ -3,10 +3,13 @@
 import json
 import uuid
 import time
-from typing import Dict, Any, Optional
+import zlib
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
 from abc import ABC, abstractmethod
 
 import redis
+import redis.asyncio as redis_async
 
 from backend.config import get_settings
 from backend.utils.logger import get_logger
@@ -37,6 +40,43 @@ class ConversationStore(ABC):
         """Generate a new unique session ID"""
         pass
 
+    # async graph 노드용 API. 기본 구현은 동기 메서드를 그대로 호출
+    # (InMemory처럼 I/O가 없는 저장소는 이걸로 충분)
+
+    async def aget_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Async `get_state`"""
+        return self.get_state(session_id)
+
+    async def asave_state(self, session_id: str, state: Dict[str, Any]):
+        """Async `save_state`"""
+        self.save_state(session_id, state)
+
+    async def adelete_state(self, session_id: str):
+        """Async `delete_state`"""
+        self.delete_state(session_id)
+
+
+# AsyncRedisConversationStore.aget_state가 붙여 주는 "읽어 온 시점의 저장 상태" 키.
+# asave_state에 그대로 돌려주면 새 메시지/바뀐 필드만 씀 (없으면 전체 재작성)
+PERSISTED_KEY = "_persisted"
+
+
+def _redis_connection_kwargs(settings) -> Dict[str, Any]:
+    # NOTE:
+    # Passing `ssl` to low-level ConnectionPool can break on 일부 redis-py
+    # connection classes. Construct Redis client directly for compatibility.
+    redis_kwargs = {
+        "host": settings.redis_host,
+        "port": settings.redis_port,
+        "db": settings.redis_db,
+        "max_connections": 10,
+    }
+    if settings.redis_password:
+        redis_kwargs["password"] = settings.redis_password
+    if settings.redis_ssl:
+        redis_kwargs["ssl"] = True
+    return redis_kwargs
+
 
 class InMemoryConversationStore(ConversationStore):
     """
@@ -53,7 +93,9 @@ class InMemoryConversationStore(ConversationStore):
         return self._store.get(session_id)
 
     def save_state(self, session_id: str, state: Dict[str, Any]):
-        self._store[session_id] = state
+        self._store[session_id] = {
+            key: value for key, value in state.items() if key != PERSISTED_KEY
+        }
 
     def delete_state(self, session_id: str):
         if session_id in self._store:
@@ -92,23 +134,11 @@ class RedisConversationStore(ConversationStore):
                 )
             else:
                 # Use individual connection parameters.
-                # NOTE:
-                # Passing `ssl` to low-level ConnectionPool can break on 일부 redis-py
-                # connection classes. Construct Redis client directly for compatibility.
-                redis_kwargs = {
-                    "host": settings.redis_host,
-                    "port": settings.redis_port,
-                    "db": settings.redis_db,
-                    "decode_responses": True,
-                    "encoding": "utf-8",
-                    "max_connections": 10,
-                }
-                if settings.redis_password:
-                    redis_kwargs["password"] = settings.redis_password
-                if settings.redis_ssl:
-                    redis_kwargs["ssl"] = True
-
-                self.redis_client = redis.Redis(**redis_kwargs)
+                self.redis_client = redis.Redis(
+                    **_redis_connection_kwargs(settings),
+                    decode_responses=True,
+                    encoding='utf-8',
+                )
 
             # Test connection
             self.redis_client.ping()
@@ -196,20 +226,299 @@ class RedisConversationStore(ConversationStore):
             return []
 
 
+class AsyncRedisConversationStore(ConversationStore):
+    """
+    redis.asyncio session store with append-only conversation history.
+
+    Layout per session (every key shares the session TTL):
+    - session:{id}:meta     hash  active_agent, last_interaction_timestamp
+    - session:{id}:history  list  one encoded message per item, capped by LTRIM
+    - session:{id}:agent    hash  one encoded field per agent_specific_state key
+
+    A turn only RPUSHes the new messages and HSETs the agent fields that changed,
+    together with the TTL refresh in one MULTI pipeline, so bytes written per turn
+    do not grow with the session. The history key is WATCHed and its length/tail
+    compared with what the turn loaded; if another turn saved in between, the
+    session is rewritten from this turn's state instead of appended to. Values at least `session_compression_min_bytes`
+    long are zlib-compressed when `session_compression` is on.
+
+    The async methods are what the orchestrator uses; the sync ones (same layout)
+    exist for scripts and the ConversationStore interface.
+    """
+
+    COMPRESSED_PREFIX = b"z:"
+    # WATCH 충돌 시 재시도 횟수
+    SAVE_ATTEMPTS = 3
+
+    def __init__(self, settings=None, client=None, sync_client=None):
+        if settings is None:
+            settings = get_settings()
+
+        self.settings = settings
+        self.ttl = settings.session_ttl  # seconds
+        self.max_history = max(1, int(settings.session_history_max_messages))
+        self.compression = bool(settings.session_compression)
+        self.compression_min_bytes = int(settings.session_compression_min_bytes)
+
+        if client is None:
+            if settings.redis_url:
+                client = redis_async.from_url(settings.redis_url)
+            else:
+                client = redis_async.Redis(**_redis_connection_kwargs(settings))
+        self.client = client
+        self._sync_client = sync_client
+
+    # --- keys / encoding ---
+
+    def _keys(self, session_id: str) -> Tuple[str, str, str]:
+        prefix = f"session:{session_id}"
+        return f"{prefix}:meta", f"{prefix}:history", f"{prefix}:agent"
+
+    def _legacy_key(self, session_id: str) -> str:
+        """Single-JSON key written by RedisConversationStore."""
+        return f"session:{session_id}"
+
+    def _encode(self, value: Any) -> bytes:
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if self.compression and len(raw) >= self.compression_min_bytes:
+            return self.COMPRESSED_PREFIX + zlib.compress(raw)
+        return raw
+
+    def _decode(self, raw: Any) -> Any:
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        if raw.startswith(self.COMPRESSED_PREFIX):
+            raw = zlib.decompress(raw[len(self.COMPRESSED_PREFIX):])
+        return json.loads(raw)
+
+    @staticmethod
+    def _digest(raw: Any) -> str:
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    # --- shared pipeline steps (sync and async pipelines queue commands the same way) ---
+
+    def _queue_load(self, pipe, session_id: str) -> None:
+        meta_key, history_key, agent_key = self._keys(session_id)
+        pipe.hgetall(meta_key)
+        pipe.lrange(history_key, 0, -1)
+        pipe.hgetall(agent_key)
+        pipe.get(self._legacy_key(session_id))
+
+    def _parse_load(self, results: List[Any]) -> Optional[Dict[str, Any]]:
+        meta_raw, history_raw, agent_raw, legacy_raw = results
+        if not meta_raw:
+            if legacy_raw is None:
+                return None
+            # 이전 형식 세션: 다음 저장 때 새 형식으로 전체 재작성
+            return self._decode(legacy_raw)
+
+        meta = {self._text(key): self._decode(value) for key, value in meta_raw.items()}
+        agent_fields = {self._text(key): value for key, value in agent_raw.items()}
+        return {
+            "active_agent": meta.get("active_agent"),
+            "conversation_history": [self._decode(item) for item in history_raw],
+            "agent_specific_state": {
+                field: self._decode(value) for field, value in agent_fields.items()
+            },
+            "last_interaction_timestamp": meta.get("last_interaction_timestamp"),
+            PERSISTED_KEY: {
+                "history_len": len(history_raw),
+                "history_tail": self._digest(history_raw[-1]) if history_raw else None,
+                "agent_fields": {field: self._digest(value) for field, value in agent_fields.items()},
+            },
+        }
+
+    def _history_unchanged(self, persisted: Dict[str, Any], length: int, tail_raw: Any) -> bool:
+        """True if the stored history is still the one `persisted` was loaded from."""
+        tail = self._digest(tail_raw) if tail_raw is not None else None
+        return length == persisted.get("history_len", 0) and tail == persisted.get("history_tail")
+
+    @staticmethod
+    def _as_rewrite(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {**state, PERSISTED_KEY: None}
+
+    def _queue_save(self, pipe, session_id: str, state: Dict[str, Any]) -> int:
+        """Queues one turn's writes; returns the number of payload bytes written."""
+        meta_key, history_key, agent_key = self._keys(session_id)
+        persisted = state.get(PERSISTED_KEY) or None
+        history = list(state.get("conversation_history") or [])
+        agent_state = state.get("agent_specific_state") or {}
+
+        meta = {
+            "active_agent": self._encode(state.get("active_agent")),
+            "last_interaction_timestamp": self._encode(state.get("last_interaction_timestamp", time.time())),
+        }
+        written = sum(len(value) for value in meta.values())
+        pipe.hset(meta_key, mapping=meta)
+
+        # 히스토리: 읽어 온 부분이 그대로면 새 메시지만 append, 아니면 다시 씀
+        base_len = persisted.get("history_len", 0) if persisted else 0
+        appendable = (
+            persisted is not None
+            and len(history) >= base_len
+            and (
+                base_len == 0
+                or self._digest(self._encode(history[base_len - 1])) == persisted.get("history_tail")
+            )
+        )
+        # 상한은 LTRIM이 맞추므로 한 번에 상한보다 많이 보낼 필요는 없음
+        new_messages = (history[base_len:] if appendable else history)[-self.max_history:]
+        if not appendable:
+            pipe.delete(history_key)
+        if new_messages:
+            encoded = [self._encode(message) for message in new_messages]
+            written += sum(len(item) for item in encoded)
+            pipe.rpush(history_key, *encoded)
+            pipe.ltrim(history_key, -self.max_history, -1)
+
+        # agent_specific_state: 바뀐 필드만 HSET, 사라진 필드는 HDEL
+        previous_fields = persisted.get("agent_fields", {}) if persisted else None
+        changed = {}
+        for field, value in agent_state.items():
+            encoded = self._encode(value)
+            if previous_fields is None or previous_fields.get(field) != self._digest(encoded):
+                changed[field] = encoded
+        if previous_fields is None:
+            pipe.delete(agent_key)
+        else:
+            removed = [field for field in previous_fields if field not in agent_state]
+            if removed:
+                pipe.hdel(agent_key, *removed)
+        if changed:
+            written += sum(len(value) for value in changed.values())
+            pipe.hset(agent_key, mapping=changed)
+
+        for key in (meta_key, history_key, agent_key):
+            pipe.expire(key, self.ttl)
+        if persisted is None:
+            pipe.delete(self._legacy_key(session_id))
+        return written
+
+    # --- async API ---
+
+    async def aget_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                self._queue_load(pipe, session_id)
+                return self._parse_load(await pipe.execute())
+        except redis.RedisError as e:
+            logger.warning("Redis get_state error for %s: %s", session_id, e)
+            return None
+        except (json.JSONDecodeError, zlib.error) as e:
+            logger.warning("Session decode error for %s: %s", session_id, e)
+            return None
+
+    async def asave_state(self, session_id: str, state: Dict[str, Any]):
+        _, history_key, _ = self._keys(session_id)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                for _ in range(self.SAVE_ATTEMPTS):
+                    try:
+                        persisted = state.get(PERSISTED_KEY)
+                        if persisted:
+                            await pipe.watch(history_key)
+                            if not self._history_unchanged(
+                                persisted, await pipe.llen(history_key), await pipe.lindex(history_key, -1)
+                            ):
+                                # 다른 턴이 먼저 저장함: append하면 중복/뒤섞임 -> 이 턴 상태로 다시 씀
+                                state = self._as_rewrite(state)
+                        pipe.multi()
+                        self._queue_save(pipe, session_id, state)
+                        await pipe.execute()
+                        return
+                    except redis.WatchError:
+                        state = self._as_rewrite(state)
+                logger.warning("Session %s not saved: history kept changing concurrently", session_id)
+        except redis.RedisError as e:
+            logger.warning("Redis save_state error for %s: %s", session_id, e)
+        except (TypeError, ValueError) as e:
+            logger.warning("JSON encode error for session %s: %s", session_id, e)
+
+    async def adelete_state(self, session_id: str):
+        try:
+            await self.client.delete(*self._keys(session_id), self._legacy_key(session_id))
+        except redis.RedisError as e:
+            logger.warning("Redis delete_state error for %s: %s", session_id, e)
+
+    # --- sync API (same layout) ---
+
+    def _get_sync_client(self):
+        if self._sync_client is None:
+            if self.settings.redis_url:
+                self._sync_client = redis.from_url(self.settings.redis_url)
+            else:
+                self._sync_client = redis.Redis(**_redis_connection_kwargs(self.settings))
+        return self._sync_client
+
+    def get_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            pipe = self._get_sync_client().pipeline(transaction=False)
+            self._queue_load(pipe, session_id)
+            return self._parse_load(pipe.execute())
+        except redis.RedisError as e:
+            logger.warning("Redis get_state error for %s: %s", session_id, e)
+            return None
+        except (json.JSONDecodeError, zlib.error) as e:
+            logger.warning("Session decode error for %s: %s", session_id, e)
+            return None
+
+    def save_state(self, session_id: str, state: Dict[str, Any]):
+        _, history_key, _ = self._keys(session_id)
+        try:
+            with self._get_sync_client().pipeline(transaction=True) as pipe:
+                for _ in range(self.SAVE_ATTEMPTS):
+                    try:
+                        persisted = state.get(PERSISTED_KEY)
+                        if persisted:
+                            pipe.watch(history_key)
+                            if not self._history_unchanged(
+                                persisted, pipe.llen(history_key), pipe.lindex(history_key, -1)
+                            ):
+                                state = self._as_rewrite(state)
+                        pipe.multi()
+                        self._queue_save(pipe, session_id, state)
+                        pipe.execute()
+                        return
+                    except redis.WatchError:
+                        state = self._as_rewrite(state)
+                logger.warning("Session %s not saved: history kept changing concurrently", session_id)
+        except redis.RedisError as e:
+            logger.warning("Redis save_state error for %s: %s", session_id, e)
+        except (TypeError, ValueError) as e:
+            logger.warning("JSON encode error for session %s: %s", session_id, e)
+
+    def delete_state(self, session_id: str):
+        try:
+            self._get_sync_client().delete(*self._keys(session_id), self._legacy_key(session_id))
+        except redis.RedisError as e:
+            logger.warning("Redis delete_state error for %s: %s", session_id, e)
+
+    def create_new_session_id(self) -> str:
+        return str(uuid.uuid4())
+
+
 def create_conversation_store() -> ConversationStore:
     """
     Factory function to create the appropriate conversation store.
 
     Returns:
-        - RedisConversationStore if use_redis_session=True and Redis is available
+        - AsyncRedisConversationStore if use_redis_session=True and Redis is available
         - InMemoryConversationStore otherwise (fallback for dev/testing)
     """
     settings = get_settings()
 
     if settings.use_redis_session:
         try:
-            store = RedisConversationStore(settings)
-            logger.info("Using RedisConversationStore for session management")
+            # 연결 확인은 동기 ping으로 (팩토리는 이벤트 루프 밖에서 호출됨)
+            RedisConversationStore(settings).redis_client.close()
+            store = AsyncRedisConversationStore(settings)
+            logger.info("Using AsyncRedisConversationStore for session management")
             return store
         except Exception as e:
             logger.warning("Failed to initialize Redis: %s", e)
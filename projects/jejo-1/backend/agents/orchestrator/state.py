@@ -11,6 +11,7 @@ class OrchestratorGraphState(TypedDict, total=False):
     conversation_history: List[Dict[str, str]]
     active_agent: Optional[str]
     agent_specific_state: Dict[str, Any]
+    session_persisted: Optional[Dict[str, Any]] # Snapshot returned by the session store on load; lets the save write only what changed.
     orchestrator_response: Optional[Dict[str, Any]] # The raw output from the selected agent, before final normalization
     llm_intent_classification: Optional[Dict[str, Any]] # Raw output from LLM intent classification for debugging/tracing.
     selected_agent_name: Optional[str] # The name of the agent chosen by the orchestrator for the current turn.
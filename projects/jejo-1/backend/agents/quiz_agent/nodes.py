@@ -7,7 +7,6 @@ import re
 import hashlib
 from typing import Dict, Any, List, Optional, cast
 import openai
-from openai import AsyncOpenAI
 
 # Ensure backend directory is in path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,6 +16,7 @@ sys.path.append(project_root)
 # Local imports
 from backend.config import get_settings
 from backend.utils.logger import get_logger
+from backend.utils.llm_gateway import get_llm_gateway
 # RAG functionality now provided by tools.py
 from backend.agents.quiz_agent.state import QuizGraphState
 
@@ -281,10 +281,7 @@ class QuizAgentComponents:
 
         self.llm = None
         if self.settings.upstage_api_key:
-            self.llm = AsyncOpenAI(
-                base_url="https://api.upstage.ai/v1",
-                api_key=self.settings.upstage_api_key
-            )
+            self.llm = get_llm_gateway().client("quiz")
         else:
             logger.warning("UPSTAGE_API_KEY is not set for QuizAgent. LLM calls will fail.")
         
@@ -300,7 +297,7 @@ QUIZ_AGENT_COMPONENTS = QuizAgentComponents()
 
 # --- Node Functions ---
 
-def perform_rag_search_node(state: QuizGraphState) -> Dict[str, Any]:
+async def perform_rag_search_node(state: QuizGraphState) -> Dict[str, Any]:
     state_dict = cast(Dict[str, Any], state)
 
     user_input = state_dict["user_input"]
@@ -317,7 +314,7 @@ def perform_rag_search_node(state: QuizGraphState) -> Dict[str, Any]:
     from backend.agents.quiz_agent.tools import search_trade_documents
 
     try:
-        retrieved_documents = search_trade_documents.invoke(
+        retrieved_documents = await search_trade_documents.ainvoke(
             {
                 "query": rag_query,
                 "k": 6,
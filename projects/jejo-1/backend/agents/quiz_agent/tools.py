@@ -14,7 +14,12 @@ import threading
 from typing import List, Dict, Any, Optional
 from langchain.tools import tool
 from backend.rag.retriever import search as rag_search
-from backend.rag.retriever import search_with_filter
+from backend.rag.retriever import (
+    aembed_query,
+    embed_query,
+    run_in_retrieval_executor,
+    search_filter_groups,
+)
 from backend.config import get_settings
 
 
@@ -65,6 +70,70 @@ def _run_async(coro: Any) -> Any:
     return result_holder.get("value")
 
 
+def _search_trade_documents(
+    query: str,
+    k: int,
+    document_type: Optional[str],
+    category: Optional[str],
+    query_embedding: List[float]
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    preferred_doc_types = [
+        "trade_terminology",
+        "terminology",
+        "faq",
+        "quiz_question",
+    ]
+
+    if document_type:
+        filter_groups = [{"document_type": document_type, "category": category}]
+        group_k = max(k, 3)
+    else:
+        filter_groups = [
+            {"document_type": doc_type, "category": category}
+            for doc_type in preferred_doc_types
+        ]
+        # Category-only probe (if requested by caller)
+        if category:
+            filter_groups.append({"category": category})
+        group_k = max(1, min(3, k))
+
+    for docs in search_filter_groups(
+        query=query,
+        filter_groups=filter_groups,
+        k=group_k,
+        query_embedding=query_embedding,
+    ):
+        results.extend(docs)
+
+    results = _dedupe_and_rank(results, k=max(k, 5))
+
+    if not results:
+        # Conservative fallback: run broad search then keep quiz-relevant doc types only.
+        broad = rag_search(query=query, k=max(k, 8), query_embedding=query_embedding)
+        filtered = [
+            doc for doc in broad
+            if str(doc.get("metadata", {}).get("document_type", "")).lower()
+            in set(preferred_doc_types)
+        ]
+        results = filtered if filtered else broad
+
+    results = _dedupe_and_rank(results, k=k)
+
+    # Format results
+    formatted_results = []
+    for doc in results:
+        formatted_results.append({
+            "document": doc["document"],
+            "metadata": doc.get("metadata", {}),
+            "source_dataset": doc.get("metadata", {}).get("source_dataset", "unknown"),
+            "document_type": doc.get("metadata", {}).get("document_type", "unknown"),
+            "topics": doc.get("metadata", {}).get("topic", [])
+        })
+
+    return formatted_results
+
+
 @tool
 def search_trade_documents(
     query: str,
@@ -94,77 +163,40 @@ def search_trade_documents(
     get_settings()  # settings access kept for side effects / config validation
 
     try:
-        results: List[Dict[str, Any]] = []
-        preferred_doc_types = [
-            "trade_terminology",
-            "terminology",
-            "faq",
-            "quiz_question",
-        ]
+        # 쿼리 임베딩은 1회만 만들고 타입별 검색/fallback 검색에 재사용
+        query_embedding = embed_query(query)
+        if query_embedding is None:
+            return []
+        return _search_trade_documents(query, k, document_type, category, query_embedding)
+    except Exception as e:
+        print(f"Error in search_trade_documents: {e}")
+        return []
 
-        if document_type:
-            results.extend(
-                search_with_filter(
-                    query=query,
-                    k=max(k, 3),
-                    document_type=document_type,
-                    category=category,
-                )
-            )
-        else:
-            per_type_k = max(1, min(3, k))
-            for doc_type in preferred_doc_types:
-                results.extend(
-                    search_with_filter(
-                        query=query,
-                        k=per_type_k,
-                        document_type=doc_type,
-                        category=category,
-                    )
-                )
-
-            # Category-only probe (if requested by caller)
-            if category:
-                results.extend(
-                    search_with_filter(
-                        query=query,
-                        k=per_type_k,
-                        category=category,
-                    )
-                )
-
-        results = _dedupe_and_rank(results, k=max(k, 5))
-
-        if not results:
-            # Conservative fallback: run broad search then keep quiz-relevant doc types only.
-            broad = rag_search(query=query, k=max(k, 8))
-            filtered = [
-                doc for doc in broad
-                if str(doc.get("metadata", {}).get("document_type", "")).lower()
-                in set(preferred_doc_types)
-            ]
-            results = filtered if filtered else broad
-
-        results = _dedupe_and_rank(results, k=k)
-
-        # Format results
-        formatted_results = []
-        for doc in results:
-            formatted_results.append({
-                "document": doc["document"],
-                "metadata": doc.get("metadata", {}),
-                "source_dataset": doc.get("metadata", {}).get("source_dataset", "unknown"),
-                "document_type": doc.get("metadata", {}).get("document_type", "unknown"),
-                "topics": doc.get("metadata", {}).get("topic", [])
-            })
-
-        return formatted_results
 
+async def _asearch_trade_documents(
+    query: str,
+    k: int = 3,
+    document_type: Optional[str] = None,
+    category: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """`search_trade_documents.ainvoke`: async embedding, Chroma on the retrieval pool."""
+    get_settings()
+
+    try:
+        query_embedding = await aembed_query(query)
+        if query_embedding is None:
+            return []
+        return await run_in_retrieval_executor(
+            _search_trade_documents, query, k, document_type, category, query_embedding
+        )
     except Exception as e:
         print(f"Error in search_trade_documents: {e}")
         return []
 
 
+search_trade_documents.coroutine = _asearch_trade_documents
+
+
 @tool
 def validate_quiz_quality(quiz_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -213,35 +245,65 @@ def validate_quiz_quality(quiz_data: Dict[str, Any]) -> Dict[str, Any]:
             }
 
         # Run EvalTool validation
-        validation_results = _run_async(evaluate_quiz_list(questions))
-        if not isinstance(validation_results, list):
-            raise TypeError("evaluate_quiz_list must return a list")
-
-        # Aggregate results
-        total = len(validation_results)
-        valid_count = sum(1 for r in validation_results if r.get("is_valid", False))
-        all_issues = []
-
-        for i, result in enumerate(validation_results):
-            if not result.get("is_valid", False):
-                issues = result.get("issues", [])
-                all_issues.append(f"Question {i+1}: {', '.join(issues)}")
-
-        return {
-            "is_valid": valid_count == total,
-            "total_questions": total,
-            "valid_questions": valid_count,
-            "issues": all_issues
-        }
+        return _summarize_validation(_run_async(evaluate_quiz_list(questions)))
 
     except Exception as e:
         print(f"Error in validate_quiz_quality: {e}")
-        return {
-            "is_valid": False,
-            "total_questions": 0,
-            "valid_questions": 0,
-            "issues": [f"Validation error: {str(e)}"]
-        }
+        return _validation_error(e)
+
+
+async def _avalidate_quiz_quality(quiz_data: Dict[str, Any]) -> Dict[str, Any]:
+    """`validate_quiz_quality.ainvoke`: awaits EvalTool on the caller's loop (no helper thread/loop)."""
+    try:
+        from backend.agents.eval_agent import evaluate_quiz_list
+
+        questions = quiz_data.get("questions", [])
+        if not questions:
+            return {
+                "is_valid": False,
+                "total_questions": 0,
+                "valid_questions": 0,
+                "issues": ["No questions provided"]
+            }
+        return _summarize_validation(await evaluate_quiz_list(questions))
+
+    except Exception as e:
+        print(f"Error in validate_quiz_quality: {e}")
+        return _validation_error(e)
+
+
+validate_quiz_quality.coroutine = _avalidate_quiz_quality
+
+
+def _summarize_validation(validation_results: Any) -> Dict[str, Any]:
+    if not isinstance(validation_results, list):
+        raise TypeError("evaluate_quiz_list must return a list")
+
+    # Aggregate results
+    total = len(validation_results)
+    valid_count = sum(1 for r in validation_results if r.get("is_valid", False))
+    all_issues = []
+
+    for i, result in enumerate(validation_results):
+        if not result.get("is_valid", False):
+            issues = result.get("issues", [])
+            all_issues.append(f"Question {i+1}: {', '.join(issues)}")
+
+    return {
+        "is_valid": valid_count == total,
+        "total_questions": total,
+        "valid_questions": valid_count,
+        "issues": all_issues
+    }
+
+
+def _validation_error(error: Exception) -> Dict[str, Any]:
+    return {
+        "is_valid": False,
+        "total_questions": 0,
+        "valid_questions": 0,
+        "issues": [f"Validation error: {str(error)}"]
+    }
 
 
 @tool
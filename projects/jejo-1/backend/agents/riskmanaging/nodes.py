@@ -6,15 +6,15 @@ from __future__ import annotations # Added as per instruction
 import os
 import sys
 import json
+import asyncio
 import uuid
 import time
-from typing import Dict, Any, List, Optional, cast, TypedDict
+import threading
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Sequence, TypeVar, cast, TypedDict
 from backend.utils.json_utils import safe_json_parse
 import openai
-from openai import AsyncOpenAI
 from langsmith import traceable
 import numpy as np
-from numpy.linalg import norm
 
 # Ensure backend directory is in path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -24,8 +24,17 @@ sys.path.append(project_root)
 # Local imports (minimal as most will be internal)
 from backend.config import get_settings
 from backend.utils.logger import get_logger
+from backend.utils.llm_gateway import UPSTAGE_SOLAR_BASE_URL, get_llm_gateway
 # RAG functionality now provided by tools.py
-from backend.rag.embedder import get_embedding
+from backend.rag.embedder import (
+    aget_embedding,
+    embedding_model_key,
+    get_embeddings,
+    local_hash_embeddings,
+    local_model_key,
+)
+from backend.rag.embedding_cache import cached_embedding_matrix
+from backend.rag.retriever import run_in_retrieval_executor
 from pydantic import BaseModel, Field
 
 # Import RiskManagingGraphState explicitly and minimally
@@ -39,6 +48,7 @@ from backend.agents.riskmanaging.state import (
     ControlGapAnalysis, PreventionStrategy, ReportRiskFactor # Added ReportRiskFactor
 )
 logger = get_logger(__name__)
+T = TypeVar("T")
 
 # --- Prompt Loader ---
 def _load_prompt(prompt_file_name: str) -> str:
@@ -326,51 +336,60 @@ CONFIDENCE_SCORE_PROMPT = """
 class SimilarityEngine:
     """
     Checks if user input is similar to risk-related topics using cosine similarity.
-    Uses pre-computed embeddings of risk trigger phrases.
+    Reference phrase embeddings come from the on-disk embedding cache as one
+    normalized matrix, so scoring is a single matrix-vector (or matrix-matrix) product.
+    Queries are embedded in the same vector space as the reference matrix; if the
+    Upstage query request fails, scoring falls back to the local-hash engine rather
+    than comparing vectors from two models.
+    Use `get_similarity_engine()` to share one instance per embedding model.
     """
-    def __init__(self):
+    # Pre-defined risk-related reference phrases
+    REFERENCE_PHRASES = [
+        "선적 지연 발생",
+        "클레임 발생 가능성",
+        "계약 위반 우려",
+        "페널티 조항 확인",
+        "리스크 분석 필요",
+        "손실 예상",
+        "문제 발생",
+        "invoice 오류",
+        "HS code 문제",
+        "payment 지연",
+        "리스크 평가 기준",
+        "점수 산출 방법",
+        "분석 절차 문의",
+        "영향도 계산",
+        "발생 가능성 판단"
+    ]
+
+    def __init__(self, reference_phrases: Optional[List[str]] = None, model_key: Optional[str] = None):
         self.settings = get_settings()
-        # Pre-defined risk-related reference phrases
-        self.reference_phrases = [
-            "선적 지연 발생",
-            "클레임 발생 가능성",
-            "계약 위반 우려",
-            "페널티 조항 확인",
-            "리스크 분석 필요",
-            "손실 예상",
-            "문제 발생",
-            "invoice 오류",
-            "HS code 문제",
-            "payment 지연",
-            "리스크 평가 기준",
-            "점수 산출 방법",
-            "분석 절차 문의",
-            "영향도 계산",
-            "발생 가능성 판단"
-        ]
-        self.reference_embeddings = []
-        self._initialize_embeddings()
-    
-    def _initialize_embeddings(self):
-        """Pre-compute embeddings for reference phrases"""
-        logger.debug("SimilarityEngine: initializing reference embeddings")
-        for phrase in self.reference_phrases:
-            embedding = get_embedding(phrase)
-            if embedding:
-                self.reference_embeddings.append(embedding)
+        self.reference_phrases = list(reference_phrases or self.REFERENCE_PHRASES)
+        self.model_key, self.reference_matrix = cached_embedding_matrix(
+            self.reference_phrases, model_key=model_key
+        )
+        # 참조 행렬이 로컬 해시 공간이면 질의도 같은 차원의 로컬 해시로 임베딩
+        self.local_dim = (
+            int(self.model_key.split(":", 1)[1]) if self.model_key.startswith("local-hash:") else None
+        )
         logger.debug(
-            "SimilarityEngine: loaded %s reference embeddings",
-            len(self.reference_embeddings),
+            "SimilarityEngine: loaded %s reference embeddings (%s)",
+            len(self.reference_matrix),
+            self.model_key,
         )
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors"""
-        if not vec1 or not vec2:
-            return 0.0
-        vec1_np = np.array(vec1)
-        vec2_np = np.array(vec2)
-        return float(np.dot(vec1_np, vec2_np) / (norm(vec1_np) * norm(vec2_np)))
-    
+
+    def _max_scores(self, embeddings: np.ndarray) -> np.ndarray:
+        """Max cosine similarity to any reference phrase, one value per row of `embeddings`."""
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.reference_matrix.shape[1]:
+            return np.zeros(len(embeddings), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1)
+        norms[norms == 0] = 1.0
+        return (embeddings @ self.reference_matrix.T).max(axis=1) / norms
+
+    def _result(self, score: float, return_score: bool):
+        is_similar = score >= SIMILARITY_THRESHOLD
+        return (is_similar, score) if return_score else is_similar
+
     def check_similarity(self, user_input: str, return_score: bool = False):
         """
         Check if user input is similar to risk-related topics.
@@ -382,24 +401,96 @@ class SimilarityEngine:
         Returns:
             bool or tuple: Similarity check result
         """
-        if not self.reference_embeddings:
+        if self.local_dim:
+            return self._score(self._local_embeddings([user_input])[0], return_score)
+        embedding = get_embeddings([user_input], fallback=False)[0]
+        if embedding is None and user_input and user_input.strip():
+            return self._local_engine().check_similarity(user_input, return_score)
+        return self._score(embedding, return_score)
+
+    async def acheck_similarity(self, user_input: str, return_score: bool = False):
+        """Async `check_similarity` (embedding via the pooled async HTTP client)."""
+        if self.local_dim:
+            return self._score(self._local_embeddings([user_input])[0], return_score)
+        embedding = await aget_embedding(user_input, fallback=False)
+        if embedding is None and user_input and user_input.strip():
+            return self._local_engine().check_similarity(user_input, return_score)
+        return self._score(embedding, return_score)
+
+    def check_similarity_batch(self, user_inputs: List[str]) -> List[tuple]:
+        """
+        `check_similarity(..., return_score=True)` for many inputs: one batched
+        embedding request and one matrix product.
+        """
+        if not user_inputs:
+            return []
+        if self.local_dim:
+            embeddings = self._local_embeddings(user_inputs)
+        else:
+            embeddings = get_embeddings(list(user_inputs), fallback=False)
+        scores = [0.0] * len(user_inputs)
+        rows = [index for index, embedding in enumerate(embeddings) if embedding is not None]
+        if rows and self.reference_matrix.size:
+            matrix = np.asarray([embeddings[index] for index in rows], dtype=np.float32)
+            for index, score in zip(rows, self._max_scores(matrix)):
+                scores[index] = float(score)
+        failed = [
+            index
+            for index, (text, embedding) in enumerate(zip(user_inputs, embeddings))
+            if embedding is None and text and text.strip()
+        ]
+        if failed:
+            fallback = self._local_engine().check_similarity_batch([user_inputs[index] for index in failed])
+            for index, (_, score) in zip(failed, fallback):
+                scores[index] = score
+        return [self._result(score, True) for score in scores]
+
+    def _local_embeddings(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        rows = [index for index, text in enumerate(texts) if text and text.strip()]
+        if rows:
+            matrix = local_hash_embeddings([texts[index] for index in rows], self.local_dim)
+            for index, row in zip(rows, matrix):
+                embeddings[index] = row
+        return embeddings
+
+    def _local_engine(self) -> "SimilarityEngine":
+        logger.warning("SimilarityEngine: Upstage query embedding failed; scoring with %s", local_model_key())
+        return get_similarity_engine(local_model_key())
+
+    def _score(self, user_embedding: Optional[Sequence[float]], return_score: bool):
+        if not self.reference_matrix.size:
             logger.warning("SimilarityEngine: no reference embeddings available")
             return (False, 0.0) if return_score else False
-        
-        user_embedding = get_embedding(user_input)
-        if not user_embedding:
+        if user_embedding is None or len(user_embedding) == 0:
             return (False, 0.0) if return_score else False
         
-        max_similarity = 0.0
-        for ref_embedding in self.reference_embeddings:
-            similarity = self._cosine_similarity(user_embedding, ref_embedding)
-            max_similarity = max(max_similarity, similarity)
-        
-        is_similar = max_similarity >= SIMILARITY_THRESHOLD
-        
-        if return_score:
-            return is_similar, max_similarity
-        return is_similar
+        vector = np.asarray(user_embedding, dtype=np.float32)[np.newaxis, :]
+        return self._result(float(self._max_scores(vector)[0]), return_score)
+
+
+_similarity_engines: Dict[str, SimilarityEngine] = {}
+_similarity_engine_lock = threading.Lock()
+
+
+def get_similarity_engine(model_key: Optional[str] = None) -> SimilarityEngine:
+    """
+    Shared SimilarityEngine for `model_key` (default: the configured embedding
+    model), built once from the disk cache.
+
+    Engines are cached under the key their reference matrix was actually built
+    with: if Upstage failed and the matrix fell back to local hash vectors, the
+    engine is only cached as the local one, and the next call retries Upstage.
+    """
+    model_key = model_key or embedding_model_key()
+    engine = _similarity_engines.get(model_key)
+    if engine is None:
+        with _similarity_engine_lock:
+            engine = _similarity_engines.get(model_key)
+            if engine is None:
+                engine = SimilarityEngine(model_key=model_key)
+                engine = _similarity_engines.setdefault(engine.model_key, engine)
+    return engine
 
 
 class ConversationManager:
@@ -409,10 +500,7 @@ class ConversationManager:
     """
     def __init__(self):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(
-            api_key=self.settings.upstage_api_key,
-            base_url="https://api.upstage.ai/v1/solar"
-        )
+        self.client = get_llm_gateway().client("riskmanaging", base_url=UPSTAGE_SOLAR_BASE_URL)
     
     async def assess_conversation_progress(self, agent_input: RiskManagingAgentInput, extracted_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -508,24 +596,11 @@ class RAGConnector:
         Returns:
             List of retrieved documents with metadata
         """
-        # Build full query context
-        full_query = user_input
-        if conversation_history:
-            recent_context = " ".join([
-                turn.get("content", "")
-                for turn in conversation_history[-3:]  # Last 3 turns
-            ])
-            full_query = f"{recent_context} {user_input}"
-        
         # Use tool: search_risk_cases
         from backend.agents.riskmanaging.tools import search_risk_cases
 
         filtered_documents = search_risk_cases.invoke(
-            {
-                "query": full_query,
-                "k": k,
-                "datasets": RAG_DATASETS,
-            }
+            self._build_tool_input(user_input, conversation_history, k)
         )
 
         logger.debug(
@@ -533,6 +608,45 @@ class RAGConnector:
             len(filtered_documents),
         )
         return filtered_documents
+
+    async def aget_risk_documents(
+        self,
+        user_input: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        k: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Async `get_risk_documents` for the graph nodes (does not block the event loop)."""
+        from backend.agents.riskmanaging.tools import search_risk_cases
+
+        filtered_documents = await search_risk_cases.ainvoke(
+            self._build_tool_input(user_input, conversation_history, k)
+        )
+
+        logger.debug(
+            "RAGConnector: retrieved %s risk-related documents",
+            len(filtered_documents),
+        )
+        return filtered_documents
+
+    def _build_tool_input(
+        self,
+        user_input: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        k: int
+    ) -> Dict[str, Any]:
+        # Build full query context
+        full_query = user_input
+        if conversation_history:
+            recent_context = " ".join([
+                turn.get("content", "")
+                for turn in conversation_history[-3:]  # Last 3 turns
+            ])
+            full_query = f"{recent_context} {user_input}"
+        return {
+            "query": full_query,
+            "k": k,
+            "datasets": RAG_DATASETS,
+        }
     
     def extract_similar_cases_and_evidence(
         self, 
@@ -578,10 +692,7 @@ class RiskEngine:
     """
     def __init__(self):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(
-            api_key=self.settings.upstage_api_key,
-            base_url="https://api.upstage.ai/v1/solar"
-        )
+        self.client = get_llm_gateway().client("riskmanaging", base_url=UPSTAGE_SOLAR_BASE_URL)
     
     async def evaluate_risk(
         self,
@@ -668,16 +779,18 @@ class RiskEngine:
             )
 
 
+def _section_failure_label(subject: str, status: str) -> str:
+    """부분 리포트 섹션 문구: 타임아웃과 오류를 구분 ("분석 시간 초과" / "분석 중 오류 발생")"""
+    return f"{subject} 시간 초과" if status == "timeout" else f"{subject} 중 오류 발생"
+
+
 class ReportGenerator:
     """
     Generates comprehensive risk analysis report.
     """
     def __init__(self):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(
-            api_key=self.settings.upstage_api_key,
-            base_url="https://api.upstage.ai/v1/solar"
-        )
+        self.client = get_llm_gateway().client("riskmanaging", base_url=UPSTAGE_SOLAR_BASE_URL)
     
     @traceable(name="report_generator_generate")
     async def generate_report(
@@ -704,17 +817,53 @@ class ReportGenerator:
             RiskReport object
         """
         self.user_profile = user_profile # Store for private methods
-        # Generate input summary
-        input_summary = await self._generate_input_summary(agent_input)
-        
-        # Generate loss simulation
-        loss_simulation = await self._generate_loss_simulation(risk_scoring)
-        
-        # Generate control gap analysis
-        control_gap_analysis = await self._generate_control_gap_analysis(risk_scoring)
-        
-        # Generate prevention strategy
-        prevention_strategy = await self._generate_prevention_strategy(risk_scoring, control_gap_analysis)
+        started = time.perf_counter()
+        concurrency = max(1, int(self.settings.report_section_concurrency))
+        semaphore = asyncio.Semaphore(concurrency)
+        section_timings: Dict[str, Dict[str, Any]] = {}
+
+        async def gap_then_prevention():
+            # 예방 전략만 통제 공백 분석 결과에 의존 -> 이 체인만 직렬
+            gaps = await self._run_section(
+                "control_gap_analysis",
+                lambda: self._generate_control_gap_analysis(risk_scoring),
+                lambda status: ControlGapAnalysis(
+                    identified_gaps=[_section_failure_label("분석", status)], recommendations=[]
+                ),
+                semaphore,
+                section_timings,
+            )
+            strategy = await self._run_section(
+                "prevention_strategy",
+                lambda: self._generate_prevention_strategy(risk_scoring, gaps),
+                lambda status: PreventionStrategy(
+                    short_term=[_section_failure_label("전략 생성", status)], long_term=[]
+                ),
+                semaphore,
+                section_timings,
+            )
+            return gaps, strategy
+
+        # 독립 섹션은 동시에 생성 (전체 지연 ~= LLM 호출 2회)
+        input_summary, loss_simulation, (control_gap_analysis, prevention_strategy) = await asyncio.gather(
+            self._run_section(
+                "input_summary",
+                lambda: self._generate_input_summary(agent_input),
+                lambda status: agent_input.user_input,
+                semaphore,
+                section_timings,
+            ),
+            self._run_section(
+                "loss_simulation",
+                lambda: self._generate_loss_simulation(risk_scoring),
+                lambda status: LossSimulation(
+                    quantitative=None, qualitative=_section_failure_label("손실 시뮬레이션 생성", status)
+                ),
+                semaphore,
+                section_timings,
+            ),
+            gap_then_prevention(),
+        )
         
         # Calculate confidence score
         confidence_score = self._calculate_confidence_score(risk_scoring, rag_documents)
@@ -738,8 +887,40 @@ class ReportGenerator:
             prevention_strategy=prevention_strategy,
             similar_cases=similar_cases,
             confidence_score=confidence_score,
-            evidence_sources=evidence_sources
+            evidence_sources=evidence_sources,
+            generation_metadata={
+                "total_seconds": round(time.perf_counter() - started, 3),
+                "section_concurrency": concurrency,
+                "partial": any(timing["status"] != "ok" for timing in section_timings.values()),
+                "sections": section_timings,
+            },
         )
+
+    async def _run_section(
+        self,
+        name: str,
+        generate: Callable[[], Awaitable[T]],
+        fallback: Callable[[str], T],
+        semaphore: asyncio.Semaphore,
+        timings: Dict[str, Dict[str, Any]],
+    ) -> T:
+        """섹션 하나를 동시성 제한/타임아웃 안에서 생성 (실패 시 fallback(status)로 부분 리포트 유지)"""
+        timeout = self.settings.report_section_timeout_seconds
+        async with semaphore:
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                result = await asyncio.wait_for(generate(), timeout=timeout if timeout > 0 else None)
+            except asyncio.TimeoutError:
+                logger.warning("Report section %s timed out after %.1fs", name, timeout)
+                status = "timeout"
+                result = fallback(status)
+            except Exception as e:
+                logger.warning("Report section %s failed: %s", name, e)
+                status = "error"
+                result = fallback(status)
+            timings[name] = {"seconds": round(time.perf_counter() - started, 3), "status": status}
+        return result
     
     async def _generate_input_summary(self, agent_input: RiskManagingAgentInput) -> str:
         """Generate concise summary of user input"""
@@ -988,7 +1169,7 @@ def prepare_risk_state_node(state: RiskManagingGraphState) -> Dict[str, Any]:
     }
 
 # Node function for detecting trigger words and similarity
-def detect_trigger_and_similarity_node(state: RiskManagingGraphState) -> Dict[str, Any]:
+async def detect_trigger_and_similarity_node(state: RiskManagingGraphState) -> Dict[str, Any]:
     logger.debug("risk node: detect_trigger_and_similarity")
     user_input = state.get("current_user_input", "")
     
@@ -1001,8 +1182,9 @@ def detect_trigger_and_similarity_node(state: RiskManagingGraphState) -> Dict[st
             break
     
     # Similarity detection
-    similarity_engine = SimilarityEngine() # Initialize here
-    is_similar, similarity_score = similarity_engine.check_similarity(user_input, return_score=True)
+    # 첫 호출만 참조 문구 임베딩을 디스크 캐시에서 읽거나 계산함 (블로킹이라 retrieval 스레드에서)
+    similarity_engine = await run_in_retrieval_executor(get_similarity_engine)
+    is_similar, similarity_score = await similarity_engine.acheck_similarity(user_input, return_score=True)
     
     analysis_required = trigger_detected or is_similar
     
@@ -1068,7 +1250,7 @@ async def perform_full_analysis_node(state: RiskManagingGraphState) -> Dict[str,
 
     # 1. RAG Connector
     rag_connector = RAGConnector()
-    rag_documents = rag_connector.get_risk_documents(user_input, conversation_history)
+    rag_documents = await rag_connector.aget_risk_documents(user_input, conversation_history)
     extracted_info = rag_connector.extract_similar_cases_and_evidence(rag_documents)
     similar_cases = extracted_info["similar_cases"]
     evidence_sources = extracted_info["evidence_sources"]
@@ -1174,10 +1356,8 @@ def handle_risk_error_node(state: RiskManagingGraphState, error: Exception) -> D
 class RISKMANAGING_COMPONENTS:
         def __init__(self):
             # Initialize all stateless components here if they are truly stateless
-            # For stateful components like SimilarityEngine that need pre-computed embeddings,
-            # it's better to instantiate them directly in the nodes or ensure they are properly
-            # initialized if passed around. Given the current design, re-instantiating in nodes
-            # is fine for now as it ensures fresh state for each node execution.
+            # SimilarityEngine needs pre-computed reference embeddings; nodes share one
+            # instance per embedding model via get_similarity_engine() (disk-cached vectors).
             pass
 
     # Assuming backend.rag.retriever.search_with_filter is correctly imported or mocked for testing
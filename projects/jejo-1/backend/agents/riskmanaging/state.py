@@ -83,6 +83,7 @@ class RiskReport(BaseModel):
     similar_cases: List[Dict[str, Any]] = Field([], description="RAG를 통해 조회된 유사 사례") # Changed default
     confidence_score: float = Field(..., ge=0.0, le=1.0, description="분석 결과에 대한 에이전트의 신뢰도 (0.0 ~ 1.0)")
     evidence_sources: List[str] = Field([], description="분석에 활용된 근거 문서 출처") # Changed default
+    generation_metadata: Dict[str, Any] = Field({}, description="리스크 보고서 섹션별 생성 시간/상태 및 전체 소요 시간")
 
 class RiskManagingAgentResponse(BaseModel):
     response: str = Field(..., description="에이전트의 최종 응답 (JSON 문자열)")
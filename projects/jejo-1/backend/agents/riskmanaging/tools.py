@@ -13,7 +13,12 @@ import json
 from typing import List, Dict, Any, Optional
 from langchain.tools import tool
 from backend.rag.retriever import search as rag_search
-from backend.rag.retriever import search_with_filter
+from backend.rag.retriever import (
+    aembed_query,
+    embed_query,
+    run_in_retrieval_executor,
+    search_filter_groups,
+)
 from backend.config import get_settings
 
 
@@ -65,6 +70,63 @@ def _dedupe_and_rank(results: List[Dict[str, Any]], k: int) -> List[Dict[str, An
     return deduped
 
 
+def _search_risk_cases(
+    query: str,
+    k: int,
+    datasets: Optional[List[str]],
+    query_embedding: List[float]
+) -> List[Dict[str, Any]]:
+    requested_datasets = datasets if datasets is not None else RAG_DATASETS
+    normalized_dataset_tokens = [str(item).strip().lower() for item in requested_datasets]
+
+    requested_doc_types = set()
+    for token in normalized_dataset_tokens:
+        requested_doc_types.update(DATASET_TO_DOC_TYPES.get(token, []))
+
+    if not requested_doc_types:
+        requested_doc_types.update(FALLBACK_RISK_DOC_TYPES)
+
+    results: List[Dict[str, Any]] = []
+    per_type_k = max(1, min(3, k))
+    for docs in search_filter_groups(
+        query=query,
+        filter_groups=[{"document_type": doc_type} for doc_type in sorted(requested_doc_types)],
+        k=per_type_k,
+        query_embedding=query_embedding,
+    ):
+        results.extend(docs)
+
+    results = _dedupe_and_rank(results, k=max(k, 8))
+
+    if not results:
+        broad = rag_search(query=query, k=max(k, 10), query_embedding=query_embedding)
+        allowed_doc_types = {doc_type.lower() for doc_type in requested_doc_types}
+        filtered = [
+            doc
+            for doc in broad
+            if str(doc.get("metadata", {}).get("document_type", "")).lower() in allowed_doc_types
+        ]
+        results = filtered if filtered else broad
+
+    results = _dedupe_and_rank(results, k=k)
+
+    # Format results
+    formatted_results = []
+    for doc in results:
+            formatted_results.append({
+                "document": doc["document"],
+                "metadata": doc.get("metadata", {}),
+                "source": doc.get("metadata", {}).get("source_dataset", "unknown"),
+                "category": (
+                    doc.get("metadata", {}).get("original_category")
+                    or doc.get("metadata", {}).get("category", "unknown")
+                ),
+                "priority": doc.get("metadata", {}).get("priority", "medium")
+            })
+
+    return formatted_results
+
+
 @tool
 def search_risk_cases(
     query: str,
@@ -93,62 +155,39 @@ def search_risk_cases(
     get_settings()  # settings access kept for side effects / config validation
 
     try:
-        requested_datasets = datasets if datasets is not None else RAG_DATASETS
-        normalized_dataset_tokens = [str(item).strip().lower() for item in requested_datasets]
-
-        requested_doc_types = set()
-        for token in normalized_dataset_tokens:
-            requested_doc_types.update(DATASET_TO_DOC_TYPES.get(token, []))
-
-        if not requested_doc_types:
-            requested_doc_types.update(FALLBACK_RISK_DOC_TYPES)
-
-        results: List[Dict[str, Any]] = []
-        per_type_k = max(1, min(3, k))
-        for doc_type in sorted(requested_doc_types):
-            results.extend(
-                search_with_filter(
-                    query=query,
-                    k=per_type_k,
-                    document_type=doc_type,
-                )
-            )
-
-        results = _dedupe_and_rank(results, k=max(k, 8))
-
-        if not results:
-            broad = rag_search(query=query, k=max(k, 10))
-            allowed_doc_types = {doc_type.lower() for doc_type in requested_doc_types}
-            filtered = [
-                doc
-                for doc in broad
-                if str(doc.get("metadata", {}).get("document_type", "")).lower() in allowed_doc_types
-            ]
-            results = filtered if filtered else broad
-
-        results = _dedupe_and_rank(results, k=k)
-
-        # Format results
-        formatted_results = []
-        for doc in results:
-                formatted_results.append({
-                    "document": doc["document"],
-                    "metadata": doc.get("metadata", {}),
-                    "source": doc.get("metadata", {}).get("source_dataset", "unknown"),
-                    "category": (
-                        doc.get("metadata", {}).get("original_category")
-                        or doc.get("metadata", {}).get("category", "unknown")
-                    ),
-                    "priority": doc.get("metadata", {}).get("priority", "medium")
-                })
-
-        return formatted_results
+        # 쿼리 임베딩은 1회만 만들고 타입별 검색/fallback 검색에 재사용
+        query_embedding = embed_query(query)
+        if query_embedding is None:
+            return []
+        return _search_risk_cases(query, k, datasets, query_embedding)
+    except Exception as e:
+        print(f"Error in search_risk_cases: {e}")
+        return []
 
+
+async def _asearch_risk_cases(
+    query: str,
+    k: int = 5,
+    datasets: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """`search_risk_cases.ainvoke`: async embedding, Chroma on the retrieval pool."""
+    get_settings()
+
+    try:
+        query_embedding = await aembed_query(query)
+        if query_embedding is None:
+            return []
+        return await run_in_retrieval_executor(
+            _search_risk_cases, query, k, datasets, query_embedding
+        )
     except Exception as e:
         print(f"Error in search_risk_cases: {e}")
         return []
 
 
+search_risk_cases.coroutine = _asearch_risk_cases
+
+
 @tool
 def evaluate_risk_factors(
     situation_context: str,
@@ -31,6 +31,9 @@ class Settings(BaseSettings):
     redis_ssl: bool = False
     session_ttl: int = 3600  # Session TTL in seconds (1 hour)
     use_redis_session: bool = False  # True for production, False for development
+    session_history_max_messages: int = 200  # Redis history list cap (LTRIM)
+    session_compression: bool = False  # zlib-compress large session values
+    session_compression_min_bytes: int = 512
 
     # Application
     environment: str = "development"
@@ -50,6 +53,44 @@ class Settings(BaseSettings):
     auto_ingest_on_startup: bool = True  # 서버 시작 시 자동 임베딩 여부
     reingest_on_dataset_change: bool = True  # 데이터셋 변경 시 재인덱싱
     force_reingest_on_startup: bool = False  # 서버 시작 시 강제 재인덱싱
+    ingest_batch_size: int = 64  # 임베딩 요청 1회당 문서 수
+    ingest_concurrency: int = 4  # 동시에 보내는 임베딩 요청 수
+    ingest_upsert_batch_size: int = 512  # Chroma upsert 1회당 문서 수
+    atomic_reindex: bool = True  # 새 컬렉션에 인덱싱한 뒤 교체 (재인덱싱 중에도 기존 인덱스로 응답)
+    retrieval_max_workers: int = 8  # async 에이전트에서 Chroma 조회를 실행하는 스레드 수
+
+    # Risk report
+    report_section_concurrency: int = 3  # 리스크 보고서 섹션 동시 생성 수
+    report_section_timeout_seconds: float = 30.0  # 섹션별 LLM 타임아웃 (0 이하면 무제한)
+
+    # Shared LLM gateway (backend/utils/llm_gateway.py)
+    llm_max_concurrency: int = 8  # 전체 동시 LLM 호출 상한 (초과 시 대기열)
+    llm_agent_concurrency: dict = {  # 에이전트별 동시 호출 상한
+        "default": 4,
+        "orchestrator": 4,
+        "riskmanaging": 4,
+        "email": 3,
+        "quiz": 3,
+        "default_chat": 3,
+    }
+    llm_timeout_seconds: float = 60.0
+    llm_max_retries: int = 3  # 429/타임아웃/연결 오류/5xx 재시도 횟수
+    llm_retry_base_delay_seconds: float = 1.0  # 지수 백오프 시작값 (Retry-After가 있으면 그 값)
+    llm_retry_max_delay_seconds: float = 20.0
+
+    # Conversation context window (에이전트에 넘기는 대화 이력)
+    context_window_enabled: bool = True
+    context_recent_messages: int = 8  # 원문 그대로 넘기는 최근 메시지 수
+    context_summary_batch_messages: int = 6  # 이만큼 쌓이면 오래된 메시지를 요약에 접음
+    context_summary_mode: str = "rule"  # rule | llm (llm은 UPSTAGE_API_KEY 필요, 실패 시 rule)
+    context_summary_max_tokens: int = 400
+    context_token_budgets: dict = {  # 에이전트별 이력 토큰 예산 (요약 + 최근 메시지)
+        "default": 2000,
+        "default_chat": 2000,
+        "riskmanaging": 3000,
+        "email": 2000,
+        "quiz": 1000,
+    }
 
 @lru_cache()
 def get_settings() -> Settings:
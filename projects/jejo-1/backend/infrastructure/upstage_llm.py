@@ -85,15 +85,9 @@ class UpstageLLMGateway(LLMGateway):
         try:
             logger.debug(f"Invoking LLM: prompt_length={len(prompt)}, temperature={temperature}")
 
-            # Temperature 설정이 있으면 임시로 LLM 재생성
+            # Temperature는 호출 인자로만 바꿈 (클라이언트/연결 풀은 그대로 재사용)
             if temperature is not None:
-                llm = ChatUpstage(
-                    api_key=self._api_key,
-                    model=self._model,
-                    timeout=self._timeout,
-                    temperature=temperature
-                )
-                response = llm.invoke(prompt)
+                response = self._llm.bind(temperature=temperature).invoke(prompt)
             else:
                 response = self._llm.invoke(prompt)
 
@@ -7,23 +7,37 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 """
 FastAPI main application
 """
+import threading
 from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from backend.config import get_settings
 from backend.api import routes
 from backend.rag.chroma_client import get_or_create_collection
 from backend.rag.ingest import (
     ingest_data,
+    sync_data,
     compute_dataset_fingerprint,
     load_ingest_manifest,
 )
+from backend.rag.index_status import (
+    BUILDING,
+    EMPTY,
+    FAILED,
+    READY,
+    REINDEXING,
+    SKIPPED,
+    index_status,
+)
 from backend.utils.logger import setup_logging, get_logger
 
 # 로깅 설정
 settings = get_settings()
 setup_logging(environment=settings.environment, app_name="trade_onboarding")
 logger = get_logger(__name__)
+_ingest_thread: Optional[threading.Thread] = None
 
 # LangSmith 트레이싱 설정
 # @traceable 데코레이터는 LANGSMITH_API_KEY를 참조하므로 두 변수 모두 설정
@@ -35,16 +49,56 @@ if settings.langsmith_tracing and settings.langsmith_api_key:
     os.environ["LANGSMITH_TRACING"] = "true"
     os.environ["LANGSMITH_PROJECT"] = settings.langsmith_project
 
+def _run_ingestion_job(reset: bool, atomic: bool, incremental: bool = False) -> None:
+    """백그라운드 스레드에서 인덱싱 실행 후 index_status 갱신"""
+    try:
+        if incremental:
+            sync_data(atomic=atomic)
+        else:
+            ingest_data(reset=reset, atomic=atomic)
+        final_count = get_or_create_collection().count()
+        index_status.set(READY, "인덱싱 완료", document_count=final_count)
+        logger.info(f"✅ 데이터 임베딩 완료! 총 문서 수: {final_count}")
+    except Exception as e:
+        try:
+            remaining = get_or_create_collection().count()
+        except Exception:
+            remaining = 0
+        index_status.set(FAILED, "인덱싱 실패", document_count=remaining, error=str(e))
+        logger.error(f"❌ 백그라운드 인덱싱 실패: {e}")
+        if remaining:
+            logger.error(f"⚠️  기존 인덱스({remaining}개 문서)로 계속 응답합니다.")
+        else:
+            logger.error("⚠️  인덱스가 비어 있어 RAG 검색은 degraded 모드(빈 결과)로 동작합니다.")
+        logger.error("💡 재시도: uv run python backend/rag/ingest.py --reset")
+
+
+def start_background_ingestion(reset: bool, atomic: bool, incremental: bool = False) -> threading.Thread:
+    """인덱싱을 이벤트 루프 밖(데몬 스레드)에서 시작"""
+    global _ingest_thread
+    _ingest_thread = threading.Thread(
+        target=_run_ingestion_job,
+        kwargs={"reset": reset, "atomic": atomic, "incremental": incremental},
+        name="startup-ingest",
+        daemon=True,
+    )
+    _ingest_thread.start()
+    return _ingest_thread
+
+
 async def run_startup_tasks() -> None:
     """
-    서버 시작 시 벡터 DB 초기화 및 데이터 임베딩
+    서버 시작 시 벡터 DB 확인 및 (필요하면) 백그라운드 데이터 임베딩
     - ChromaDB 컬렉션 확인
-    - 컬렉션이 비어있으면 자동으로 데이터셋 임베딩 업로드
-    - 이미 데이터가 있으면 스킵
+    - 컬렉션이 비어있거나 데이터셋이 바뀌었으면 백그라운드 스레드에서 인덱싱 시작 (API는 바로 요청 처리)
+    - 데이터셋 변경은 manifest의 엔트리별 해시로 바뀐 엔트리만 다시 임베딩 (sync_data)
+    - 빈 인덱스를 만드는 동안은 /ready가 503이고 RAG 검색은 degraded 모드(빈 결과)로 동작
+    - atomic_reindex=true면 새 컬렉션에 만든 뒤 교체하므로 재인덱싱 중에도 기존 인덱스로 응답
     - config.auto_ingest_on_startup 설정으로 자동 임베딩 비활성화 가능
     """
     if settings.environment.lower() in {"test", "testing"}:
         logger.info("🧪 테스트 환경: startup 벡터 초기화를 건너뜁니다.")
+        index_status.set(SKIPPED, "테스트 환경")
         return
 
     logger.info("🚀 무역 온보딩 AI 코치 API 시작 중...")
@@ -70,6 +124,9 @@ async def run_startup_tasks() -> None:
                 or (settings.reingest_on_dataset_change and dataset_changed)
             )
         )
+        atomic = bool(settings.atomic_reindex)
+        # 엔트리별 해시가 있으면 변경분만 반영, 강제 재인덱싱은 항상 전체 재구축
+        incremental = not force_reingest and isinstance(manifest.get("files"), dict)
 
         logger.info(f"✅ 벡터 데이터베이스 연결 완료. 현재 문서 수: {current_count}")
         if previous_fingerprint:
@@ -81,36 +138,39 @@ async def run_startup_tasks() -> None:
         if force_reingest:
             logger.warning("⚠️ force_reingest_on_startup=true: 강제 재인덱싱 모드")
 
-        # 자동 임베딩이 활성화되어 있고, 컬렉션이 비어있으면 자동으로 데이터 임베딩
+        # 자동 임베딩이 활성화되어 있고, 컬렉션이 비어있으면 백그라운드에서 데이터 임베딩
         if settings.auto_ingest_on_startup and current_count == 0:
-            logger.info("📥 벡터 데이터베이스가 비어있습니다. 자동 데이터 임베딩 시작...")
-            logger.info("⏳ 첫 실행 시 수 분이 소요될 수 있습니다...")
-
-            # 데이터 임베딩 및 업로드
-            ingest_data(reset=False)
-
-            # 업로드 후 카운트 확인
-            final_count = collection.count()
-            logger.info(f"✅ 데이터 임베딩 완료! 총 문서 수: {final_count}")
+            logger.info("📥 벡터 데이터베이스가 비어있습니다. 백그라운드 데이터 임베딩 시작...")
+            logger.info("⏳ 완료될 때까지 /ready는 503, RAG 검색은 degraded 모드로 동작합니다.")
+            index_status.set(BUILDING, "초기 인덱싱 중", document_count=0)
+            start_background_ingestion(reset=False, atomic=atomic)
+        elif should_reingest and incremental:
+            logger.info("🔁 데이터셋 변경: 바뀐 엔트리만 백그라운드에서 다시 임베딩합니다.")
+            index_status.set(REINDEXING, "증분 인덱싱 중 (기존 인덱스 사용)", document_count=current_count)
+            start_background_ingestion(reset=False, atomic=atomic, incremental=True)
         elif should_reingest:
-            logger.info("🔁 데이터셋 변경/강제 옵션으로 재인덱싱을 수행합니다.")
-            logger.info("⏳ 기존 컬렉션을 재구축하므로 시간이 걸릴 수 있습니다...")
-            ingest_data(reset=True)
-
-            # 업로드 후 카운트 확인
-            final_count = collection.count()
-            logger.info(f"✅ 데이터 임베딩 완료! 총 문서 수: {final_count}")
+            logger.info("🔁 데이터셋 변경/강제 옵션으로 백그라운드 재인덱싱을 시작합니다.")
+            if atomic:
+                logger.info("⏳ 새 컬렉션이 완성될 때까지 기존 인덱스로 응답합니다.")
+                index_status.set(REINDEXING, "재인덱싱 중 (기존 인덱스 사용)", document_count=current_count)
+            else:
+                logger.info("⏳ 기존 컬렉션을 비우고 다시 만드는 동안 RAG 검색은 degraded 모드로 동작합니다.")
+                index_status.set(BUILDING, "재인덱싱 중 (컬렉션 재구축)", document_count=0)
+            start_background_ingestion(reset=True, atomic=atomic)
         elif current_count == 0:
             logger.warning("⚠️  벡터 데이터베이스가 비어있지만, 자동 임베딩이 비활성화되어 있습니다.")
             logger.warning("💡 수동 데이터 임베딩: uv run python backend/rag/ingest.py")
+            index_status.set(EMPTY, "인덱스 없음 (자동 인덱싱 비활성화)", document_count=0)
         else:
             logger.info("✅ 벡터 데이터베이스에 이미 데이터가 있습니다. 임베딩 생략.")
             logger.info(f"📚 총 {current_count}개 문서 로드 완료.")
+            index_status.set(READY, "기존 인덱스 사용", document_count=current_count)
 
     except Exception as e:
         logger.error(f"❌ 벡터 데이터베이스 초기화 중 오류 발생: {e}")
         logger.error("⚠️  서버는 시작되지만 RAG 기능이 정상 작동하지 않을 수 있습니다.")
         logger.error("💡 재시도: uv run python backend/rag/ingest.py --reset")
+        index_status.set(FAILED, "벡터 데이터베이스 초기화 실패", error=str(e))
 
     logger.info("🎉 서버 시작 완료!")
 
@@ -158,6 +218,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 200 once the vector index can serve queries, 503 while it is being built"""
+    snapshot = index_status.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,12 +1,17 @@
 import chromadb
+import json
 import os
 import shutil
+import threading
+import time
 from chromadb.utils import embedding_functions
 from backend.utils.logger import get_logger
 
 # Configuration
 VECTOR_DB_DIR = "backend/vectorstore"
 COLLECTION_NAME = "trade_coaching_knowledge"
+# 검색이 바라보는 컬렉션 이름 (재인덱싱 시 새 컬렉션을 만든 뒤 이 포인터만 교체)
+ACTIVE_COLLECTION_PATH = os.path.join(VECTOR_DB_DIR, "active_collection.json")
 
 # Ensure the vectorstore directory exists
 os.makedirs(VECTOR_DB_DIR, exist_ok=True)
@@ -14,38 +19,116 @@ os.makedirs(VECTOR_DB_DIR, exist_ok=True)
 # Initialize Chroma client
 _client = chromadb.PersistentClient(path=VECTOR_DB_DIR)
 logger = get_logger(__name__)
+_active_lock = threading.Lock()
+
+
+def _load_pointer() -> dict:
+    try:
+        with open(ACTIVE_COLLECTION_PATH, "r", encoding="utf-8") as file:
+            pointer = json.load(file)
+        return pointer if isinstance(pointer, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _pointer_name(pointer: dict, key: str):
+    name = pointer.get(key)
+    return name if isinstance(name, str) and name else None
+
+
+_pointer = _load_pointer()
+_active_collection_name = _pointer_name(_pointer, "name") or COLLECTION_NAME
+# 직전 활성 컬렉션: 교체 시점에 진행 중이던 검색이 끝날 수 있도록 다음 교체까지 남겨 둠
+_previous_collection_name = _pointer_name(_pointer, "previous")
+
+
+def get_active_collection_name() -> str:
+    return _active_collection_name
 
 
 def get_or_create_collection():
     """
-    Retrieves an existing Chroma collection or creates a new one if it doesn't exist.
+    Retrieves the active Chroma collection or creates it if it doesn't exist.
     """
+    name = _active_collection_name
     logger.debug(
         "Attempting to get or create collection: %s in %s",
-        COLLECTION_NAME,
+        name,
         VECTOR_DB_DIR,
     )
-    collection = _client.get_or_create_collection(name=COLLECTION_NAME)
-    logger.debug("Successfully got or created collection: %s", COLLECTION_NAME)
+    collection = _client.get_or_create_collection(name=name)
+    logger.debug("Successfully got or created collection: %s", name)
     return collection
 
 
+def get_collection_by_name(name: str):
+    """Gets (or creates) a collection by name without changing the active one."""
+    return _client.get_or_create_collection(name=name)
+
+
+def create_staging_collection():
+    """
+    Creates an empty collection to build a fresh index into.
+    Queries keep using the active collection until `activate_collection` is called.
+    """
+    name = f"{COLLECTION_NAME}_{time.strftime('%Y%m%d%H%M%S')}_{os.getpid()}"
+    logger.info("Creating staging collection: %s", name)
+    return _client.get_or_create_collection(name=name)
+
+
+def activate_collection(name: str) -> None:
+    """
+    Atomically points queries at collection `name`.
+
+    The pointer file is replaced with os.replace, so a restart never sees a
+    half-written pointer; in-process callers switch on their next
+    `get_or_create_collection()`. The collection being replaced is kept (as
+    "previous" in the pointer) so queries already running against it can
+    finish; it is dropped on the next successful swap.
+    """
+    global _active_collection_name, _previous_collection_name
+    with _active_lock:
+        previous = _active_collection_name
+        if previous == name:
+            return
+        retired = _previous_collection_name
+        os.makedirs(VECTOR_DB_DIR, exist_ok=True)
+        tmp_path = ACTIVE_COLLECTION_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"name": name, "previous": previous, "activated_at": int(time.time())},
+                file,
+            )
+        os.replace(tmp_path, ACTIVE_COLLECTION_PATH)
+        _active_collection_name = name
+        _previous_collection_name = previous
+    logger.info("Active collection switched: %s -> %s", previous, name)
+    if not retired or retired in (name, previous):
+        return
+    try:
+        _client.delete_collection(name=retired)
+        logger.info("Collection '%s' from the swap before last deleted.", retired)
+    except Exception as e:
+        logger.warning("Collection '%s' delete skipped: %s", retired, e)
+
+
 def reset_collection():
     """
     Deletes the existing Chroma collection and recreates it.
     This effectively clears the vector database for a fresh ingestion.
     """
-    logger.info("Resetting collection: %s in %s", COLLECTION_NAME, VECTOR_DB_DIR)
+    name = _active_collection_name
+    logger.info("Resetting collection: %s in %s", name, VECTOR_DB_DIR)
     try:
         # Attempt to delete the collection if it exists
-        _client.delete_collection(name=COLLECTION_NAME)
-        logger.info("Collection '%s' deleted successfully.", COLLECTION_NAME)
+        _client.delete_collection(name=name)
+        logger.info("Collection '%s' deleted successfully.", name)
     except Exception as e:
-        logger.warning("Collection '%s' delete skipped: %s", COLLECTION_NAME, e)
+        logger.warning("Collection '%s' delete skipped: %s", name, e)
     
     # Recreate the collection
-    collection = _client.create_collection(name=COLLECTION_NAME)
-    logger.info("Collection '%s' recreated successfully.", COLLECTION_NAME)
+    collection = _client.create_collection(name=name)
+    logger.info("Collection '%s' recreated successfully.", name)
     return collection
 
 if __name__ == '__main__':
@@ -1,12 +1,19 @@
+import asyncio
 import hashlib
 import math
 import os
 import re
 import sys
+import threading
 import time
-from typing import List, Optional
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import httpx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 
 # Ensure backend directory is in path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -15,8 +22,50 @@ from backend.config import get_settings
 
 # Upstage API interaction
 UPSTAGE_API_URL = "https://api.upstage.ai/v1/embeddings"
+UPSTAGE_EMBEDDING_MODEL = "embedding-query"
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2
+# Upstage accepts up to 100 inputs per embeddings request
+MAX_BATCH_SIZE = 100
+HTTP_POOL_SIZE = 16
+# Distinct (token, dim) pairs whose hash buckets are memoized
+TOKEN_HASH_CACHE_SIZE = 65536
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# httpx.AsyncClient는 만든 이벤트 루프에 묶이므로 루프마다 하나씩 둠
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_http_session() -> requests.Session:
+    """Shared keep-alive session so repeated embedding calls reuse connections."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _get_async_http_client() -> httpx.AsyncClient:
+    """Pooled async client of the running event loop (for `aget_embedding`)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE,
+            )
+        )
+        _async_clients[loop] = client
+    return client
 
 
 def _tokenize(text: str) -> List[str]:
@@ -27,53 +76,120 @@ def _tokenize(text: str) -> List[str]:
     return [stripped] if stripped else []
 
 
+@lru_cache(maxsize=TOKEN_HASH_CACHE_SIZE)
+def _token_buckets(token: str, dim: int) -> Tuple[int, int, float]:
+    """(positive index, negative index, weight) of one token in the hashed projection."""
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    idx_a = int.from_bytes(digest[:4], "little") % dim
+    idx_b = int.from_bytes(digest[4:8], "little") % dim
+    weight = 1.0 + min(len(token), 24) / 24.0
+    return idx_a, idx_b, weight
+
+
+def _sparse_hash_embedding(text: str, dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Non-zero part of the local hash embedding: sorted indices and normalized float64 values.
+
+    Bit-for-bit equal to the original dense loop: each slot receives the same
+    additions in the same token order (np.add.at is unbuffered and ordered), and
+    the norm sums squares sequentially in index order, where the skipped zero
+    slots contribute exactly 0.0.
+    """
+    tokens = _tokenize(text)
+    if not tokens:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    buckets = [_token_buckets(token, dim) for token in tokens]
+    # token 순서대로 (+weight at idx_a, -0.5*weight at idx_b)를 interleave
+    positions = np.empty(2 * len(buckets), dtype=np.int64)
+    deltas = np.empty(2 * len(buckets), dtype=np.float64)
+    positions[0::2] = [bucket[0] for bucket in buckets]
+    positions[1::2] = [bucket[1] for bucket in buckets]
+    weights = np.fromiter((bucket[2] for bucket in buckets), dtype=np.float64, count=len(buckets))
+    deltas[0::2] = weights
+    deltas[1::2] = -(weights * 0.5)
+
+    indices, inverse = np.unique(positions, return_inverse=True)
+    values = np.zeros(len(indices), dtype=np.float64)
+    np.add.at(values, inverse, deltas)
+
+    norm = math.sqrt(sum((values * values).tolist()))
+    if norm <= 0:
+        return indices, values
+    return indices, values / norm
+
+
 def _local_hash_embedding(text: str, dim: int) -> List[float]:
     """
     Deterministic local embedding fallback.
     Uses hashed token projection so retrieval still works in offline environments.
     """
     dim = max(64, int(dim))
+    indices, values = _sparse_hash_embedding(text, dim)
+    # 대부분 0이므로 dense ndarray를 tolist()하는 것보다 non-zero만 채우는 편이 빠름
     vector = [0.0] * dim
-    tokens = _tokenize(text)
+    for index, value in zip(indices.tolist(), values.tolist()):
+        vector[index] = value
+    return vector
 
-    for token in tokens:
-        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
-        idx_a = int.from_bytes(digest[:4], "little") % dim
-        idx_b = int.from_bytes(digest[4:8], "little") % dim
-        weight = 1.0 + min(len(token), 24) / 24.0
-        vector[idx_a] += weight
-        vector[idx_b] -= weight * 0.5
 
-    norm = math.sqrt(sum(value * value for value in vector))
-    if norm <= 0:
-        return vector
-    return [value / norm for value in vector]
+def local_hash_embeddings(texts: Sequence[str], dim: int) -> np.ndarray:
+    """
+    Batch local hash embedding: float32 matrix of shape (len(texts), dim).
 
+    Row i equals `_local_hash_embedding(texts[i], dim)` cast to float32, i.e. the
+    values Chroma stores for it.
+    """
+    dim = max(64, int(dim))
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        indices, values = _sparse_hash_embedding(text, dim)
+        matrix[row, indices] = values
+    return matrix
 
-def _request_upstage_embedding(text: str, api_key: str, retries: int) -> Optional[List[float]]:
+
+def _upstage_request(texts: List[str], api_key: str) -> Tuple[Dict[str, str], Dict[str, Any], int]:
+    """(headers, payload, timeout seconds) of one embeddings request."""
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
     payload = {
-        "input": text,
-        "model": "embedding-query",
+        "input": texts if len(texts) > 1 else texts[0],
+        "model": UPSTAGE_EMBEDDING_MODEL,
     }
+    return headers, payload, 10 + len(texts) // 10
+
+
+def _parse_upstage_response(data: Any, expected: int) -> Optional[List[List[float]]]:
+    items = data.get("data") if isinstance(data, dict) else None
+    if (
+        items
+        and len(items) == expected
+        and all(isinstance(item, dict) and "embedding" in item for item in items)
+    ):
+        ordered = sorted(items, key=lambda item: item.get("index", 0))
+        return [item["embedding"] for item in ordered]
+    print(f"Error: Unexpected API response format: {data}")
+    return None
+
+
+def _request_upstage_embeddings(
+    texts: List[str], api_key: str, retries: int
+) -> Optional[List[List[float]]]:
+    """One embeddings request for all `texts`; None if the whole request failed."""
+    headers, payload, timeout = _upstage_request(texts, api_key)
 
     for attempt in range(retries):
         try:
-            response = requests.post(
+            response = _get_http_session().post(
                 UPSTAGE_API_URL,
                 headers=headers,
                 json=payload,
-                timeout=10,
+                timeout=timeout,
             )
             response.raise_for_status()
-            data = response.json()
-            if data and "data" in data and data["data"] and "embedding" in data["data"][0]:
-                return data["data"][0]["embedding"]
-            print(f"Error: Unexpected API response format: {data}")
-            return None
+            return _parse_upstage_response(response.json(), len(texts))
         except requests.exceptions.HTTPError as error:
             status_code = error.response.status_code if error.response is not None else "unknown"
             print(f"HTTP error occurred (Attempt {attempt + 1}/{retries}): status={status_code}, error={error}")
@@ -100,6 +216,81 @@ def _request_upstage_embedding(text: str, api_key: str, retries: int) -> Optiona
     return None
 
 
+def _request_upstage_embedding(text: str, api_key: str, retries: int) -> Optional[List[float]]:
+    embeddings = _request_upstage_embeddings([text], api_key=api_key, retries=retries)
+    return embeddings[0] if embeddings else None
+
+
+async def _arequest_upstage_embeddings(
+    texts: List[str], api_key: str, retries: int
+) -> Optional[List[List[float]]]:
+    """Async `_request_upstage_embeddings`: waits on the event loop instead of blocking it."""
+    headers, payload, timeout = _upstage_request(texts, api_key)
+
+    for attempt in range(retries):
+        try:
+            response = await _get_async_http_client().post(
+                UPSTAGE_API_URL,
+                headers=headers,
+                json=payload,
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            return _parse_upstage_response(response.json(), len(texts))
+        except httpx.HTTPStatusError as error:
+            status_code = error.response.status_code
+            print(f"HTTP error occurred (Attempt {attempt + 1}/{retries}): status={status_code}, error={error}")
+            if status_code in {400, 401, 403}:
+                return None
+            if attempt < retries - 1:
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+        except httpx.TimeoutException:
+            print(f"Request timed out (Attempt {attempt + 1}/{retries}).")
+            if attempt < retries - 1:
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+        except httpx.TransportError as error:
+            print(f"Connection error occurred (Attempt {attempt + 1}/{retries}): {error}")
+            if attempt < retries - 1:
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+        except httpx.HTTPError as error:
+            print(f"Unexpected request error (Attempt {attempt + 1}/{retries}): {error}")
+            return None
+        except Exception as error:
+            print(f"Unexpected error while calling embedding API: {error}")
+            return None
+
+    print(f"Failed to get embedding after {retries} attempt(s).")
+    return None
+
+
+def _resolve_provider() -> Tuple[str, int, str]:
+    settings = get_settings()
+    provider = str(getattr(settings, "embedding_provider", "local") or "local").strip().lower()
+    if provider not in {"local", "upstage", "auto"}:
+        provider = "local"
+
+    local_dim = int(getattr(settings, "local_embedding_dim", 4096) or 4096)
+    api_key = str(getattr(settings, "upstage_api_key", "") or "").strip()
+    return provider, local_dim, api_key
+
+
+def embedding_model_key() -> str:
+    """
+    Identifies the vector space the configured provider produces, e.g.
+    "upstage:embedding-query" or "local-hash:4096" (cache key for stored vectors).
+    """
+    provider, local_dim, api_key = _resolve_provider()
+    if provider in {"upstage", "auto"} and api_key:
+        return f"upstage:{UPSTAGE_EMBEDDING_MODEL}"
+    return local_model_key()
+
+
+def local_model_key() -> str:
+    """Vector space of the local hash embedding fallback, e.g. "local-hash:4096"."""
+    _, local_dim, _ = _resolve_provider()
+    return f"local-hash:{max(64, local_dim)}"
+
+
 def get_embedding(text: str) -> Optional[List[float]]:
     """
     Retrieve embedding for text.
@@ -111,13 +302,7 @@ def get_embedding(text: str) -> Optional[List[float]]:
         print("Warning: Attempted to get embedding for empty or whitespace-only text. Returning None.")
         return None
 
-    settings = get_settings()
-    provider = str(getattr(settings, "embedding_provider", "local") or "local").strip().lower()
-    if provider not in {"local", "upstage", "auto"}:
-        provider = "local"
-
-    local_dim = int(getattr(settings, "local_embedding_dim", 4096) or 4096)
-    api_key = str(getattr(settings, "upstage_api_key", "") or "").strip()
+    provider, local_dim, api_key = _resolve_provider()
 
     use_upstage = provider in {"upstage", "auto"} and bool(api_key)
     if use_upstage:
@@ -132,6 +317,84 @@ def get_embedding(text: str) -> Optional[List[float]]:
     return _local_hash_embedding(text=text, dim=local_dim)
 
 
+async def aget_embedding(text: str, fallback: bool = True) -> Optional[List[float]]:
+    """
+    Async `get_embedding` for the agent graphs: the Upstage request goes through a
+    pooled httpx.AsyncClient, so a slow call does not stall other requests on the loop.
+    Same provider priority and local fallback; with `fallback=False` a failed
+    Upstage request returns None instead of a local embedding.
+    """
+    if not text or not text.strip():
+        print("Warning: Attempted to get embedding for empty or whitespace-only text. Returning None.")
+        return None
+
+    provider, local_dim, api_key = _resolve_provider()
+
+    use_upstage = provider in {"upstage", "auto"} and bool(api_key)
+    if use_upstage:
+        retries = MAX_RETRIES if provider == "upstage" else 1
+        embeddings = await _arequest_upstage_embeddings([text], api_key=api_key, retries=retries)
+        if embeddings:
+            return embeddings[0]
+        if not fallback:
+            print("Warning: Upstage embedding failed.")
+            return None
+        print("Warning: Upstage embedding failed. Falling back to local embedding.")
+    elif provider in {"upstage", "auto"} and not api_key:
+        print("Warning: UPSTAGE_API_KEY is empty. Falling back to local embedding.")
+
+    # 로컬 해시 임베딩은 수십 us 수준이라 루프에서 바로 계산
+    return _local_hash_embedding(text=text, dim=local_dim)
+
+
+def get_embeddings(
+    texts: List[str], batch_size: int = MAX_BATCH_SIZE, fallback: bool = True
+) -> List[Optional[List[float]]]:
+    """
+    Batch version of `get_embedding`: one Upstage request per `batch_size` texts
+    over a pooled session, same provider priority and local fallback.
+    Returns one entry per input text (None for empty/whitespace-only texts).
+    With `fallback=False`, texts whose Upstage request failed stay None instead of
+    getting a local embedding (callers that must not mix vector spaces).
+    """
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+    positions = [index for index, text in enumerate(texts) if text and text.strip()]
+    if not positions:
+        return embeddings
+
+    provider, local_dim, api_key = _resolve_provider()
+    pending = positions
+    use_upstage = provider in {"upstage", "auto"} and bool(api_key)
+    if use_upstage:
+        retries = MAX_RETRIES if provider == "upstage" else 1
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        failed: List[int] = []
+        for start in range(0, len(positions), batch_size):
+            batch = positions[start:start + batch_size]
+            result = _request_upstage_embeddings(
+                [texts[index] for index in batch], api_key=api_key, retries=retries
+            )
+            if result is None:
+                failed.extend(batch)
+                continue
+            for index, embedding in zip(batch, result):
+                embeddings[index] = embedding
+        if failed and not fallback:
+            print(f"Warning: Upstage embedding failed for {len(failed)} text(s).")
+            return embeddings
+        if failed:
+            print(f"Warning: Upstage embedding failed for {len(failed)} text(s). Falling back to local embedding.")
+        pending = failed
+    elif provider in {"upstage", "auto"} and not api_key:
+        print("Warning: UPSTAGE_API_KEY is empty. Falling back to local embedding.")
+
+    if pending:
+        matrix = local_hash_embeddings([texts[index] for index in pending], dim=local_dim)
+        for index, row in zip(pending, matrix):
+            embeddings[index] = row.tolist()
+    return embeddings
+
+
 if __name__ == "__main__":
     test_text = "안녕하세요, 무역 코칭 플랫폼입니다."
     embedding = get_embedding(test_text)
@@ -0,0 +1,117 @@
+"""
+고정 문구 임베딩의 디스크 캐시.
+
+SimilarityEngine 참조 문구처럼 코드에 박힌 짧은 텍스트 목록을 매번 임베딩하지 않도록
+(provider, model, 문구 해시) 단위로 `backend/vectorstore/embedding_cache/`에 저장합니다.
+모델(벡터 공간)마다 npz 파일 하나이고, 문구가 바뀌면 바뀐 문구만 새로 임베딩합니다.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.rag.embedder import embedding_model_key, get_embeddings, local_hash_embeddings, local_model_key
+
+CACHE_DIR_NAME = "embedding_cache"
+
+_lock = threading.Lock()
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _cache_path(model_key: str, cache_dir: str) -> str:
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_key)
+    return os.path.join(cache_dir, f"{safe_name}.npz")
+
+
+def _default_cache_dir() -> str:
+    return os.path.join(get_settings().vector_db_dir, CACHE_DIR_NAME)
+
+
+def _load(path: str) -> Dict[str, np.ndarray]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return dict(zip(data["hashes"].tolist(), data["vectors"]))
+    except Exception as e:
+        print(f"Warning: ignoring unreadable embedding cache {path}: {e}")
+        return {}
+
+
+def _save(path: str, vectors: Dict[str, np.ndarray]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    hashes = sorted(vectors)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        hashes=np.array(hashes),
+        vectors=np.stack([vectors[key] for key in hashes]).astype(np.float32),
+    )
+    os.replace(tmp_path, path)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def cached_embedding_matrix(
+    texts: Sequence[str], cache_dir: str | None = None, model_key: str | None = None
+) -> Tuple[str, np.ndarray]:
+    """
+    Embeddings of `texts` as one L2-normalized float32 matrix (row i = texts[i]).
+
+    Cached vectors are reused; missing texts are embedded in one batch and written
+    back. If the configured Upstage provider fails, the whole matrix is built with
+    the local hash embedding instead so rows never mix vector spaces.
+
+    Args:
+        model_key: vector space to build in (default: `embedding_model_key()`)
+
+    Returns:
+        (model_key, matrix) - the space the matrix was actually built in, which is
+        the local hash key when the Upstage request failed
+    """
+    cache_dir = cache_dir or _default_cache_dir()
+    texts = list(texts)
+    model_key = model_key or embedding_model_key()
+
+    with _lock:
+        path = _cache_path(model_key, cache_dir)
+        vectors = _load(path)
+        hashes = [_text_hash(text) for text in texts]
+        missing = [index for index, key in enumerate(hashes) if key not in vectors]
+
+        if missing:
+            if model_key.startswith("local-hash:"):
+                dim = int(model_key.split(":", 1)[1])
+                computed: List = list(local_hash_embeddings([texts[index] for index in missing], dim))
+            else:
+                computed = get_embeddings([texts[index] for index in missing], fallback=False)
+            if any(vector is None for vector in computed):
+                # Upstage 실패: 로컬 임베딩으로 전체를 만듦 (캐시는 로컬 키로만 저장)
+                model_key = local_model_key()
+                dim = int(model_key.split(":", 1)[1])
+                path = _cache_path(model_key, cache_dir)
+                vectors = _load(path)
+                missing = [index for index, key in enumerate(hashes) if key not in vectors]
+                computed = list(local_hash_embeddings([texts[index] for index in missing], dim))
+            for index, vector in zip(missing, computed):
+                vectors[hashes[index]] = np.asarray(vector, dtype=np.float32)
+            if missing:
+                _save(path, vectors)
+
+        if not texts:
+            return model_key, np.zeros((0, 0), dtype=np.float32)
+        matrix = np.stack([vectors[key] for key in hashes])
+    return model_key, _normalize_rows(matrix)
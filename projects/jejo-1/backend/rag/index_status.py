@@ -0,0 +1,99 @@
+"""
+벡터 인덱스 준비 상태 (readiness gate).
+
+서버 시작 시 인덱싱은 백그라운드 스레드에서 돌고, API는 바로 요청을 받습니다.
+검색 코드는 `is_retrieval_degraded()`로 인덱스가 아직 없는 구간을 확인하고,
+`/ready` 엔드포인트는 `snapshot()`을 그대로 돌려줍니다.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# 상태 값
+NOT_STARTED = "not_started"  # startup 작업 전 (CLI/스크립트 실행 포함) - 검색 허용
+SKIPPED = "skipped"          # 테스트 환경 등 startup 인덱싱을 건너뜀
+BUILDING = "building"        # 빈 인덱스를 처음 만드는 중 - degraded
+REINDEXING = "reindexing"    # 기존 인덱스로 응답하면서 새 인덱스를 만드는 중
+READY = "ready"
+EMPTY = "empty"              # 인덱스가 비어 있고 자동 인덱싱도 꺼져 있음 - degraded
+FAILED = "failed"            # 인덱싱 실패 (기존 인덱스가 남아 있으면 ready 유지)
+
+_READY_STATES = {SKIPPED, REINDEXING, READY}
+
+
+class IndexStatus:
+    """Thread-safe holder for the vector index lifecycle state."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state = NOT_STARTED
+        self._ready = False
+        self._degraded = False
+        self._document_count: Optional[int] = None
+        self._message = ""
+        self._error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def set(
+        self,
+        state: str,
+        message: str = "",
+        document_count: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._state = state
+            self._message = message
+            self._error = error
+            if document_count is not None:
+                self._document_count = document_count
+            if state in {BUILDING, REINDEXING}:
+                self._started_at = time.time()
+                self._finished_at = None
+            elif state in {READY, FAILED}:
+                self._finished_at = time.time()
+
+            has_documents = bool(self._document_count)
+            if state == FAILED:
+                self._ready = has_documents
+            else:
+                self._ready = state in _READY_STATES
+            self._degraded = state in {BUILDING, EMPTY} or (state == FAILED and not has_documents)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def degraded(self) -> bool:
+        return self._degraded
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = None
+            if self._started_at is not None:
+                elapsed = round((self._finished_at or time.time()) - self._started_at, 1)
+            return {
+                "state": self._state,
+                "ready": self._ready,
+                "retrieval_degraded": self._degraded,
+                "document_count": self._document_count,
+                "message": self._message,
+                "error": self._error,
+                "indexing_seconds": elapsed,
+            }
+
+
+index_status = IndexStatus()
+
+
+def is_retrieval_degraded() -> bool:
+    """True while there is no usable index (first build in progress, empty or failed)."""
+    return index_status.degraded
@@ -5,13 +5,20 @@ import argparse
 import sys
 import hashlib
 import time
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 # Ensure backend directory is in path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from backend.rag.embedder import get_embedding
-from backend.rag.chroma_client import get_or_create_collection, reset_collection
+from backend.rag.embedder import get_embeddings
+from backend.rag.chroma_client import (
+    activate_collection,
+    create_staging_collection,
+    get_collection_by_name,
+    get_or_create_collection,
+    reset_collection,
+)
 from backend.rag.schema import normalize_metadata
 from backend.config import get_settings
 
@@ -38,6 +45,17 @@ def compute_dataset_fingerprint(dataset_dir: str = DATASET_DIR) -> str:
     return digest
 
 
+def _file_digest(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _entry_digest(content: str, metadata: Dict[str, Any]) -> str:
+    """Hash of what gets stored for one entry; a changed digest means re-embed."""
+    payload = json.dumps([content, metadata], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def load_ingest_manifest(manifest_path: str = INGEST_MANIFEST_PATH) -> Dict[str, Any]:
     if not os.path.exists(manifest_path):
         return {}
@@ -173,100 +191,381 @@ def _prepare_content(entry: Dict[str, Any], file_name: str) -> str:
     return _enrich_short_content(content, entry, file_name)
 
 
-def ingest_data(reset: bool = False):
+def _collect_entries(file_path: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """(entry_id, content, metadata) for every embeddable entry of one dataset file."""
+    file_name = os.path.basename(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if not isinstance(data, list):
+        print(f"Warning: {file_name} does not contain a list of entries. Skipping.")
+        return []
+
+    entries: List[Tuple[str, str, Dict[str, Any]]] = []
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            print(f"  Skipping row {i} in {file_name}: Non-dict entry.")
+            continue
+
+        content = _prepare_content(entry, file_name)
+        entry_id = f"{os.path.splitext(file_name)[0]}_{entry.get('id', i)}" # Unique ID
+
+        if not content or not content.strip():
+            print(f"  Skipping entry {entry_id} in {file_name}: Empty content.")
+            continue
+
+        # Normalize metadata
+        normalized_metadata = normalize_metadata(entry, file_path) # Pass full entry and file_path
+        entries.append((entry_id, content, normalized_metadata))
+    return entries
+
+
+def _resume_state(manifest: Dict[str, Any], fingerprint: str, atomic: bool) -> Optional[Dict[str, Any]]:
+    """Progress of an interrupted run over the same dataset, embedding settings and mode."""
+    state = manifest.get("in_progress")
+    if not isinstance(state, dict):
+        return None
+    settings = get_settings()
+    if (
+        state.get("dataset_fingerprint") != fingerprint
+        or state.get("embedding_provider") != settings.embedding_provider
+        or state.get("local_embedding_dim") != settings.local_embedding_dim
+        or bool(state.get("target_collection")) != atomic
+    ):
+        return None
+    return state
+
+
+def ingest_data(reset: bool = False, resume: bool = True, atomic: bool = False):
     """
     Ingests data from JSON files in the dataset directory into the Chroma vector store.
 
+    Entries are embedded in batches of `ingest_batch_size` with up to
+    `ingest_concurrency` requests in flight, and upserted `ingest_upsert_batch_size`
+    at a time. Completed files are recorded under `in_progress` in the ingestion
+    manifest, so an interrupted run over the same dataset continues where it stopped.
+    Per-file and per-entry content hashes are written to the manifest's `files`
+    section so later runs can use `sync_data` instead of a full rebuild.
+
     Args:
         reset (bool): If True, resets the Chroma collection before ingestion.
+        resume (bool): If True, continues a matching interrupted run (skipping the
+            reset and the files it already finished) instead of starting over.
+        atomic (bool): If True, builds into a new staging collection and swaps it in
+            only when complete, so queries never see a partially built index
+            (`reset` is implied).
     """
     print("--- Starting Data Ingestion ---")
+    settings = get_settings()
+    started_at = time.perf_counter()
 
-    # Get Chroma collection
-    if reset:
-        collection = reset_collection()
-    else:
-        collection = get_or_create_collection()
-
-    documents_to_add = []
-    embeddings_to_add = []
-    metadatas_to_add = []
-    ids_to_add = []
-    total_inserted_count = 0
-    indexed_files = set()
-
-    json_files = glob.glob(os.path.join(DATASET_DIR, "*.json"))
+    json_files = sorted(glob.glob(os.path.join(DATASET_DIR, "*.json")))
     if not json_files:
         print(f"No JSON files found in {DATASET_DIR}. Exiting ingestion.")
         return
 
+    fingerprint = compute_dataset_fingerprint(DATASET_DIR)
+    manifest = load_ingest_manifest()
+    state = _resume_state(manifest, fingerprint, atomic) if resume else None
+
+    # Get Chroma collection (a resumed run already reset it before it was interrupted)
+    if atomic:
+        if state is not None:
+            collection = get_collection_by_name(state["target_collection"])
+        else:
+            collection = create_staging_collection()
+    elif reset and state is None:
+        collection = reset_collection()
+    else:
+        collection = get_or_create_collection()
+
+    if state is None:
+        state = {
+            "dataset_fingerprint": fingerprint,
+            "embedding_provider": settings.embedding_provider,
+            "local_embedding_dim": settings.local_embedding_dim,
+            "completed_files": [],
+            "indexed_documents": 0,
+        }
+        if atomic:
+            state["target_collection"] = collection.name
+    else:
+        print(
+            f"Resuming interrupted ingestion: {len(state['completed_files'])} file(s), "
+            f"{state['indexed_documents']} entries already indexed."
+        )
+    completed_files = set(state["completed_files"])
+    resumed_count = int(state["indexed_documents"])
+    # 완료된 파일의 {sha256, entries: {entry_id: digest}} (sync_data의 비교 기준)
+    file_records: Dict[str, Dict[str, Any]] = dict(state.get("files", {}))
+    pending_records: Dict[str, Dict[str, Any]] = {}
+    indexed_files = set(state.get("indexed_files", completed_files))
+    # 이번 실행에서 파일별로 upsert 대상이 된 문서 수
+    inserted_by_file: Dict[str, int] = {}
+
+    # 1) 남은 파일의 엔트리 수집 -> 파일 경계를 넘지 않는 임베딩 배치로 분할
+    batch_size = max(1, int(settings.ingest_batch_size))
+    batches: List[Tuple[str, List[Tuple[str, str, Dict[str, Any]]]]] = []
+    last_batch_of_file: Dict[str, int] = {}
     for file_path in json_files:
         file_name = os.path.basename(file_path)
-        print(f"\nProcessing file: {file_name}")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        if not isinstance(data, list):
-            print(f"Warning: {file_name} does not contain a list of entries. Skipping.")
+        if file_name in completed_files:
             continue
-
-        for i, entry in enumerate(data):
-            if not isinstance(entry, dict):
-                print(f"  Skipping row {i} in {file_name}: Non-dict entry.")
-                continue
-
-            content = _prepare_content(entry, file_name)
-            entry_id = f"{os.path.splitext(file_name)[0]}_{entry.get('id', i)}" # Unique ID
-            
-            if not content or not content.strip():
-                print(f"  Skipping entry {entry_id} in {file_name}: Empty content.")
-                continue
-            
-            # Normalize metadata
-            normalized_metadata = normalize_metadata(entry, file_path) # Pass full entry and file_path
-            
-            # Generate embedding
-            embedding = get_embedding(content)
-            if embedding is None:
-                print(f"  Skipping entry {entry_id} in {file_name}: Failed to generate embedding.")
-                continue
-
-            # Add to lists for batch insertion
-            documents_to_add.append(content)
-            embeddings_to_add.append(embedding) # Store the generated embedding
-            metadatas_to_add.append(normalized_metadata)
-            ids_to_add.append(entry_id)
-            total_inserted_count += 1
-            indexed_files.add(file_name)
-
-            if total_inserted_count % 10 == 0:
-                print(f"  Processed {total_inserted_count} entries...")
-    
-    if documents_to_add:
-        print(f"\nAdding {len(documents_to_add)} documents to Chroma collection...")
-        collection.upsert(
-            embeddings=embeddings_to_add, # Use the stored embeddings
-            documents=documents_to_add,
-            metadatas=metadatas_to_add,
-            ids=ids_to_add
+        entries = _collect_entries(file_path)
+        record = {
+            "sha256": _file_digest(file_path),
+            "entries": {entry_id: _entry_digest(content, metadata) for entry_id, content, metadata in entries},
+        }
+        for start in range(0, len(entries), batch_size):
+            batches.append((file_name, entries[start:start + batch_size]))
+        if entries:
+            last_batch_of_file[file_name] = len(batches) - 1
+            pending_records[file_name] = record
+        else:
+            completed_files.add(file_name)
+            file_records[file_name] = record
+    total_pending = sum(len(entries) for _, entries in batches)
+    print(f"Embedding {total_pending} entries in {len(batches)} batch(es) from {len(last_batch_of_file)} file(s)...")
+
+    def embed_batch(batch: Tuple[str, List[Tuple[str, str, Dict[str, Any]]]]) -> List[Optional[List[float]]]:
+        return get_embeddings([content for _, content, _ in batch[1]], batch_size=batch_size)
+
+    def save_progress() -> None:
+        state["completed_files"] = sorted(completed_files)
+        state["indexed_files"] = sorted(
+            indexed_files | {name for name in completed_files if inserted_by_file.get(name)}
         )
-        print(f"  Successfully added {len(documents_to_add)} documents.")
-    else:
-        print("No documents to add after processing files.")
+        state["indexed_documents"] = resumed_count + sum(
+            count for name, count in inserted_by_file.items() if name in completed_files
+        )
+        state["files"] = file_records
+        save_ingest_manifest({**manifest, "in_progress": state})
+
+    upsert_batch_size = max(1, int(settings.ingest_upsert_batch_size))
+    pending_ids: List[str] = []
+    pending_documents: List[str] = []
+    pending_embeddings: List[List[float]] = []
+    pending_metadatas: List[Dict[str, Any]] = []
+
+    # 마지막 배치까지 임베딩됐지만 아직 upsert되지 않은 파일
+    files_awaiting_upsert: List[str] = []
+
+    def flush() -> None:
+        if pending_ids:
+            collection.upsert(
+                embeddings=pending_embeddings,
+                documents=pending_documents,
+                metadatas=pending_metadatas,
+                ids=pending_ids,
+            )
+            pending_ids.clear()
+            pending_documents.clear()
+            pending_embeddings.clear()
+            pending_metadatas.clear()
+        if files_awaiting_upsert:
+            # upsert까지 끝난 파일만 완료로 기록 (중단되면 나머지 파일부터 재개)
+            completed_files.update(files_awaiting_upsert)
+            for name in files_awaiting_upsert:
+                file_records[name] = pending_records.pop(name)
+            files_awaiting_upsert.clear()
+            save_progress()
+
+    # 2) 임베딩은 최대 ingest_concurrency개 요청을 동시에, 결과는 순서대로 upsert
+    embedded_count = 0
+    concurrency = max(1, int(settings.ingest_concurrency))
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest-embed") as executor:
+        for batch_index, ((file_name, entries), embeddings) in enumerate(
+            zip(batches, executor.map(embed_batch, batches))
+        ):
+            for (entry_id, content, metadata), embedding in zip(entries, embeddings):
+                if embedding is None:
+                    print(f"  Skipping entry {entry_id} in {file_name}: Failed to generate embedding.")
+                    # 기록에서 빼서 다음 sync_data에서 다시 시도
+                    pending_records[file_name]["entries"].pop(entry_id, None)
+                    pending_records[file_name]["sha256"] = None
+                    continue
+                pending_ids.append(entry_id)
+                pending_documents.append(content)
+                pending_embeddings.append(embedding)
+                pending_metadatas.append(metadata)
+                inserted_by_file[file_name] = inserted_by_file.get(file_name, 0) + 1
+            embedded_count += len(entries)
+
+            if last_batch_of_file.get(file_name) == batch_index:
+                files_awaiting_upsert.append(file_name)
+                elapsed = time.perf_counter() - started_at
+                print(
+                    f"  [{embedded_count}/{total_pending}] {file_name} embedded "
+                    f"({embedded_count / elapsed:.0f} entries/s)"
+                )
+            if len(pending_ids) >= upsert_batch_size:
+                flush()
+    flush()
+    if atomic:
+        activate_collection(collection.name)
+    total_inserted_count = resumed_count + sum(inserted_by_file.values())
+    indexed_files.update(name for name, count in inserted_by_file.items() if count)
 
     print(f"\n--- Data Ingestion Complete ---")
     print(f"Total entries processed: {total_inserted_count}")
     collection_count = collection.count()
     print(f"Current collection count: {collection_count}")
+    print(f"Elapsed: {time.perf_counter() - started_at:.1f}s")
 
     manifest = {
         "updated_at": int(time.time()),
-        "dataset_fingerprint": compute_dataset_fingerprint(DATASET_DIR),
+        "dataset_fingerprint": fingerprint,
         "indexed_files": sorted(indexed_files),
         "indexed_documents": total_inserted_count,
         "collection_count": collection_count,
-        "embedding_provider": get_settings().embedding_provider,
-        "local_embedding_dim": get_settings().local_embedding_dim,
+        "collection_name": collection.name,
+        "embedding_provider": settings.embedding_provider,
+        "local_embedding_dim": settings.local_embedding_dim,
+        "files": file_records,
+    }
+    save_ingest_manifest(manifest)
+    print(f"Ingestion manifest updated: {INGEST_MANIFEST_PATH}")
+    return manifest
+
+
+def _sync_fallback_reason(manifest: Dict[str, Any], collection) -> Optional[str]:
+    """Why the manifest cannot drive an incremental sync (None if it can)."""
+    settings = get_settings()
+    files = manifest.get("files")
+    if not isinstance(files, dict):
+        return "manifest has no per-entry hashes"
+    if "in_progress" in manifest:
+        return "an interrupted ingestion has to be resumed first"
+    if (
+        manifest.get("embedding_provider") != settings.embedding_provider
+        or manifest.get("local_embedding_dim") != settings.local_embedding_dim
+    ):
+        return "embedding settings changed"
+    if manifest.get("collection_name") not in (None, collection.name):
+        return "manifest belongs to a different collection"
+    if collection.count() == 0 and any(record.get("entries") for record in files.values()):
+        return "collection is empty"
+    return None
+
+
+def sync_data(atomic: bool = False, dry_run: bool = False):
+    """
+    Brings the collection in line with the dataset without a full rebuild.
+
+    Files whose sha256 matches the manifest are skipped without parsing. For the
+    others, entries whose content/metadata digest changed (or are new) are
+    re-embedded and upserted, and ids that disappeared (including those of
+    deleted files) are removed from the collection. Falls back to
+    `ingest_data(reset=True, atomic=atomic)` when the manifest cannot be trusted
+    (no per-entry hashes, different embedding settings, interrupted run).
+
+    Args:
+        atomic (bool): Passed to `ingest_data` when a full rebuild is needed.
+        dry_run (bool): Only print what would change.
+    """
+    print("--- Starting Incremental Sync ---")
+    settings = get_settings()
+    started_at = time.perf_counter()
+
+    collection = get_or_create_collection()
+    manifest = load_ingest_manifest()
+    reason = _sync_fallback_reason(manifest, collection)
+    if reason is not None:
+        print(f"Full rebuild required: {reason}.")
+        if dry_run:
+            return None
+        return ingest_data(reset=True, atomic=atomic)
+
+    previous_files: Dict[str, Dict[str, Any]] = manifest["files"]
+    file_records: Dict[str, Dict[str, Any]] = {}
+    changed: List[Tuple[str, str, str, Dict[str, Any]]] = []  # (file_name, entry_id, content, metadata)
+    removed_ids: List[str] = []
+
+    json_files = sorted(glob.glob(os.path.join(DATASET_DIR, "*.json")))
+    for file_path in json_files:
+        file_name = os.path.basename(file_path)
+        previous = previous_files.get(file_name) or {}
+        file_hash = _file_digest(file_path)
+        if previous.get("sha256") == file_hash:
+            file_records[file_name] = previous
+            continue
+
+        previous_entries: Dict[str, str] = previous.get("entries", {})
+        entries = _collect_entries(file_path)
+        digests = {entry_id: _entry_digest(content, metadata) for entry_id, content, metadata in entries}
+        changed.extend(
+            (file_name, entry_id, content, metadata)
+            for entry_id, content, metadata in entries
+            if previous_entries.get(entry_id) != digests[entry_id]
+        )
+        removed_ids.extend(entry_id for entry_id in previous_entries if entry_id not in digests)
+        file_records[file_name] = {"sha256": file_hash, "entries": digests}
+
+    for file_name, record in previous_files.items():
+        if file_name not in file_records:
+            removed_ids.extend(record.get("entries", {}))
+
+    print(f"{len(changed)} new/changed entries, {len(removed_ids)} removed entries.")
+    if dry_run:
+        for file_name, entry_id, _, _ in changed:
+            print(f"  upsert {entry_id} ({file_name})")
+        for entry_id in removed_ids:
+            print(f"  delete {entry_id}")
+        return None
+
+    batch_size = max(1, int(settings.ingest_batch_size))
+    upsert_batch_size = max(1, int(settings.ingest_upsert_batch_size))
+    batches = [changed[start:start + batch_size] for start in range(0, len(changed), batch_size)]
+
+    def embed_batch(batch: List[Tuple[str, str, str, Dict[str, Any]]]) -> List[Optional[List[float]]]:
+        return get_embeddings([content for _, _, content, _ in batch], batch_size=batch_size)
+
+    upserted = 0
+    concurrency = max(1, int(settings.ingest_concurrency))
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest-embed") as executor:
+        rows: List[Tuple[str, str, List[float], Dict[str, Any]]] = []
+        for batch, embeddings in zip(batches, executor.map(embed_batch, batches)):
+            for (file_name, entry_id, content, metadata), embedding in zip(batch, embeddings):
+                if embedding is None:
+                    print(f"  Skipping entry {entry_id} in {file_name}: Failed to generate embedding.")
+                    # 이전 digest를 유지해 다음 sync에서 다시 시도 (없으면 기록하지 않음)
+                    entries = file_records[file_name]["entries"]
+                    previous_digest = (previous_files.get(file_name) or {}).get("entries", {}).get(entry_id)
+                    if previous_digest is None:
+                        entries.pop(entry_id, None)
+                    else:
+                        entries[entry_id] = previous_digest
+                    file_records[file_name]["sha256"] = None
+                    continue
+                rows.append((entry_id, content, embedding, metadata))
+        for start in range(0, len(rows), upsert_batch_size):
+            chunk = rows[start:start + upsert_batch_size]
+            collection.upsert(
+                ids=[row[0] for row in chunk],
+                documents=[row[1] for row in chunk],
+                embeddings=[row[2] for row in chunk],
+                metadatas=[row[3] for row in chunk],
+            )
+            upserted += len(chunk)
+
+    for start in range(0, len(removed_ids), upsert_batch_size):
+        collection.delete(ids=removed_ids[start:start + upsert_batch_size])
+
+    collection_count = collection.count()
+    print("\n--- Incremental Sync Complete ---")
+    print(f"Upserted: {upserted}, deleted: {len(removed_ids)}, collection count: {collection_count}")
+    print(f"Elapsed: {time.perf_counter() - started_at:.1f}s")
+
+    manifest = {
+        **manifest,
+        "updated_at": int(time.time()),
+        "dataset_fingerprint": compute_dataset_fingerprint(DATASET_DIR),
+        "indexed_files": sorted(name for name, record in file_records.items() if record.get("entries")),
+        "indexed_documents": sum(len(record.get("entries", {})) for record in file_records.values()),
+        "collection_count": collection_count,
+        "collection_name": collection.name,
+        "files": file_records,
+        "last_sync": {"upserted": upserted, "deleted": len(removed_ids)},
     }
     save_ingest_manifest(manifest)
     print(f"Ingestion manifest updated: {INGEST_MANIFEST_PATH}")
@@ -276,7 +575,14 @@ def ingest_data(reset: bool = False):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ingest data into Chroma vector store.")
     parser.add_argument("--reset", action="store_true", help="Reset Chroma collection before ingestion.")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore progress of an interrupted run and start over.")
+    parser.add_argument("--atomic", action="store_true", help="Build into a new collection and swap it in when complete.")
+    parser.add_argument("--sync", action="store_true", help="Only embed new/changed entries and delete removed ones.")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync: print what would change without writing.")
     args = parser.parse_args()
 
-    ingest_data(reset=args.reset)
+    if args.sync:
+        sync_data(atomic=args.atomic, dry_run=args.dry_run)
+    else:
+        ingest_data(reset=args.reset, resume=not args.no_resume, atomic=args.atomic)
 #테스트완료
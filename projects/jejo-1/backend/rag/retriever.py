@@ -1,32 +1,79 @@
 import sys
 import os
 import json
-from typing import List, Dict, Any, Optional
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 # Ensure backend directory is in path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from backend.rag.chroma_client import get_or_create_collection
-from backend.rag.embedder import get_embedding
+from backend.rag.embedder import aget_embedding, get_embedding
+from backend.rag.index_status import is_retrieval_degraded
 from backend.config import get_settings
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
+T = TypeVar("T")
 
-def search(query: str, k: int = 5) -> List[Dict[str, Any]]:
+_retrieval_executor: Optional[ThreadPoolExecutor] = None
+_retrieval_executor_lock = threading.Lock()
+
+
+def _get_retrieval_executor() -> ThreadPoolExecutor:
+    """Bounded pool for blocking Chroma calls made from async code."""
+    global _retrieval_executor
+    if _retrieval_executor is None:
+        with _retrieval_executor_lock:
+            if _retrieval_executor is None:
+                workers = max(1, int(get_settings().retrieval_max_workers))
+                _retrieval_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="retrieval"
+                )
+    return _retrieval_executor
+
+
+def run_in_retrieval_executor(fn: Callable[..., T], *args: Any, **kwargs: Any) -> Awaitable[T]:
+    """
+    Runs a blocking retrieval call (Chroma query, tool body) on the bounded
+    retrieval pool and returns an awaitable, keeping the event loop free.
+    The caller's context (LangSmith run tree, loggers) is carried over.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(fn, *args, **kwargs)
+    return loop.run_in_executor(_get_retrieval_executor(), context.run, call)
+
+
+def search(
+    query: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[Dict[str, Any]]:
     """
     Performs a similarity search against the Chroma vector store.
 
     Args:
         query (str): The search query.
         k (int): The number of top results to retrieve.
+        query_embedding (Optional[List[float]]): Precomputed embedding of `query`
+            (from `embed_query`); skips the embedding call when given.
 
     Returns:
         List[Dict[str, Any]]: A list of dictionaries, each representing a retrieved document
                                with its content and metadata.
     """
+    if is_retrieval_degraded():
+        logger.warning("Vector index is not ready; search() returns no results (degraded mode)")
+        return []
+
     collection = get_or_create_collection()
-    query_embedding = get_embedding(query)
+    if query_embedding is None:
+        query_embedding = get_embedding(query)
 
     if query_embedding is None:
         logger.warning("Could not generate embedding for query in search()")
@@ -38,6 +85,15 @@ def search(query: str, k: int = 5) -> List[Dict[str, Any]]:
         include=['documents', 'metadatas', 'distances']
     )
 
+    return _format_results(results)
+
+
+# Multiple of the requested per-group k fetched by the combined `$in` query, so
+# that one document type with closer matches does not crowd out the others.
+GROUP_QUERY_OVERSAMPLE = 3
+
+
+def _format_results(results: Any) -> List[Dict[str, Any]]:
     retrieved_docs = []
     if results and results['documents']:
         for i in range(len(results['documents'][0])):
@@ -49,6 +105,52 @@ def search(query: str, k: int = 5) -> List[Dict[str, Any]]:
             retrieved_docs.append(doc)
     return retrieved_docs
 
+
+def _build_where_clause(
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    level: Optional[str] = None,
+    role: Optional[str] = None,
+    document_type: Any = None,
+    topic: Optional[str] = None,
+    situation: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    # 1. 일단 조건에 맞는 필터들을 리스트에 '수집'만 합니다.
+    # document_type에 리스트를 주면 $in 필터 하나로 여러 타입을 한 번에 조회합니다.
+    filters = []
+
+    if category:
+        filters.append({"original_category": category})
+    if priority:
+        filters.append({"priority": priority})
+    if level:
+        filters.append({"level": level})
+    if isinstance(document_type, (list, tuple)):
+        filters.append({"document_type": {"$in": list(document_type)}})
+    elif document_type:
+        filters.append({"document_type": document_type})
+
+    # 리스트형 데이터($contains) 처리도 동일하게 리스트에 추가
+    if role:
+        filters.append({"role": {"$contains": role}})
+    if topic:
+        filters.append({"topic": {"$contains": topic}})
+    if situation:
+        filters.append({"situation": {"$contains": situation}})
+
+    # 2. 여기서 딱 한 번만 판단해서 where_clause를 만듭니다.
+    if len(filters) > 1:
+        # 필터가 여러 개면 $and 상자에 담기
+        where_clause = {"$and": filters}
+    elif len(filters) == 1:
+        # 필터가 하나면 그 필터 그대로 사용
+        where_clause = filters[0]
+    else:
+        # 필터가 없으면 None
+        where_clause = None
+    return where_clause
+
+
 def search_with_filter(
     query: str,
     k: int = 5,
@@ -58,7 +160,8 @@ def search_with_filter(
     role: Optional[str] = None,
     document_type: Optional[str] = None,
     topic: Optional[str] = None,
-    situation: Optional[str] = None
+    situation: Optional[str] = None,
+    query_embedding: Optional[List[float]] = None
 ) -> List[Dict[str, Any]]:
     """
     Performs a similarity search with optional metadata filtering.
@@ -73,91 +176,229 @@ def search_with_filter(
         document_type (Optional[str]): Filter by document_type.
         topic (Optional[str]): Filter by topic (checks if topic is in the list of topics).
         situation (Optional[str]): Filter by situation (checks if situation is in the list of situations).
+        query_embedding (Optional[List[float]]): Precomputed embedding of `query`
+            (from `embed_query`); skips the embedding call when given.
 
     Returns:
         List[Dict[str, Any]]: A list of dictionaries, each representing a retrieved document
                                with its content and metadata.
     """
+    if is_retrieval_degraded():
+        logger.warning("Vector index is not ready; search_with_filter() returns no results (degraded mode)")
+        return []
+
     collection = get_or_create_collection()
-    query_embedding = get_embedding(query)
+    if query_embedding is None:
+        query_embedding = get_embedding(query)
 
     if query_embedding is None:
         logger.warning("Could not generate embedding for query in search_with_filter()")
         return []
 
-    # where_clause = {}
-    # if category:
-    #     where_clause["original_category"] = category
-    # if priority:
-    #     where_clause["priority"] = priority
-    # if level:
-    #     where_clause["level"] = level
-    # if document_type:
-    #     where_clause["document_type"] = document_type
-    # if role:
-    #     where_clause["role"] = {"$contains": role} # Assuming role can be a list in metadata
-    # if topic:
-    #     where_clause["topic"] = {"$contains": topic} # Assuming topic can be a list in metadata
-    # if situation:
-    #     where_clause["situation"] = {"$contains": situation} # Assuming situation can be a list in metadata
-        
-        
-        
-    # 1. 일단 조건에 맞는 필터들을 리스트에 '수집'만 합니다.   #debug : docs where_clause 딕셔너리 만드는 부분을 아래처럼 바꿈
-    filters = []
-    
-    if category:
-        filters.append({"original_category": category})
-    if priority:
-        filters.append({"priority": priority})
-    if level:
-        filters.append({"level": level})
-    if document_type:
-        filters.append({"document_type": document_type})
-    
-    # 리스트형 데이터($contains) 처리도 동일하게 리스트에 추가
-    if role:
-        filters.append({"role": {"$contains": role}})
-    if topic:
-        filters.append({"topic": {"$contains": topic}})
-    if situation:
-        filters.append({"situation": {"$contains": situation}})
+    where_clause = _build_where_clause(
+        category=category,
+        priority=priority,
+        level=level,
+        role=role,
+        document_type=document_type,
+        topic=topic,
+        situation=situation,
+    )
 
-    # 2. 여기서 딱 한 번만 판단해서 where_clause를 만듭니다.
-    if len(filters) > 1:
-        # 필터가 여러 개면 $and 상자에 담기
-        where_clause = {"$and": filters}
-    elif len(filters) == 1:
-        # 필터가 하나면 그 필터 그대로 사용
-        where_clause = filters[0]
-    else:
-        # 필터가 없으면 None
-        where_clause = None    
+    logger.debug("Executing search_with_filter where=%s", where_clause if where_clause else "None")
 
-        
-        
-        
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=k,
+        where=where_clause if where_clause else None,
+        include=['documents', 'metadatas', 'distances']
+    )
 
+    return _format_results(results)
 
-    logger.debug("Executing search_with_filter where=%s", where_clause if where_clause else "None")
 
+def embed_query(query: str) -> Optional[List[float]]:
+    """
+    Embeds a query once so that several searches can reuse the vector
+    (`query_embedding` of `search`, `search_with_filter`, `search_filter_groups`).
+    """
+    return get_embedding(query)
+
+
+async def aembed_query(query: str) -> Optional[List[float]]:
+    """Async `embed_query` (pooled async HTTP client, does not block the event loop)."""
+    return await aget_embedding(query)
+
+
+async def asearch(
+    query: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None
+) -> List[Dict[str, Any]]:
+    """Async `search`: embeds with `aembed_query` and queries Chroma on the retrieval pool."""
+    if is_retrieval_degraded():
+        return search(query, k=k)
+    if query_embedding is None:
+        query_embedding = await aembed_query(query)
+        if query_embedding is None:
+            logger.warning("Could not generate embedding for query in asearch()")
+            return []
+    return await run_in_retrieval_executor(search, query, k=k, query_embedding=query_embedding)
+
+
+async def asearch_with_filter(
+    query: str,
+    k: int = 5,
+    query_embedding: Optional[List[float]] = None,
+    **filters: Any
+) -> List[Dict[str, Any]]:
+    """Async `search_with_filter` (same keyword filters)."""
+    if is_retrieval_degraded():
+        return search_with_filter(query, k=k, **filters)
+    if query_embedding is None:
+        query_embedding = await aembed_query(query)
+        if query_embedding is None:
+            logger.warning("Could not generate embedding for query in asearch_with_filter()")
+            return []
+    return await run_in_retrieval_executor(
+        search_with_filter, query, k=k, query_embedding=query_embedding, **filters
+    )
+
+
+async def asearch_filter_groups(
+    query: str,
+    filter_groups: List[Dict[str, Any]],
+    k: int = 3,
+    query_embedding: Optional[List[float]] = None
+) -> List[List[Dict[str, Any]]]:
+    """Async `search_filter_groups`."""
+    if not filter_groups or is_retrieval_degraded():
+        return search_filter_groups(query, filter_groups, k=k)
+    if query_embedding is None:
+        query_embedding = await aembed_query(query)
+        if query_embedding is None:
+            logger.warning("Could not generate embedding for query in asearch_filter_groups()")
+            return [[] for _ in filter_groups]
+    return await run_in_retrieval_executor(
+        search_filter_groups, query, filter_groups, k=k, query_embedding=query_embedding
+    )
+
+
+def _query_collection(
+    collection: Any,
+    query_embedding: List[float],
+    k: int,
+    where_clause: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    logger.debug("Executing search_filter_groups where=%s", where_clause if where_clause else "None")
     results = collection.query(
         query_embeddings=[query_embedding],
         n_results=k,
         where=where_clause if where_clause else None,
         include=['documents', 'metadatas', 'distances']
     )
+    return _format_results(results)
 
-    retrieved_docs = []
-    if results and results['documents']:
-        for i in range(len(results['documents'][0])):
-            doc = {
-                "document": results['documents'][0][i],
-                "metadata": results['metadatas'][0][i],
-                "distance": results['distances'][0][i]
+
+def search_filter_groups(
+    query: str,
+    filter_groups: List[Dict[str, Any]],
+    k: int = 3,
+    query_embedding: Optional[List[float]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Runs several filtered searches for one query with a single embedding call.
+
+    Groups that share every filter except `document_type` are merged into one
+    `document_type $in [...]` query. Its results are split back per type in
+    memory, and each group keeps its own top-k. If the combined query came back
+    full, a type left short gets a top-up query with the same vector. The
+    results are therefore the same as one `search_with_filter` call per group.
+
+    Args:
+        query (str): The search query.
+        filter_groups (List[Dict[str, Any]]): `search_with_filter` keyword filters per group,
+            e.g. [{"document_type": "faq"}, {"document_type": "faq", "category": "incoterms"}].
+        k (int): The number of results per group.
+        query_embedding (Optional[List[float]]): Precomputed embedding of `query`
+            (from `embed_query`); skips the embedding call when given.
+
+    Returns:
+        List[List[Dict[str, Any]]]: One result list per filter group, in the same order,
+                                     closest first.
+    """
+    grouped: List[List[Dict[str, Any]]] = [[] for _ in filter_groups]
+    if not filter_groups:
+        return grouped
+    if is_retrieval_degraded():
+        logger.warning("Vector index is not ready; search_filter_groups() returns no results (degraded mode)")
+        return grouped
+
+    if query_embedding is None:
+        query_embedding = get_embedding(query)
+    if query_embedding is None:
+        logger.warning("Could not generate embedding for query in search_filter_groups()")
+        return grouped
+
+    collection = get_or_create_collection()
+
+    # (document_type 외 필터, document_type 유무) 기준으로 묶으면 묶음당 쿼리 1회
+    partitions: Dict[Tuple[Any, ...], List[int]] = {}
+    for index, group in enumerate(filter_groups):
+        shared = tuple(sorted(
+            (key, value) for key, value in group.items()
+            if key != "document_type" and value
+        ))
+        partitions.setdefault((shared, bool(group.get("document_type"))), []).append(index)
+
+    for (shared, has_doc_type), indices in partitions.items():
+        shared_filters = dict(shared)
+        if not has_doc_type:
+            docs = _query_collection(
+                collection, query_embedding, k, _build_where_clause(**shared_filters)
+            )
+            for index in indices:
+                grouped[index] = list(docs)
+            continue
+
+        doc_types = list(dict.fromkeys(filter_groups[index]["document_type"] for index in indices))
+        if len(doc_types) == 1:
+            by_type = {
+                doc_types[0]: _query_collection(
+                    collection,
+                    query_embedding,
+                    k,
+                    _build_where_clause(document_type=doc_types[0], **shared_filters),
+                )
             }
-            retrieved_docs.append(doc)
-    return retrieved_docs
+        else:
+            n_results = k * len(doc_types) * GROUP_QUERY_OVERSAMPLE
+            docs = _query_collection(
+                collection,
+                query_embedding,
+                n_results,
+                _build_where_clause(document_type=doc_types, **shared_filters),
+            )
+            by_type = {doc_type: [] for doc_type in doc_types}
+            for doc in docs:
+                bucket = by_type.get((doc.get("metadata") or {}).get("document_type"))
+                if bucket is not None and len(bucket) < k:
+                    bucket.append(doc)
+            if len(docs) >= n_results:
+                # 결과가 잘렸으면 k개를 못 채운 타입은 top-k 밖에 더 있을 수 있음
+                for doc_type in doc_types:
+                    if len(by_type[doc_type]) < k:
+                        by_type[doc_type] = _query_collection(
+                            collection,
+                            query_embedding,
+                            k,
+                            _build_where_clause(document_type=doc_type, **shared_filters),
+                        )
+
+        for index in indices:
+            grouped[index] = list(by_type[filter_groups[index]["document_type"]])
+
+    return grouped
 
 
 if __name__ == '__main__':
@@ -0,0 +1,292 @@
+"""
+공유 LLM 게이트웨이
+
+[역할]
+  모든 에이전트(orchestrator, email, quiz, riskmanaging, default_chat)의 Upstage Chat
+  호출이 지나가는 단일 경로.
+  - (base_url, model)마다 연결 풀을 가진 AsyncOpenAI 클라이언트 하나를 재사용
+  - 전역 동시 호출 상한(LLM_MAX_CONCURRENCY) + 에이전트별 상한(LLM_AGENT_CONCURRENCY),
+    초과분은 대기열에서 순서대로 기다림
+  - 429/타임아웃/연결 오류/5xx는 지수 백오프로 재시도 (Retry-After 우선).
+    429를 받으면 전체 호출이 잠시 쉬어 가도록 cooldown을 둠
+  - 호출마다 지연, 대기열 대기 시간, 토큰 사용량, 재시도 횟수를 기록 (`stats()`)
+
+[사용 예시]
+  from backend.utils.llm_gateway import get_llm_gateway
+
+  client = get_llm_gateway().client("email")   # AsyncOpenAI와 같은 인터페이스
+  completion = await client.chat.completions.create(model="solar-pro2", messages=[...])
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from backend.config import get_settings
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+UPSTAGE_BASE_URL = "https://api.upstage.ai/v1"
+UPSTAGE_SOLAR_BASE_URL = "https://api.upstage.ai/v1/solar"
+DEFAULT_MODEL = "solar-pro"
+# stats()에 남기는 최근 호출 기록 수
+RECENT_CALLS = 200
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class _LoopState:
+    """Semaphores and HTTP clients bound to one event loop."""
+
+    def __init__(self, max_concurrency: int):
+        self.global_slots = asyncio.Semaphore(max(1, max_concurrency))
+        self.agent_slots: Dict[str, asyncio.Semaphore] = {}
+        self.clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.queued = 0
+
+
+class _Completions:
+    def __init__(self, gateway: "SharedLLMGateway", agent: str, base_url: str):
+        self._gateway = gateway
+        self._agent = agent
+        self._base_url = base_url
+
+    async def create(self, **kwargs: Any):
+        return await self._gateway.chat_completion(self._agent, self._base_url, **kwargs)
+
+
+class AgentLLMClient:
+    """`client.chat.completions.create(...)` surface of AsyncOpenAI, routed through the gateway."""
+
+    def __init__(self, gateway: "SharedLLMGateway", agent: str, base_url: str = UPSTAGE_BASE_URL):
+        self.agent = agent
+        self.base_url = base_url
+        self.chat = SimpleNamespace(completions=_Completions(gateway, agent, base_url))
+
+
+class SharedLLMGateway:
+    """Pooled, rate-limited, accounted Upstage chat completions for all agents."""
+
+    def __init__(self, settings=None):
+        self.settings = settings or get_settings()
+        # asyncio primitives와 httpx 클라이언트는 만든 이벤트 루프에 묶이므로 루프마다 둠
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats_lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_CALLS)
+
+    def client(self, agent: str, base_url: str = UPSTAGE_BASE_URL) -> AgentLLMClient:
+        return AgentLLMClient(self, agent, base_url)
+
+    # --- per-loop resources ---
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = _LoopState(int(self.settings.llm_max_concurrency))
+            self._loops[loop] = state
+        return state
+
+    def _agent_slots(self, state: _LoopState, agent: str) -> asyncio.Semaphore:
+        slots = state.agent_slots.get(agent)
+        if slots is None:
+            limits = self.settings.llm_agent_concurrency or {}
+            limit = int(limits.get(agent, limits.get("default", self.settings.llm_max_concurrency)))
+            slots = asyncio.Semaphore(max(1, limit))
+            state.agent_slots[agent] = slots
+        return slots
+
+    def _http_client(self, state: _LoopState, base_url: str, model: str) -> AsyncOpenAI:
+        key = (base_url, model)
+        client = state.clients.get(key)
+        if client is None:
+            timeout = float(self.settings.llm_timeout_seconds)
+            connections = max(1, int(self.settings.llm_max_concurrency))
+            client = AsyncOpenAI(
+                api_key=self.settings.upstage_api_key,
+                base_url=base_url,
+                max_retries=0,  # 재시도는 게이트웨이가 담당
+                timeout=timeout,
+                http_client=httpx.AsyncClient(
+                    timeout=timeout,
+                    limits=httpx.Limits(
+                        max_connections=connections, max_keepalive_connections=connections
+                    ),
+                ),
+            )
+            state.clients[key] = client
+        return client
+
+    # --- retry ---
+
+    def _backoff_seconds(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), float(self.settings.llm_retry_max_delay_seconds))
+            except ValueError:
+                pass
+        base = float(self.settings.llm_retry_base_delay_seconds)
+        delay = min(base * (2 ** (attempt - 1)), float(self.settings.llm_retry_max_delay_seconds))
+        return delay * (0.5 + random.random() / 2)  # jitter
+
+    async def chat_completion(self, agent: str, base_url: str = UPSTAGE_BASE_URL, **kwargs: Any):
+        """
+        `chat.completions.create(**kwargs)` with queueing, retry and accounting.
+
+        Raises the last error when retries are exhausted or the error is not retryable.
+        """
+        model = str(kwargs.setdefault("model", DEFAULT_MODEL))
+        state = self._state()
+        loop = asyncio.get_running_loop()
+        max_attempts = 1 + max(0, int(self.settings.llm_max_retries))
+        record: Dict[str, Any] = {
+            "agent": agent,
+            "model": model,
+            "queue_wait_ms": 0.0,
+            "latency_ms": 0.0,
+            "attempts": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "status": "ok",
+        }
+        started = time.perf_counter()
+        try:
+            while True:
+                record["attempts"] += 1
+                wait_started = time.perf_counter()
+                state.queued += 1
+                acquired = False
+                try:
+                    if state.cooldown_until > loop.time():
+                        await asyncio.sleep(state.cooldown_until - loop.time())
+                    # 에이전트 슬롯을 먼저 잡아야 한 에이전트의 대기열이 전역 슬롯을 붙잡지 않음
+                    async with self._agent_slots(state, agent):
+                        async with state.global_slots:
+                            state.queued -= 1
+                            acquired = True
+                            record["queue_wait_ms"] += (time.perf_counter() - wait_started) * 1000
+                            state.in_flight += 1
+                            try:
+                                client = self._http_client(state, base_url, model)
+                                response = await client.chat.completions.create(**kwargs)
+                            finally:
+                                state.in_flight -= 1
+                except RETRYABLE_ERRORS as e:
+                    if record["attempts"] >= max_attempts:
+                        record["status"] = type(e).__name__
+                        raise
+                    delay = self._backoff_seconds(record["attempts"], e)
+                    if isinstance(e, openai.RateLimitError):
+                        state.cooldown_until = max(state.cooldown_until, loop.time() + delay)
+                    logger.warning(
+                        "LLM call %s/%s failed (%s); retry %s/%s in %.2fs",
+                        agent, model, type(e).__name__, record["attempts"], max_attempts - 1, delay,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException as e:
+                    record["status"] = type(e).__name__
+                    raise
+                finally:
+                    if not acquired:
+                        state.queued -= 1
+
+                usage = getattr(response, "usage", None)
+                record["prompt_tokens"] = int(getattr(usage, "prompt_tokens", 0) or 0)
+                record["completion_tokens"] = int(getattr(usage, "completion_tokens", 0) or 0)
+                return response
+        finally:
+            record["latency_ms"] = (time.perf_counter() - started) * 1000
+            self._record(record)
+
+    # --- accounting ---
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        record["latency_ms"] = round(record["latency_ms"], 1)
+        record["queue_wait_ms"] = round(record["queue_wait_ms"], 1)
+        with self._stats_lock:
+            totals = self._totals.setdefault(
+                (record["agent"], record["model"]),
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "latency_ms": 0.0,
+                    "queue_wait_ms": 0.0,
+                    "max_queue_wait_ms": 0.0,
+                },
+            )
+            totals["calls"] += 1
+            totals["errors"] += record["status"] != "ok"
+            totals["retries"] += record["attempts"] - 1
+            totals["prompt_tokens"] += record["prompt_tokens"]
+            totals["completion_tokens"] += record["completion_tokens"]
+            totals["latency_ms"] += record["latency_ms"]
+            totals["queue_wait_ms"] += record["queue_wait_ms"]
+            totals["max_queue_wait_ms"] = max(totals["max_queue_wait_ms"], record["queue_wait_ms"])
+            self._recent.append(record)
+        logger.debug(
+            "LLM call %s/%s status=%s latency=%.1fms queue=%.1fms tokens=%s+%s attempts=%s",
+            record["agent"], record["model"], record["status"], record["latency_ms"],
+            record["queue_wait_ms"], record["prompt_tokens"], record["completion_tokens"], record["attempts"],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-(agent, model) totals and the most recent calls."""
+        with self._stats_lock:
+            agents: Dict[str, Dict[str, Any]] = {}
+            for (agent, model), totals in self._totals.items():
+                entry = dict(totals)
+                calls = max(1, entry["calls"])
+                entry["avg_latency_ms"] = round(entry.pop("latency_ms") / calls, 1)
+                entry["avg_queue_wait_ms"] = round(entry.pop("queue_wait_ms") / calls, 1)
+                agents.setdefault(agent, {})[model] = entry
+            return {
+                "limits": {
+                    "max_concurrency": int(self.settings.llm_max_concurrency),
+                    "agent_concurrency": dict(self.settings.llm_agent_concurrency or {}),
+                },
+                "in_flight": sum(state.in_flight for state in list(self._loops.values())),
+                "queued": sum(state.queued for state in list(self._loops.values())),
+                "agents": agents,
+                "recent": list(self._recent),
+            }
+
+
+_gateway: Optional[SharedLLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> SharedLLMGateway:
+    """Process-wide gateway shared by all agents."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = SharedLLMGateway()
+    return _gateway
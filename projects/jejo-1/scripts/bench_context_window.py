@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+대화 컨텍스트 윈도우 벤치마크 (스크립트로 진행하는 30턴 세션).
+
+실제 orchestrator 노드(load → call_agent → finalize)와 DefaultChatAgent를 그대로 쓰고,
+LLM 클라이언트만 스텁으로 바꿉니다. 스텁은 받은 프롬프트 토큰 수를 기록하고
+토큰 수에 비례해 대기합니다 (prefill 지연 흉내, 기본 0.05 ms/token).
+
+- window: CONTEXT_WINDOW_ENABLED=true (요약 + 최근 메시지, 에이전트별 토큰 예산)
+- full: 컨텍스트 윈도우를 끈 상태 (이전 동작: 전체 history 전달)
+
+Usage:
+  .venv/bin/python scripts/bench_context_window.py
+  .venv/bin/python scripts/bench_context_window.py --turns 60 --ms-per-token 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+# Ensure project root is importable when run as a script.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.agents.context_window import ContextWindow, estimate_tokens
+from backend.agents.default_chat.default_chat_agent import DefaultChatAgent
+from backend.agents.orchestrator import nodes as orchestrator_nodes
+from backend.agents.orchestrator.session_store import InMemoryConversationStore
+from backend.config import get_settings
+
+QUESTIONS = [
+    "베트남 바이어와 FOB 조건으로 계약하려는데 주의할 점이 있을까요?",
+    "선적이 2주 지연되면 지체상금은 보통 어떻게 계산하나요?",
+    "L/C 개설 은행이 서류 불일치를 통보했어요. 어떻게 대응하죠?",
+    "CIF와 CIP 차이를 실무 관점에서 다시 설명해 주세요.",
+    "원산지 증명서 발급이 늦어지면 관세 혜택을 못 받나요?",
+]
+
+
+class _StubCompletions:
+    def __init__(self, ms_per_token: float, prompt_tokens: List[int]):
+        self.ms_per_token = ms_per_token
+        self.prompt_tokens = prompt_tokens
+
+    async def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        self.prompt_tokens.append(tokens)
+        await asyncio.sleep(tokens * self.ms_per_token / 1000)
+        answer = "요청하신 내용은 계약서 조항과 인코텀즈 기준으로 확인하시는 것이 좋습니다. " * 6
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+
+async def _run_session(turns: int, ms_per_token: float, window_enabled: bool):
+    settings = get_settings()
+    settings.context_window_enabled = window_enabled
+    components = orchestrator_nodes.ORCHESTRATOR_COMPONENTS
+    components.conversation_store = InMemoryConversationStore()
+    components.context_window = ContextWindow(settings)
+
+    prompt_tokens: List[int] = []
+    agent = DefaultChatAgent()
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=_StubCompletions(ms_per_token, prompt_tokens)))
+    components.agents_instances = {"default_chat": agent}
+
+    latencies = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        state = await orchestrator_nodes.load_session_state_node(
+            {"session_id": "bench", "user_input": QUESTIONS[turn % len(QUESTIONS)], "context": {}}
+        )
+        state["selected_agent_name"] = "default_chat"
+        state = await orchestrator_nodes.call_agent_node(state)
+        await orchestrator_nodes.finalize_and_save_state_node(state)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return prompt_tokens, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Conversation context window benchmark")
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--ms-per-token", type=float, default=0.05)
+    args = parser.parse_args()
+
+    results = {
+        "window": asyncio.run(_run_session(args.turns, args.ms_per_token, True)),
+        "full": asyncio.run(_run_session(args.turns, args.ms_per_token, False)),
+    }
+
+    print(f"turns={args.turns} simulated prefill={args.ms_per_token} ms/token")
+    print(f"{'turn':>4} {'window tok':>10} {'window ms':>9} {'full tok':>9} {'full ms':>8}")
+    window_tokens, window_ms = results["window"]
+    full_tokens, full_ms = results["full"]
+    for turn in range(args.turns):
+        if turn in (0, 4, 9) or (turn + 1) % 10 == 0:
+            print(
+                f"{turn + 1:>4} {window_tokens[turn]:>10} {window_ms[turn]:>9.1f} "
+                f"{full_tokens[turn]:>9} {full_ms[turn]:>8.1f}"
+            )
+    print(
+        f"max prompt tokens: window={max(window_tokens)} full={max(full_tokens)}; "
+        f"total ms: window={sum(window_ms):.0f} full={sum(full_ms):.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+로컬 해시 임베딩 마이크로 벤치마크.
+
+기존 순수 Python 구현(아래 `_reference_hash_embedding`)과 NumPy 구현을
+dataset/ 문서 텍스트로 비교합니다. 결과가 비트 단위로 같은지도 함께 확인합니다.
+
+- per-text: `_local_hash_embedding` (쿼리 1건 경로, List[float] 반환)
+- batch: `local_hash_embeddings` (인덱싱 경로, float32 행렬 반환)
+- cold: 토큰 해시 LRU 캐시를 비운 상태 / warm: 캐시가 찬 상태
+
+Usage:
+  .venv/bin/python scripts/bench_local_embedding.py
+  .venv/bin/python scripts/bench_local_embedding.py --dim 4096 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import math
+import os
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+# Ensure project root is importable when run as a script.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.rag import embedder
+from backend.rag.ingest import _collect_entries
+
+
+def _reference_hash_embedding(text: str, dim: int) -> List[float]:
+    """기존 구현 그대로 (비교 기준)."""
+    dim = max(64, int(dim))
+    vector = [0.0] * dim
+    tokens = embedder._tokenize(text)
+
+    for token in tokens:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        idx_a = int.from_bytes(digest[:4], "little") % dim
+        idx_b = int.from_bytes(digest[4:8], "little") % dim
+        weight = 1.0 + min(len(token), 24) / 24.0
+        vector[idx_a] += weight
+        vector[idx_b] -= weight * 0.5
+
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm <= 0:
+        return vector
+    return [value / norm for value in vector]
+
+
+def _load_texts(dataset_dir: str = "dataset") -> List[str]:
+    texts: List[str] = []
+    for file_path in sorted(glob.glob(os.path.join(dataset_dir, "*.json"))):
+        texts.extend(content for _, content, _ in _collect_entries(file_path))
+    return texts
+
+
+def _best_of(repeat: int, fn: Callable[[], object], before: Callable[[], None] = lambda: None) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        before()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local hash embedding micro-benchmark")
+    parser.add_argument("--dim", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = _load_texts()
+    if not texts:
+        raise SystemExit("dataset/ 에서 텍스트를 찾지 못했습니다.")
+    dim = args.dim
+    clear_cache = embedder._token_buckets.cache_clear
+
+    reference = np.array([_reference_hash_embedding(text, dim) for text in texts], dtype=np.float64)
+    per_text = np.array([embedder._local_hash_embedding(text, dim) for text in texts], dtype=np.float64)
+    batch = embedder.local_hash_embeddings(texts, dim)
+    assert np.array_equal(reference.view(np.uint64), per_text.view(np.uint64)), "per-text 결과 불일치"
+    assert np.array_equal(
+        reference.astype(np.float32).view(np.uint32), batch.view(np.uint32)
+    ), "batch 결과 불일치"
+
+    timings = {
+        "reference (pure Python)": _best_of(
+            args.repeat, lambda: [_reference_hash_embedding(text, dim) for text in texts]
+        ),
+        "per-text, cold cache": _best_of(
+            args.repeat, lambda: [embedder._local_hash_embedding(text, dim) for text in texts], clear_cache
+        ),
+        "per-text, warm cache": _best_of(
+            args.repeat, lambda: [embedder._local_hash_embedding(text, dim) for text in texts]
+        ),
+        "batch, cold cache": _best_of(
+            args.repeat, lambda: embedder.local_hash_embeddings(texts, dim), clear_cache
+        ),
+        "batch, warm cache": _best_of(
+            args.repeat, lambda: embedder.local_hash_embeddings(texts, dim)
+        ),
+    }
+
+    baseline = timings["reference (pure Python)"]
+    print(f"texts={len(texts)} dim={dim} (bit-for-bit identical to reference)")
+    print(f"{'variant':<26} {'total ms':>9} {'us/text':>9} {'texts/s':>9} {'speedup':>8}")
+    for name, seconds in timings.items():
+        print(
+            f"{name:<26} {seconds * 1000:>9.1f} {seconds / len(texts) * 1e6:>9.1f} "
+            f"{len(texts) / seconds:>9.0f} {baseline / seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
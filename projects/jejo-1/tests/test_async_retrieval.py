@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import backend.agents.email_agent.tools as email_tools
+import backend.rag.embedder as embedder
+import backend.rag.retriever as retriever
+from backend.config import get_settings
+
+EMBED_LATENCY = 0.1
+CHROMA_LATENCY = 0.05
+
+
+class _StubEmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        time.sleep(EMBED_LATENCY)
+        body = json.dumps(
+            {"data": [{"index": i, "embedding": [float(len(text)), 1.0]} for i, text in enumerate(texts)]}
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _SlowCollection:
+    def __init__(self):
+        self.queries = 0
+
+    def query(self, *, query_embeddings, n_results, where=None, include=None):
+        self.queries += 1
+        time.sleep(CHROMA_LATENCY)  # blocking, like the Chroma client
+        doc_type = where.get("document_type") if where else "email"
+        if isinstance(doc_type, dict):
+            doc_type = doc_type["$in"][0]
+        return {
+            "documents": [[f"stub-{doc_type}"]],
+            "metadatas": [[{"document_type": doc_type, "source_dataset": "stub.json"}]],
+            "distances": [[0.1]],
+        }
+
+
+@pytest.fixture
+def stub_embeddings(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEmbeddingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings = get_settings()
+    monkeypatch.setattr(settings, "embedding_provider", "upstage")
+    monkeypatch.setattr(settings, "upstage_api_key", "test-key")
+    monkeypatch.setattr(embedder, "UPSTAGE_API_URL", f"http://127.0.0.1:{server.server_port}/v1/embeddings")
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+async def _calls_per_second(sessions: int, calls_per_session: int = 2) -> float:
+    async def session(index: int):
+        for turn in range(calls_per_session):
+            assert await retriever.aembed_query(f"세션 {index} 질문 {turn}") is not None
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(index) for index in range(sessions)))
+    return sessions * calls_per_session / (time.perf_counter() - started)
+
+
+async def test_async_embedding_throughput_scales_with_concurrent_sessions(stub_embeddings):
+    await _calls_per_second(1)  # warm up the pooled client
+    single = await _calls_per_second(1)
+    concurrent = await _calls_per_second(8)
+
+    # blocking requests.post would keep this at ~1x
+    assert concurrent > single * 4
+
+
+async def test_tool_ainvoke_keeps_event_loop_responsive(stub_embeddings, monkeypatch):
+    collection = _SlowCollection()
+    monkeypatch.setattr(retriever, "get_or_create_collection", lambda: collection)
+    ticks = 0
+    running = True
+
+    async def ticker():
+        nonlocal ticks
+        while running:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            email_tools.search_email_references.ainvoke({"query": f"클레임 응답 {i}", "k": 3})
+            for i in range(4)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    running = False
+    await ticker_task
+
+    assert all(result and result[0]["type"] == "email" for result in results)
+    # 4 sessions overlap (embedding + Chroma query) instead of queuing behind each other
+    assert elapsed < 2 * (EMBED_LATENCY + CHROMA_LATENCY)
+    # the loop kept running other tasks while requests were in flight
+    assert ticks >= elapsed / 0.005 * 0.5
+
+    sync_result = email_tools.search_email_references.invoke({"query": "클레임 응답 0", "k": 3})
+    assert sync_result == results[0]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import backend.agents.orchestrator.nodes as orchestrator_nodes
+from backend.agents.context_window import (
+    CONTEXT_SUMMARY_KEY,
+    SUMMARY_ROLE,
+    ContextWindow,
+    estimate_tokens,
+    message_tokens,
+)
+from backend.agents.orchestrator.session_store import InMemoryConversationStore
+
+
+def _settings(**overrides):
+    values = dict(
+        context_window_enabled=True,
+        context_recent_messages=4,
+        context_summary_batch_messages=4,
+        context_summary_mode="rule",
+        context_summary_max_tokens=120,
+        context_token_budgets={"default": 400, "quiz": 60},
+        upstage_api_key="",
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _history(turns: int):
+    history = []
+    for turn in range(turns):
+        history.append({"role": "User", "content": f"질문 {turn}: 선적 지연 시 계약 조건은 어떻게 되나요?"})
+        history.append({"role": "Agent", "content": f"답변 {turn}: " + "지연 조항과 보험 범위를 먼저 확인하세요. " * 3})
+    return history
+
+
+async def test_summary_folds_old_messages_in_batches_and_keeps_recent_verbatim():
+    calls = []
+
+    async def summarizer(previous, messages):
+        calls.append(len(messages))
+        return (previous + "\n" if previous else "") + f"{len(messages)}건 요약"
+
+    window = ContextWindow(_settings(), summarizer=summarizer)
+    history, state = [], None
+    for turn in range(10):
+        history.extend(_history(turn + 1)[-2:])
+        state = await window.update_summary(history, state)
+
+    # 20 messages, 4 recent -> 16 folded in batches of >= 4 (not every turn)
+    assert sum(calls) == state["folded_total"] == 16
+    assert len(calls) == 4
+    view = window.build(history, state, "default_chat")
+    assert view[0]["role"] == SUMMARY_ROLE
+    assert view[1:] == history[state["covered"]:]
+    assert view[-1] == history[-1]
+
+
+async def test_view_respects_per_agent_token_budget():
+    window = ContextWindow(_settings())
+    history = _history(30)
+    state = await window.update_summary(history, None)
+
+    for agent_name, budget in (("default_chat", 400), ("quiz", 60)):
+        view = window.build(history, state, agent_name)
+        assert sum(message_tokens(turn) for turn in view) <= budget
+        assert view[-1]["content"].startswith("답변 29")
+
+    huge = [{"role": "User", "content": "가" * 500}]
+    (only,) = window.build(huge, None, "quiz")
+    assert message_tokens(only) <= 60
+
+
+async def test_summary_survives_store_trimming_the_front_of_history():
+    window = ContextWindow(_settings())
+    history = _history(10)
+    state = await window.update_summary(history, None)
+    covered_message = history[state["covered"] - 1]
+
+    trimmed = history[6:]  # e.g. Redis LTRIM dropped the oldest messages
+    view = window.build(trimmed, state, "default_chat")
+    assert view[1:] == trimmed[trimmed.index(covered_message) + 1:]
+
+    gone = history[state["covered"]:]
+    assert window.build(gone, state, "default_chat")[1:] == gone
+
+
+def test_estimate_tokens_counts_hangul_per_char():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("선적 지연") == 5  # 4 Hangul + 1 space
+
+
+class _RecordingAgent:
+    def __init__(self):
+        self.seen = []
+
+    async def run(self, user_input, conversation_history, analysis_in_progress=False, context=None):
+        self.seen.append(list(conversation_history))
+        history = list(conversation_history)
+        history.append({"role": "User", "content": user_input})
+        history.append({"role": "Agent", "content": f"응답: {user_input}"})
+        return {
+            "response": {"response": f"응답: {user_input}", "agent_type": "default_chat", "metadata": {}},
+            "conversation_history": history,
+        }
+
+
+async def test_orchestrator_passes_bounded_context_and_keeps_full_history(monkeypatch):
+    agent = _RecordingAgent()
+    components = orchestrator_nodes.ORCHESTRATOR_COMPONENTS
+    monkeypatch.setattr(components, "conversation_store", InMemoryConversationStore())
+    monkeypatch.setattr(components, "agents_instances", {"default_chat": agent})
+    monkeypatch.setattr(components, "context_window", ContextWindow(_settings()))
+
+    for turn in range(30):
+        state = await orchestrator_nodes.load_session_state_node(
+            {"session_id": "long-session", "user_input": f"질문 {turn}", "context": {}}
+        )
+        state["selected_agent_name"] = "default_chat"
+        state = await orchestrator_nodes.call_agent_node(state)
+        await orchestrator_nodes.finalize_and_save_state_node(state)
+
+    saved = components.conversation_store.get_state("long-session")
+    assert len(saved["conversation_history"]) == 60
+    assert all(turn["role"] != SUMMARY_ROLE for turn in saved["conversation_history"])
+    assert saved["agent_specific_state"][CONTEXT_SUMMARY_KEY]["folded_total"] >= 50
+
+    view_sizes = [len(view) for view in agent.seen]
+    assert max(view_sizes[10:]) <= 1 + 4 + 4  # summary + recent + one pending batch
+    assert agent.seen[-1][0]["role"] == SUMMARY_ROLE
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from backend.utils.llm_gateway import SharedLLMGateway
+
+
+def _settings(**overrides):
+    values = dict(
+        upstage_api_key="test-key",
+        llm_max_concurrency=4,
+        llm_agent_concurrency={"default": 4, "email": 2},
+        llm_timeout_seconds=5.0,
+        llm_max_retries=3,
+        llm_retry_base_delay_seconds=0.01,
+        llm_retry_max_delay_seconds=0.2,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _completion(content="ok", prompt_tokens=10, completion_tokens=5):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+def _rate_limited(retry_after="0.05"):
+    response = httpx.Response(
+        429,
+        headers={"retry-after": retry_after},
+        request=httpx.Request("POST", "https://api.upstage.ai/v1/chat/completions"),
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class _FakeUpstream:
+    """Stands in for the pooled AsyncOpenAI client; tracks concurrency per agent."""
+
+    def __init__(self, latency=0.02, failures=None):
+        self.latency = latency
+        self.failures = list(failures or [])
+        self.active = {}
+        self.peak = {}
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        agent = kwargs["messages"][0]["content"]
+        self.calls += 1
+        self.active[agent] = self.active.get(agent, 0) + 1
+        self.active["*"] = self.active.get("*", 0) + 1
+        for key in (agent, "*"):
+            self.peak[key] = max(self.peak.get(key, 0), self.active[key])
+        try:
+            await asyncio.sleep(self.latency)
+            if self.failures:
+                raise self.failures.pop(0)
+            return _completion()
+        finally:
+            self.active[agent] -= 1
+            self.active["*"] -= 1
+
+
+def _install(gateway, monkeypatch, upstream):
+    monkeypatch.setattr(gateway, "_http_client", lambda state, base_url, model: upstream)
+
+
+async def test_burst_is_bounded_globally_and_per_agent(monkeypatch):
+    gateway = SharedLLMGateway(_settings())
+    upstream = _FakeUpstream()
+    _install(gateway, monkeypatch, upstream)
+
+    async def call(agent):
+        client = gateway.client(agent)
+        return await client.chat.completions.create(
+            model="solar-pro2", messages=[{"role": "user", "content": agent}]
+        )
+
+    results = await asyncio.gather(*(call("email" if i % 2 else "quiz") for i in range(20)))
+
+    assert len(results) == 20
+    assert upstream.peak["*"] <= 4
+    assert upstream.peak["email"] <= 2
+    stats = gateway.stats()
+    email = stats["agents"]["email"]["solar-pro2"]
+    assert email["calls"] == 10 and email["errors"] == 0
+    assert email["prompt_tokens"] == 100 and email["completion_tokens"] == 50
+    assert email["max_queue_wait_ms"] > 0
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+async def test_rate_limits_are_retried_with_backoff(monkeypatch):
+    gateway = SharedLLMGateway(_settings())
+    upstream = _FakeUpstream(latency=0, failures=[_rate_limited(), _rate_limited()])
+    _install(gateway, monkeypatch, upstream)
+
+    completion = await gateway.client("email").chat.completions.create(
+        model="solar-pro2", messages=[{"role": "user", "content": "email"}]
+    )
+
+    assert completion.choices[0].message.content == "ok"
+    (record,) = gateway.stats()["recent"]
+    assert record["attempts"] == 3 and record["status"] == "ok"
+    assert record["latency_ms"] >= 100  # two Retry-After waits of 50 ms
+    assert gateway.stats()["agents"]["email"]["solar-pro2"]["retries"] == 2
+
+
+async def test_exhausted_and_non_retryable_errors_are_raised(monkeypatch):
+    gateway = SharedLLMGateway(_settings(llm_max_retries=1))
+    upstream = _FakeUpstream(latency=0, failures=[_rate_limited("0"), _rate_limited("0"), ValueError("bad request")])
+    _install(gateway, monkeypatch, upstream)
+    client = gateway.client("quiz")
+    messages = [{"role": "user", "content": "quiz"}]
+
+    with pytest.raises(openai.RateLimitError):
+        await client.chat.completions.create(model="solar-pro2", messages=messages)
+    with pytest.raises(ValueError):
+        await client.chat.completions.create(model="solar-pro2", messages=messages)
+
+    assert upstream.calls == 3
+    totals = gateway.stats()["agents"]["quiz"]["solar-pro2"]
+    assert totals["calls"] == 2 and totals["errors"] == 2 and totals["retries"] == 1
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_POST(self):
+        type(self).connections.add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": payload["model"],
+                "choices": [
+                    {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "안녕하세요"}}
+                ],
+                "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def test_pooled_client_reuses_connections_per_model():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _ChatHandler.connections = set()
+    try:
+        gateway = SharedLLMGateway(_settings())
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        for agent in ("email", "quiz", "email", "default_chat") * 3:
+            completion = await gateway.client(agent, base_url=base_url).chat.completions.create(
+                model="solar-pro2", messages=[{"role": "user", "content": "hi"}]
+            )
+            assert completion.choices[0].message.content == "안녕하세요"
+
+        # 12 sequential calls from 3 agents share one keep-alive connection
+        assert len(_ChatHandler.connections) == 1
+        state = gateway._state()
+        assert list(state.clients) == [(base_url, "solar-pro2")]
+        assert gateway.stats()["agents"]["email"]["solar-pro2"]["prompt_tokens"] == 7 * 6
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hashlib
+import math
+
+import numpy as np
+
+from backend.rag import embedder
+
+
+def _reference_hash_embedding(text, dim):
+    # Pre-vectorization implementation; stored vectors were built with it.
+    dim = max(64, int(dim))
+    vector = [0.0] * dim
+    for token in embedder._tokenize(text):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        idx_a = int.from_bytes(digest[:4], "little") % dim
+        idx_b = int.from_bytes(digest[4:8], "little") % dim
+        weight = 1.0 + min(len(token), 24) / 24.0
+        vector[idx_a] += weight
+        vector[idx_b] -= weight * 0.5
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm <= 0:
+        return vector
+    return [value / norm for value in vector]
+
+
+TEXTS = [
+    "FOB 조건에서 위험 이전 시점은 본선 적재 시점입니다",
+    "L/C 개설 은행 | 신용장 | payment_terms",
+    "a a a b b",  # repeated tokens hit the same buckets several times
+    "선적 지연 클레임 " * 40,
+    "!!!",
+    "",
+]
+
+
+def test_local_hash_embedding_is_bit_for_bit_compatible():
+    for dim in (4096, 64, 10):
+        for text in TEXTS:
+            expected = _reference_hash_embedding(text, dim)
+            actual = embedder._local_hash_embedding(text, dim)
+            assert [value.hex() for value in actual] == [value.hex() for value in expected]
+
+
+def test_local_hash_embeddings_batch_matches_float32_rows():
+    matrix = embedder.local_hash_embeddings(TEXTS, 4096)
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (len(TEXTS), 4096)
+    expected = np.array([_reference_hash_embedding(text, 4096) for text in TEXTS]).astype(np.float32)
+    assert np.array_equal(matrix.view(np.uint32), expected.view(np.uint32))
@@ -71,9 +71,9 @@ def reset_orchestrator_components(monkeypatch):
     return store
 
 
-def test_load_session_state_initializes_new_session(reset_orchestrator_components):
+async def test_load_session_state_initializes_new_session(reset_orchestrator_components):
     state = make_state(session_id="new-session")
-    updated = orchestrator_nodes.load_session_state_node(state)
+    updated = await orchestrator_nodes.load_session_state_node(state)
 
     assert updated["conversation_history"] == []
     assert updated["active_agent"] is None
@@ -248,7 +248,7 @@ async def test_call_agent_node_merges_agent_specific_state(monkeypatch):
     assert updated["agent_specific_state"]["awaiting_follow_up"] is True
 
 
-def test_finalize_and_normalize_roundtrip(reset_orchestrator_components):
+async def test_finalize_and_normalize_roundtrip(reset_orchestrator_components):
     state = make_state(
         session_id="save-session",
         selected_agent_name="default_chat",
@@ -262,7 +262,7 @@ def test_finalize_and_normalize_roundtrip(reset_orchestrator_components):
         },
     )
 
-    saved = orchestrator_nodes.finalize_and_save_state_node(state)
+    saved = await orchestrator_nodes.finalize_and_save_state_node(state)
     persisted = reset_orchestrator_components.get_state("save-session")
     normalized = orchestrator_nodes.normalize_response_node(saved)
 
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import backend.rag.ingest as ingest
+
+_load_manifest = ingest.load_ingest_manifest
+_save_manifest = ingest.save_ingest_manifest
+
+
+class _FakeCollection:
+    name = "fake_collection"
+
+    def __init__(self):
+        self.rows = {}
+        self.upsert_sizes = []
+
+    def upsert(self, *, embeddings, documents, metadatas, ids):
+        self.upsert_sizes.append(len(ids))
+        for entry_id, document in zip(ids, documents):
+            self.rows[entry_id] = document
+
+    def delete(self, *, ids):
+        for entry_id in ids:
+            self.rows.pop(entry_id, None)
+
+    def count(self):
+        return len(self.rows)
+
+
+def _setup(monkeypatch, tmp_path, *, batch_size=4, upsert_batch_size=6):
+    dataset_dir = tmp_path / "dataset"
+    dataset_dir.mkdir()
+    for file_index in range(3):
+        entries = [
+            {"id": i, "content": f"file {file_index} entry {i} - 무역 실무 설명 문장입니다"}
+            for i in range(5)
+        ]
+        (dataset_dir / f"data_{file_index}.json").write_text(
+            json.dumps(entries, ensure_ascii=False), encoding="utf-8"
+        )
+
+    manifest_path = str(tmp_path / "ingest_manifest.json")
+    collection = _FakeCollection()
+    settings = SimpleNamespace(
+        embedding_provider="local",
+        local_embedding_dim=64,
+        ingest_batch_size=batch_size,
+        ingest_concurrency=2,
+        ingest_upsert_batch_size=upsert_batch_size,
+    )
+    monkeypatch.setattr(ingest, "DATASET_DIR", str(dataset_dir))
+    monkeypatch.setattr(ingest, "get_settings", lambda: settings)
+    monkeypatch.setattr(ingest, "get_or_create_collection", lambda: collection)
+    monkeypatch.setattr(ingest, "reset_collection", lambda: collection)
+    monkeypatch.setattr(ingest, "load_ingest_manifest", lambda: _load_manifest(manifest_path))
+    monkeypatch.setattr(ingest, "save_ingest_manifest", lambda data: _save_manifest(data, manifest_path))
+    return collection, manifest_path
+
+
+def test_ingest_embeds_in_batches_and_upserts_in_chunks(monkeypatch, tmp_path):
+    collection, manifest_path = _setup(monkeypatch, tmp_path)
+    batch_sizes = []
+
+    def fake_get_embeddings(texts, batch_size):
+        batch_sizes.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(ingest, "get_embeddings", fake_get_embeddings)
+
+    manifest = ingest.ingest_data(reset=True)
+
+    # batches never cross file boundaries: 5 entries per file -> 4 + 1
+    assert batch_sizes == [4, 1, 4, 1, 4, 1]
+    assert collection.count() == 15
+    assert collection.upsert_sizes == [9, 6]
+    assert manifest["indexed_documents"] == 15
+    saved = json.loads(open(manifest_path, encoding="utf-8").read())
+    assert "in_progress" not in saved
+    assert saved["indexed_files"] == ["data_0.json", "data_1.json", "data_2.json"]
+
+
+def test_ingest_resumes_after_interruption(monkeypatch, tmp_path):
+    collection, manifest_path = _setup(monkeypatch, tmp_path, batch_size=5, upsert_batch_size=5)
+    calls = []
+
+    def failing_get_embeddings(texts, batch_size):
+        calls.append(texts)
+        if len(calls) == 3:
+            raise RuntimeError("embedding service went away")
+        return [[1.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(ingest, "get_embeddings", failing_get_embeddings)
+    with pytest.raises(RuntimeError):
+        ingest.ingest_data(reset=True)
+
+    saved = json.loads(open(manifest_path, encoding="utf-8").read())
+    assert saved["in_progress"]["completed_files"] == ["data_0.json", "data_1.json"]
+    assert saved["in_progress"]["indexed_documents"] == 10
+
+    resumed_texts = []
+
+    def get_embeddings(texts, batch_size):
+        resumed_texts.extend(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(ingest, "get_embeddings", get_embeddings)
+    monkeypatch.setattr(ingest, "reset_collection", lambda: pytest.fail("resumed run must not reset"))
+    manifest = ingest.ingest_data(reset=True)
+
+    assert len(resumed_texts) == 5
+    assert all(text.startswith("file 2") for text in resumed_texts)
+    assert manifest["indexed_documents"] == 15
+    assert collection.count() == 15
+
+
+def test_sync_reembeds_only_changed_entries_and_deletes_removed(monkeypatch, tmp_path):
+    collection, manifest_path = _setup(monkeypatch, tmp_path)
+    monkeypatch.setattr(ingest, "get_embeddings", lambda texts, batch_size: [[1.0, 0.0] for _ in texts])
+    ingest.ingest_data(reset=True)
+
+    dataset_dir = tmp_path / "dataset"
+    data_1 = json.loads((dataset_dir / "data_1.json").read_text(encoding="utf-8"))
+    data_1[2]["content"] = "file 1 entry 2 - 수정된 설명 문장입니다"
+    del data_1[4]
+    (dataset_dir / "data_1.json").write_text(json.dumps(data_1, ensure_ascii=False), encoding="utf-8")
+    (dataset_dir / "data_2.json").unlink()
+
+    embedded = []
+
+    def get_embeddings(texts, batch_size):
+        embedded.extend(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(ingest, "get_embeddings", get_embeddings)
+    monkeypatch.setattr(ingest, "reset_collection", lambda: pytest.fail("sync must not reset"))
+    manifest = ingest.sync_data()
+
+    assert embedded == ["file 1 entry 2 - 수정된 설명 문장입니다"]
+    assert collection.rows["data_1_2"] == embedded[0]
+    assert "data_1_4" not in collection.rows
+    assert not any(entry_id.startswith("data_2_") for entry_id in collection.rows)
+    assert collection.count() == 9
+    assert manifest["last_sync"] == {"upserted": 1, "deleted": 6}
+    assert manifest["indexed_files"] == ["data_0.json", "data_1.json"]
+
+    embedded.clear()
+    ingest.sync_data()
+    assert embedded == []
+
+
+def test_sync_falls_back_to_full_rebuild_without_entry_hashes(monkeypatch, tmp_path):
+    collection, manifest_path = _setup(monkeypatch, tmp_path)
+    collection.rows["stale"] = "old"
+    _save_manifest({"dataset_fingerprint": "old", "embedding_provider": "local", "local_embedding_dim": 64}, manifest_path)
+    rebuilds = []
+
+    def reset_collection():
+        rebuilds.append(True)
+        collection.rows.clear()
+        return collection
+
+    monkeypatch.setattr(ingest, "reset_collection", reset_collection)
+    monkeypatch.setattr(ingest, "get_embeddings", lambda texts, batch_size: [[1.0, 0.0] for _ in texts])
+    manifest = ingest.sync_data()
+
+    assert rebuilds == [True]
+    assert collection.count() == 15
+    assert set(manifest["files"]) == {"data_0.json", "data_1.json", "data_2.json"}
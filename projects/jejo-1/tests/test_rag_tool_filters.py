@@ -6,6 +6,7 @@ from typing import Any, Dict
 import backend.agents.email_agent.tools as email_tools
 import backend.agents.quiz_agent.tools as quiz_tools
 import backend.agents.riskmanaging.tools as risk_tools
+import backend.rag.retriever as retriever
 
 
 def _stub_doc(
@@ -28,16 +29,32 @@ def _stub_doc(
     }
 
 
+def _fake_search_filter_groups(calls, make_doc):
+    def fake(*, query, filter_groups, k, query_embedding):
+        assert query_embedding == [1.0]
+        grouped = []
+        for group in filter_groups:
+            calls.append((group.get("document_type"), group.get("category"), k))
+            grouped.append(make_doc(group, len(calls)))
+        return grouped
+
+    return fake
+
+
 def test_quiz_search_trade_documents_uses_preferred_doc_types(monkeypatch):
     calls = []
 
     monkeypatch.setattr(quiz_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
 
-    def fake_search_with_filter(*, query, k, document_type=None, category=None):
-        calls.append((document_type, category, k))
-        return [_stub_doc(document_type=document_type, distance=0.1 + len(calls) * 0.01)]
-
-    monkeypatch.setattr(quiz_tools, "search_with_filter", fake_search_with_filter)
+    monkeypatch.setattr(quiz_tools, "embed_query", lambda query: [1.0])
+    monkeypatch.setattr(
+        quiz_tools,
+        "search_filter_groups",
+        _fake_search_filter_groups(
+            calls,
+            lambda group, n: [_stub_doc(document_type=group["document_type"], distance=0.1 + n * 0.01)],
+        ),
+    )
     monkeypatch.setattr(quiz_tools, "rag_search", lambda *args, **kwargs: [])
 
     result = quiz_tools.search_trade_documents.invoke({"query": "무역용어 퀴즈내줘", "k": 3})
@@ -57,11 +74,14 @@ def test_quiz_search_trade_documents_respects_explicit_document_type(monkeypatch
 
     monkeypatch.setattr(quiz_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
 
-    def fake_search_with_filter(*, query, k, document_type=None, category=None):
-        calls.append((document_type, category, k))
-        return [_stub_doc(document_type=document_type, document="faq-doc")]
-
-    monkeypatch.setattr(quiz_tools, "search_with_filter", fake_search_with_filter)
+    monkeypatch.setattr(quiz_tools, "embed_query", lambda query: [1.0])
+    monkeypatch.setattr(
+        quiz_tools,
+        "search_filter_groups",
+        _fake_search_filter_groups(
+            calls, lambda group, n: [_stub_doc(document_type=group["document_type"], document="faq-doc")]
+        ),
+    )
     monkeypatch.setattr(quiz_tools, "rag_search", lambda *args, **kwargs: [])
 
     result = quiz_tools.search_trade_documents.invoke(
@@ -83,18 +103,19 @@ def test_email_search_references_uses_mistake_doc_types(monkeypatch):
 
     monkeypatch.setattr(email_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
 
-    def fake_search_with_filter(*, query, k, document_type=None):
-        calls.append((document_type, k))
-        return [_stub_doc(document_type=document_type)]
-
-    monkeypatch.setattr(email_tools, "search_with_filter", fake_search_with_filter)
+    monkeypatch.setattr(email_tools, "embed_query", lambda query: [1.0])
+    monkeypatch.setattr(
+        email_tools,
+        "search_filter_groups",
+        _fake_search_filter_groups(calls, lambda group, n: [_stub_doc(document_type=group["document_type"])]),
+    )
     monkeypatch.setattr(email_tools, "rag_search", lambda *args, **kwargs: [])
 
     result = email_tools.search_email_references.invoke(
         {"query": "BL 오류", "k": 3, "search_type": "mistakes"}
     )
 
-    assert [doc_type for doc_type, _ in calls] == ["common_mistake", "error_checklist"]
+    assert [doc_type for doc_type, _, _ in calls] == ["common_mistake", "error_checklist"]
     assert result
     assert {item["type"] for item in result} <= {"common_mistake", "error_checklist"}
 
@@ -104,27 +125,32 @@ def test_risk_search_cases_maps_dataset_tokens_to_doc_types(monkeypatch):
 
     monkeypatch.setattr(risk_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
 
-    def fake_search_with_filter(*, query, k, document_type=None):
-        calls.append((document_type, k))
-        category = "claims" if document_type == "claim_type" else "mistakes"
-        return [_stub_doc(document_type=document_type, original_category=category)]
+    def make_doc(group, n):
+        category = "claims" if group["document_type"] == "claim_type" else "mistakes"
+        return [_stub_doc(document_type=group["document_type"], original_category=category)]
 
-    monkeypatch.setattr(risk_tools, "search_with_filter", fake_search_with_filter)
+    monkeypatch.setattr(risk_tools, "embed_query", lambda query: [1.0])
+    monkeypatch.setattr(risk_tools, "search_filter_groups", _fake_search_filter_groups(calls, make_doc))
     monkeypatch.setattr(risk_tools, "rag_search", lambda *args, **kwargs: [])
 
     result = risk_tools.search_risk_cases.invoke(
         {"query": "선적 지연 페널티", "k": 5, "datasets": ["claims", "mistakes"]}
     )
 
-    assert [doc_type for doc_type, _ in calls] == ["claim_type", "common_mistake", "error_checklist"]
-    assert [k_value for _, k_value in calls] == [3, 3, 3]
+    assert [doc_type for doc_type, _, _ in calls] == ["claim_type", "common_mistake", "error_checklist"]
+    assert [k_value for _, _, k_value in calls] == [3, 3, 3]
     assert result
     assert all(item["category"] != "unknown" for item in result)
 
 
 def test_risk_search_cases_fallback_filters_broad_results(monkeypatch):
     monkeypatch.setattr(risk_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
-    monkeypatch.setattr(risk_tools, "search_with_filter", lambda **kwargs: [])
+    monkeypatch.setattr(risk_tools, "embed_query", lambda query: [1.0])
+    monkeypatch.setattr(
+        risk_tools,
+        "search_filter_groups",
+        lambda *, filter_groups, **kwargs: [[] for _ in filter_groups],
+    )
     monkeypatch.setattr(
         risk_tools,
         "rag_search",
@@ -141,3 +167,110 @@ def test_risk_search_cases_fallback_filters_broad_results(monkeypatch):
 
     assert result
     assert [item["metadata"]["document_type"] for item in result] == ["claim_type"]
+
+
+class _FakeCollection:
+    """In-memory stand-in for a Chroma collection (eq / $in / $and filters, L2 distance)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def _matches(self, metadata, where):
+        if not where:
+            return True
+        if "$and" in where:
+            return all(self._matches(metadata, clause) for clause in where["$and"])
+        (key, condition), = where.items()
+        if isinstance(condition, dict) and "$in" in condition:
+            return metadata.get(key) in condition["$in"]
+        return metadata.get(key) == condition
+
+    def query(self, *, query_embeddings, n_results, where=None, include=None):
+        self.queries.append(where)
+        vector = query_embeddings[0]
+        scored = sorted(
+            (sum((a - b) ** 2 for a, b in zip(vector, embedding)), document, metadata)
+            for embedding, document, metadata in self.rows
+            if self._matches(metadata, where)
+        )[:n_results]
+        return {
+            "documents": [[document for _, document, _ in scored]],
+            "metadatas": [[metadata for _, _, metadata in scored]],
+            "distances": [[distance for distance, _, _ in scored]],
+        }
+
+
+def _install_fake_collection(monkeypatch):
+    doc_types = [
+        "claim_type", "common_mistake", "error_checklist", "email", "process_flow",
+        "trade_terminology", "terminology", "faq", "quiz_question", "country_guideline",
+    ]
+    rows = []
+    for index in range(120):
+        # claim_type rows sit closest to the query so they would crowd out other types
+        doc_type = doc_types[index % len(doc_types)]
+        offset = 0.0 if doc_type == "claim_type" else 1.0
+        rows.append(
+            (
+                [offset + index * 0.01, 0.0],
+                f"doc-{index}",
+                {
+                    "document_type": doc_type,
+                    "original_category": "incoterms" if index % 3 == 0 else "payment_terms",
+                    "source_dataset": "stub.json",
+                },
+            )
+        )
+    collection = _FakeCollection(rows)
+    embed_calls = []
+
+    def fake_get_embedding(text):
+        embed_calls.append(text)
+        return [0.0, 0.0]
+
+    monkeypatch.setattr(retriever, "get_or_create_collection", lambda: collection)
+    monkeypatch.setattr(retriever, "get_embedding", fake_get_embedding)
+    return collection, embed_calls
+
+
+def test_search_filter_groups_matches_per_group_search_with_filter(monkeypatch):
+    collection, embed_calls = _install_fake_collection(monkeypatch)
+    groups = [
+        {"document_type": "claim_type"},
+        {"document_type": "common_mistake"},
+        {"document_type": "error_checklist"},
+        {"document_type": "faq", "category": "incoterms"},
+        {"document_type": "terminology", "category": "incoterms"},
+        {"category": "incoterms"},
+    ]
+
+    expected = [retriever.search_with_filter(query="q", k=3, **group) for group in groups]
+    embed_calls.clear()
+    collection.queries.clear()
+
+    grouped = retriever.search_filter_groups(query="q", filter_groups=groups, k=3)
+
+    assert grouped == expected
+    assert len(embed_calls) == 1
+    # one $in query per shared-filter set, one for the category-only group
+    assert len(collection.queries) == 3
+
+
+def test_rag_tools_embed_query_exactly_once(monkeypatch):
+    monkeypatch.setattr(risk_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
+    monkeypatch.setattr(email_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
+    monkeypatch.setattr(quiz_tools, "get_settings", lambda: SimpleNamespace(upstage_api_key="test"))
+    collection, embed_calls = _install_fake_collection(monkeypatch)
+
+    invocations = [
+        (risk_tools.search_risk_cases, {"query": "선적 지연 페널티", "k": 5}),
+        (risk_tools.search_risk_cases, {"query": "없는 타입", "k": 3, "datasets": ["emails"]}),
+        (email_tools.search_email_references, {"query": "BL 오류", "k": 3}),
+        (quiz_tools.search_trade_documents, {"query": "FOB란?", "k": 3, "category": "incoterms"}),
+    ]
+    for tool_fn, payload in invocations:
+        embed_calls.clear()
+        result = tool_fn.invoke(payload)
+        assert result
+        assert len(embed_calls) == 1, tool_fn.name
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import backend.agents.riskmanaging.nodes as nodes
+from backend.agents.riskmanaging.state import RiskManagingAgentInput, RiskScoring
+from backend.config import get_settings
+
+LATENCY = 0.2
+
+
+class _FakeCompletions:
+    def __init__(self, hang_on=None):
+        self.hang_on = hang_on
+        self.prompts = []
+
+    async def create(self, *, model, messages, temperature):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        section = prompt.split(":", 1)[0]
+        await asyncio.sleep(3600 if section == self.hang_on else LATENCY)
+        if section == "GAP":
+            content = json.dumps({"identified_gaps": ["서류 검증 누락"], "recommendations": ["체크리스트"]})
+        elif section == "PREVENTION":
+            content = json.dumps({"short_term": ["즉시 조치"], "long_term": ["프로세스 개선"]})
+        else:
+            content = f"{section} 결과"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "upstage_api_key", "test-key")
+    monkeypatch.setattr(settings, "report_section_concurrency", 3)
+    monkeypatch.setattr(settings, "report_section_timeout_seconds", 30.0)
+    monkeypatch.setattr(nodes, "INPUT_SUMMARY_PROMPT", "SUMMARY: {{user_input}}")
+    monkeypatch.setattr(nodes, "LOSS_SIMULATION_QUALITATIVE_PROMPT", "LOSS: {{risk_summary}}")
+    monkeypatch.setattr(nodes, "CONTROL_GAP_ANALYSIS_PROMPT", "GAP: {{risk_summary}}")
+    monkeypatch.setattr(nodes, "PREVENTION_STRATEGY_PROMPT", "PREVENTION: {{control_gaps_json}}")
+    return nodes.ReportGenerator()
+
+
+async def _generate(generator):
+    return await generator.generate_report(
+        agent_input=RiskManagingAgentInput(user_input="L/C 서류 불일치로 대금 지연", conversation_history=[]),
+        risk_scoring=RiskScoring(overall_risk_level="high", risk_factors=[], overall_assessment="대금 회수 리스크"),
+        similar_cases=[],
+        evidence_sources=[],
+        rag_documents=[],
+    )
+
+
+async def test_independent_sections_run_concurrently(generator):
+    completions = _FakeCompletions()
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    started = time.perf_counter()
+    report = await _generate(generator)
+    elapsed = time.perf_counter() - started
+
+    # summary / loss / gap 동시 -> prevention: LLM 지연 2회분
+    assert elapsed < LATENCY * 3
+    assert report.input_summary == "SUMMARY 결과"
+    assert report.prevention_strategy.short_term == ["즉시 조치"]
+    prevention_prompt = next(prompt for prompt in completions.prompts if prompt.startswith("PREVENTION"))
+    assert "서류 검증 누락" in prevention_prompt
+
+    metadata = report.generation_metadata
+    assert metadata["partial"] is False
+    assert set(metadata["sections"]) == {"input_summary", "loss_simulation", "control_gap_analysis", "prevention_strategy"}
+    assert all(section["status"] == "ok" for section in metadata["sections"].values())
+
+
+async def test_section_timeout_returns_partial_report(generator, monkeypatch):
+    monkeypatch.setattr(get_settings(), "report_section_timeout_seconds", LATENCY * 2)
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(hang_on="LOSS")))
+
+    report = await _generate(generator)
+
+    assert report.input_summary == "SUMMARY 결과"
+    assert report.loss_simulation.qualitative == "손실 시뮬레이션 생성 시간 초과"
+    assert report.generation_metadata["partial"] is True
+    assert report.generation_metadata["sections"]["loss_simulation"]["status"] == "timeout"
+    assert report.generation_metadata["sections"]["prevention_strategy"]["status"] == "ok"
+
+
+async def test_section_error_is_not_reported_as_timeout(generator, monkeypatch):
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions()))
+
+    async def broken(risk_scoring):
+        raise RuntimeError("bad response")
+
+    monkeypatch.setattr(generator, "_generate_control_gap_analysis", broken)
+
+    report = await _generate(generator)
+
+    assert report.control_gap_analysis.identified_gaps == ["분석 중 오류 발생"]
+    sections = report.generation_metadata["sections"]
+    assert sections["control_gap_analysis"]["status"] == "error"
+    assert sections["prevention_strategy"]["status"] == "ok"
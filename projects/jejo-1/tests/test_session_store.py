@@ -1,11 +1,15 @@
 # tests/test_session_store.py
 
+import asyncio
 import pytest
 import time
 import json
 from typing import Dict, Any
 
+import redis
+
 from backend.agents.orchestrator.session_store import (
+    AsyncRedisConversationStore,
     InMemoryConversationStore,
     RedisConversationStore,
     create_conversation_store,
@@ -189,6 +193,237 @@ class TestRedisConversationStore:
         redis_store.delete_state(session_id)
 
 
+class _LocalRedis:
+    """In-memory stand-in for the redis.asyncio commands the session store uses.
+
+    Counts payload bytes sent by write commands so tests can check per-turn cost.
+    """
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.ttls: Dict[str, int] = {}
+        self.bytes_written = 0
+        self.pipelines = 0
+        self.versions: Dict[str, int] = {}  # bumped on every write, for WATCH
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return _LocalPipeline(self)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.ttls.pop(key, None)
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _apply(self, name, *args, **kwargs):
+        if name in ("set", "hset", "hdel", "rpush", "ltrim", "delete"):
+            for key in args if name == "delete" else args[:1]:
+                self.versions[key] = self.versions.get(key, 0) + 1
+        if name == "get":
+            return self.data.get(args[0])
+        if name == "set":
+            self.data[args[0]] = args[1]
+            self.bytes_written += len(args[1])
+            return True
+        if name == "hgetall":
+            return dict(self.data.get(args[0], {}))
+        if name == "hset":
+            mapping = kwargs["mapping"]
+            self.data.setdefault(args[0], {}).update(mapping)
+            self.bytes_written += sum(len(value) for value in mapping.values())
+            return len(mapping)
+        if name == "hdel":
+            fields = self.data.get(args[0], {})
+            return sum(fields.pop(field, None) is not None for field in args[1:])
+        if name == "rpush":
+            self.data.setdefault(args[0], []).extend(args[1:])
+            self.bytes_written += sum(len(value) for value in args[1:])
+            return len(self.data[args[0]])
+        if name == "ltrim":
+            key, start, end = args
+            items = self.data.get(key, [])
+            self.data[key] = items[start:] if end == -1 else items[start:end + 1]
+            return True
+        if name == "lrange":
+            items = self.data.get(args[0], [])
+            return list(items[args[1]:] if args[2] == -1 else items[args[1]:args[2] + 1])
+        if name == "expire":
+            self.ttls[args[0]] = args[1]
+            return args[0] in self.data
+        if name == "delete":
+            return sum(self.data.pop(key, None) is not None for key in args)
+        raise NotImplementedError(name)
+
+
+class _LocalPipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+        self._watched: Dict[str, int] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    # WATCH puts the pipeline in immediate mode until multi()
+    async def watch(self, *keys):
+        self._watched = {key: self._redis.versions.get(key, 0) for key in keys}
+
+    def multi(self):
+        pass
+
+    async def llen(self, key):
+        await asyncio.sleep(0)  # lets a concurrent save interleave here
+        return len(self._redis.data.get(key, []))
+
+    async def lindex(self, key, index):
+        items = self._redis.data.get(key, [])
+        return items[index] if items else None
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        commands, self._commands = self._commands, []
+        watched, self._watched = self._watched, {}
+        if any(self._redis.versions.get(key, 0) != version for key, version in watched.items()):
+            raise redis.WatchError("watched key changed")
+        return [self._redis._apply(name, *args, **kwargs) for name, args, kwargs in commands]
+
+
+class TestAsyncRedisConversationStore:
+    """AsyncRedisConversationStore against the local redis stand-in"""
+
+    @staticmethod
+    def _store(**overrides):
+        settings = Settings(session_ttl=60, session_history_max_messages=50, **overrides)
+        redis = _LocalRedis()
+        return AsyncRedisConversationStore(settings, client=redis), redis
+
+    @staticmethod
+    async def _turn(store, session_id, turn):
+        state = await store.aget_state(session_id) or {
+            "active_agent": None,
+            "conversation_history": [],
+            "agent_specific_state": {},
+        }
+        history = state["conversation_history"] + [
+            {"role": "User", "content": f"질문 {turn}: 선적 지연 시 대응 방법은?"},
+            {"role": "Agent", "content": f"답변 {turn}: " + "계약서의 지연 조항과 보험 범위를 먼저 확인하세요. " * 4},
+        ]
+        agent_state = dict(state["agent_specific_state"])
+        agent_state["turn"] = turn
+        agent_state.setdefault("extracted_data", {"supplier": "A사", "items": list(range(50))})
+        await store.asave_state(session_id, {
+            "active_agent": "riskmanaging",
+            "conversation_history": history,
+            "agent_specific_state": agent_state,
+            "last_interaction_timestamp": time.time(),
+            "_persisted": state.get("_persisted"),
+        })
+
+    async def test_roundtrip_and_ttl_on_all_keys(self):
+        store, redis = self._store()
+        session_id = store.create_new_session_id()
+        assert await store.aget_state(session_id) is None
+
+        await self._turn(store, session_id, 0)
+        await self._turn(store, session_id, 1)
+        loaded = await store.aget_state(session_id)
+
+        assert loaded["active_agent"] == "riskmanaging"
+        assert [m["content"][:4] for m in loaded["conversation_history"]] == ["질문 0", "답변 0", "질문 1", "답변 1"]
+        assert loaded["agent_specific_state"]["turn"] == 1
+        assert loaded["agent_specific_state"]["extracted_data"]["supplier"] == "A사"
+        assert set(redis.ttls) == set(store._keys(session_id))
+        assert set(redis.ttls.values()) == {60}
+
+        await store.adelete_state(session_id)
+        assert await store.aget_state(session_id) is None
+
+    async def test_per_turn_bytes_stay_constant_and_history_is_capped(self):
+        store, redis = self._store()
+        session_id = store.create_new_session_id()
+        written = []
+        for turn in range(60):
+            before = redis.bytes_written
+            await self._turn(store, session_id, turn)
+            written.append(redis.bytes_written - before)
+
+        # first turn writes the unchanged extracted_data once; afterwards only deltas
+        assert max(written[2:]) <= min(written[2:]) * 1.1
+        assert written[59] < written[0]
+        history = (await store.aget_state(session_id))["conversation_history"]
+        assert len(history) == 50
+        assert history[-1]["content"].startswith("답변 59")
+
+    async def test_rewritten_history_and_removed_fields(self):
+        store, redis = self._store()
+        session_id = store.create_new_session_id()
+        await self._turn(store, session_id, 0)
+        state = await store.aget_state(session_id)
+
+        state["conversation_history"] = [{"role": "User", "content": "새 대화"}]
+        state["agent_specific_state"] = {"turn": 1}
+        await store.asave_state(session_id, state)
+        loaded = await store.aget_state(session_id)
+
+        assert loaded["conversation_history"] == [{"role": "User", "content": "새 대화"}]
+        assert loaded["agent_specific_state"] == {"turn": 1}
+
+    async def test_stale_snapshot_rewrites_instead_of_appending(self):
+        store, redis = self._store()
+        session_id = store.create_new_session_id()
+        await self._turn(store, session_id, 0)
+        first = await store.aget_state(session_id)
+        second = await store.aget_state(session_id)
+
+        first["conversation_history"] = first["conversation_history"] + [{"role": "User", "content": "A"}]
+        second["conversation_history"] = second["conversation_history"] + [{"role": "User", "content": "B"}]
+        await store.asave_state(session_id, first)
+        await store.asave_state(session_id, second)
+
+        # second turn was loaded before the first saved: no "A" + "B" interleaving
+        history = (await store.aget_state(session_id))["conversation_history"]
+        assert history == second["conversation_history"]
+
+    async def test_concurrent_saves_do_not_duplicate_history(self):
+        store, redis = self._store()
+        session_id = store.create_new_session_id()
+        await self._turn(store, session_id, 0)
+        states = [await store.aget_state(session_id) for _ in range(2)]
+        for label, state in zip("AB", states):
+            state["conversation_history"] = state["conversation_history"] + [{"role": "User", "content": label}]
+
+        # both pass the length/tail check before either executes; WATCH catches the loser
+        await asyncio.gather(*(store.asave_state(session_id, state) for state in states))
+
+        history = (await store.aget_state(session_id))["conversation_history"]
+        assert len(history) == 3
+        assert history in [state["conversation_history"] for state in states]
+
+    async def test_compression_and_legacy_sessions(self):
+        store, redis = self._store(session_compression=True, session_compression_min_bytes=64)
+        session_id = store.create_new_session_id()
+        await self._turn(store, session_id, 0)
+
+        _, history_key, _ = store._keys(session_id)
+        assert redis.data[history_key][1].startswith(b"z:")
+        loaded = await store.aget_state(session_id)
+        assert loaded["conversation_history"][1]["content"].startswith("답변 0")
+
+        legacy = {"active_agent": "quiz", "conversation_history": [], "agent_specific_state": {}}
+        redis.data["session:legacy"] = json.dumps(legacy).encode("utf-8")
+        assert (await store.aget_state("legacy"))["active_agent"] == "quiz"
+
+
 class TestConversationStoreFactory:
     """Test factory function"""
 
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+import backend.agents.riskmanaging.nodes as risk_nodes
+import backend.rag.embedding_cache as embedding_cache
+from backend.config import get_settings
+from backend.rag.embedder import get_embedding
+
+INPUTS = ["선적이 2주 지연될 것 같아요", "오늘 점심 뭐 먹지", "HS code 분류 문제로 통관 보류", ""]
+
+
+@pytest.fixture
+def local_cache(monkeypatch, tmp_path):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "embedding_provider", "local")
+    monkeypatch.setattr(settings, "local_embedding_dim", 512)
+    monkeypatch.setattr(settings, "vector_db_dir", str(tmp_path))
+    monkeypatch.setattr(risk_nodes, "_similarity_engines", {})
+    return tmp_path
+
+
+def _loop_cosine_max(user_input: str) -> float:
+    """Previous implementation: per-pair cosine over freshly embedded phrases."""
+    user = np.array(get_embedding(user_input))
+    best = 0.0
+    for phrase in risk_nodes.SimilarityEngine.REFERENCE_PHRASES:
+        ref = np.array(get_embedding(phrase))
+        best = max(best, float(np.dot(user, ref) / (np.linalg.norm(user) * np.linalg.norm(ref))))
+    return best
+
+
+def test_reference_embeddings_are_cached_on_disk(local_cache, monkeypatch):
+    engine = risk_nodes.SimilarityEngine()
+    assert engine.model_key == "local-hash:512"
+    assert engine.reference_matrix.shape == (15, 512)
+    assert os.path.exists(local_cache / "embedding_cache" / "local-hash_512.npz")
+
+    monkeypatch.setattr(
+        embedding_cache, "local_hash_embeddings", lambda texts, dim: pytest.fail("cache hit expected")
+    )
+    reloaded = risk_nodes.SimilarityEngine()
+    assert np.array_equal(reloaded.reference_matrix, engine.reference_matrix)
+
+    assert risk_nodes.get_similarity_engine() is risk_nodes.get_similarity_engine()
+
+
+def test_scores_match_previous_loop_and_batch_matches_single(local_cache):
+    engine = risk_nodes.SimilarityEngine()
+
+    singles = [engine.check_similarity(text, return_score=True) for text in INPUTS]
+    batch = engine.check_similarity_batch(INPUTS)
+
+    assert singles[-1] == (False, 0.0)
+    for text, (is_similar, score), batched in zip(INPUTS[:-1], singles, batch):
+        assert score == pytest.approx(_loop_cosine_max(text), abs=1e-5)
+        assert batched[0] == is_similar
+        assert batched[1] == pytest.approx(score, abs=1e-6)
+    assert singles[2][1] > singles[1][1]  # shares tokens with "HS code 문제"
+
+
+def test_upstage_phrases_embedded_once_and_failure_falls_back_to_local(local_cache, monkeypatch):
+    requests_made = []
+
+    def fake_get_embeddings(texts, fallback=True):
+        requests_made.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    monkeypatch.setattr(embedding_cache, "embedding_model_key", lambda: "upstage:embedding-query")
+    monkeypatch.setattr(embedding_cache, "get_embeddings", fake_get_embeddings)
+
+    key, matrix = embedding_cache.cached_embedding_matrix(["선적 지연", "클레임"])
+    assert key == "upstage:embedding-query"
+    assert requests_made == [["선적 지연", "클레임"]]
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+
+    embedding_cache.cached_embedding_matrix(["선적 지연", "클레임", "환율 변동"])
+    assert requests_made[-1] == ["환율 변동"]
+
+    monkeypatch.setattr(embedding_cache, "get_embeddings", lambda texts, fallback=True: [None for _ in texts])
+    key, matrix = embedding_cache.cached_embedding_matrix(["페널티 조항"])
+    assert key == "local-hash:512"
+    assert matrix.shape == (1, 512)
+
+
+async def test_engine_built_on_local_fallback_scores_queries_locally(local_cache, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "embedding_model_key", lambda: "upstage:embedding-query")
+    monkeypatch.setattr(risk_nodes, "embedding_model_key", lambda: "upstage:embedding-query")
+    monkeypatch.setattr(embedding_cache, "get_embeddings", lambda texts, fallback=True: [None for _ in texts])
+    monkeypatch.setattr(
+        risk_nodes, "get_embeddings", lambda texts, fallback=True: pytest.fail("local engine must not call Upstage")
+    )
+
+    engine = risk_nodes.get_similarity_engine()
+    assert engine.model_key == "local-hash:512"
+    assert list(risk_nodes._similarity_engines) == ["local-hash:512"]
+    assert engine.check_similarity_batch(INPUTS) == [
+        engine.check_similarity(text, return_score=True) for text in INPUTS
+    ]
+    assert await engine.acheck_similarity(INPUTS[0], return_score=True) == engine.check_similarity(
+        INPUTS[0], return_score=True
+    )
+
+    # Upstage recovers: the next call builds an Upstage engine, and a failed query
+    # is scored by the local engine instead of against the Upstage matrix
+    monkeypatch.setattr(
+        embedding_cache, "get_embeddings", lambda texts, fallback=True: [[1.0, 0.0, 0.5] for _ in texts]
+    )
+    upstage = risk_nodes.get_similarity_engine()
+    assert upstage.model_key == "upstage:embedding-query"
+    assert risk_nodes.get_similarity_engine() is upstage
+
+    async def failed_query(text, fallback=True):
+        assert fallback is False
+        return None
+
+    monkeypatch.setattr(risk_nodes, "aget_embedding", failed_query)
+    monkeypatch.setattr(risk_nodes, "get_embeddings", lambda texts, fallback=True: [None for _ in texts])
+    expected = engine.check_similarity(INPUTS[2], return_score=True)
+    assert await upstage.acheck_similarity(INPUTS[2], return_score=True) == expected
+    assert upstage.check_similarity(INPUTS[2], return_score=True) == expected
+    assert upstage.check_similarity_batch(INPUTS) == engine.check_similarity_batch(INPUTS)
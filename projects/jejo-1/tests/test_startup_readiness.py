@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import backend.main as main_module
+import backend.rag.chroma_client as chroma_client
+import backend.rag.index_status as index_status_module
+import backend.rag.retriever as retriever
+from backend.rag.index_status import IndexStatus
+
+
+class _FakeCollection:
+    def __init__(self, count: int):
+        self._count = count
+
+    def count(self):
+        return self._count
+
+
+@pytest.fixture
+def status(monkeypatch):
+    fresh = IndexStatus()
+    monkeypatch.setattr(index_status_module, "index_status", fresh)
+    monkeypatch.setattr(main_module, "index_status", fresh)
+    monkeypatch.setattr(main_module.settings, "environment", "development")
+    monkeypatch.setattr(main_module.settings, "auto_ingest_on_startup", True)
+    monkeypatch.setattr(main_module.settings, "force_reingest_on_startup", False)
+    monkeypatch.setattr(main_module.settings, "atomic_reindex", True)
+    monkeypatch.setattr(main_module, "compute_dataset_fingerprint", lambda: "fp-new")
+    return fresh
+
+
+def _install(monkeypatch, *, count_before: int, count_after: int, manifest, ingest_fn):
+    counts = {"value": count_before}
+    monkeypatch.setattr(main_module, "get_or_create_collection", lambda: _FakeCollection(counts["value"]))
+    monkeypatch.setattr(main_module, "load_ingest_manifest", lambda: manifest)
+
+    def fake_ingest(reset, atomic):
+        ingest_fn(reset=reset, atomic=atomic)
+        counts["value"] = count_after
+
+    monkeypatch.setattr(main_module, "ingest_data", fake_ingest)
+
+
+async def test_first_boot_serves_immediately_and_gates_readiness(monkeypatch, status):
+    release = threading.Event()
+    calls = []
+
+    def blocking_ingest(reset, atomic):
+        calls.append((reset, atomic))
+        assert release.wait(timeout=10)
+
+    _install(monkeypatch, count_before=0, count_after=42, manifest={}, ingest_fn=blocking_ingest)
+    monkeypatch.setattr(
+        retriever, "get_or_create_collection", lambda: pytest.fail("degraded search must not query Chroma")
+    )
+
+    await main_module.run_startup_tasks()  # returns while ingestion is still running
+
+    assert status.state == index_status_module.BUILDING
+    response = await main_module.readiness_check()
+    assert response.status_code == 503
+    assert retriever.search("선적 지연") == []
+    assert retriever.search_filter_groups("선적 지연", [{"document_type": "faq"}]) == [[]]
+
+    release.set()
+    main_module._ingest_thread.join(timeout=10)
+
+    assert calls == [(False, True)]
+    assert status.state == index_status_module.READY
+    assert status.snapshot()["document_count"] == 42
+    assert (await main_module.readiness_check()).status_code == 200
+    assert not index_status_module.is_retrieval_degraded()
+
+
+async def test_atomic_reindex_keeps_serving_previous_index(monkeypatch, status):
+    release = threading.Event()
+    _install(
+        monkeypatch,
+        count_before=895,
+        count_after=900,
+        manifest={"dataset_fingerprint": "fp-old"},
+        ingest_fn=lambda reset, atomic: release.wait(timeout=10),
+    )
+
+    await main_module.run_startup_tasks()
+
+    assert status.state == index_status_module.REINDEXING
+    assert (await main_module.readiness_check()).status_code == 200
+    assert not index_status_module.is_retrieval_degraded()
+
+    release.set()
+    main_module._ingest_thread.join(timeout=10)
+    assert status.state == index_status_module.READY
+
+
+async def test_failed_first_build_stays_degraded(monkeypatch, status):
+    def failing_ingest(reset, atomic):
+        raise RuntimeError("embedding service unavailable")
+
+    _install(monkeypatch, count_before=0, count_after=0, manifest={}, ingest_fn=failing_ingest)
+
+    await main_module.run_startup_tasks()
+    main_module._ingest_thread.join(timeout=10)
+
+    snapshot = status.snapshot()
+    assert snapshot["state"] == index_status_module.FAILED
+    assert snapshot["error"] == "embedding service unavailable"
+    assert snapshot["retrieval_degraded"] is True
+    assert (await main_module.readiness_check()).status_code == 503
+
+
+async def test_dataset_change_with_entry_hashes_syncs_incrementally(monkeypatch, status):
+    _install(
+        monkeypatch,
+        count_before=895,
+        count_after=895,
+        manifest={"dataset_fingerprint": "fp-old", "files": {}},
+        ingest_fn=lambda reset, atomic: pytest.fail("dataset change must not trigger a full rebuild"),
+    )
+    synced = []
+    monkeypatch.setattr(main_module, "sync_data", lambda atomic: synced.append(atomic))
+
+    await main_module.run_startup_tasks()
+    main_module._ingest_thread.join(timeout=10)
+
+    assert synced == [True]
+    assert status.state == index_status_module.READY
+
+
+def test_atomic_swap_keeps_previous_collection_until_next_swap(monkeypatch, tmp_path):
+    deleted = []
+    monkeypatch.setattr(
+        chroma_client, "_client", SimpleNamespace(delete_collection=lambda name: deleted.append(name))
+    )
+    monkeypatch.setattr(chroma_client, "VECTOR_DB_DIR", str(tmp_path))
+    monkeypatch.setattr(chroma_client, "ACTIVE_COLLECTION_PATH", str(tmp_path / "active_collection.json"))
+    monkeypatch.setattr(chroma_client, "_active_collection_name", "base")
+    monkeypatch.setattr(chroma_client, "_previous_collection_name", None)
+
+    chroma_client.activate_collection("v1")
+    # queries that started on "base" before the swap can still finish
+    assert chroma_client.get_active_collection_name() == "v1"
+    assert deleted == []
+
+    chroma_client.activate_collection("v2")
+    assert deleted == ["base"]
+    pointer = json.loads((tmp_path / "active_collection.json").read_text(encoding="utf-8"))
+    assert (pointer["name"], pointer["previous"]) == ("v2", "v1")
+
+    chroma_client.activate_collection("v2")  # no-op
+    assert deleted == ["base"]